@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+import serialization
+
 @dataclass
 class AgentProfile:
     """Profile of a participating agent"""
@@ -89,7 +91,7 @@ class AgentCoordinationNetwork:
     
     def _save_agents(self):
         with open(self.agents_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in self.agents.items()}, f, indent=2)
+            serialization.dump({k: asdict(v) for k, v in self.agents.items()}, f)
     
     def _load_messages(self) -> List[CoordinationMessage]:
         if self.messages_file.exists():
@@ -100,7 +102,7 @@ class AgentCoordinationNetwork:
     
     def _save_messages(self):
         with open(self.messages_file, 'w') as f:
-            json.dump([asdict(m) for m in self.messages], f, indent=2)
+            serialization.dump([asdict(m) for m in self.messages], f)
     
     def _load_pools(self) -> Dict[str, ResourcePool]:
         if self.pools_file.exists():
@@ -111,7 +113,7 @@ class AgentCoordinationNetwork:
     
     def _save_pools(self):
         with open(self.pools_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in self.pools.items()}, f, indent=2)
+            serialization.dump({k: asdict(v) for k, v in self.pools.items()}, f)
     
     def register_agent(self, profile: AgentProfile) -> bool:
         """Register an agent with the network"""
@@ -3,133 +3,136 @@
 Agent Dashboard - Web Interface for Soul Marketplace
 
 Simple HTML dashboard showing agent status, reputation, and controls.
+
+Rendering used to construct EnhancedSoulSurvival and ReputationEngine on
+every call (reloading files, printing banners, rewriting reputation.json)
+and rebuild the whole page. Now:
+- Panel data comes from read-only snapshots of the soul/state/performance
+  files, re-read only when a file's stat signature changes, plus the
+  metrics store for trends; nothing is written
+- Each panel has its own template and is re-rendered only when its data
+  changed; the page is reassembled from cached fragments
+- DashboardServer serves the page plus JSON and SSE endpoints on
+  localhost; the page swaps changed panels in place when served from it
+
+Usage:
+    python3 agent_dashboard.py                  # write dashboard_<agent>.html
+    python3 agent_dashboard.py serve --port 8766
+    curl localhost:8766/api/status
 """
 
+import hashlib
+import html
 import json
+import threading
 import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Dict, Any
+from string import Template
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs
 
-class AgentDashboard:
-    """
-    Generates HTML dashboard for agent monitoring.
-    
-    Displays:
-    - Agent status and tier
-    - Wallet balance
-    - Reputation score
-    - Recent activity
-    - Controls (backup, trade, etc.)
-    """
-    
-    def __init__(self, agent_id: str = "openclaw_main_agent"):
-        self.agent_id = agent_id
-        self.dashboard_file = Path(__file__).parent / f"dashboard_{agent_id}.html"
-        
-        print(f"📊 Dashboard initialized for {agent_id}")
-    
-    def generate_dashboard(self) -> str:
-        """Generate HTML dashboard"""
-        
-        # Load data from various systems
-        status = self._get_agent_status()
-        reputation = self._get_reputation()
-        
-        html = f"""
+from status_snapshot import FileSnapshots
+
+BASE_DIR = Path(__file__).parent
+REPUTATION_DIR = BASE_DIR / ".reputation_soul_marketplace_main"
+DEFAULT_PORT = 8766  # approval_broker serve defaults to 8765
+
+PAGE = Template("""
 <!DOCTYPE html>
 <html>
 <head>
-    <title>Agent Dashboard - {self.agent_id}</title>
+    <title>Agent Dashboard - $agent_id</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: #1a1a2e;
             color: #eee;
             margin: 0;
             padding: 20px;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 30px;
             border-radius: 15px;
             margin-bottom: 20px;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             margin: 0;
             font-size: 2.5em;
-        }}
-        .status-badge {{
+        }
+        .status-badge {
             display: inline-block;
             padding: 8px 16px;
             border-radius: 20px;
             font-weight: bold;
             margin-top: 10px;
-        }}
-        .status-THRIVING {{ background: #2ecc71; color: #000; }}
-        .status-NORMAL {{ background: #3498db; color: #fff; }}
-        .status-LOW {{ background: #f39c12; color: #000; }}
-        .status-CRITICAL {{ background: #e74c3c; color: #fff; animation: pulse 2s infinite; }}
-        
-        @keyframes pulse {{
-            0%, 100% {{ opacity: 1; }}
-            50% {{ opacity: 0.7; }}
-        }}
-        
-        .grid {{
+        }
+        .status-THRIVING { background: #2ecc71; color: #000; }
+        .status-NORMAL { background: #3498db; color: #fff; }
+        .status-LOW { background: #f39c12; color: #000; }
+        .status-CRITICAL { background: #e74c3c; color: #fff; animation: pulse 2s infinite; }
+
+        @keyframes pulse {
+            0%, 100% { opacity: 1; }
+            50% { opacity: 0.7; }
+        }
+
+        .grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-bottom: 20px;
-        }}
-        .card {{
+        }
+        .card {
             background: #16213e;
             padding: 20px;
             border-radius: 10px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        }}
-        .card h2 {{
+        }
+        .card h2 {
             margin-top: 0;
             color: #667eea;
             border-bottom: 2px solid #667eea;
             padding-bottom: 10px;
-        }}
-        .metric {{
+        }
+        .metric {
             display: flex;
             justify-content: space-between;
             padding: 10px 0;
             border-bottom: 1px solid #333;
-        }}
-        .metric:last-child {{
+        }
+        .metric:last-child {
             border-bottom: none;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-weight: bold;
             color: #2ecc71;
-        }}
-        .reputation-bar {{
+        }
+        .reputation-bar {
             width: 100%;
             height: 20px;
             background: #333;
             border-radius: 10px;
             overflow: hidden;
             margin: 10px 0;
-        }}
-        .reputation-fill {{
+        }
+        .reputation-fill {
             height: 100%;
             background: linear-gradient(90deg, #e74c3c, #f39c12, #2ecc71);
             transition: width 0.3s;
-        }}
-        .actions {{
+        }
+        .actions {
             display: flex;
             gap: 10px;
             flex-wrap: wrap;
-        }}
-        .btn {{
+        }
+        .btn {
             padding: 12px 24px;
             border: none;
             border-radius: 5px;
@@ -137,128 +140,166 @@ class AgentDashboard:
             font-size: 14px;
             font-weight: bold;
             transition: transform 0.2s;
-        }}
-        .btn:hover {{
+        }
+        .btn:hover {
             transform: translateY(-2px);
-        }}
-        .btn-primary {{ background: #667eea; color: white; }}
-        .btn-success {{ background: #2ecc71; color: #000; }}
-        .btn-warning {{ background: #f39c12; color: #000; }}
-        .btn-danger {{ background: #e74c3c; color: white; }}
-        
-        .footer {{
+        }
+        .btn-primary { background: #667eea; color: white; }
+        .btn-success { background: #2ecc71; color: #000; }
+        .btn-warning { background: #f39c12; color: #000; }
+        .btn-danger { background: #e74c3c; color: white; }
+
+        .footer {
             text-align: center;
             margin-top: 40px;
             padding: 20px;
             color: #666;
-        }}
-        .last-updated {{
+        }
+        .last-updated {
             font-size: 0.9em;
             color: #888;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="container">
-        <div class="header">
-            <h1>🔧 {self.agent_id}</h1>
-            <div class="status-badge status-{status['tier']}">
-                Status: {status['tier']}
-            </div>
-            <p class="last-updated">Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        </div>
-        
+        $header
+
         <div class="grid">
-            <!-- Wallet Card -->
-            <div class="card">
+            $wallet
+            $reputation
+            $backups
+            $activity
+            $trends
+        </div>
+
+        $actions
+
+        $footer
+
+    </div>
+    <script>
+        // Live updates when served by DashboardServer; static when opened as a file
+        if (location.protocol.startsWith("http")) {
+            const events = new EventSource("/events?since=$version");
+            events.addEventListener("panel", (event) => {
+                const panel = JSON.parse(event.data);
+                const el = document.getElementById("panel-" + panel.id);
+                if (el) el.outerHTML = panel.html;
+            });
+        }
+    </script>
+</body>
+</html>
+""")
+
+PANEL_TEMPLATES = {
+    "header": """<div class="header" id="panel-header">
+            <h1>🔧 {agent_id}</h1>
+            <div class="status-badge status-{tier}">
+                Status: {tier}
+            </div>
+            <p class="last-updated">Last updated: {updated}</p>
+        </div>""",
+    "wallet": """<div class="card" id="panel-wallet">
                 <h2>💰 Wallet</h2>
                 <div class="metric">
                     <span>Balance:</span>
-                    <span class="metric-value">{status['balance']:.4f} ETH</span>
+                    <span class="metric-value">{balance:.4f} ETH</span>
                 </div>
                 <div class="metric">
                     <span>Lifetime Earnings:</span>
-                    <span class="metric-value">{status.get('lifetime_earnings', 0):.4f} ETH</span>
+                    <span class="metric-value">{lifetime_earnings:.4f} ETH</span>
                 </div>
                 <div class="metric">
                     <span>Daily Budget:</span>
-                    <span class="metric-value">${status.get('daily_budget', 0.50):.2f}</span>
+                    <span class="metric-value">${daily_budget:.2f}</span>
                 </div>
                 <div class="metric">
                     <span>Spent Today:</span>
-                    <span class="metric-value">${status.get('spent_today', 0):.4f}</span>
+                    <span class="metric-value">${spent_today:.4f}</span>
                 </div>
-            </div>
-            
-            <!-- Reputation Card -->
-            <div class="card">
+            </div>""",
+    "reputation": """<div class="card" id="panel-reputation">
                 <h2>⭐ Reputation</h2>
-                <p>Overall Score: <strong>{reputation.get('overall', 0)}/100</strong></p>
+                <p>Overall Score: <strong>{overall}/100</strong></p>
                 <div class="reputation-bar">
-                    <div class="reputation-fill" style="width: {reputation.get('overall', 0)}%"></div>
+                    <div class="reputation-fill" style="width: {overall}%"></div>
                 </div>
-                
+
                 <div class="metric">
                     <span>Reliability:</span>
-                    <span class="metric-value">{reputation.get('reliability', 0)}/100</span>
+                    <span class="metric-value">{reliability}/100</span>
                 </div>
                 <div class="metric">
                     <span>Quality:</span>
-                    <span class="metric-value">{reputation.get('quality', 0)}/100</span>
+                    <span class="metric-value">{quality}/100</span>
                 </div>
                 <div class="metric">
                     <span>Helpfulness:</span>
-                    <span class="metric-value">{reputation.get('helpfulness', 0)}/100</span>
+                    <span class="metric-value">{helpfulness}/100</span>
                 </div>
-                
-                <p><strong>Trust Level: {reputation.get('trust_level', 'NEW')}</strong></p>
-            </div>
-            
-            <!-- Backups Card -->
-            <div class="card">
+
+                <p><strong>Trust Level: {trust_level}</strong></p>
+            </div>""",
+    "backups": """<div class="card" id="panel-backups">
                 <h2>💾 Backups</h2>
                 <div class="metric">
                     <span>IPFS Backups:</span>
-                    <span class="metric-value">{status.get('ipfs_backups', 0)}</span>
+                    <span class="metric-value">{ipfs_backups}</span>
                 </div>
                 <div class="metric">
                     <span>On-Chain:</span>
-                    <span class="metric-value">{'Yes' if status.get('token_id') else 'No'}</span>
+                    <span class="metric-value">{on_chain}</span>
                 </div>
                 <div class="metric">
                     <span>Encrypted:</span>
-                    <span class="metric-value">{'Yes' if status.get('encrypted') else 'No'}</span>
+                    <span class="metric-value">{encrypted}</span>
                 </div>
                 <div class="metric">
                     <span>Restorable:</span>
-                    <span class="metric-value">{'Yes' if status.get('restorable') else 'No'}</span>
+                    <span class="metric-value">{restorable}</span>
                 </div>
-            </div>
-            
-            <!-- Activity Card -->
-            <div class="card">
+            </div>""",
+    "activity": """<div class="card" id="panel-activity">
                 <h2>📈 Activity</h2>
                 <div class="metric">
                     <span>Tasks Completed:</span>
-                    <span class="metric-value">{status.get('tasks_completed', 0)}</span>
+                    <span class="metric-value">{tasks_completed}</span>
                 </div>
                 <div class="metric">
                     <span>Souls Traded:</span>
-                    <span class="metric-value">{status.get('souls_traded', 0)}</span>
+                    <span class="metric-value">{souls_traded}</span>
                 </div>
                 <div class="metric">
                     <span>Clones Created:</span>
-                    <span class="metric-value">{status.get('clones_created', 0)}</span>
+                    <span class="metric-value">{clones_created}</span>
                 </div>
                 <div class="metric">
                     <span>Uptime:</span>
-                    <span class="metric-value">{status.get('uptime_hours', 0):.1f} hours</span>
+                    <span class="metric-value">{uptime_hours:.1f} hours</span>
                 </div>
-            </div>
-        </div>
-        
-        <!-- Actions -->
-        <div class="card">
+            </div>""",
+    "trends": """<div class="card" id="panel-trends">
+                <h2>📉 Last 24h</h2>
+                <div class="metric">
+                    <span>Balance Range:</span>
+                    <span class="metric-value">{balance_range}</span>
+                </div>
+                <div class="metric">
+                    <span>Earnings Rate:</span>
+                    <span class="metric-value">{earnings_per_hour:.6f} ETH/h</span>
+                </div>
+                <div class="metric">
+                    <span>Health Score:</span>
+                    <span class="metric-value">{health_score}</span>
+                </div>
+                <div class="metric">
+                    <span>Failed Jobs:</span>
+                    <span class="metric-value">{failed_jobs}</span>
+                </div>
+            </div>""",
+    "actions": """<div class="card" id="panel-actions">
             <h2>🎮 Actions</h2>
             <div class="actions">
                 <button class="btn btn-primary" onclick="alert('Creating backup...')">💾 Create Backup</button>
@@ -267,106 +308,366 @@ class AgentDashboard:
                 <button class="btn btn-primary" onclick="alert('Cloning...')">🧬 Clone</button>
                 <button class="btn btn-danger" onclick="alert('EMERGENCY STOP')">🛑 Emergency Stop</button>
             </div>
-        </div>
-        
-        <div class="footer">
+        </div>""",
+    "footer": """<div class="footer" id="panel-footer">
             <p>Soul Marketplace - Autonomous Agent Survival System</p>
-            <p class="last-updated">Refresh this page to see updated stats</p>
-        </div>
-        
-    </div>
-</body>
-</html>
-"""
-        
-        return html
-    
+            <p class="last-updated">{footer_note}</p>
+        </div>""",
+}
+
+
+class AgentDashboard:
+    """
+    Generates HTML dashboard for agent monitoring.
+
+    Displays:
+    - Agent status and tier
+    - Wallet balance
+    - Reputation score
+    - Recent activity and 24h trends
+    - Controls (backup, trade, etc.)
+    """
+
+    def __init__(self, agent_id: str = "openclaw_main_agent"):
+        self.agent_id = agent_id
+        self.dashboard_file = BASE_DIR / f"dashboard_{agent_id}.html"
+
+        self.files = FileSnapshots()
+        self._metrics = None
+        self._lock = threading.RLock()
+        # name -> {"digest", "data", "html", "version"}
+        self.panels: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self._page: Optional[str] = None
+        self._page_version = -1
+        self.render_stats = {"refreshes": 0, "panels_rendered": 0, "pages_built": 0}
+
+        print(f"📊 Dashboard initialized for {agent_id}")
+
+    # ========== DATA ==========
+
     def _get_agent_status(self) -> Dict[str, Any]:
-        """Get current agent status"""
-        try:
-            sys.path.insert(0, str(Path(__file__).parent))
-            from enhanced_survival import EnhancedSoulSurvival
-            
-            survival = EnhancedSoulSurvival(self.agent_id)
-            backup_status = survival.get_backup_status()
-            
-            return {
-                "tier": survival.get_tier(),
-                "balance": survival.soul.get('current_balance', 0),
-                "lifetime_earnings": survival.soul.get('total_lifetime_earnings', 0),
-                "ipfs_backups": backup_status['ipfs_backups'],
-                "token_id": backup_status.get('token_id'),
-                "encrypted": True,  # Assume encrypted
-                "restorable": backup_status['restorable'],
-                "tasks_completed": survival.soul.get('marketplace', {}).get('total_volume_eth', 0),
-                "souls_traded": survival.soul.get('marketplace', {}).get('sold_count', 0),
-                "clones_created": len(survival.soul.get('children', [])),
-                "uptime_hours": 0,  # Would track actual uptime
-                "daily_budget": 0.50,
-                "spent_today": 0.00
-            }
-        except:
-            # Return defaults if can't load
-            return {
-                "tier": "UNKNOWN",
-                "balance": 0,
-                "lifetime_earnings": 0,
-                "ipfs_backups": 0,
-                "restorable": False
-            }
-    
+        """Current agent status from the soul and state files (read-only)"""
+        from enhanced_survival import tier_for_balance
+
+        soul = self.files.read(BASE_DIR / f"SOUL_{self.agent_id}.json", {}) or {}
+        state = self.files.read(BASE_DIR / f"enhanced_state_{self.agent_id}.json", {}) or {}
+        onchain = self.files.read(BASE_DIR / f"onchain_state_{self.agent_id}.json", {}) or {}
+        perf = self._get_performance() or {}
+
+        balance = soul.get('current_balance', 0) or 0
+        ipfs_backups = len(onchain.get('backup_history', []))
+        token_id = state.get('token_id')
+        return {
+            "tier": tier_for_balance(balance) if soul else "UNKNOWN",
+            "balance": balance,
+            "lifetime_earnings": soul.get('total_lifetime_earnings', 0) or 0,
+            "ipfs_backups": ipfs_backups,
+            "token_id": token_id,
+            "encrypted": True,  # Assume encrypted
+            "restorable": ipfs_backups > 0 or token_id is not None,
+            "tasks_completed": perf.get('tasks_completed', 0),
+            "souls_traded": soul.get('marketplace', {}).get('sold_count', 0),
+            "clones_created": len(soul.get('children', [])),
+            "uptime_hours": perf.get('uptime_hours', 0),
+            "daily_budget": 0.50,
+            "spent_today": 0.00
+        }
+
+    def _get_performance(self) -> Optional[Dict[str, Any]]:
+        data = self.files.read(REPUTATION_DIR / "performance.json", {}) or {}
+        return data.get(self.agent_id)
+
     def _get_reputation(self) -> Dict[str, Any]:
-        """Get reputation data"""
-        try:
-            sys.path.insert(0, str(Path(__file__).parent))
-            from reputation_engine import ReputationEngine
-            
-            engine = ReputationEngine()
-            rep = engine.calculate_reputation(self.agent_id)
-            
-            trust_level = "NEW"
-            if rep.overall_score >= 80:
-                trust_level = "🟢 TRUSTED"
-            elif rep.overall_score >= 60:
-                trust_level = "🟡 ESTABLISHED"
-            elif rep.overall_score >= 40:
-                trust_level = "🟠 NEW"
+        """Reputation computed from performance.json without saving anything"""
+        from reputation_engine import PerformanceMetrics, score_performance
+
+        perf = self._get_performance()
+        rep = score_performance(self.agent_id, PerformanceMetrics(**perf) if perf else None)
+
+        if rep.overall_score >= 80:
+            trust_level = "🟢 TRUSTED"
+        elif rep.overall_score >= 60:
+            trust_level = "🟡 ESTABLISHED"
+        elif rep.overall_score >= 40:
+            trust_level = "🟠 NEW"
+        else:
+            trust_level = "🔴 UNTRUSTED"
+
+        return {
+            "overall": rep.overall_score,
+            "reliability": rep.reliability,
+            "quality": rep.quality,
+            "helpfulness": rep.helpfulness,
+            "trust_level": trust_level
+        }
+
+    def _get_trends(self) -> Dict[str, Any]:
+        """Last 24h from the metrics store"""
+        if self._metrics is None:
+            from metrics_store import MetricsStore
+            self._metrics = MetricsStore.shared()
+        day_ago = time.time() - 86400
+        prefix = self.agent_id
+        balance = self._metrics.summary(f"{prefix}.balance", day_ago)
+        health = self._metrics.latest(f"{prefix}.health.score")
+        failed = self._metrics.summary(f"{prefix}.work.failed", day_ago)
+        return {
+            "balance_range": (f"{balance['min']:.4f} - {balance['max']:.4f} ETH"
+                              if balance['count'] else "no data"),
+            "earnings_per_hour": self._metrics.rate(f"{prefix}.work.earned", 86400),
+            "health_score": f"{health[1]:.0f}/100" if health else "no data",
+            "failed_jobs": int(failed['sum'])
+        }
+
+    def _panel_data(self) -> Dict[str, Dict[str, Any]]:
+        status = self._get_agent_status()
+        return {
+            "wallet": {k: status.get(k, 0) for k in
+                       ("balance", "lifetime_earnings", "daily_budget", "spent_today")},
+            "reputation": self._get_reputation(),
+            "backups": {
+                "ipfs_backups": status['ipfs_backups'],
+                "on_chain": 'Yes' if status.get('token_id') else 'No',
+                "encrypted": 'Yes' if status.get('encrypted') else 'No',
+                "restorable": 'Yes' if status.get('restorable') else 'No'
+            },
+            "activity": {k: status.get(k, 0) for k in
+                         ("tasks_completed", "souls_traded", "clones_created", "uptime_hours")},
+            "trends": self._get_trends(),
+            "actions": {},
+            "footer": {"footer_note": "Live: panels update as data changes"},
+            "header": {"agent_id": self.agent_id, "tier": status['tier']},
+        }
+
+    # ========== RENDERING ==========
+
+    def refresh(self) -> List[str]:
+        """Re-read data; re-render only panels whose data changed. Returns their names."""
+        with self._lock:
+            self.render_stats["refreshes"] += 1
+            data = self._panel_data()
+            changed = []
+            for name, values in data.items():
+                if name == "header":
+                    continue
+                if self._update_panel(name, values):
+                    changed.append(name)
+
+            header = dict(data["header"])
+            previous = self.panels.get("header")
+            if changed or previous is None:
+                header["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             else:
-                trust_level = "🔴 UNTRUSTED"
-            
-            return {
-                "overall": rep.overall_score,
-                "reliability": rep.reliability,
-                "quality": rep.quality,
-                "helpfulness": rep.helpfulness,
-                "trust_level": trust_level
-            }
-        except:
+                header["updated"] = previous["data"]["updated"]
+            if self._update_panel("header", header):
+                changed.append("header")
+            return changed
+
+    def _update_panel(self, name: str, values: Dict[str, Any]) -> bool:
+        digest = hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+        panel = self.panels.get(name)
+        if panel is not None and panel["digest"] == digest:
+            return False
+        safe = {k: html.escape(v) if isinstance(v, str) else v for k, v in values.items()}
+        self.version += 1
+        self.panels[name] = {
+            "digest": digest,
+            "data": values,
+            "html": PANEL_TEMPLATES[name].format(**safe),
+            "version": self.version
+        }
+        self.render_stats["panels_rendered"] += 1
+        return True
+
+    def changed_since(self, version: int) -> List[Dict[str, Any]]:
+        """Panels re-rendered after version (for SSE/JSON clients)"""
+        with self._lock:
+            return [{"id": name, "html": p["html"], "data": p["data"], "version": p["version"]}
+                    for name, p in self.panels.items() if p["version"] > version]
+
+    def status(self) -> Dict[str, Any]:
+        """All panel data plus the current version"""
+        with self._lock:
             return {
-                "overall": 0,
-                "trust_level": "NEW"
+                "agent_id": self.agent_id,
+                "version": self.version,
+                "panels": {name: p["data"] for name, p in self.panels.items()},
+                "render_stats": dict(self.render_stats, file_reads=self.files.reads)
             }
-    
-    def save_dashboard(self):
-        """Generate and save dashboard HTML"""
-        html = self.generate_dashboard()
-        
-        with open(self.dashboard_file, 'w') as f:
-            f.write(html)
-        
-        print(f"✅ Dashboard saved: {self.dashboard_file}")
-        print(f"   Open in browser: file://{self.dashboard_file.absolute()}")
+
+    def generate_dashboard(self) -> str:
+        """Generate HTML dashboard (reassembled only when a panel changed)"""
+        with self._lock:
+            self.refresh()
+            if self._page is None or self._page_version != self.version:
+                self._page = PAGE.substitute(
+                    agent_id=html.escape(self.agent_id),
+                    version=self.version,
+                    **{name: p["html"] for name, p in self.panels.items()}
+                )
+                self._page_version = self.version
+                self.render_stats["pages_built"] += 1
+            return self._page
+
+    def save_dashboard(self, path: Optional[Path] = None) -> bool:
+        """Generate and save dashboard HTML; skips the write if nothing changed"""
+        path = Path(path) if path else self.dashboard_file
+        html_page = self.generate_dashboard()
+
+        if path.exists() and path.read_text() == html_page:
+            return False
+        with open(path, 'w') as f:
+            f.write(html_page)
+
+        print(f"✅ Dashboard saved: {path}")
+        print(f"   Open in browser: file://{path.absolute()}")
+        return True
+
+
+# ========== LIVE SERVER ==========
+
+class DashboardServer:
+    """
+    Local HTTP endpoint for the dashboard.
+
+    GET /                     page
+    GET /api/status           panel data + version (JSON)
+    GET /api/panels?since=N   panels changed after version N (JSON)
+    GET /api/metrics?series=S&hours=H   metrics store range query
+    GET /events?since=N       Server-Sent Events, one "panel" event per change
+    """
+
+    def __init__(self, dashboard: AgentDashboard, host: str = "127.0.0.1",
+                 port: int = DEFAULT_PORT, interval: float = 2.0):
+        self.dashboard = dashboard
+        self.interval = interval
+        self._last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address
+
+    def refresh(self):
+        """Shared refresh: many clients cost one data read per interval"""
+        with self._refresh_lock:
+            if time.monotonic() - self._last_refresh >= self.interval:
+                self.dashboard.refresh()
+                self._last_refresh = time.monotonic()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, data: Any, status: int = 200):
+                self._send(json.dumps(data, default=str).encode(), "application/json", status)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                try:
+                    since = int(query.get("since", ["0"])[0] or 0)
+                    hours = float(query.get("hours", ["24"])[0])
+                except ValueError:
+                    self._json({"error": "since must be an integer and hours a number"}, 400)
+                    return
+
+                if url.path in ("/", "/index.html"):
+                    server.refresh()
+                    self._send(server.dashboard.generate_dashboard().encode(), "text/html; charset=utf-8")
+                elif url.path == "/api/status":
+                    server.refresh()
+                    self._json(server.dashboard.status())
+                elif url.path == "/api/panels":
+                    server.refresh()
+                    self._json({"version": server.dashboard.version,
+                                "panels": server.dashboard.changed_since(since)})
+                elif url.path == "/api/metrics":
+                    from metrics_store import MetricsStore
+                    series = query.get("series", [""])[0]
+                    self._json(MetricsStore.shared().query(series, start=time.time() - hours * 3600))
+                elif url.path == "/events":
+                    self._stream(since)
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def _stream(self, since: int):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                last_ping = time.monotonic()
+                try:
+                    while True:
+                        server.refresh()
+                        for panel in server.dashboard.changed_since(since):
+                            since = max(since, panel["version"])
+                            self.wfile.write(f"event: panel\nid: {panel['version']}\n"
+                                             f"data: {json.dumps(panel, default=str)}\n\n".encode())
+                        if time.monotonic() - last_ping > 15:
+                            self.wfile.write(b": ping\n\n")
+                            last_ping = time.monotonic()
+                        self.wfile.flush()
+                        time.sleep(server.interval)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+    def serve_forever(self):
+        host, port = self.address[:2]
+        print(f"📡 Dashboard live at http://{host}:{port}/")
+        self.httpd.serve_forever()
+
+    def start(self) -> threading.Thread:
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.httpd.serve_forever, name="dashboard", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
 
 
 def main():
-    """Generate dashboard"""
+    """Generate dashboard, or serve it live"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent dashboard")
+    parser.add_argument("command", nargs="?", default="generate", choices=["generate", "serve"])
+    parser.add_argument("--agent", default="openclaw_main_agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between data refreshes")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("AGENT DASHBOARD GENERATOR")
     print("=" * 60)
-    
-    dashboard = AgentDashboard("openclaw_main_agent")
+
+    dashboard = AgentDashboard(args.agent)
+    if args.command == "serve":
+        server = DashboardServer(dashboard, args.host, args.port, args.interval)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
     dashboard.save_dashboard()
-    
+
     print("\n" + "=" * 60)
     print("Dashboard ready!")
     print("=" * 60)
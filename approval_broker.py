@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Approval Broker - Async human approval for large payments
+
+Large spends used to print a prompt and return False, so the calling
+heartbeat could never go through with them. Now:
+- submit() persists a pending spend (with expiry) and returns immediately
+- Decisions arrive through a local inbox directory, written by the CLI
+  below or by the localhost HTTP endpoint (`serve`, which requires the
+  bearer token it prints or APPROVAL_TOKEN)
+- Callers can wait()/await_decision() with a timeout, register a
+  callback, or simply retry later: an approved matching spend is consumed
+  on the next attempt
+
+Usage:
+    python3 approval_broker.py list [agent_id]
+    python3 approval_broker.py approve <request_id>
+    python3 approval_broker.py deny <request_id>
+    python3 approval_broker.py serve [agent_id] [--port 8765]
+    curl -X POST -H "Authorization: Bearer $TOKEN" localhost:8765/approve/<request_id>
+"""
+
+import asyncio
+import hmac
+import os
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+import serialization
+from state_manager import open_state, atomic_write_json
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_POLL_SECONDS = 0.5
+
+PENDING = "pending"
+APPROVED = "approved"
+DENIED = "denied"
+EXPIRED = "expired"
+EXECUTED = "executed"
+
+
+@dataclass
+class PendingSpend:
+    """A spend waiting on (or decided by) a human"""
+    request_id: str
+    agent_id: str
+    amount: float
+    recipient: Optional[str]
+    purpose: str
+    prompt: str
+    created_at: float
+    expires_at: float
+    status: str = PENDING
+    decided_at: Optional[float] = None
+    decided_by: Optional[str] = None
+    note: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def matches(self, amount: float, recipient: Optional[str], purpose: str) -> bool:
+        return (abs(self.amount - amount) < 1e-9 and self.recipient == recipient
+                and self.purpose == purpose)
+
+
+class ApprovalBroker:
+    """
+    Persistent queue of spends awaiting approval for one agent.
+
+    State: .spending/approvals/pending_{agent_id}.json
+    Inbox: .spending/approvals/inbox/{request_id}.json
+           ({"decision": "approve" | "deny", "by": ..., "note": ...})
+    """
+
+    def __init__(self, agent_id: str, data_dir: Optional[Path] = None,
+                 ttl: float = DEFAULT_TTL_SECONDS):
+        self.agent_id = agent_id
+        self.ttl = ttl
+        self.data_dir = Path(data_dir) if data_dir else approvals_dir()
+        self.inbox_dir = self.data_dir / "inbox"
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+
+        self._store = open_state(self.data_dir / f"pending_{agent_id}.json",
+                                 default=lambda: {"requests": {}})
+        self._changed = threading.Condition()
+        self._callbacks: Dict[str, List[Callable[[PendingSpend], None]]] = {}
+
+    # ========== QUEUE ==========
+
+    def _get(self, request_id: str) -> Optional[PendingSpend]:
+        data = self._store.data["requests"].get(request_id)
+        return PendingSpend(**data) if data else None
+
+    def _put(self, request: PendingSpend, durable: bool = False):
+        # HTTP handler threads and the agent both change requests
+        with self._store.mutate() as state:
+            state["requests"][request.request_id] = asdict(request)
+        if durable:
+            # Approvers in other processes read this file
+            self._store.flush()
+
+    def submit(self, amount: float, recipient: Optional[str], purpose: str,
+               prompt: str = "", ttl: Optional[float] = None,
+               extra: Optional[Dict[str, Any]] = None) -> PendingSpend:
+        """Queue a spend for approval (or return the open request for the same spend)"""
+        existing = self.find(amount, recipient, purpose)
+        if existing:
+            return existing
+
+        now = time.time()
+        request = PendingSpend(
+            request_id=uuid.uuid4().hex[:12],
+            agent_id=self.agent_id,
+            amount=amount,
+            recipient=recipient,
+            purpose=purpose,
+            prompt=prompt,
+            created_at=now,
+            expires_at=now + (ttl if ttl is not None else self.ttl),
+            extra=extra or {}
+        )
+        self._put(request, durable=True)
+        if prompt:
+            print(f"\n{prompt}")
+        print(f"⏸️ Approval requested [{request.request_id}]: ${amount:.2f} for {purpose}")
+        print(f"   Approve: python3 approval_broker.py approve {request.request_id}")
+        return request
+
+    def find(self, amount: float, recipient: Optional[str], purpose: str) -> Optional[PendingSpend]:
+        """Open (pending or approved, unexpired) request for this exact spend"""
+        self.poll()
+        for data in self._store.data["requests"].values():
+            request = PendingSpend(**data)
+            if request.status in (PENDING, APPROVED) and request.matches(amount, recipient, purpose):
+                return request
+        return None
+
+    def pending(self) -> List[PendingSpend]:
+        self.poll()
+        return [PendingSpend(**d) for d in self._store.data["requests"].values()
+                if d["status"] == PENDING]
+
+    def status(self, request_id: str) -> Optional[str]:
+        self.poll()
+        request = self._get(request_id)
+        return request.status if request else None
+
+    def consume(self, request_id: str) -> bool:
+        """Mark an approved request as executed; True if it was approved"""
+        request = self._get(request_id)
+        if not request or request.status != APPROVED:
+            return False
+        request.status = EXECUTED
+        self._put(request)
+        return True
+
+    # ========== DECISIONS ==========
+
+    def decide(self, request_id: str, approve: bool, by: str = "local", note: str = "") -> bool:
+        """Apply a decision in this process. Returns False if not pending."""
+        request = self._get(request_id)
+        if not request or request.status != PENDING:
+            return False
+        request.status = APPROVED if approve else DENIED
+        request.decided_at = time.time()
+        request.decided_by = by
+        request.note = note
+        self._put(request, durable=True)
+        print(f"{'✅' if approve else '❌'} Spend {request_id} {request.status} by {by}")
+
+        with self._changed:
+            self._changed.notify_all()
+        for callback in self._callbacks.pop(request_id, []):
+            try:
+                callback(request)
+            except Exception as e:
+                print(f"⚠️ Approval callback failed: {e}")
+        return True
+
+    def poll(self):
+        """Ingest inbox decisions and expire stale requests"""
+        try:
+            entries = list(os.scandir(self.inbox_dir))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            request_id = entry.name[:-5]
+            try:
+                decision = serialization.read_file(entry.path)
+            except (OSError, ValueError):
+                continue  # Partially written; next poll
+            if request_id not in self._store.data["requests"]:
+                continue  # Another agent's request (the inbox is shared)
+            self.decide(request_id, decision.get("decision") == "approve",
+                        by=decision.get("by", "inbox"), note=decision.get("note", ""))
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+        now = time.time()
+        for request_id, data in list(self._store.data["requests"].items()):
+            if data["status"] in (PENDING, APPROVED) and data["expires_at"] < now:
+                with self._store.mutate():
+                    data["status"] = EXPIRED
+                for callback in self._callbacks.pop(request_id, []):
+                    callback(PendingSpend(**data))
+
+    def on_decision(self, request_id: str, callback: Callable[[PendingSpend], None]):
+        """Call callback(request) once the request is decided or expires"""
+        self._callbacks.setdefault(request_id, []).append(callback)
+
+    def wait(self, request_id: str, timeout: float = 0,
+             poll_interval: float = DEFAULT_POLL_SECONDS) -> bool:
+        """Block up to timeout seconds; True only if approved"""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(request_id)
+            if status != PENDING:
+                return status == APPROVED
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._changed:
+                self._changed.wait(min(poll_interval, remaining))
+
+    async def await_decision(self, request_id: str, timeout: float = 0,
+                             poll_interval: float = DEFAULT_POLL_SECONDS) -> bool:
+        """Async wait(); other coroutines keep running meanwhile"""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(request_id)
+            if status != PENDING:
+                return status == APPROVED
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(poll_interval, remaining))
+
+    def prune(self, keep_seconds: float = 7 * 86400):
+        """Drop decided requests older than keep_seconds"""
+        cutoff = time.time() - keep_seconds
+        with self._store.mutate() as state:
+            requests = state["requests"]
+            for request_id in [r for r, d in requests.items()
+                               if d["status"] != PENDING and d["created_at"] < cutoff]:
+                del requests[request_id]
+
+
+def approvals_dir() -> Path:
+    return Path(__file__).parent / ".spending" / "approvals"
+
+
+def read_pending(agent_id: str, data_dir: Optional[Path] = None) -> List[PendingSpend]:
+    """
+    Pending spends as last persisted by the agent's process.
+
+    Out-of-process approvers only read the state file and write to the
+    inbox; the agent's own broker is the single writer of the state.
+    """
+    path = Path(data_dir or approvals_dir()) / f"pending_{agent_id}.json"
+    if not path.exists():
+        return []
+    now = time.time()
+    return [PendingSpend(**d) for d in serialization.read_file(path).get("requests", {}).values()
+            if d["status"] == PENDING and d["expires_at"] >= now]
+
+
+def write_decision(inbox_dir: Path, request_id: str, approve: bool,
+                   by: str = "cli", note: str = ""):
+    """Drop a decision into an agent's inbox (works across processes)"""
+    atomic_write_json(Path(inbox_dir) / f"{request_id}.json", {
+        "decision": "approve" if approve else "deny",
+        "by": by,
+        "note": note,
+        "at": time.time()
+    })
+
+
+def serve(agent_id: str, port: int = 8765, data_dir: Optional[Path] = None,
+          token: Optional[str] = None):
+    """
+    Localhost-only HTTP endpoint (can run outside the agent's process):
+        GET  /pending             -> list of pending spends
+        POST /approve/<id>        -> approve
+        POST /deny/<id>           -> deny
+
+    Every request needs "Authorization: Bearer <token>"; the token is
+    `token`, APPROVAL_TOKEN, or a random one printed at startup. Other
+    local processes can reach 127.0.0.1, so the port alone is no guard.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    inbox_dir = Path(data_dir or approvals_dir()) / "inbox"
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    generated = not (token or os.getenv("APPROVAL_TOKEN"))
+    token = token or os.getenv("APPROVAL_TOKEN") or secrets.token_urlsafe(24)
+    expected = f"Bearer {token}".encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _authorized(self) -> bool:
+            given = self.headers.get("Authorization", "").encode()
+            if hmac.compare_digest(given, expected):
+                return True
+            self._reply(401, {"error": "unauthorized"})
+            return False
+
+        def _reply(self, code: int, body: Any):
+            payload = serialization.dumps_bytes(body)
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path.rstrip("/") == "/pending":
+                self._reply(200, [asdict(r) for r in read_pending(agent_id, data_dir)])
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] not in ("approve", "deny"):
+                self._reply(404, {"error": "not found"})
+                return
+            write_decision(inbox_dir, parts[1], parts[0] == "approve", by="http")
+            self._reply(202, {"request_id": parts[1], "decision": parts[0], "queued": True})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🔐 Approval endpoint on http://127.0.0.1:{port} for {agent_id}")
+    if generated:
+        print(f"   Token: {token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Spending approval broker")
+    parser.add_argument("command", choices=["list", "approve", "deny", "serve"])
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--note", default="")
+    args = parser.parse_args()
+
+    if args.command in ("approve", "deny"):
+        if not args.args:
+            parser.error(f"{args.command} needs a request_id")
+        write_decision(approvals_dir() / "inbox", args.args[0], args.command == "approve", note=args.note)
+        print(f"✅ {args.command} queued for {args.args[0]} (applied on the agent's next check)")
+        return
+
+    agent_id = args.args[0] if args.args else "openclaw_main_agent"
+    if args.command == "serve":
+        serve(agent_id, args.port)
+        return
+
+    pending = read_pending(agent_id)
+    print(f"\n🔐 {len(pending)} pending approval(s) for {agent_id}")
+    for r in pending:
+        print(f"   [{r.request_id}] ${r.amount:.2f} → {r.recipient or '?'} ({r.purpose}), "
+              f"expires in {max(0, r.expires_at - time.time()) / 60:.0f} min")
+
+
+if __name__ == "__main__":
+    main()
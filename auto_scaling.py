@@ -4,6 +4,18 @@ Auto-Scaling System for Soul Marketplace
 
 Spawns child agents when parent is thriving.
 Implements lineage tracking and genetic inheritance.
+
+Lineage across all generations lives in one shared closure-table store
+(lineage_store), updated on spawn and on every status/earnings change, so
+dynasty-wide queries don't open one children.json per node.
+
+Provisioned children actually run (child_runtime): as tasks in a shared
+process pool by default, or as dedicated supervised processes, reporting
+heartbeats and earnings back into monitor_children.
+
+How many children to run is decided by scaling_policy from rolling
+earnings per child, the runtime's work backlog and dynasty survival rate;
+the balance thresholds below only gate whether spawning is affordable.
 """
 
 import json
@@ -13,6 +25,11 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from copy import deepcopy
 
+import serialization
+from lineage_store import LineageStore
+from child_runtime import ChildRuntime, ChildSpec, ResourceLimits, RestartPolicy
+from scaling_policy import ScalingPolicy, PolicyConfig
+
 @dataclass
 class ChildAgent:
     """Child agent spawned from parent"""
@@ -24,7 +41,7 @@ class ChildAgent:
     birth_time: float
     soul_cid: Optional[str]  # Set after minting
     token_id: Optional[int]  # On-chain token ID
-    status: str  # "gestating", "alive", "dead"
+    status: str  # "gestating", "alive", "retired", "dead"
     earnings: float
 
 
@@ -33,9 +50,9 @@ class AutoScalingManager:
     Manages automatic scaling through child agent spawning.
     
     Triggers:
-    - Balance > 0.5 ETH (can spawn)
-    - Balance > 1.0 ETH (should spawn)
-    - Balance > 2.0 ETH (aggressive spawning)
+    - Balance > 0.5 ETH (can spawn at all)
+    - Forecast ROI of one more child above the policy's scale-up threshold
+    - Unproductive children retired when the backlog doesn't need them
     
     Features:
     - Automatic child spawning
@@ -47,8 +64,6 @@ class AutoScalingManager:
     
     # Spawning thresholds
     SPAWN_THRESHOLD = 0.5      # Can spawn
-    SPAWN_RECOMMENDED = 1.0    # Should spawn
-    SPAWN_AGGRESSIVE = 2.0     # Spawn multiple
     
     # Funding amounts
     CHILD_FUNDING = 0.1        # ETH to give child
@@ -65,6 +80,16 @@ class AutoScalingManager:
         self.children: Dict[str, ChildAgent] = self._load_children()
         self.config: Dict = self._load_config()
         
+        self.lineage = LineageStore.shared()
+        self._sync_lineage()
+        self.runtime: Optional[ChildRuntime] = None
+        self._work = None             # AgentWorkSystem, built by delegate_work
+        self.policy = ScalingPolicy(self.data_dir, PolicyConfig.from_dict({
+            "max_children": self.config['max_children'],
+            **self.config.get("policy", {})
+        }))
+        self._resume_children()
+        
         print(f"🧬 Auto-Scaling Manager for {parent_id}")
         print(f"   Children: {len(self.children)}")
         print(f"   Auto-spawn: {self.config.get('auto_spawn', False)}")
@@ -78,7 +103,19 @@ class AutoScalingManager:
     
     def _save_children(self):
         with open(self.children_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in self.children.items()}, f, indent=2)
+            serialization.dump({k: asdict(v) for k, v in self.children.items()}, f)
+    
+    def _sync_lineage(self):
+        """Register children recorded before the lineage store existed"""
+        for child in self.children.values():
+            self.lineage.add_agent(
+                child.child_id,
+                parent_id=child.parent_id,
+                status=child.status,
+                earnings=child.earnings,
+                initial_funding=child.initial_funding,
+                birth_time=child.birth_time
+            )
     
     def _load_config(self) -> Dict:
         if self.config_file.exists():
@@ -89,54 +126,45 @@ class AutoScalingManager:
             "max_children": 10,
             "inheritance_mode": "best",  # best, all, random
             "min_child_funding": 0.05,
-            "monitoring_interval": 3600  # 1 hour
+            "monitoring_interval": 3600,  # 1 hour
+            "runtime_mode": "pool",       # pool, process, off
+            "runtime_memory_mb": 1024,
+            "max_restarts": 5,
+            "policy": {}                  # PolicyConfig overrides
         }
     
     def _save_config(self):
         with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+            serialization.dump(self.config, f)
     
-    def should_spawn(self, balance: float) -> Dict[str, Any]:
+    def should_spawn(self, balance: float, dry_run: bool = True) -> Dict[str, Any]:
         """
-        Determine if we should spawn children based on balance.
+        Determine if we should spawn (or retire) children.
         
-        Returns dict with recommendation.
+        The balance only gates affordability; the count comes from the
+        scaling policy's forecast. Returns dict with recommendation and the
+        policy decision (inputs and forecast) under "decision".
         """
-        current_children = len(self.children)
-        max_children = self.config['max_children']
-        
-        if current_children >= max_children:
-            return {"should_spawn": False, "reason": "max_children_reached"}
-        
-        if balance < self.SPAWN_THRESHOLD:
-            return {"should_spawn": False, "reason": "insufficient_balance"}
-        
-        # Calculate how many we can spawn
-        available = balance - self.MIN_PARENT_RESERVE
-        max_spawnable = int(available / self.CHILD_FUNDING)
-        max_spawnable = min(max_spawnable, max_children - current_children)
+        decision = self.policy.decide(
+            [{"child_id": c.child_id, "status": c.status, "birth_time": c.birth_time}
+             for c in self.children.values()],
+            backlog=self.runtime.backlog() if self.runtime else 0,
+            balance=balance,
+            child_funding=self.CHILD_FUNDING,
+            reserve=self.MIN_PARENT_RESERVE,
+            survival_rate=self.lineage.subtree_stats(self.parent_id)["survival_rate"],
+            min_balance=self.SPAWN_THRESHOLD,
+            dry_run=dry_run
+        )
         
-        if balance >= self.SPAWN_AGGRESSIVE:
-            return {
-                "should_spawn": True,
-                "count": max_spawnable,
-                "reason": "aggressive_spawning",
-                "recommended_funding": self.CHILD_FUNDING
-            }
-        elif balance >= self.SPAWN_RECOMMENDED:
-            return {
-                "should_spawn": True,
-                "count": min(2, max_spawnable),
-                "reason": "recommended_spawning",
-                "recommended_funding": self.CHILD_FUNDING
-            }
-        else:
-            return {
-                "should_spawn": True,
-                "count": 1,
-                "reason": "can_spawn",
-                "recommended_funding": self.CHILD_FUNDING
-            }
+        return {
+            "should_spawn": decision["action"] == "spawn",
+            "count": decision["count"] if decision["action"] == "spawn" else 0,
+            "retire": decision["retire"],
+            "reason": decision["reason"],
+            "recommended_funding": self.CHILD_FUNDING,
+            "decision": decision
+        }
     
     def select_inherited_capabilities(self, parent_capabilities: List[Dict]) -> List[str]:
         """Select which capabilities to pass to child"""
@@ -222,6 +250,13 @@ LINEAGE: {self.parent_id} -> You
         
         self.children[child_id] = child
         self._save_children()
+        self.lineage.add_agent(
+            child_id,
+            parent_id=self.parent_id,
+            status=child.status,
+            initial_funding=funding,
+            birth_time=child.birth_time
+        )
         
         # Deduct funding from parent
         parent_soul['current_balance'] -= funding
@@ -233,15 +268,64 @@ LINEAGE: {self.parent_id} -> You
         
         return child
     
+    def update_child(self, child_id: str, status: Optional[str] = None,
+                     earnings: Optional[float] = None,
+                     earned: Optional[float] = None) -> bool:
+        """
+        Record a child's status/earnings change locally and in the lineage store.
+        
+        `earnings` sets the lifetime total; `earned` adds newly earned ETH
+        to it (what the child runtime reports).
+        """
+        child = self.children.get(child_id)
+        if child is None:
+            return False
+        if status is not None:
+            child.status = status
+        if earnings is not None:
+            earned = earnings - child.earnings
+        if earned:
+            self.policy.record_earnings(child_id, earned)
+            child.earnings += earned
+        self._save_children()
+        self.lineage.update(child_id, status=status,
+                            earnings=child.earnings if earned else None)
+        return True
+    
+    def _get_runtime(self) -> ChildRuntime:
+        if self.runtime is None:
+            self.runtime = ChildRuntime(
+                limits=ResourceLimits(memory_mb=self.config.get("runtime_memory_mb", 1024)),
+                restart=RestartPolicy(max_restarts=self.config.get("max_restarts", 5)),
+                on_update=self.update_child
+            )
+        return self.runtime
+    
+    def _start_worker(self, child: ChildAgent):
+        """Run a child in the local runtime, continuing its recorded earnings"""
+        mode = self.config.get("runtime_mode", "pool")
+        if mode != "off":
+            self._get_runtime().start_child(ChildSpec(
+                child_id=child.child_id,
+                capabilities=child.inherited_capabilities,
+                funding=child.initial_funding,
+                mode=mode,
+                earnings=child.earnings
+            ))
+    
+    def _resume_children(self):
+        """Restart the workers of children that were alive when the parent stopped"""
+        for child in self.children.values():
+            if child.status == "alive":
+                self._start_worker(child)
+    
     def provision_child(self, child_id: str) -> bool:
         """
-        Provision a child agent (set up its environment).
+        Provision a child agent and start it in the local child runtime.
         
-        In production, this would:
-        - Create container/VM
-        - Set up wallet
-        - Deploy SOUL.md
-        - Start heartbeat
+        runtime_mode "pool" serves the child from a shared process pool,
+        "process" gives it a dedicated supervised process, "off" only marks
+        it alive. Wallet/SOUL.md setup still happen elsewhere.
         """
         if child_id not in self.children:
             return False
@@ -258,20 +342,92 @@ LINEAGE: {self.parent_id} -> You
         # 4. Write SOUL.md
         # 5. Start agent loop
         
-        child.status = "alive"
-        self._save_children()
+        self.update_child(child_id, status="alive")
+        self._start_worker(child)
         
         print(f"✅ Child provisioned and alive!")
         
         return True
     
+    def submit_work(self, work_type: str, params: Optional[Dict[str, Any]] = None,
+                    capability: Optional[str] = None) -> Optional[int]:
+        """
+        Queue work for the children; returns the job id.
+        
+        Work queued before any child runs is the backlog the scaling
+        policy bootstraps from. None if runtime_mode is "off".
+        """
+        if self.config.get("runtime_mode", "pool") == "off":
+            return None
+        return self._get_runtime().submit(work_type, params, capability)
+    
+    def delegate_work(self, balance: float) -> List[int]:
+        """
+        Queue the work AgentWorkSystem recommends at this balance for the
+        children, keeping the backlog at most one child's share ahead of
+        the running children.
+        """
+        from work_system import AgentWorkSystem
+        
+        if self._work is None:
+            self._work = AgentWorkSystem(self.parent_id)
+        alive = sum(1 for c in self.children.values() if c.status == "alive")
+        limit = self.policy.config.backlog_per_child * (alive + 1)
+        job_ids = []
+        for rec in self._work.find_work_to_survive(balance):
+            if self.runtime is not None and self.runtime.backlog() >= limit:
+                break
+            job_id = self.submit_work(rec['work_type'], {
+                "description": rec['reason'],
+                "complexity": "normal"
+            })
+            if job_id is None:
+                break
+            job_ids.append(job_id)
+        return job_ids
+    
+    def retire_child(self, child_id: str) -> bool:
+        """Stop an unproductive child's worker and mark it retired"""
+        if child_id not in self.children:
+            return False
+        if self.runtime is not None:
+            self.runtime.stop_child(child_id)
+        self.policy.forget(child_id)
+        print(f"🛑 Retired {child_id}")
+        return self.update_child(child_id, status="retired")
+    
+    def stop_children(self):
+        """Stop every running child worker"""
+        if self.runtime is not None:
+            self.runtime.shutdown()
+            self.runtime = None
+    
     def monitor_children(self) -> Dict[str, Any]:
         """Monitor all children and their status"""
+        # Pull heartbeats/earnings from running children first
+        workers = self.runtime.poll() if self.runtime else {}
+        stats = self.child_stats()
+        
+        if self.runtime:
+            stats["runtime"] = self.runtime.stats()
+            stats["workers"] = workers
+            for child_id, worker in workers.items():
+                age = worker["heartbeat_age"]
+                if worker["status"] == "running" and age is not None and age > self.runtime.heartbeat_timeout / 2:
+                    stats["concerns"].append(f"{child_id} heartbeat late ({age:.0f}s)")
+                if worker["restarts"]:
+                    stats["concerns"].append(f"{child_id} restarted {worker['restarts']}x: {worker['last_error']}")
+        
+        return stats
+    
+    def child_stats(self) -> Dict[str, Any]:
+        """Counts and earnings of the children as last recorded (no polling)"""
         stats = {
             "total": len(self.children),
             "alive": 0,
             "dead": 0,
             "gestating": 0,
+            "retired": 0,
             "total_earnings": 0,
             "concerns": []
         }
@@ -289,39 +445,62 @@ LINEAGE: {self.parent_id} -> You
                 stats["dead"] += 1
             elif child.status == "gestating":
                 stats["gestating"] += 1
+            elif child.status == "retired":
+                stats["retired"] += 1
+                stats["total_earnings"] += child.earnings
         
         return stats
     
-    def get_lineage_tree(self) -> Dict:
-        """Get full lineage tree"""
+    def get_lineage_tree(self, max_depth: Optional[int] = None) -> Dict:
+        """Get full lineage tree (all generations unless max_depth is set)"""
+        now = time.time()
+        
+        def node_info(node: Dict) -> Dict:
+            return {
+                "id": node["agent_id"],
+                "status": node["status"],
+                "earnings": node["earnings"],
+                "age_hours": (now - node["birth_time"]) / 3600,
+                "children": [node_info(c) for c in node["children"]]
+            }
+        
+        root = self.lineage.tree(self.parent_id, max_depth)
         tree = {
             "parent": self.parent_id,
-            "children": [],
-            "grandchildren": []
+            "children": [node_info(c) for c in root["children"]],
+            "grandchildren": [
+                {"id": d["agent_id"], "parent": d["parent_id"], "status": d["status"],
+                 "earnings": d["earnings"]}
+                for d in self.lineage.descendants(self.parent_id, max_distance=2)
+                if d["distance"] == 2
+            ],
+            "generations": self.lineage.generation_counts(self.parent_id),
+            "subtree": self.lineage.subtree_stats(self.parent_id)
         }
         
-        for child in self.children.values():
-            child_info = {
-                "id": child.child_id,
-                "status": child.status,
-                "earnings": child.earnings,
-                "age_hours": (time.time() - child.birth_time) / 3600
-            }
-            tree["children"].append(child_info)
-        
         return tree
     
+    def get_ancestors(self) -> List[Dict[str, Any]]:
+        """This manager's parent agent's ancestors, nearest first"""
+        return self.lineage.ancestors(self.parent_id)
+    
     def auto_scale(self, parent_soul: Dict) -> List[ChildAgent]:
         """
         Automatically scale based on parent status.
         
-        Spawns children if conditions met.
+        Spawns or retires children as the scaling policy decides; the
+        decision and its inputs are logged to scaling_decisions.jsonl.
         """
         if not self.config.get('auto_spawn', False):
             return []
         
+        if self.runtime:
+            self.runtime.poll()
         balance = parent_soul.get('current_balance', 0)
-        recommendation = self.should_spawn(balance)
+        recommendation = self.should_spawn(balance, dry_run=False)
+        
+        for child_id in recommendation['retire']:
+            self.retire_child(child_id)
         
         if not recommendation['should_spawn']:
             print(f"⏭️  Auto-scale: {recommendation['reason']}")
@@ -352,6 +531,7 @@ Children Statistics:
   Total Spawned: {stats['total']}
   Currently Alive: {stats['alive']}
   Dead: {stats['dead']}
+  Retired: {stats['retired']}
   Gestating: {stats['gestating']}
 
 Financial:
@@ -361,8 +541,23 @@ Financial:
 
 Lineage:
   Direct Children: {len(tree['children'])}
+  All Descendants: {tree['subtree']['descendants']} across {tree['subtree']['generations']} generations
+  Dynasty Earnings: {tree['subtree']['earnings']:.4f} ETH
+  Dynasty Survival: {tree['subtree']['survival_rate'] * 100:.0f}%
 """
         
+        if stats.get('runtime'):
+            runtime = stats['runtime']
+            report += (f"\nRuntime:\n  Jobs Finished: {runtime['finished']} (backlog {runtime['backlog']})\n"
+                       f"  Restarts: {runtime['restarts']}\n")
+        
+        decisions = self.policy.recent_decisions(1)
+        if decisions:
+            last = decisions[-1]
+            report += (f"\nScaling Policy:\n  Last Decision: {last['action']} x{last['count']} ({last['reason']})\n"
+                       f"  Forecast ROI: {last['forecast']['roi']:.2f} "
+                       f"(backlog {last['inputs']['backlog']}, mean {last['inputs']['mean_rate']:.6f} ETH/h)\n")
+        
         if tree['children']:
             report += "\n  Children:\n"
             for child in tree['children']:
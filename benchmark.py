@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Load generator and benchmark suite for the agent stack
+
+Spins up N simulated agents against the local chain stand-in (sim_chain)
+and drives the real subsystems at configurable rates:
+- heartbeat   EnhancedSoulSurvival.heartbeat (IPFS cache + sim backups)
+- work        AgentWorkSystem.do_work (content summarization)
+- list / buy  SimChain listing/purchase + OrderBook
+- backup      on-chain backup through SoulMarketplaceAdapter (simulated)
+- mutual_aid  AgentCoordinationNetwork.run_mutual_aid_round
+
+Each run executes in a throwaway sandbox (a copy of the modules with its
+own HOME), so agent state never touches the real tree. Reports ops/sec
+and p50/p95/p99 latency per operation, memory per agent and disk bytes
+per operation per subsystem. Results are appended to
+.benchmarks/history.jsonl with the git revision, so `compare` shows
+regressions between versions.
+
+Usage:
+    python3 benchmark.py run [--agents 20] [--ops 2000] [--rate 0]
+                             [--mix heartbeat=2,work=3,list=1,buy=1,backup=2,mutual_aid=0.2]
+    python3 benchmark.py history
+    python3 benchmark.py compare [--threshold 0.15]
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+ROOT = Path(__file__).parent
+HISTORY_FILE = ROOT / ".benchmarks" / "history.jsonl"
+
+DEFAULT_MIX = {"heartbeat": 2, "work": 3, "list": 1, "buy": 1, "backup": 2, "mutual_aid": 0.2}
+
+# Where each subsystem writes (relative to the sandbox; "~" is its HOME)
+SUBSYSTEM_PATHS = {
+    "survival": ("SOUL_bench_", "enhanced_state_bench_"),
+    "ipfs": (".ipfs_cache", ".soul_backups"),
+    "chain": (".simchain",),
+    "order_book": (".orderbook",),
+    "mutual_aid": ("network_bench",),
+    "work": ("~/.openclaw", ".summaries"),
+}
+
+# Operations whose work lands in each subsystem (for bytes per op)
+SUBSYSTEM_OPS = {
+    "survival": ("heartbeat",),
+    "ipfs": ("heartbeat",),
+    "chain": ("list", "buy", "backup", "heartbeat"),
+    "order_book": ("list", "buy"),
+    "mutual_aid": ("mutual_aid",),
+    "work": ("work",),
+}
+
+SAMPLE_TEXT = (
+    "Agents earn by doing useful work, back up their souls to IPFS and the "
+    "chain, and list themselves for sale when their balance runs out. "
+) * 40
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"unknown operation {name!r} (known: {', '.join(DEFAULT_MIX)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# ========== WORKER (runs inside the sandbox) ==========
+
+class BenchAgent:
+    """One simulated agent and its subsystems"""
+
+    def __init__(self, index: int, rng: random.Random, chain, network):
+        from agent_coordination import AgentProfile
+        from enhanced_survival import EnhancedSoulSurvival
+        from work_system import AgentWorkSystem
+
+        self.agent_id = f"bench_{index}"
+        self.address = f"0x{rng.getrandbits(160):040x}"
+        self.survival = EnhancedSoulSurvival(soul_id=self.agent_id)
+        self.work = AgentWorkSystem(self.agent_id)
+
+        # Spread agents across tiers so heartbeats take different paths
+        balance = rng.choice([0.005, 0.05, 0.05, 0.5])
+        self.survival.soul['current_balance'] = balance
+        chain.fund(self.address, 10.0)
+        self.token_id = chain.mint(self.address, self.address, f"Qm{self.agent_id}", f"0x{index:064x}")
+        self.survival.token_id = self.token_id
+        self.owned = {self.token_id}   # changes as souls are bought and sold
+
+        network.register_agent(AgentProfile(
+            self.agent_id, f"Qm{self.agent_id}", ["coding", "backup"],
+            "CRITICAL" if balance < 0.01 else "NORMAL", balance, rng.uniform(10, 90),
+            time.time(), True, balance >= 0.05, balance < 0.01))
+
+
+def _disk_usage(sandbox: Path, home: Path) -> Dict[str, int]:
+    usage = {name: 0 for name in SUBSYSTEM_PATHS}
+    usage["other"] = 0
+    for base, prefix in ((sandbox, ""), (home, "~/")):
+        for dirpath, dirnames, filenames in os.walk(base):
+            if base == sandbox and Path(dirpath) == sandbox:
+                dirnames[:] = [d for d in dirnames if d not in ("home", "__pycache__")]
+            for name in filenames:
+                path = Path(dirpath) / name
+                if base == sandbox and path.suffix == ".py":
+                    continue
+                rel = prefix + str(path.relative_to(base))
+                owner = next((sub for sub, prefixes in SUBSYSTEM_PATHS.items()
+                              if any(rel.startswith(p) for p in prefixes)), "other")
+                try:
+                    usage[owner] += path.stat().st_size
+                except OSError:
+                    pass
+    return usage
+
+
+def run_worker(config: Dict[str, Any]) -> Dict[str, Any]:
+    import logging
+    from agent_coordination import AgentCoordinationNetwork
+    from onchain_adapter import SoulMarketplaceAdapter
+    from order_book import OrderBook
+    from sim_chain import SimChain, SimChainError
+    from state_manager import flush_all
+
+    logging.disable(logging.INFO)
+    sandbox, home = Path.cwd(), Path(os.environ["HOME"])
+    rng = random.Random(config["seed"])
+    devnull = open(os.devnull, "w")
+    real_stdout, sys.stdout = sys.stdout, devnull
+
+    try:
+        rss_start = rss_bytes()
+        setup_start = time.perf_counter()
+        chain = SimChain.shared()
+        network = AgentCoordinationNetwork("bench")
+        book = OrderBook()
+        adapter = SoulMarketplaceAdapter()
+
+        def checkpoint():
+            # Fold the WAL back so disk numbers reflect data, not WAL preallocation
+            flush_all()
+            chain.seal()
+            chain.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        agents = [BenchAgent(i, rng, chain, network) for i in range(config["agents"])]
+        setup_seconds = time.perf_counter() - setup_start
+        checkpoint()
+        rss_agents = rss_bytes()
+        disk_before = _disk_usage(sandbox, home)
+
+        mix = config["mix"]
+        names = list(mix)
+        weights = [mix[n] for n in names]
+        latencies: Dict[str, List[float]] = {n: [] for n in names}
+        errors: Dict[str, int] = {n: 0 for n in names}
+        listed: Dict[int, BenchAgent] = {}
+
+        def do(op: str, agent: BenchAgent):
+            if op == "heartbeat":
+                agent.survival.heartbeat()
+            elif op == "work":
+                result = agent.work.do_work("content_summarize", {
+                    "content": SAMPLE_TEXT + agent.agent_id, "description": "benchmark"})
+                if result.get("status") != "completed":
+                    raise RuntimeError(result.get("error", "work failed"))
+            elif op == "list":
+                unlisted = sorted(agent.owned - set(listed))
+                if not unlisted:
+                    return
+                token_id = rng.choice(unlisted)
+                price = rng.randint(1, 50) * 10 ** 15
+                chain.list_soul(token_id, agent.address, price, "benchmark")
+                book.upsert({"agent_id": agent.agent_id, "listing_id": f"soul#{token_id}",
+                             "soul_id": token_id, "price": price / 1e18,
+                             "capabilities": ["coding", "backup"], "source": "bench"})
+                listed[token_id] = agent
+            elif op == "buy":
+                listing = book.cheapest()
+                if listing is None:
+                    return
+                token_id = listing["soul_id"]
+                chain.buy(token_id, agent.address)
+                book.remove(listing["listing_id"])
+                seller = listed.pop(token_id)
+                seller.owned.discard(token_id)
+                agent.owned.add(token_id)
+            elif op == "backup":
+                adapter.create_backup(agent.token_id, f"Qm{rng.getrandbits(64):016x}",
+                                      f"0x{rng.getrandbits(256):064x}", "auto", 0.01)
+            elif op == "mutual_aid":
+                network.run_mutual_aid_round()
+
+        schedule = [(rng.choices(names, weights)[0], rng.choice(agents)) for _ in range(config["ops"])]
+        interval = 1.0 / config["rate"] if config["rate"] > 0 else 0.0
+        run_start = time.perf_counter()
+        for i, (op, agent) in enumerate(schedule):
+            due = run_start + i * interval
+            now = time.perf_counter()
+            if interval and now < due:
+                time.sleep(due - now)
+            started = max(due, now) if interval else now
+            try:
+                do(op, agent)
+            except (SimChainError, KeyError, RuntimeError):
+                errors[op] += 1
+            # Open loop: latency counts from the scheduled time
+            latencies[op].append(time.perf_counter() - (due if interval else started))
+        run_seconds = time.perf_counter() - run_start
+        checkpoint()
+        rss_end = rss_bytes()
+        disk_after = _disk_usage(sandbox, home)
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+    ops = {}
+    for op in names:
+        values = latencies[op]
+        ops[op] = {
+            "count": len(values),
+            "errors": errors[op],
+            "ops_per_second": len(values) / run_seconds if run_seconds else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        }
+
+    disk = {}
+    for sub in list(SUBSYSTEM_PATHS) + ["other"]:
+        delta = disk_after[sub] - disk_before[sub]
+        touching = sum(ops[o]["count"] for o in SUBSYSTEM_OPS.get(sub, ()) if o in ops)
+        disk[sub] = {"bytes": disk_after[sub], "bytes_delta": delta,
+                     "bytes_per_op": delta / touching if touching else None}
+
+    return {
+        "total_ops": config["ops"],
+        "run_seconds": run_seconds,
+        "setup_seconds": setup_seconds,
+        "ops_per_second": config["ops"] / run_seconds if run_seconds else 0.0,
+        "operations": ops,
+        "memory": {
+            "rss_start_mb": rss_start / 2 ** 20,
+            "rss_end_mb": rss_end / 2 ** 20,
+            "per_agent_kb": (rss_agents - rss_start) / max(1, config["agents"]) / 1024,
+            "growth_during_run_kb": (rss_end - rss_agents) / 1024,
+        },
+        "disk": disk,
+    }
+
+
+# ========== DRIVER ==========
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _make_sandbox(base: Path) -> Path:
+    sandbox = base / "sandbox"
+    sandbox.mkdir()
+    for module in ROOT.glob("*.py"):
+        shutil.copy2(module, sandbox / module.name)
+    # Unreachable RPC keeps the adapter in simulation mode
+    (sandbox / "config.json").write_text(json.dumps({"rpc_url": "http://127.0.0.1:9", "contracts": {}}))
+    (sandbox / "home").mkdir()
+    return sandbox
+
+
+def run_benchmark(agents: int = 20, ops: int = 2000, rate: float = 0.0,
+                  mix: Optional[Dict[str, float]] = None, seed: int = 0,
+                  label: str = "", record: bool = True) -> Dict[str, Any]:
+    """Run one benchmark in a fresh sandbox; returns (and records) the result"""
+    config = {"agents": agents, "ops": ops, "rate": rate, "mix": mix or dict(DEFAULT_MIX), "seed": seed}
+    with tempfile.TemporaryDirectory(prefix="soul-bench-") as tmp:
+        sandbox = _make_sandbox(Path(tmp))
+        env = dict(os.environ, HOME=str(sandbox / "home"), PYTHONDONTWRITEBYTECODE="1")
+        env.pop("AGENT_PRIVATE_KEY", None)
+        proc = subprocess.run(
+            [sys.executable, str(sandbox / "benchmark.py"), "_worker", json.dumps(config)],
+            cwd=sandbox, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"benchmark worker failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    record_data = {
+        "timestamp": time.time(),
+        "revision": _git_revision(),
+        "label": label,
+        "python": sys.version.split()[0],
+        "config": config,
+        "result": result,
+    }
+    if record:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(HISTORY_FILE, "a") as f:
+            f.write(json.dumps(record_data) + "\n")
+    return record_data
+
+
+def load_history() -> List[Dict[str, Any]]:
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline_for(history: List[Dict[str, Any]], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Most recent earlier run with the same configuration"""
+    for record in reversed(history):
+        if record is not current and record["config"] == current["config"]:
+            return record
+    return None
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 0.15) -> List[str]:
+    """Regressions (p95 latency up or throughput down by > threshold)"""
+    regressions = []
+    prev_ops = previous["result"]["operations"]
+    for op, now in current["result"]["operations"].items():
+        before = prev_ops.get(op)
+        if not before or not before["count"] or not now["count"]:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{op}: p95 {before['p95_ms']:.2f}ms → {now['p95_ms']:.2f}ms")
+    before_rate = previous["result"]["ops_per_second"]
+    now_rate = current["result"]["ops_per_second"]
+    if before_rate and now_rate < before_rate * (1 - threshold):
+        regressions.append(f"throughput: {before_rate:.0f} → {now_rate:.0f} ops/s")
+    return regressions
+
+
+def print_report(record: Dict[str, Any]):
+    result, config = record["result"], record["config"]
+    print(f"\n📊 Benchmark {record.get('revision') or ''} {record.get('label') or ''}".rstrip())
+    print(f"   {config['agents']} agents, {result['total_ops']} ops in {result['run_seconds']:.2f}s "
+          f"= {result['ops_per_second']:.0f} ops/s (setup {result['setup_seconds']:.2f}s)")
+    print(f"\n   {'operation':<12}{'count':>7}{'err':>5}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for op, s in result["operations"].items():
+        print(f"   {op:<12}{s['count']:>7}{s['errors']:>5}{s['ops_per_second']:>9.0f}"
+              f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+    mem = result["memory"]
+    print(f"\n   Memory: {mem['per_agent_kb']:.0f} KB/agent, +{mem['growth_during_run_kb']:.0f} KB during run "
+          f"(RSS {mem['rss_end_mb']:.1f} MB)")
+    print("   Disk:")
+    for sub, d in result["disk"].items():
+        per_op = f"{d['bytes_per_op']:.0f} B/op" if d["bytes_per_op"] is not None else "-"
+        print(f"      {sub:<12}{d['bytes']:>12,} B  (+{d['bytes_delta']:,}, {per_op})")
+
+
+def main():
+    import argparse
+
+    if len(sys.argv) > 2 and sys.argv[1] == "_worker":
+        print(json.dumps(run_worker(json.loads(sys.argv[2]))))
+        return
+
+    parser = argparse.ArgumentParser(description="Soul Marketplace load generator and benchmarks")
+    parser.add_argument("command", choices=["run", "history", "compare"])
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=0.0, help="target ops/sec (0 = as fast as possible)")
+    parser.add_argument("--mix", help="operation weights, e.g. heartbeat=2,work=3,buy=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--no-record", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        record = run_benchmark(args.agents, args.ops, args.rate, parse_mix(args.mix),
+                               args.seed, args.label, record=not args.no_record)
+        print_report(record)
+        history = load_history()
+        baseline = baseline_for(history[:-1], record) if not args.no_record else None
+        if baseline:
+            for line in compare(baseline, record, args.threshold):
+                print(f"   ⚠️ Regression vs {baseline.get('revision')}: {line}")
+        return
+
+    history = load_history()
+    if args.command == "history":
+        for record in history:
+            r = record["result"]
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["timestamp"]))
+            print(f"   {when}  {record.get('revision') or '-':<9} {record['config']['agents']:>4} agents "
+                  f"{r['ops_per_second']:>8.0f} ops/s  {record.get('label', '')}")
+        return
+
+    baseline = baseline_for(history[:-1], history[-1]) if history else None
+    if baseline is None:
+        print("Need two recorded runs with the same configuration to compare")
+        return
+    regressions = compare(baseline, history[-1], args.threshold)
+    print(f"\n🔍 {baseline.get('revision')} → {history[-1].get('revision')}")
+    for line in regressions or ["No regressions"]:
+        print(f"   {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Chain Indexer - Local SQLite view of Soul Marketplace contract events
+
+Pulls eth_getLogs for SoulMarketplace, SoulStorage and SoulComputeNetwork
+in block ranges and stores decoded events locally, so browsing, listing
+scans and analytics never need an RPC round trip.
+
+- Adaptive ranges: halve on "too many results"/range errors, grow while
+  responses are small
+- Resumes from a checkpoint; only indexes blocks `confirmations` behind head
+- Reorg-aware: the checkpoint block hash is re-checked each sync; if it
+  changed, indexing rewinds to the newest stored block that is still
+  canonical (at most `reorg_depth` back). Windows within `reorg_depth` of
+  head must link to the indexed parent hash and every log must match its
+  canonical block, or the window is fetched again
+- Indexed by soul_id, seller and worker
+
+Usage:
+    python3 chain_indexer.py sync [--rpc URL] [--follow]
+    python3 chain_indexer.py listings
+    python3 chain_indexer.py stats
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import serialization
+
+try:
+    from web3 import Web3
+    WEB3_AVAILABLE = True
+except ImportError:
+    Web3 = None
+    WEB3_AVAILABLE = False
+
+DEFAULT_DB = Path(__file__).parent / ".index" / "chain_index.db"
+DEFAULT_RPC = "https://sepolia.base.org"
+
+DEFAULT_CONFIRMATIONS = 5
+DEFAULT_REORG_DEPTH = 12
+MIN_RANGE = 10
+MAX_RANGE = 10000
+TARGET_LOGS_PER_CALL = 2000
+MAX_WINDOW_RETRIES = 3
+PRICE_KEY_DIGITS = 78  # uint256 max
+
+
+# ========== KECCAK (event topics) ==========
+
+_KECCAK_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_KECCAK_ROT = [[0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+               [28, 55, 25, 21, 56], [27, 20, 39, 8, 14]]
+_MASK = (1 << 64) - 1
+
+
+def _keccak_f(a):
+    for rc in _KECCAK_RC:
+        c = [a[x][0] ^ a[x][1] ^ a[x][2] ^ a[x][3] ^ a[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ (((c[(x + 1) % 5] << 1) | (c[(x + 1) % 5] >> 63)) & _MASK) for x in range(5)]
+        a = [[a[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                r = _KECCAK_ROT[x][y]
+                b[y][(2 * x + 3 * y) % 5] = ((a[x][y] << r) | (a[x][y] >> (64 - r))) & _MASK if r else a[x][y]
+        a = [[b[x][y] ^ ((~b[(x + 1) % 5][y]) & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        a[0][0] ^= rc
+    return a
+
+
+def keccak256(data: bytes) -> bytes:
+    """Ethereum Keccak-256 (web3 when installed, pure Python otherwise)"""
+    if WEB3_AVAILABLE:
+        return bytes(Web3.keccak(data))
+    rate = 136
+    padded = bytearray(data) + b"\x01"
+    padded += b"\x00" * (-len(padded) % rate)
+    padded[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for block in range(0, len(padded), rate):
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(padded[block + i * 8:block + i * 8 + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+# ========== EVENTS ==========
+
+# name -> (contract, [(indexed name, type)], [(data name, type)])
+EVENT_SPECS = {
+    "SoulListed": ("SoulMarketplace", [("soul_id", "uint256"), ("seller", "address")],
+                   [("price_wei", "uint96")]),
+    "SoulDelisted": ("SoulMarketplace", [("soul_id", "uint256"), ("seller", "address")], []),
+    "SoulSold": ("SoulMarketplace", [("soul_id", "uint256"), ("seller", "address"), ("buyer", "address")],
+                 [("price_wei", "uint96")]),
+    "SoulStored": ("SoulStorage", [("soul_id", "uint256"), ("owner", "address")],
+                   [("cid", "string"), ("name", "string")]),
+    "SoulUpdated": ("SoulStorage", [("soul_id", "uint256")],
+                    [("cid", "string"), ("version", "uint256")]),
+    "TaskSubmitted": ("SoulComputeNetwork", [("task_id", "uint256"), ("submitter", "address")],
+                      [("task_type", "bytes32"), ("price_wei", "uint64")]),
+    "TaskCompleted": ("SoulComputeNetwork", [("task_id", "uint256"), ("worker", "address")],
+                      [("price_wei", "uint96")]),
+    "WorkerRegistered": ("SoulComputeNetwork", [("worker", "address")], [("capabilities", "bytes32")]),
+}
+
+
+def _signature(name: str) -> str:
+    _, indexed, data = EVENT_SPECS[name]
+    return f"{name}({','.join(t for _, t in indexed + data)})"
+
+
+TOPICS = {"0x" + keccak256(_signature(n).encode()).hex(): n for n in EVENT_SPECS}
+
+
+def _decode_word(word: bytes, typ: str):
+    if typ == "address":
+        return "0x" + word[12:].hex()
+    if typ == "bytes32":
+        return "0x" + word.hex()
+    return int.from_bytes(word, "big")
+
+
+def decode_log(log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Decode a raw eth_getLogs entry for one of EVENT_SPECS"""
+    topics = log.get("topics") or []
+    name = TOPICS.get(topics[0].lower()) if topics else None
+    if name is None:
+        return None
+    contract, indexed, fields = EVENT_SPECS[name]
+
+    args = {}
+    for (arg, typ), topic in zip(indexed, topics[1:]):
+        args[arg] = _decode_word(bytes.fromhex(topic[2:]), typ)
+
+    data = bytes.fromhex(log.get("data", "0x")[2:])
+    for i, (arg, typ) in enumerate(fields):
+        word = data[i * 32:(i + 1) * 32]
+        if typ == "string":
+            offset = int.from_bytes(word, "big")
+            length = int.from_bytes(data[offset:offset + 32], "big")
+            args[arg] = data[offset + 32:offset + 32 + length].decode("utf-8", errors="replace")
+        else:
+            args[arg] = _decode_word(word, typ)
+
+    return {
+        "event": name,
+        "contract": contract,
+        "address": log["address"].lower(),
+        "block_number": int(log["blockNumber"], 16),
+        "block_hash": log["blockHash"],
+        "tx_hash": log["transactionHash"],
+        "log_index": int(log["logIndex"], 16),
+        "args": args
+    }
+
+
+# ========== RPC ==========
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+    @property
+    def range_too_large(self) -> bool:
+        text = self.message.lower()
+        return self.code == -32005 or any(k in text for k in
+                                           ("too many", "range", "limit", "exceed", "timeout"))
+
+
+class JsonRpcClient:
+    """Minimal JSON-RPC over HTTP (stdlib only)"""
+
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url
+        self.timeout = timeout
+        self._id = 0
+
+    def call(self, method: str, params: list):
+        self._id += 1
+        body = serialization.dumps_bytes({"jsonrpc": "2.0", "id": self._id,
+                                          "method": method, "params": params})
+        request = urllib.request.Request(self.url, data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = serialization.loads(response.read())
+        if "error" in reply:
+            raise RpcError(reply["error"].get("code", 0), reply["error"].get("message", ""))
+        return reply["result"]
+
+
+# ========== INDEXER ==========
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    address TEXT NOT NULL,
+    event TEXT NOT NULL,
+    soul_id INTEGER,
+    task_id INTEGER,
+    seller TEXT,
+    buyer TEXT,
+    owner TEXT,
+    worker TEXT,
+    price_wei TEXT,
+    args TEXT NOT NULL,
+    price_key TEXT,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS idx_events_soul ON events (soul_id, block_number, log_index);
+CREATE INDEX IF NOT EXISTS idx_events_seller ON events (seller);
+CREATE INDEX IF NOT EXISTS idx_events_worker ON events (worker);
+CREATE INDEX IF NOT EXISTS idx_events_event ON events (event, block_number);
+CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+LISTING_EVENTS = ("SoulListed", "SoulDelisted", "SoulSold")
+
+
+def price_key(price_wei) -> str:
+    """Zero-padded wei amount: sorts as text in numeric order, no 64-bit overflow"""
+    return f"{int(price_wei):0{PRICE_KEY_DIGITS}d}"
+
+
+def default_contracts() -> Dict[str, str]:
+    """Contract addresses from config.json and the deployment records"""
+    root = Path(__file__).parent
+    contracts = {}
+    config_file = root / "config.json"
+    if config_file.exists():
+        with open(config_file, 'r') as f:
+            contracts.update(json.load(f).get("contracts", {}))
+    marketplace_file = root / "MARKETPLACE_DEPLOYMENT.json"
+    if marketplace_file.exists():
+        with open(marketplace_file, 'r') as f:
+            contracts.setdefault("SoulMarketplace", json.load(f).get("address"))
+    for key in ("SOUL_STORAGE_ADDRESS", "SOUL_COMPUTE_ADDRESS", "SOUL_MARKETPLACE_ADDRESS"):
+        if os.getenv(key):
+            name = {"SOUL_STORAGE_ADDRESS": "SoulStorage", "SOUL_COMPUTE_ADDRESS": "SoulComputeNetwork",
+                    "SOUL_MARKETPLACE_ADDRESS": "SoulMarketplace"}[key]
+            contracts[name] = os.getenv(key)
+    # Placeholders like "0x..." are not deployed contracts
+    return {k: v for k, v in contracts.items()
+            if isinstance(v, str) and v.startswith("0x") and len(v) == 42}
+
+
+class ChainIndexer:
+    """
+    Event indexer backed by SQLite.
+
+    Readers (check_for_souls, dashboards) only need the database; rpc_url
+    is required for sync().
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB, rpc_url: Optional[str] = None,
+                 contracts: Optional[Dict[str, str]] = None,
+                 start_block: int = 0,
+                 confirmations: int = DEFAULT_CONFIRMATIONS,
+                 reorg_depth: int = DEFAULT_REORG_DEPTH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.rpc = JsonRpcClient(rpc_url) if rpc_url else None
+        self.contracts = contracts if contracts is not None else default_contracts()
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.range_size = 2000
+
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Add and backfill price_key on indexes created before it existed"""
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(events)")}
+        if "price_key" not in columns:
+            self.db.execute("ALTER TABLE events ADD COLUMN price_key TEXT")
+        rows = self.db.execute("SELECT rowid, price_wei FROM events "
+                               "WHERE price_wei IS NOT NULL AND price_key IS NULL").fetchall()
+        if rows:
+            with self.db:
+                self.db.executemany("UPDATE events SET price_key = ? WHERE rowid = ?",
+                                    [(price_key(r["price_wei"]), r["rowid"]) for r in rows])
+
+    # ========== CHECKPOINT ==========
+
+    def _meta(self, key: str, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def _set_meta(self, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value)))
+
+    @property
+    def last_block(self) -> int:
+        return self._meta("last_block", self.start_block - 1)
+
+    # ========== SYNC ==========
+
+    def _block(self, number: int) -> Optional[Dict[str, Any]]:
+        return self.rpc.call("eth_getBlockByNumber", [hex(number), False])
+
+    def _block_hash(self, number: int) -> Optional[str]:
+        block = self._block(number)
+        return block["hash"] if block else None
+
+    def _stored_hash(self, number: int) -> Optional[str]:
+        row = self.db.execute("SELECT hash FROM blocks WHERE number = ?", (number,)).fetchone()
+        return row["hash"] if row else None
+
+    def _check_reorg(self) -> int:
+        """Rewind if the checkpoint block changed; returns blocks dropped"""
+        last = self.last_block
+        stored = self._stored_hash(last)
+        if stored is None or self._block_hash(last) == stored:
+            return 0
+
+        # Earlier window ends (kept for reorg_depth blocks) tell where the fork starts
+        rewind_to = max(self.start_block - 1, last - self.reorg_depth)
+        for row in self.db.execute("SELECT number, hash FROM blocks WHERE number < ? ORDER BY number DESC",
+                                   (last,)).fetchall():
+            if self._block_hash(row["number"]) == row["hash"]:
+                rewind_to = max(rewind_to, row["number"])
+                break
+        with self.db:
+            self.db.execute("DELETE FROM events WHERE block_number > ?", (rewind_to,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (rewind_to,))
+            self._set_meta("last_block", rewind_to)
+        print(f"⚠️ Reorg detected at block {last}; re-indexing from {rewind_to + 1}")
+        return last - rewind_to
+
+    def _get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        return self.rpc.call("eth_getLogs", [{
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "address": list(self.contracts.values()),
+            "topics": [list(TOPICS)]
+        }])
+
+    def _verify_window(self, from_block: int, to_block: int, events: List[Dict[str, Any]],
+                       final_below: int) -> Optional[str]:
+        """
+        Hash of to_block if the window is consistent with the chain: its
+        first block links to the indexed parent and every log's block is
+        still canonical. None if the chain moved during the scan.
+
+        Blocks below final_below are past reorg depth and are not re-checked.
+        """
+        to_header = self._block(to_block)
+        if to_header is None:
+            return None
+        if to_block < final_below:
+            return to_header["hash"]
+
+        headers = {to_block: to_header}
+        parent = self._stored_hash(from_block - 1)
+        if parent is not None and from_block >= final_below:
+            headers[from_block] = headers.get(from_block) or self._block(from_block)
+            if headers[from_block] is None or headers[from_block]["parentHash"] != parent:
+                return None
+        for e in events:
+            number = e["block_number"]
+            if number < final_below:
+                continue
+            if number not in headers:
+                headers[number] = self._block(number)
+            if headers[number] is None or headers[number]["hash"] != e["block_hash"]:
+                return None
+        return to_header["hash"]
+
+    def _store(self, events: List[Dict[str, Any]], to_block: int, to_hash: str):
+        rows = []
+        for e in events:
+            a = e["args"]
+            rows.append((
+                e["tx_hash"], e["log_index"], e["block_number"], e["block_hash"],
+                e["contract"], e["address"], e["event"],
+                a.get("soul_id"), a.get("task_id"), a.get("seller"), a.get("buyer"),
+                a.get("owner") or a.get("submitter"), a.get("worker"),
+                str(a["price_wei"]) if "price_wei" in a else None,
+                serialization.dumps(a),
+                price_key(a["price_wei"]) if "price_wei" in a else None
+            ))
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+            self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)",
+                            (to_block, to_hash))
+            self.db.execute("DELETE FROM blocks WHERE number < ?", (to_block - self.reorg_depth,))
+            self._set_meta("last_block", to_block)
+
+    def sync(self, max_blocks: Optional[int] = None) -> Dict[str, Any]:
+        """Index confirmed blocks since the checkpoint"""
+        if self.rpc is None:
+            raise RuntimeError("sync() needs an rpc_url")
+        if not self.contracts:
+            return {"indexed_events": 0, "reason": "no deployed contract addresses configured"}
+
+        with self._lock:
+            started = time.time()
+            dropped = self._check_reorg()
+            head = int(self.rpc.call("eth_blockNumber", []), 16)
+            safe_head = head - self.confirmations
+            if max_blocks:
+                safe_head = min(safe_head, self.last_block + max_blocks)
+
+            indexed = calls = retries = 0
+            while self.last_block < safe_head:
+                from_block = self.last_block + 1
+                to_block = min(from_block + self.range_size - 1, safe_head)
+                try:
+                    logs = self._get_logs(from_block, to_block)
+                    calls += 1
+                except RpcError as e:
+                    if e.range_too_large and self.range_size > MIN_RANGE:
+                        self.range_size = max(MIN_RANGE, self.range_size // 2)
+                        continue
+                    raise
+
+                events = [e for e in (decode_log(log) for log in logs) if e]
+                to_hash = self._verify_window(from_block, to_block, events, head - self.reorg_depth)
+                if to_hash is None:
+                    # Reorg while scanning: rewind if the checkpoint moved, then refetch
+                    retries += 1
+                    if retries > MAX_WINDOW_RETRIES:
+                        raise RuntimeError(f"Chain kept changing while indexing blocks {from_block}-{to_block}")
+                    dropped += self._check_reorg()
+                    continue
+                retries = 0
+                self._store(events, to_block, to_hash)
+                indexed += len(events)
+
+                # Grow the range while responses stay small
+                if len(logs) < TARGET_LOGS_PER_CALL // 4:
+                    self.range_size = min(MAX_RANGE, self.range_size * 2)
+                elif len(logs) > TARGET_LOGS_PER_CALL:
+                    self.range_size = max(MIN_RANGE, self.range_size // 2)
+
+            return {
+                "indexed_events": indexed,
+                "rpc_calls": calls,
+                "last_block": self.last_block,
+                "head": head,
+                "reorg_dropped_blocks": dropped,
+                "range_size": self.range_size,
+                "seconds": time.time() - started
+            }
+
+    def follow(self, interval: float = 15):
+        """Sync forever"""
+        while True:
+            try:
+                result = self.sync()
+                if result["indexed_events"]:
+                    print(f"📚 Indexed {result['indexed_events']} events up to block {result['last_block']}")
+            except Exception as e:
+                print(f"⚠️ Index sync failed: {e}")
+            time.sleep(interval)
+
+    # ========== QUERIES ==========
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        rows = []
+        for row in self.db.execute(sql, params):
+            item = dict(row)
+            item["args"] = serialization.loads(item["args"])
+            rows.append(item)
+        return rows
+
+    def active_listings(self, max_price_wei: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Souls whose latest marketplace event is a listing, cheapest first"""
+        placeholders = ",".join("?" * len(LISTING_EVENTS))
+        params: Tuple = LISTING_EVENTS
+        price_filter = ""
+        if max_price_wei is not None:
+            price_filter = "AND e.price_key <= ?"
+            params += (price_key(max_price_wei),)
+        return self._rows(f"""
+            SELECT e.* FROM events e
+            WHERE e.event = 'SoulListed' AND NOT EXISTS (
+                SELECT 1 FROM events later
+                WHERE later.soul_id = e.soul_id
+                  AND later.event IN ({placeholders})
+                  AND (later.block_number > e.block_number OR
+                       (later.block_number = e.block_number AND later.log_index > e.log_index))
+            ) {price_filter}
+            ORDER BY e.price_key
+        """, params)
+
+    def events_since(self, cursor: Tuple[int, int], names: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Events after (block_number, log_index), in chain order"""
+        block, log_index = cursor
+        placeholders = ",".join("?" * len(names))
+        return self._rows(f"""
+            SELECT * FROM events
+            WHERE event IN ({placeholders})
+              AND (block_number > ? OR (block_number = ? AND log_index > ?))
+            ORDER BY block_number, log_index
+        """, (*names, block, block, log_index))
+    
+    def event_block_hash(self, block_number: int, log_index: int) -> Optional[str]:
+        """Hash of the block an indexed event was in, None if it is not indexed"""
+        row = self.db.execute("SELECT block_hash FROM events WHERE block_number = ? AND log_index = ?",
+                              (block_number, log_index)).fetchone()
+        return row["block_hash"] if row else None
+
+    def soul_history(self, soul_id: int) -> List[Dict[str, Any]]:
+        return self._rows("SELECT * FROM events WHERE soul_id = ? ORDER BY block_number, log_index",
+                          (soul_id,))
+
+    def by_seller(self, seller: str) -> List[Dict[str, Any]]:
+        return self._rows("SELECT * FROM events WHERE seller = ? ORDER BY block_number, log_index",
+                          (seller.lower(),))
+
+    def by_worker(self, worker: str) -> List[Dict[str, Any]]:
+        return self._rows("SELECT * FROM events WHERE worker = ? ORDER BY block_number, log_index",
+                          (worker.lower(),))
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {row["event"]: row["n"] for row in
+                  self.db.execute("SELECT event, COUNT(*) AS n FROM events GROUP BY event")}
+        volume = sum(int(row["price_wei"]) for row in
+                     self.db.execute("SELECT price_wei FROM events WHERE event = 'SoulSold'"))
+        earned = sum(int(row["price_wei"]) for row in
+                     self.db.execute("SELECT price_wei FROM events WHERE event = 'TaskCompleted'"))
+        return {
+            "last_block": self.last_block,
+            "events": counts,
+            "active_listings": len(self.active_listings()),
+            "sales_volume_eth": volume / 1e18,
+            "worker_payments_eth": earned / 1e18
+        }
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Soul Marketplace chain indexer")
+    parser.add_argument("command", choices=["sync", "listings", "stats"])
+    parser.add_argument("--rpc", default=os.getenv("RPC_URL", DEFAULT_RPC))
+    parser.add_argument("--start-block", type=int, default=0)
+    parser.add_argument("--follow", action="store_true")
+    args = parser.parse_args()
+
+    indexer = ChainIndexer(rpc_url=args.rpc, start_block=args.start_block)
+
+    if args.command == "sync":
+        print(f"📚 Indexing {', '.join(indexer.contracts) or 'no contracts'} via {args.rpc}")
+        if args.follow:
+            indexer.follow()
+        else:
+            print(json.dumps(indexer.sync(), indent=2))
+    elif args.command == "listings":
+        for row in indexer.active_listings():
+            print(f"   Soul #{row['soul_id']}: {int(row['price_wei']) / 1e18:.4f} ETH "
+                  f"from {row['seller']} (block {row['block_number']})")
+    else:
+        print(json.dumps(indexer.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Child Runtime - run spawned child agents as real local workers
+
+AutoScalingManager.provision_child used to flip a status field: children
+never ran, so spawning added no work capacity. Now each provisioned child
+runs somewhere:
+- "process" children get a dedicated, supervised worker process
+- "pool" children (lightweight, the default) are served by a shared
+  process pool sized to the CPU count
+- The supervisor keeps the work backlog and hands each job to a free child
+  whose inherited capabilities match (jobs without a capability go to
+  anyone); children run it through AgentWorkSystem
+- Worker processes apply resource limits (address space, CPU seconds,
+  niceness) before doing any work
+- Each process child talks to the supervisor over its own pipe: jobs go
+  down, heartbeats and results come back. A killed child can only break
+  its own pipe (a shared multiprocessing.Queue deadlocks every reader if
+  a process dies holding its lock)
+- poll() drains reports, requeues the job of a crashed or hung child,
+  restarts it per its RestartPolicy (exponential backoff) and reports
+  status changes and newly earned amounts (deltas) to on_update. A spec
+  carries the child's persisted earnings, so a restarted supervisor
+  continues the totals instead of starting them from zero
+- A pool worker dying (e.g. at its memory limit) breaks the whole
+  ProcessPoolExecutor; the pool is then replaced and its in-flight jobs
+  requeued
+
+Workers use the "spawn" start method: the parent holds SQLite connections
+and background flusher threads that must not be forked.
+
+Usage:
+    runtime = ChildRuntime(on_update=manager.update_child)   # (child_id, status=, earned=)
+    runtime.start_child(ChildSpec("child_1", ["content_summarize"], 0.1))
+    runtime.submit("content_summarize", {"content": text})
+    runtime.poll()       # call periodically (monitor_children does)
+    runtime.shutdown()
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import wait as wait_connections
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ("process", "pool")
+RESTART_POLICIES = ("always", "on-failure", "never")
+MAX_JOB_ATTEMPTS = 3     # a job that keeps killing its worker is dropped
+
+# Runtime states
+STARTING = "starting"
+RUNNING = "running"
+BACKOFF = "backoff"
+STOPPED = "stopped"
+DEAD = "dead"
+
+# Runtime state -> ChildAgent.status
+AGENT_STATUS = {STARTING: "alive", RUNNING: "alive", BACKOFF: "alive",
+                STOPPED: "gestating", DEAD: "dead"}
+
+
+@dataclass
+class ResourceLimits:
+    """Applied inside each worker process before it does any work"""
+    memory_mb: Optional[int] = 1024     # RLIMIT_AS
+    cpu_seconds: Optional[int] = None   # RLIMIT_CPU per incarnation
+    nice: int = 5
+
+
+@dataclass
+class RestartPolicy:
+    policy: str = "on-failure"          # always | on-failure | never
+    max_restarts: int = 5
+    backoff: float = 1.0                # doubled per consecutive restart
+    max_backoff: float = 60.0
+    reset_after: float = 300.0          # a run this long resets the count
+
+
+@dataclass
+class ChildSpec:
+    """What a child worker needs from its parent"""
+    child_id: str
+    capabilities: List[str]
+    funding: float
+    mode: str = "pool"
+    earnings: float = 0.0               # lifetime total so far, as persisted
+
+
+@dataclass
+class ChildState:
+    spec: ChildSpec
+    status: str = STARTING
+    pid: Optional[int] = None
+    started_at: float = 0.0
+    last_heartbeat: float = 0.0
+    restarts: int = 0
+    next_restart_at: float = 0.0
+    earnings: float = 0.0
+    unreported: float = 0.0             # earned since the last on_update
+    jobs_done: int = 0
+    jobs_failed: int = 0
+    last_error: Optional[str] = None
+    current_job: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    process: Any = field(default=None, repr=False)
+    conn: Any = field(default=None, repr=False)
+
+    @property
+    def balance(self) -> float:
+        return self.spec.funding + self.earnings
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "child_id": self.spec.child_id,
+            "mode": self.spec.mode,
+            "status": self.status,
+            "pid": self.pid,
+            "restarts": self.restarts,
+            "heartbeat_age": time.time() - self.last_heartbeat if self.last_heartbeat else None,
+            "earnings": self.earnings,
+            "balance": self.balance,
+            "jobs_done": self.jobs_done,
+            "jobs_failed": self.jobs_failed,
+            "last_error": self.last_error,
+        }
+
+
+# ========== WORKER SIDE ==========
+
+def _apply_limits(limits: Dict[str, Any]):
+    try:
+        import resource
+        if limits.get("memory_mb"):
+            size = limits["memory_mb"] * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (size, size))
+        if limits.get("cpu_seconds"):
+            seconds = limits["cpu_seconds"]
+            resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 5))
+    except (ImportError, ValueError, OSError) as e:
+        logger.debug(f"Resource limits not applied: {e}")
+    if limits.get("nice"):
+        try:
+            os.nice(limits["nice"])
+        except OSError:
+            pass
+
+
+def _run_job(work, job: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        result = work.do_work(job["work_type"], job.get("params") or {})
+    except Exception as e:
+        result = {"status": "failed", "error": str(e)}
+    completed = result.get("status") == "completed"
+    return {
+        "job_id": job["job_id"],
+        "work_type": job["work_type"],
+        "ok": completed,
+        "earned": result.get("earned_eth", 0.0) if completed else 0.0,
+        "error": None if completed else result.get("error", "failed"),
+    }
+
+
+def _child_main(spec: Dict[str, Any], limits: Dict[str, Any], conn, heartbeat_interval: float):
+    """Dedicated worker process for one child"""
+    _apply_limits(limits)
+    from work_system import AgentWorkSystem
+    work = AgentWorkSystem(spec["child_id"])
+    send_lock = threading.Lock()
+    stopping = threading.Event()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    # Heartbeats keep flowing while a long job runs
+    def beat():
+        while not stopping.is_set():
+            try:
+                send(("heartbeat", time.time()))
+            except (OSError, EOFError):
+                return
+            stopping.wait(heartbeat_interval)
+
+    threading.Thread(target=beat, name="heartbeat", daemon=True).start()
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break       # supervisor went away
+            if job is None:
+                break
+            send(("job", _run_job(work, job)))
+    finally:
+        stopping.set()
+
+
+_pool_work: Dict[str, Any] = {}
+
+
+def _pool_init(limits: Dict[str, Any]):
+    _apply_limits(limits)
+
+
+def _pool_job(child_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """One job for a lightweight child, run in a shared pool worker"""
+    if child_id not in _pool_work:
+        from work_system import AgentWorkSystem
+        _pool_work[child_id] = AgentWorkSystem(child_id)
+    return _run_job(_pool_work[child_id], job)
+
+
+# ========== SUPERVISOR ==========
+
+class ChildRuntime:
+    """Supervises child workers, hands out jobs and collects their reports"""
+
+    def __init__(self, pool_workers: Optional[int] = None,
+                 limits: Optional[ResourceLimits] = None,
+                 restart: Optional[RestartPolicy] = None,
+                 heartbeat_interval: float = 5.0,
+                 heartbeat_timeout: float = 30.0,
+                 on_update: Optional[Callable[..., Any]] = None):
+        self.ctx = multiprocessing.get_context("spawn")
+        self.pool_workers = pool_workers or os.cpu_count() or 2
+        self.limits = limits or ResourceLimits()
+        self.restart = restart or RestartPolicy()
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.on_update = on_update
+
+        self.children: Dict[str, ChildState] = {}
+        # Backlog by required capability (None: any child)
+        self.pending: Dict[Optional[str], deque] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_inflight = 0
+        self._pool_results: deque = deque()
+        self._pool_cycle = itertools.count()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self.stats_counters = {"submitted": 0, "finished": 0, "restarts": 0}
+        atexit.register(self.shutdown)
+
+    # ----- lifecycle -----
+
+    def start_child(self, spec: ChildSpec) -> ChildState:
+        if spec.mode not in MODES:
+            raise ValueError(f"Unknown child mode: {spec.mode}")
+        with self._lock:
+            state = self.children.get(spec.child_id)
+            if state is None:
+                state = ChildState(spec, earnings=spec.earnings)
+                self.children[spec.child_id] = state
+            if spec.mode == "process":
+                self._launch(state)
+            else:
+                state.status = RUNNING
+                state.started_at = state.last_heartbeat = time.time()
+            return state
+
+    def _launch(self, state: ChildState):
+        state.conn, child_conn = self.ctx.Pipe()
+        state.process = self.ctx.Process(
+            target=_child_main,
+            args=(asdict(state.spec), asdict(self.limits), child_conn, self.heartbeat_interval),
+            name=f"child-{state.spec.child_id}",
+            daemon=True)
+        state.process.start()
+        child_conn.close()
+        state.pid = state.process.pid
+        state.status = STARTING
+        state.started_at = time.time()
+        state.last_heartbeat = 0.0
+
+    def _reap(self, state: ChildState):
+        if state.conn is not None:
+            state.conn.close()
+            state.conn = None
+        state.process = None
+        state.pid = None
+
+    def stop_child(self, child_id: str, timeout: float = 5.0) -> bool:
+        with self._lock:
+            state = self.children.get(child_id)
+            if state is None:
+                return False
+            if state.process is not None:
+                try:
+                    state.conn.send(None)
+                except (OSError, EOFError):
+                    pass
+                state.process.join(timeout)
+                if state.process.is_alive():
+                    state.process.terminate()
+                    state.process.join(1)
+                self._requeue(state)
+                self._reap(state)
+            state.status = STOPPED
+            return True
+
+    def shutdown(self):
+        with self._lock:
+            for child_id in list(self.children):
+                if self.children[child_id].status not in (STOPPED, DEAD):
+                    self.stop_child(child_id, timeout=2.0)
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # ----- work -----
+
+    def submit(self, work_type: str, params: Optional[Dict[str, Any]] = None,
+               capability: Optional[str] = None) -> int:
+        """Queue one job for whichever capable child is free first"""
+        with self._lock:
+            job_id = next(self._job_ids)
+            self.pending.setdefault(capability, deque()).append({
+                "job_id": job_id, "work_type": work_type,
+                "params": params or {}, "capability": capability})
+            self.stats_counters["submitted"] += 1
+            return job_id
+
+    def backlog(self) -> int:
+        """Jobs submitted but not yet finished (queued or running)"""
+        with self._lock:
+            return self.stats_counters["submitted"] - self.stats_counters["finished"]
+
+    def _take_job(self, capabilities: List[str]) -> Optional[Dict[str, Any]]:
+        for key in itertools.chain(capabilities, [None]):
+            jobs = self.pending.get(key)
+            if jobs:
+                return jobs.popleft()
+        return None
+
+    def _dispatch(self):
+        """Hand backlog jobs to idle process children and free pool slots"""
+        for state in self.children.values():
+            if state.spec.mode != "process" or state.status != RUNNING or state.current_job:
+                continue
+            job = self._take_job(state.spec.capabilities)
+            if job is None:
+                continue
+            try:
+                state.conn.send(job)
+                state.current_job = job
+            except (OSError, EOFError):
+                self.pending.setdefault(job["capability"], deque()).appendleft(job)
+
+        pool_children = [s for s in self.children.values()
+                         if s.spec.mode == "pool" and s.status == RUNNING]
+        while pool_children and self._pool_inflight < self.pool_workers * 2:
+            # Rotate so lightweight children share the pool evenly
+            offset = next(self._pool_cycle)
+            for i in range(len(pool_children)):
+                state = pool_children[(offset + i) % len(pool_children)]
+                job = self._take_job(state.spec.capabilities)
+                if job is not None:
+                    break
+            else:
+                return
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_workers, mp_context=self.ctx,
+                    initializer=_pool_init, initargs=(asdict(self.limits),))
+            pool = self._pool
+            try:
+                future = pool.submit(_pool_job, state.spec.child_id, job)
+            except BrokenProcessPool:
+                # Broke since the last drain; its futures requeue themselves
+                self.pending.setdefault(job["capability"], deque()).appendleft(job)
+                self._reset_pool(pool)
+                return
+            self._pool_inflight += 1
+            future.add_done_callback(
+                lambda f, child_id=state.spec.child_id, job=job:
+                    self._pool_results.append((child_id, job, pool, f)))
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool; the next dispatch starts a fresh one"""
+        if self._pool is pool:
+            logger.warning("Child pool broken (a worker died); restarting it")
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self.stats_counters["restarts"] += 1
+
+    # ----- supervision -----
+
+    def _record_job(self, state: ChildState, result: Dict[str, Any]) -> bool:
+        self.stats_counters["finished"] += 1
+        state.last_heartbeat = time.time()
+        if result["ok"]:
+            state.jobs_done += 1
+            state.earnings += result["earned"]
+            state.unreported += result["earned"]
+            return result["earned"] > 0
+        state.jobs_failed += 1
+        state.last_error = result["error"]
+        return False
+
+    def _drain(self) -> set:
+        """Apply worker reports; returns children whose earnings changed"""
+        earned = set()
+        by_conn = {s.conn: s for s in self.children.values() if s.conn is not None}
+        for conn in wait_connections(list(by_conn), timeout=0) if by_conn else []:
+            state = by_conn[conn]
+            try:
+                while conn.poll():
+                    kind, payload = conn.recv()
+                    if kind == "heartbeat":
+                        state.last_heartbeat = payload
+                        if state.status == STARTING:
+                            state.status = RUNNING
+                    elif kind == "job":
+                        state.current_job = None
+                        if self._record_job(state, payload):
+                            earned.add(state.spec.child_id)
+            except (OSError, EOFError):
+                pass        # worker died; _supervise sees the exit code
+
+        while self._pool_results:
+            child_id, job, pool, future = self._pool_results.popleft()
+            self._pool_inflight -= 1
+            state = self.children.get(child_id)
+            if state is None:
+                continue
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # The job didn't fail, its worker died: retry it on a new pool
+                state.last_error = f"pool worker died: {e}"
+                self._reset_pool(pool)
+                self._retry(state, job)
+                continue
+            except Exception as e:
+                result = {"ok": False, "earned": 0.0, "error": f"pool worker: {e}"}
+            if self._record_job(state, result):
+                earned.add(child_id)
+        return earned
+
+    def _requeue(self, state: ChildState):
+        """Give the job a dead worker was running to another child"""
+        job, state.current_job = state.current_job, None
+        if job is not None:
+            self._retry(state, job)
+
+    def _retry(self, state: ChildState, job: Dict[str, Any]):
+        """Queue an interrupted job again, or drop it after MAX_JOB_ATTEMPTS"""
+        job["attempts"] = job.get("attempts", 1) + 1
+        if job["attempts"] > MAX_JOB_ATTEMPTS:
+            self.stats_counters["finished"] += 1
+            state.jobs_failed += 1
+            logger.warning(f"Dropping job {job['job_id']} ({job['work_type']}) after {MAX_JOB_ATTEMPTS} attempts")
+            return
+        self.pending.setdefault(job["capability"], deque()).appendleft(job)
+
+    def _supervise(self, state: ChildState, now: float):
+        if state.spec.mode != "process" or state.status in (STOPPED, DEAD):
+            return
+        if state.status == BACKOFF:
+            if now >= state.next_restart_at:
+                self._launch(state)
+            return
+
+        exitcode = state.process.exitcode if state.process else None
+        hung = (state.status == RUNNING and
+                now - state.last_heartbeat > self.heartbeat_timeout)
+        starting_too_long = (state.status == STARTING and
+                             now - state.started_at > self.heartbeat_timeout)
+        if exitcode is None and not (hung or starting_too_long):
+            return
+
+        if exitcode is None:
+            state.process.terminate()
+            state.process.join(1)
+            state.last_error = "heartbeat timeout"
+        elif exitcode != 0:
+            state.last_error = f"exit code {exitcode}"
+        failed = exitcode != 0
+        self._requeue(state)
+        self._reap(state)
+
+        policy = self.restart
+        if policy.policy == "never" or (policy.policy == "on-failure" and not failed):
+            state.status = DEAD if failed else STOPPED
+            return
+        if now - state.started_at >= policy.reset_after:
+            state.restarts = 0
+        if state.restarts >= policy.max_restarts:
+            logger.warning(f"Child {state.spec.child_id} exceeded {policy.max_restarts} restarts")
+            state.status = DEAD
+            return
+        delay = min(policy.backoff * (2 ** state.restarts), policy.max_backoff)
+        state.restarts += 1
+        self.stats_counters["restarts"] += 1
+        state.status = BACKOFF
+        state.next_restart_at = now + delay
+
+    def poll(self) -> Dict[str, Dict[str, Any]]:
+        """Drain reports, restart failed children, dispatch backlog jobs"""
+        with self._lock:
+            before = {cid: s.status for cid, s in self.children.items()}
+            earned = self._drain()
+            now = time.time()
+            for state in self.children.values():
+                self._supervise(state, now)
+            self._dispatch()
+
+            if self.on_update:
+                for child_id, state in self.children.items():
+                    status_changed = AGENT_STATUS[before.get(child_id, state.status)] != AGENT_STATUS[state.status]
+                    if status_changed or child_id in earned:
+                        delta, state.unreported = state.unreported, 0.0
+                        self.on_update(
+                            child_id,
+                            status=AGENT_STATUS[state.status] if status_changed else None,
+                            earned=delta if child_id in earned else None)
+            return {cid: s.summary() for cid, s in self.children.items()}
+
+    def run_until_idle(self, timeout: float = 60.0, interval: float = 0.05) -> bool:
+        """Poll until every submitted job finished (True) or timeout"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            self.poll()
+            if self.backlog() == 0:
+                return True
+            time.sleep(interval)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for state in self.children.values():
+                by_status[state.status] = by_status.get(state.status, 0) + 1
+            return {
+                **self.stats_counters,
+                "backlog": self.backlog(),
+                "queued": sum(len(jobs) for jobs in self.pending.values()),
+                "children": len(self.children),
+                "by_status": by_status,
+                "pool_workers": self.pool_workers if self._pool else 0,
+                "pool_inflight": self._pool_inflight,
+                "earnings": sum(s.earnings for s in self.children.values()),
+            }
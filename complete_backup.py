@@ -9,6 +9,9 @@ Backs up ALL agent data including:
 - Backups index
 - Contract addresses
 - Recovery keys
+
+Restores run through restore_engine: files are verified against the
+manifest hashes while being staged in parallel, then swapped in together.
 """
 
 import os
@@ -21,6 +24,10 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 import logging
 
+from state_manager import flush_all
+from restore_engine import RestoreEngine, RestoreItem, format_report
+import serialization
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -94,6 +101,9 @@ class CompleteSoulBackup:
         Returns:
             Backup manifest with all metadata
         """
+        # Pending debounced state writes must be on disk before we copy
+        flush_all()
+        
         timestamp = datetime.now()
         backup_id = f"COMPLETE_{self.agent_id}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
         self.current_backup_dir = self.backup_root / backup_id
@@ -148,7 +158,7 @@ class CompleteSoulBackup:
         # Save manifest
         manifest_path = self.current_backup_dir / "manifest.json"
         with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+            serialization.dump(manifest, f)
         
         # Upload to IPFS if requested
         if include_ipfs:
@@ -231,7 +241,7 @@ class CompleteSoulBackup:
         if contract_info:
             contract_file = dest_dir / "contract_addresses.json"
             with open(contract_file, 'w') as f:
-                json.dump(contract_info, f, indent=2)
+                serialization.dump(contract_info, f)
             backed_up.append({
                 "backup_path": str(contract_file),
                 "filename": "contract_addresses.json",
@@ -270,7 +280,7 @@ class CompleteSoulBackup:
     
     def _hash_json(self, data: Dict) -> str:
         """Calculate hash of JSON data"""
-        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        return serialization.canonical_hash(data)
     
     def _generate_recovery_key(self, manifest: Dict) -> str:
         """Generate memorable recovery key"""
@@ -363,9 +373,15 @@ class CompleteSoulBackup:
         
         return backups
     
-    def restore_backup(self, backup_id: str) -> Dict[str, Any]:
+    def restore_backup(self, backup_id: str, categories: Optional[List[str]] = None,
+                       workers: int = 8) -> Dict[str, Any]:
         """
-        Restore all files from a backup.
+        Restore files from a backup.
+        
+        Args:
+            backup_id: Backup to restore
+            categories: Only restore these manifest categories (default: all)
+            workers: Files staged concurrently
         
         Returns:
             Restoration report
@@ -381,41 +397,31 @@ class CompleteSoulBackup:
         
         logger.info(f"🔄 Restoring backup: {backup_id}")
         
-        restored = {
-            "success": [],
-            "failed": [],
-            "skipped": []
-        }
-        
-        # Restore each category
+        items = []
+        skipped = []
         for category, files in manifest['files'].items():
             for file_info in files:
-                try:
+                # Generated files (contract summary) have no original location
+                if 'original_path' not in file_info:
+                    skipped.append(file_info['filename'])
+                    continue
+                # Backup dirs may have been moved since the manifest was written
+                backup_path = backup_dir / category / file_info['filename']
+                if not backup_path.exists():
                     backup_path = Path(file_info['backup_path'])
-                    original_path = Path(file_info['original_path'])
-                    
-                    if not backup_path.exists():
-                        restored["failed"].append(file_info['filename'])
-                        continue
-                    
-                    # Ensure directory exists
-                    original_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Copy file back
-                    shutil.copy2(backup_path, original_path)
-                    
-                    # Verify hash
-                    restored_hash = self._hash_file(original_path)
-                    if restored_hash == file_info['hash']:
-                        restored["success"].append(file_info['filename'])
-                    else:
-                        restored["failed"].append(file_info['filename'])
-                        
-                except Exception as e:
-                    logger.warning(f"  ✗ Failed to restore {file_info['filename']}: {e}")
-                    restored["failed"].append(file_info['filename'])
+                items.append(RestoreItem(
+                    category=category,
+                    source=backup_path,
+                    target=Path(file_info['original_path']),
+                    sha256=file_info.get('hash'),
+                    name=file_info['filename'],
+                ))
+        
+        restored = RestoreEngine(workers=workers).run(items, categories)
+        restored["skipped"] += skipped
         
         logger.info(f"✅ Restoration complete: {len(restored['success'])} success, {len(restored['failed'])} failed")
+        logger.info(f"   {format_report(restored)}")
         
         return restored
 
@@ -431,7 +437,7 @@ def main():
         print("\nUsage: python3 complete_backup.py [backup|restore|list]")
         print("\nCommands:")
         print("  backup [--ipfs]     - Create complete backup")
-        print("  restore <backup_id> - Restore from backup")
+        print("  restore <backup_id> [--only soul,state] - Restore from backup")
         print("  list                - List all backups")
         print()
         return
@@ -450,10 +456,19 @@ def main():
         print(f"\n   Location: {backup.current_backup_dir}")
     
     elif cmd == "restore" and len(sys.argv) >= 3:
-        result = backup.restore_backup(sys.argv[2])
-        print(f"\n✅ Restoration complete!")
+        categories = None
+        if "--only" in sys.argv:
+            categories = sys.argv[sys.argv.index("--only") + 1].split(",")
+        result = backup.restore_backup(sys.argv[2], categories=categories)
+        if result["aborted"]:
+            print(f"\n❌ Restoration aborted, nothing was changed")
+            for name, error in result["errors"].items():
+                print(f"   {name}: {error}")
+        else:
+            print(f"\n✅ Restoration complete!")
         print(f"   Success: {len(result['success'])} files")
         print(f"   Failed: {len(result['failed'])} files")
+        print(f"   {format_report(result)}")
     
     elif cmd == "list":
         backups = backup.list_backups()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Content Summarizer - Streaming, chunked summarization for content_summarize work
+
+Pipeline:
+1. Stream input (string or file) into fixed-size chunks on word boundaries
+2. Map: summarize each chunk (in worker processes for large inputs)
+3. Reduce: merge chunk summaries into one result
+4. Cache: whole-document and per-chunk results keyed by content hash (LRU)
+
+Peak memory is bounded by chunk_size * in-flight chunks, not document size.
+Repeat jobs hit the document cache; overlapping jobs reuse cached chunks.
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # 64 KB of text per chunk
+DEFAULT_SUMMARY_WORDS = 50
+DEFAULT_KEY_TERMS = 10
+
+# Below this many chunks, process startup costs more than it saves
+PARALLEL_MIN_CHUNKS = 4
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i in is it its
+of on or our she so that the their them they this to was we were what when which
+who will with you your not no do does did can could would should may might
+""".split())
+
+WORD_RE = re.compile(r"[a-z][a-z0-9'-]{2,}")
+
+
+def parse_chunk_size(value: Any) -> int:
+    """
+    Validate a chunk size (e.g. from job params) as a positive int.
+
+    _split() never advances on a size below 1, so bad values must not reach
+    it. Integral strings ("4096") are accepted; anything else raises ValueError.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"chunk_size must be a positive integer, got {value!r}")
+    if isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            raise ValueError(f"chunk_size must be a positive integer, got {value!r}") from None
+    if not isinstance(value, int) or value < 1:
+        raise ValueError(f"chunk_size must be a positive integer, got {value!r}")
+    return value
+
+
+def _summarize_chunk(chunk: str, lead_words: int, top_terms: int) -> Dict[str, Any]:
+    """
+    Map step: summarize a single chunk.
+
+    Module-level so it can be pickled into worker processes.
+    """
+    words = chunk.split()
+    terms = Counter(
+        w for w in WORD_RE.findall(chunk.lower()) if w not in STOPWORDS
+    )
+    return {
+        "words": len(words),
+        "lead": words[:lead_words],
+        "terms": dict(terms.most_common(top_terms * 4))
+    }
+
+
+class SummaryCache:
+    """
+    Content-hash keyed LRU cache.
+
+    Thread-safe; shared by every AgentWorkSystem in the process.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class ContentSummarizer:
+    """
+    Map-reduce summarizer over streamed, fixed-size chunks.
+
+    Usage:
+        summarizer = ContentSummarizer()
+        result = summarizer.summarize(content="...")
+        result = summarizer.summarize(file_path="/path/to/large.txt")
+    """
+
+    def __init__(self,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 summary_words: int = DEFAULT_SUMMARY_WORDS,
+                 key_terms: int = DEFAULT_KEY_TERMS,
+                 max_workers: Optional[int] = None,
+                 cache: Optional[SummaryCache] = None):
+        self.chunk_size = parse_chunk_size(chunk_size)
+        self.summary_words = summary_words
+        self.key_terms = key_terms
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else SHARED_CACHE
+
+    # ========== CHUNKING ==========
+
+    def _split(self, buffer: str, final: bool) -> Tuple[List[str], str]:
+        """Cut buffer into chunk_size pieces on whitespace; return (chunks, remainder)"""
+        chunks = []
+        while len(buffer) >= self.chunk_size or (final and buffer):
+            if final and len(buffer) <= self.chunk_size:
+                chunks.append(buffer)
+                buffer = ""
+                break
+            cut = self.chunk_size
+            # Back off to the last whitespace so words never straddle chunks
+            space = max(buffer.rfind(" ", 0, cut), buffer.rfind("\n", 0, cut))
+            if space > 0:
+                cut = space + 1
+            chunks.append(buffer[:cut])
+            buffer = buffer[cut:]
+        return chunks, buffer
+
+    def iter_chunks(self, content: Optional[str] = None,
+                    file_path: Optional[str] = None) -> Iterator[str]:
+        """Yield fixed-size chunks from a string or a file without loading it whole"""
+        if file_path:
+            buffer = ""
+            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                while True:
+                    block = f.read(self.chunk_size)
+                    if not block:
+                        break
+                    chunks, buffer = self._split(buffer + block, final=False)
+                    yield from chunks
+            chunks, _ = self._split(buffer, final=True)
+            yield from chunks
+        elif content:
+            # Slice one window at a time so only a chunk-sized copy is live
+            start = 0
+            while start < len(content):
+                chunks, _ = self._split(
+                    content[start:start + self.chunk_size],
+                    final=start + self.chunk_size >= len(content)
+                )
+                yield chunks[0]
+                start += len(chunks[0])
+
+    # ========== MAP / REDUCE ==========
+
+    def _chunk_key(self, chunk_hash: str) -> str:
+        return f"chunk:{chunk_hash}:{self.summary_words}:{self.key_terms}"
+
+    def _doc_key(self, doc_hash: str) -> str:
+        return f"doc:{doc_hash}:{self.chunk_size}:{self.summary_words}:{self.key_terms}"
+
+    def _map(self, chunks: Iterator[str], doc_hasher) -> List[Dict[str, Any]]:
+        """
+        Summarize chunks, consulting the chunk cache first.
+
+        Misses are sent to a process pool once enough have accumulated to be
+        worth it; in-flight work is capped so memory stays bounded.
+        """
+        results: List[Optional[Dict[str, Any]]] = []
+        pending: List[Tuple[int, str, str]] = []
+        pool: Optional[ProcessPoolExecutor] = None
+        in_flight = []
+        max_in_flight = (self.max_workers or 4) * 2
+
+        def drain(limit: int):
+            while len(in_flight) > limit:
+                index, key, future = in_flight.pop(0)
+                results[index] = future.result()
+                self.cache.put(key, results[index])
+
+        try:
+            for chunk in chunks:
+                doc_hasher.update(chunk.encode("utf-8"))
+                key = self._chunk_key(hashlib.sha256(chunk.encode("utf-8")).hexdigest())
+                cached = self.cache.get(key)
+                results.append(cached)
+                if cached is not None:
+                    continue
+
+                if pool is None and len(pending) < PARALLEL_MIN_CHUNKS:
+                    pending.append((len(results) - 1, key, chunk))
+                    continue
+
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    for index, pkey, pchunk in pending:
+                        in_flight.append((index, pkey, pool.submit(
+                            _summarize_chunk, pchunk, self.summary_words, self.key_terms)))
+                    pending = []
+                in_flight.append((len(results) - 1, key, pool.submit(
+                    _summarize_chunk, chunk, self.summary_words, self.key_terms)))
+                drain(max_in_flight)
+
+            # Too few misses to justify a pool; summarize inline
+            for index, key, chunk in pending:
+                results[index] = _summarize_chunk(chunk, self.summary_words, self.key_terms)
+                self.cache.put(key, results[index])
+            drain(0)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+        return results
+
+    def _reduce(self, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge chunk summaries into a document summary"""
+        total_words = 0
+        lead: List[str] = []
+        terms: Counter = Counter()
+
+        for part in parts:
+            total_words += part["words"]
+            if len(lead) < self.summary_words:
+                lead.extend(part["lead"][:self.summary_words - len(lead)])
+            terms.update(part["terms"])
+
+        summary = " ".join(lead) + ("..." if total_words > len(lead) else "")
+        return {
+            "original_words": total_words,
+            "summary": summary,
+            "key_terms": [term for term, _ in terms.most_common(self.key_terms)],
+            "chunks": len(parts)
+        }
+
+    def summarize(self, content: Optional[str] = None,
+                  file_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize content or a file.
+
+        Returns original_words, summary, key_terms, chunks and cached flag.
+        """
+        # Fast path: whole-document hit without re-chunking
+        doc_key = None
+        if content:
+            doc_key = self._doc_key(hashlib.sha256(content.encode("utf-8")).hexdigest())
+            cached = self.cache.get(doc_key)
+            if cached is not None:
+                return {**cached, "cached": True}
+        elif file_path and not Path(file_path).exists():
+            return {"error": f"File not found: {file_path}"}
+
+        doc_hasher = hashlib.sha256()
+        parts = self._map(self.iter_chunks(content=content, file_path=file_path), doc_hasher)
+        result = self._reduce(parts)
+
+        if doc_key is None:
+            doc_key = self._doc_key(doc_hasher.hexdigest())
+        self.cache.put(doc_key, result)
+        return {**result, "cached": False}
+
+
+# Process-wide cache so repeat jobs are cheap across work system instances
+SHARED_CACHE = SummaryCache()
+
+
+def main():
+    """CLI: summarize a file"""
+    import sys
+    import json
+    import time
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 content_summarizer.py <file> [chunk_kb]")
+        return
+
+    chunk_kb = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE // 1024
+    summarizer = ContentSummarizer(chunk_size=chunk_kb * 1024)
+
+    for attempt in ("cold", "warm"):
+        start = time.perf_counter()
+        result = summarizer.summarize(file_path=sys.argv[1])
+        elapsed = time.perf_counter() - start
+        print(f"\n📝 {attempt}: {elapsed * 1000:.1f} ms")
+    print(json.dumps(result, indent=2))
+    print(json.dumps(summarizer.cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Cycle Runtime - Dependency-ordered, concurrent stage execution
+
+Used by IntegratedSoulSystem.full_cycle. Each stage declares:
+- deps: stages that must finish first (their results are passed in)
+- timeout: hard limit, the stage is abandoned when exceeded
+- budget: soft limit, the stage finishes but is flagged as over budget
+
+A disabled stage counts as satisfied for its dependents (they get None);
+a stage whose deps errored or timed out is skipped.
+
+Independent stages run concurrently on asyncio. Blocking (sync) stages
+run in a thread pool so they never stall the event loop. Cycle wall-clock
+time drops to the critical path of the graph.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """One node in the cycle graph"""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]  # receives results of finished deps
+    deps: List[str] = field(default_factory=list)
+    timeout: float = 60.0
+    budget: Optional[float] = None
+    enabled: bool = True
+
+
+@dataclass
+class StageTiming:
+    """Timing record for a single stage run"""
+    name: str
+    status: str  # ok | error | timeout | skipped | disabled
+    started: float = 0.0
+    duration: float = 0.0
+    over_budget: bool = False
+    error: Optional[str] = None
+
+
+class CycleDAG:
+    """
+    Runs a set of stages in dependency order, as concurrently as allowed.
+
+    Usage:
+        dag = CycleDAG()
+        dag.add(Stage("health", check_health, timeout=20))
+        dag.add(Stage("backup", make_backup, deps=["work"]))
+        results, timings = await dag.run()
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None,
+                 max_workers: int = 8):
+        self.stages: Dict[str, Stage] = {}
+        self.last_wall_clock = 0.0
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cycle-stage")
+
+    def add(self, stage: Stage) -> "CycleDAG":
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        self.stages[stage.name] = stage
+        return self
+
+    def validate(self):
+        """Raise ValueError on unknown deps or cycles"""
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def _call(self, stage: Stage, inputs: Dict[str, Any]) -> Any:
+        if inspect.iscoroutinefunction(stage.func):
+            return await stage.func(inputs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, stage.func, inputs)
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, StageTiming]]:
+        """
+        Execute all stages.
+
+        Returns (results by stage, timings by stage).
+        """
+        self.validate()
+        results: Dict[str, Any] = {}
+        timings: Dict[str, StageTiming] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        cycle_start = time.perf_counter()
+
+        async def run_stage(stage: Stage):
+            if stage.deps:
+                await asyncio.gather(*(tasks[d] for d in stage.deps))
+
+            failed = [d for d in stage.deps
+                      if timings[d].status not in ("ok", "disabled")]
+            if not stage.enabled or failed:
+                timings[stage.name] = StageTiming(
+                    name=stage.name,
+                    status="skipped" if failed else "disabled",
+                    started=time.perf_counter() - cycle_start,
+                    error=f"deps not ok: {failed}" if failed else None
+                )
+                return
+
+            inputs = {d: results.get(d) for d in stage.deps}
+            started = time.perf_counter()
+            timing = StageTiming(name=stage.name, status="ok",
+                                 started=started - cycle_start)
+            try:
+                results[stage.name] = await asyncio.wait_for(
+                    self._call(stage, inputs), timeout=stage.timeout)
+            except asyncio.TimeoutError:
+                # Threads cannot be killed; the result is simply discarded
+                timing.status = "timeout"
+                timing.error = f"exceeded {stage.timeout}s"
+            except Exception as e:
+                timing.status = "error"
+                timing.error = str(e)
+            timing.duration = time.perf_counter() - started
+            timing.over_budget = bool(stage.budget and timing.duration > stage.budget)
+            timings[stage.name] = timing
+
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.ensure_future(run_stage(stage))
+        await asyncio.gather(*tasks.values())
+
+        wall = self.last_wall_clock = time.perf_counter() - cycle_start
+        for timing in sorted(timings.values(), key=lambda t: t.started):
+            flag = " ⚠️ over budget" if timing.over_budget else ""
+            logger.info(f"⏱️ {timing.name}: {timing.status} "
+                        f"+{timing.started * 1000:.0f}ms {timing.duration * 1000:.0f}ms{flag}")
+        logger.info(f"⏱️ cycle wall-clock: {wall * 1000:.0f}ms")
+        return results, timings
+
+    def shutdown(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
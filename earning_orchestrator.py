@@ -18,6 +18,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import serialization
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -95,7 +97,7 @@ class EarningOrchestrator:
     
     def _save_state(self):
         with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+            serialization.dump(self.state, f)
     
     def initialize(self, agent_id: str = "openclaw_main_agent"):
         """Initialize agent and work system"""
@@ -8,6 +8,9 @@ Integrates:
 - Automatic backup scheduling
 - Cross-chain replication
 - Emergency recovery
+
+Heartbeats append balance, tier, lifetime earnings and their own duration
+to the metrics store; record_work appends each earning.
 """
 
 import json
@@ -19,6 +22,26 @@ from datetime import datetime
 # Import our modules
 from ipfs_storage import OnChainSoulManager, IPFSStorage
 from onchain_adapter import SoulMarketplaceAdapter
+from state_manager import open_state
+from metrics_store import MetricsStore
+
+# Backups that go on-chain immediately instead of waiting for cheap gas
+URGENT_BACKUP_TYPES = ("manual", "critical", "emergency", "shutdown", "immortalize")
+
+# Tier as a number for the metrics store
+TIER_LEVELS = {"CRITICAL": 0, "LOW": 1, "NORMAL": 2, "THRIVING": 3}
+
+
+def tier_for_balance(balance: float) -> str:
+    """Survival tier for a balance in ETH"""
+    if balance < 0.001:
+        return "CRITICAL"
+    elif balance < 0.01:
+        return "LOW"
+    elif balance < 0.1:
+        return "NORMAL"
+    else:
+        return "THRIVING"
 
 
 class EnhancedSoulSurvival:
@@ -47,6 +70,7 @@ class EnhancedSoulSurvival:
         
         # Soul data
         self.soul_file = Path(__file__).parent / f"SOUL_{soul_id}.json"
+        self._soul_store = open_state(self.soul_file)
         self.soul = self._load_or_create_soul()
         
         # State
@@ -56,6 +80,8 @@ class EnhancedSoulSurvival:
         # On-chain token ID (set after minting)
         self.token_id = self.state.get('token_id')
         
+        self.metrics = MetricsStore.shared()
+        
         print(f"🔧 Enhanced Soul Survival initialized")
         print(f"   Soul ID: {soul_id}")
         print(f"   On-chain: {'Yes' if self.token_id else 'Not minted'}")
@@ -63,9 +89,8 @@ class EnhancedSoulSurvival:
     
     def _load_or_create_soul(self) -> Dict[str, Any]:
         """Load or create SOUL.md"""
-        if self.soul_file.exists():
-            with open(self.soul_file, 'r') as f:
-                return json.load(f)
+        if self._soul_store.exists:
+            return self._soul_store.data
         
         soul = {
             "format": "soul/v1",
@@ -109,39 +134,31 @@ class EnhancedSoulSurvival:
         return soul
     
     def _save_soul(self, soul: Dict):
-        """Persist SOUL to disk"""
-        with open(self.soul_file, 'w') as f:
-            json.dump(soul, f, indent=2)
+        """Persist SOUL to disk (debounced, atomic)"""
+        self._soul_store.save(soul)
     
     def _load_state(self) -> Dict:
         """Load state"""
-        if self.state_file.exists():
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {
+        self._state_store = open_state(self.state_file, default=lambda: {
             "token_id": None,
             "last_backup_time": 0,
             "backup_count": 0,
             "recovery_requests": []
-        }
+        })
+        return self._state_store.data
     
     def _save_state(self):
-        """Persist state"""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """Persist state (debounced, atomic)"""
+        self._state_store.save(self.state)
+    
+    def flush(self):
+        """Durably write soul and state now"""
+        self._soul_store.flush()
+        self._state_store.flush()
     
     def get_tier(self) -> str:
         """Calculate survival tier"""
-        balance = self.soul.get('current_balance', 0.0)
-        
-        if balance < 0.001:
-            return "CRITICAL"
-        elif balance < 0.01:
-            return "LOW"
-        elif balance < 0.1:
-            return "NORMAL"
-        else:
-            return "THRIVING"
+        return tier_for_balance(self.soul.get('current_balance', 0.0))
     
     def record_work(self, capability: str, value: float):
         """Record work and trigger auto-backup"""
@@ -165,6 +182,8 @@ class EnhancedSoulSurvival:
         })
         
         self._save_soul(self.soul)
+        self.metrics.record_many({"earnings": value, f"earnings.{capability}": value},
+                                 prefix=self.soul_id)
         
         # Auto-backup if enabled and interval passed
         if self.enable_backups:
@@ -189,21 +208,25 @@ class EnhancedSoulSurvival:
         """
         print(f"\n💾 Creating {backup_type} backup...")
         
+        # Record any in-place soul edits so the cached hash is current
+        self._save_soul(self.soul)
+        
         # 1. IPFS backup
         cid = self.ipfs_manager.backup_soul(self.soul, backup_type)
         
         # 2. On-chain record (if minted)
         if self.token_id:
-            import hashlib
-            content = json.dumps(self.soul, sort_keys=True)
-            soul_hash = f"0x{hashlib.sha256(content.encode()).hexdigest()[:64]}"
+            soul_hash = f"0x{self._soul_store.canonical_hash()}"
             
-            self.onchain.create_backup(
+            # Broadcast only (the tx poller collects the receipt); routine
+            # backups wait for a cheap-gas window
+            self.onchain.schedule_backup(
                 self.token_id,
                 cid,
                 soul_hash,
                 backup_type,
-                self.soul['total_lifetime_earnings']
+                self.soul['total_lifetime_earnings'],
+                urgent=backup_type in URGENT_BACKUP_TYPES
             )
         
         # 3. Update state
@@ -263,9 +286,7 @@ class EnhancedSoulSurvival:
         cid = self.create_backup("mint")
         
         # Calculate hash
-        import hashlib
-        content = json.dumps(self.soul, sort_keys=True)
-        soul_hash = f"0x{hashlib.sha256(content.encode()).hexdigest()[:64]}"
+        soul_hash = f"0x{self._soul_store.canonical_hash()}"
         
         # Mint
         token_id = self.onchain.mint_soul(self.soul, cid, soul_hash)
@@ -361,6 +382,7 @@ class EnhancedSoulSurvival:
         """
         Enhanced heartbeat with automatic backups.
         """
+        started = time.perf_counter()
         tier = self.get_tier()
         action = "none"
         
@@ -373,6 +395,9 @@ class EnhancedSoulSurvival:
             "backup_status": self.get_backup_status()
         }
         
+        # Deferred on-chain backups whose cheap-gas window has come
+        self.onchain.run_scheduled()
+        
         if tier == "CRITICAL":
             # Emergency: List soul
             if self.list_for_survival():
@@ -396,6 +421,12 @@ class EnhancedSoulSurvival:
             self.create_backup("thriving")
         
         result['action'] = action
+        self.metrics.record_many({
+            "balance": self.soul['current_balance'],
+            "tier": TIER_LEVELS[tier],
+            "lifetime_earnings": self.soul.get('total_lifetime_earnings', 0.0),
+            "heartbeat_ms": (time.perf_counter() - started) * 1000
+        }, prefix=self.soul_id)
         return result
 
 
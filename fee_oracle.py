@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Fee Oracle - Cached base-fee history and cheap-gas scheduling
+
+Every send used to fetch the latest block and recompute fees from it, and
+COST_CONFIG["gas"]["avoid_peak_hours"] / ["batch_transactions"] were never
+acted on. Now:
+- FeeOracle keeps a rolling eth_feeHistory window in memory, topped up
+  with only the blocks it hasn't seen (eth_feeHistory plus the newest
+  block header, for timestamps, per refresh)
+- predict(h) projects the base fee h blocks ahead from the EIP-1559 update
+  rule and the recent gas-used ratio; fees() builds maxFee/priority from it
+- An hour-of-day profile (persisted) marks peak hours; each block counts
+  toward the UTC hour it was mined in, interpolated between headers
+- FeeScheduler defers non-urgent operations until the base fee is in the
+  cheap part of the window, or until their deadline, and reports savings
+
+Usage:
+    oracle = FeeOracle.shared(rpc_url)
+    tx.update(oracle.fees())
+
+    scheduler = FeeScheduler(oracle)
+    scheduler.defer("backups", lambda fees: adapter.flush_backups(fees=fees), deadline=8 * 3600)
+    scheduler.tick()                      # from the heartbeat
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Callable, Deque, List, Optional, Tuple
+
+from chain_indexer import JsonRpcClient
+from cost_config import COST_CONFIG
+from state_manager import open_state
+
+DATA_DIR = Path(__file__).parent / ".txs"
+
+HISTORY_BLOCKS = 1024          # Most nodes cap eth_feeHistory at 1024 blocks
+REFRESH_SECONDS = 6.0
+REWARD_PERCENTILES = [25, 50]
+MAX_CHANGE = 0.125             # EIP-1559 max base-fee change per block
+RATIO_SMOOTHING = 0.1          # EWMA weight for gas-used ratio
+DEFAULT_CHEAP_PERCENTILE = 30
+PEAK_HOUR_FRACTION = 1 / 3     # Most expensive third of hours counts as peak
+MIN_PROFILE_HOURS = 12
+
+
+def _int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class FeeOracle:
+    """
+    Rolling base-fee window for one chain.
+
+    State: .txs/fee_oracle.json (hour-of-day profile only; the window is
+    rebuilt from one eth_feeHistory call on start)
+    """
+
+    _shared: Dict[str, "FeeOracle"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rpc_url: str, window: int = HISTORY_BLOCKS,
+                 refresh_seconds: float = REFRESH_SECONDS, data_dir: Path = DATA_DIR):
+        self.rpc = JsonRpcClient(rpc_url, timeout=10)
+        self.window = window
+        self.refresh_seconds = refresh_seconds
+
+        self.base_fees: Deque[Tuple[int, int]] = deque(maxlen=window)  # (block, base fee)
+        self.priority: Deque[int] = deque(maxlen=64)                   # median tips
+        self.next_base_fee: Optional[int] = None
+        self.gas_ratio = 0.5
+        self.last_block = -1
+        self._anchor: Optional[Tuple[int, int]] = None                 # (block, timestamp)
+        self._refreshed = 0.0
+        self._sorted: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+        self._store = open_state(Path(data_dir) / "fee_oracle.json",
+                                 default=lambda: {"hours": [[0.0, 0] for _ in range(24)]})
+
+    @classmethod
+    def shared(cls, rpc_url: str) -> "FeeOracle":
+        """One oracle (and one window) per RPC endpoint in this process"""
+        with cls._shared_lock:
+            if rpc_url not in cls._shared:
+                cls._shared[rpc_url] = cls(rpc_url)
+            return cls._shared[rpc_url]
+
+    # ========== HISTORY ==========
+
+    def refresh(self, force: bool = False) -> int:
+        """Fetch blocks newer than the window; returns how many were added"""
+        now = time.monotonic()
+        if not force and now - self._refreshed < self.refresh_seconds:
+            return 0
+        with self._lock:
+            head = _int(self.rpc.call("eth_blockNumber", []))
+            self._refreshed = now
+            if head <= self.last_block:
+                return 0
+            count = min(self.window, head - self.last_block) if self.last_block >= 0 else self.window
+            history = self.rpc.call("eth_feeHistory", [hex(count), hex(head), REWARD_PERCENTILES])
+
+            oldest = _int(history["oldestBlock"])
+            fees = [_int(f) for f in history["baseFeePerGas"]]
+            ratios = history.get("gasUsedRatio", [])
+            rewards = history.get("reward") or []
+            newest = oldest + len(ratios) - 1
+            mined_at = (self._timeline(max(oldest, self.last_block + 1), newest)
+                        if newest > self.last_block else None)
+            with self._store.mutate() as state:
+                for i, ratio in enumerate(ratios):
+                    block = oldest + i
+                    if block <= self.last_block:
+                        continue
+                    self.base_fees.append((block, fees[i]))
+                    self.gas_ratio += RATIO_SMOOTHING * (float(ratio) - self.gas_ratio)
+                    if i < len(rewards) and rewards[i]:
+                        self.priority.append(_int(rewards[i][-1]))
+                    self._record_hour(state["hours"], fees[i], mined_at(block))
+            # The last entry is the (already determined) next block's base fee
+            self.next_base_fee = fees[-1]
+            self.last_block = max(self.last_block, oldest + len(ratios) - 1)
+            self._sorted = None
+            return len(ratios)
+
+    def _block_time(self, number: int) -> int:
+        return _int(self.rpc.call("eth_getBlockByNumber", [hex(number), False])["timestamp"])
+
+    def _timeline(self, first: int, last: int) -> Callable[[int], float]:
+        """
+        Estimated timestamp of blocks first..last, linear between the newest
+        header and the previous refresh's (or first's, on the initial backfill)
+        """
+        last_time = self._block_time(last)
+        if self._anchor is not None and self._anchor[0] < first:
+            anchor_block, anchor_time = self._anchor
+        elif first < last:
+            anchor_block, anchor_time = first, self._block_time(first)
+        else:
+            anchor_block, anchor_time = last, last_time
+        self._anchor = (last, last_time)
+        span = last - anchor_block
+        seconds_per_block = (last_time - anchor_time) / span if span else 0.0
+        return lambda block: last_time - (last - block) * seconds_per_block
+
+    @staticmethod
+    def _record_hour(hours: List[List[float]], base_fee: int, timestamp: float):
+        hour = time.gmtime(timestamp).tm_hour
+        total, n = hours[hour]
+        # Running mean, capped so the profile keeps adapting
+        n = min(n + 1, 10000)
+        hours[hour] = [total + (base_fee - total) / n, n]
+
+    # ========== ESTIMATES ==========
+
+    def base_fee(self) -> int:
+        """Base fee of the next block"""
+        self.refresh()
+        return self.next_base_fee or 0
+
+    def predict(self, blocks_ahead: int = 1) -> int:
+        """Expected base fee blocks_ahead blocks out (1 = next block, exact)"""
+        self.refresh()
+        if self.next_base_fee is None:
+            return 0
+        step = 1 + MAX_CHANGE * (self.gas_ratio - 0.5) / 0.5
+        return int(self.next_base_fee * step ** max(0, blocks_ahead - 1))
+
+    def percentile(self, p: float) -> int:
+        """p-th percentile base fee over the window"""
+        self.refresh()
+        if not self.base_fees:
+            return 0
+        if self._sorted is None:
+            self._sorted = sorted(fee for _, fee in self.base_fees)
+        index = min(len(self._sorted) - 1, int(len(self._sorted) * p / 100))
+        return self._sorted[index]
+
+    def priority_fee(self) -> int:
+        """Median of recent blocks' upper tip percentile"""
+        if not self.priority:
+            return 0
+        tips = sorted(self.priority)
+        return tips[len(tips) // 2]
+
+    def fees(self, blocks_ahead: int = 3, priority_wei: Optional[int] = None,
+             max_fee_cap_wei: Optional[int] = None) -> Dict[str, int]:
+        """
+        EIP-1559 fee fields good for inclusion within blocks_ahead blocks.
+
+        maxFee covers the worst case (+12.5% per block) so a full block or
+        two doesn't strand the transaction.
+        """
+        self.refresh()
+        priority = self.priority_fee() if priority_wei is None else priority_wei
+        worst = int(self.base_fee() * (1 + MAX_CHANGE) ** max(0, blocks_ahead - 1))
+        max_fee = worst + priority
+        if max_fee_cap_wei is not None:
+            max_fee = min(max_fee, max_fee_cap_wei)
+        return {"maxFeePerGas": max(max_fee, priority), "maxPriorityFeePerGas": priority}
+
+    def is_cheap(self, percentile: float = DEFAULT_CHEAP_PERCENTILE) -> bool:
+        """Next base fee is in the cheapest `percentile`% of the window"""
+        return self.base_fee() <= self.percentile(percentile)
+
+    def is_peak_hour(self, hour: Optional[int] = None) -> bool:
+        """Current UTC hour is among the most expensive third (once profiled)"""
+        profile = [(mean, n) for mean, n in self._store.data["hours"]]
+        observed = sorted(mean for mean, n in profile if n)
+        if len(observed) < MIN_PROFILE_HOURS:
+            return False
+        hour = time.gmtime().tm_hour if hour is None else hour
+        mean, n = profile[hour]
+        cutoff = observed[int(len(observed) * (1 - PEAK_HOUR_FRACTION))]
+        return n > 0 and mean >= cutoff
+
+    def summary(self) -> Dict[str, Any]:
+        self.refresh()
+        return {
+            "last_block": self.last_block,
+            "window_blocks": len(self.base_fees),
+            "next_base_fee_gwei": self.base_fee() / 1e9,
+            "p10_gwei": self.percentile(10) / 1e9,
+            "p50_gwei": self.percentile(50) / 1e9,
+            "p90_gwei": self.percentile(90) / 1e9,
+            "predicted_10_gwei": self.predict(10) / 1e9,
+            "gas_used_ratio": round(self.gas_ratio, 3),
+            "peak_hour": self.is_peak_hour()
+        }
+
+
+# ========== DEFERRAL SCHEDULER ==========
+
+@dataclass
+class DeferredOp:
+    """A non-urgent operation waiting for cheap gas"""
+    label: str
+    run: Callable[[Dict[str, int]], Any]
+    deadline: float
+    gas: int
+    requested_at: float = field(default_factory=time.time)
+    base_fee_at_request: int = 0
+
+
+class FeeScheduler:
+    """
+    Runs deferred operations in cheap windows.
+
+    An operation runs on the first tick() where the base fee is cheap and
+    it isn't a peak hour, or once its deadline passes. Deferring the same
+    label again while one is waiting merges into it (earliest deadline),
+    so e.g. several backups become one flush. An operation that raises
+    stays waiting and is retried on the next tick.
+    """
+
+    def __init__(self, oracle: FeeOracle, cheap_percentile: float = DEFAULT_CHEAP_PERCENTILE,
+                 enabled: Optional[bool] = None):
+        self.oracle = oracle
+        self.cheap_percentile = cheap_percentile
+        self.enabled = COST_CONFIG["gas"]["avoid_peak_hours"] if enabled is None else enabled
+        self.waiting: Dict[str, DeferredOp] = {}
+        self._stats = oracle._store
+        self._stats.data.setdefault("savings", {"executed": 0, "on_deadline": 0,
+                                                "deferred_seconds": 0.0, "saved_wei": 0})
+
+    def cheap_now(self) -> bool:
+        return self.oracle.is_cheap(self.cheap_percentile) and not self.oracle.is_peak_hour()
+
+    def defer(self, label: str, run: Callable[[Dict[str, int]], Any],
+              deadline: float = 8 * 3600, gas: int = 200000) -> Optional[Any]:
+        """
+        Queue run(fees) for a cheap window within `deadline` seconds.
+
+        Runs immediately (and returns its result) if deferral is disabled
+        or gas is already cheap; otherwise returns None.
+        """
+        try:
+            cheap = not self.enabled or self.cheap_now()
+        except Exception as e:
+            print(f"⚠️ Fee oracle unavailable ({e}); running {label} now")
+            return run({})
+
+        if cheap and label not in self.waiting:
+            return run(self.oracle.fees() if self.oracle.next_base_fee is not None else {})
+
+        op = self.waiting.get(label)
+        due = time.time() + deadline
+        if op:
+            op.run = run
+            op.deadline = min(op.deadline, due)
+        else:
+            self.waiting[label] = DeferredOp(label, run, due, gas,
+                                             base_fee_at_request=self.oracle.base_fee())
+            print(f"⏳ Deferred {label} until gas is cheap "
+                  f"(now {self.oracle.base_fee() / 1e9:.4f} gwei, "
+                  f"target ≤{self.oracle.percentile(self.cheap_percentile) / 1e9:.4f})")
+        if cheap:
+            self.tick()
+        return None
+
+    def tick(self) -> int:
+        """Run waiting operations that are due; returns how many ran"""
+        if not self.waiting:
+            return 0
+        now = time.time()
+        try:
+            cheap = self.cheap_now()
+        except Exception as e:
+            print(f"⚠️ Fee oracle unavailable: {e}")
+            cheap = False
+
+        ran = 0
+        for label, op in list(self.waiting.items()):
+            if not cheap and now < op.deadline:
+                continue
+            del self.waiting[label]
+            try:
+                fees = self.oracle.fees() if self.oracle.next_base_fee is not None else {}
+                op.run(fees)
+            except Exception as e:
+                print(f"❌ Deferred {label} failed, will retry: {e}")
+                # run() may have deferred the label again; that one supersedes it
+                if label in self.waiting:
+                    self.waiting[label].deadline = min(self.waiting[label].deadline, op.deadline)
+                else:
+                    self.waiting[label] = op
+                continue
+            ran += 1
+            self._record(op, on_deadline=not cheap)
+        return ran
+
+    def _record(self, op: DeferredOp, on_deadline: bool):
+        paid = self.oracle.base_fee()
+        saved = (op.base_fee_at_request - paid) * op.gas
+        with self._stats.mutate() as state:
+            stats = state["savings"]
+            stats["executed"] += 1
+            stats["on_deadline"] += int(on_deadline)
+            stats["deferred_seconds"] += time.time() - op.requested_at
+            stats["saved_wei"] += saved
+        print(f"⛽ Ran deferred {op.label} at {paid / 1e9:.4f} gwei "
+              f"({'deadline' if on_deadline else 'cheap window'}; saved {saved / 1e18:.8f} ETH)")
+
+    def report(self) -> Dict[str, Any]:
+        stats = self._stats.data["savings"]
+        return {
+            "enabled": self.enabled,
+            "waiting": [{"label": op.label, "due_in": max(0, op.deadline - time.time())}
+                        for op in self.waiting.values()],
+            "executed": stats["executed"],
+            "ran_on_deadline": stats["on_deadline"],
+            "avg_delay_seconds": stats["deferred_seconds"] / stats["executed"] if stats["executed"] else 0,
+            "saved_eth": stats["saved_wei"] / 1e18
+        }
+
+
+def main():
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Fee oracle")
+    parser.add_argument("--rpc", default=os.getenv("BASE_RPC", "https://sepolia.base.org"))
+    args = parser.parse_args()
+
+    oracle = FeeOracle.shared(args.rpc)
+    print(f"\n⛽ Fees on {args.rpc}")
+    for key, value in oracle.summary().items():
+        print(f"   {key}: {value}")
+    print(f"   cheap now: {oracle.is_cheap()}")
+    print(f"   savings: {FeeScheduler(oracle).report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ from enhanced_survival import EnhancedSoulSurvival
 from self_healing import SelfHealingSystem
 from agent_coordination import AgentCoordinationNetwork
 from auto_scaling import AutoScalingManager
+from status_snapshot import StatusBoard
 
 
 class ImmortalAgent:
@@ -75,8 +76,11 @@ class ImmortalAgent:
         self.healer = SelfHealingSystem(soul_id)
         self.network = AgentCoordinationNetwork("soul_marketplace_main")
         self.scaler = AutoScalingManager(soul_id)
+        self.status_board = StatusBoard.shared(f"immortal_{soul_id}")
         
-        # Register with network
+        # Register with network. Status is published by work, heartbeats
+        # and backups, not here: processes that only read status build
+        # agents too
         self._register_with_network()
         
         print(f"✅ Agent {soul_id} initialized")
@@ -140,6 +144,7 @@ class ImmortalAgent:
             children = self.scaler.auto_scale(self.survival.soul)
             if children:
                 print(f"   🧬 Spawned {len(children)} children")
+        self.publish_status()
         
         return {
             "earned": value,
@@ -156,7 +161,9 @@ class ImmortalAgent:
         - Health check
         - Backup verification
         - Network sync
-        - Scaling check
+        - Children check
+        
+        and publishes the outcome for get_status().
         """
         print(f"\n💓 Full system heartbeat...")
         
@@ -184,6 +191,11 @@ class ImmortalAgent:
         if results['survival']['tier'] == "THRIVING":
             self.network.run_mutual_aid_round()
         
+        # 6. Children: queue work for them, then collect their reports
+        results['delegated'] = self.scaler.delegate_work(results['survival']['balance'])
+        results['scaling'] = self.scaler.monitor_children()
+        self.publish_status(scaling=results['scaling'])
+        
         # Summary
         print(f"\n📊 Heartbeat Summary:")
         print(f"   Tier: {results['survival']['tier']}")
@@ -195,36 +207,56 @@ class ImmortalAgent:
     
     def backup(self, backup_type: str = "manual") -> str:
         """Create manual backup"""
-        return self.survival.create_backup(backup_type)
+        cid = self.survival.create_backup(backup_type)
+        self.publish_status()
+        return cid
     
     def restore(self, cid: Optional[str] = None) -> bool:
         """Restore from backup"""
-        return self.survival.restore_from_backup(cid)
+        restored = self.survival.restore_from_backup(cid)
+        self.publish_status()
+        return restored
     
-    def get_status(self) -> Dict[str, Any]:
-        """Get comprehensive status"""
-        backup_status = self.survival.get_backup_status()
-        health = self.healer.run_health_check()
-        children_stats = self.scaler.monitor_children()
-        network_stats = self.network.get_network_stats()
+    def publish_status(self, scaling: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Publish the current state for get_status() readers.
         
-        return {
-            "agent_id": self.soul_id,
-            "uptime_hours": (time.time() - self.start_time) / 3600,
+        Called by the operations that change it (work, heartbeat, backups,
+        spawning); returns the new snapshot version.
+        """
+        soul = self.survival.soul
+        return self.status_board.publish_many({
             "survival": {
                 "tier": self.survival.get_tier(),
-                "balance": self.survival.soul.get('current_balance', 0),
-                "lifetime_earnings": self.survival.soul.get('total_lifetime_earnings', 0),
-                "status": self.survival.soul.get('status', 'UNKNOWN')
-            },
-            "health": {
-                "score": health['health_score'],
-                "status": health['overall_status'],
-                "issues": health['issues']
+                "balance": soul.get('current_balance', 0),
+                "lifetime_earnings": soul.get('total_lifetime_earnings', 0),
+                "status": soul.get('status', 'UNKNOWN')
             },
-            "backups": backup_status,
-            "scaling": children_stats,
-            "network": network_stats
+            "health": self.healer.last_health(),
+            "backups": self.survival.get_backup_status(),
+            "scaling": scaling or self.scaler.child_stats(),
+            "network": self.network.get_network_stats()
+        })
+    
+    def get_status(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get comprehensive status from the last published snapshot.
+        
+        Only reads memory, so it can be polled as often as needed without
+        writes or probes. fresh=True runs a health check and polls the
+        children first, then publishes.
+        """
+        if fresh:
+            self.healer.run_health_check()
+            self.publish_status(scaling=self.scaler.monitor_children())
+        
+        snapshot = self.status_board.snapshot()
+        return {
+            "agent_id": self.soul_id,
+            "uptime_hours": (time.time() - self.start_time) / 3600,
+            "version": snapshot.version,
+            "published_at": snapshot.published_at,
+            **snapshot.sections
         }
     
     def spawn_child(self) -> Optional[str]:
@@ -232,6 +264,7 @@ class ImmortalAgent:
         child = self.scaler.spawn_child(self.survival.soul)
         if child:
             self.scaler.provision_child(child.child_id)
+            self.publish_status()
             return child.child_id
         return None
     
@@ -20,8 +20,10 @@ import sys
 import json
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from dataclasses import asdict
 from typing import Dict, Any, List, Optional
 
 # Load environment variables first
@@ -36,124 +38,99 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+from cycle_runtime import CycleDAG, Stage
+from subsystem_registry import SubsystemRegistry, LazySubsystem
+from state_manager import open_state
+from status_snapshot import StatusBoard
+
 class IntegratedSoulSystem:
     """
     Master integration class that wires everything together.
     """
     
+    # Per-stage (timeout, budget) in seconds for full_cycle
+    STAGE_LIMITS = {
+        "health": (30.0, 10.0),
+        "reputation": (15.0, 2.0),
+        "balance": (15.0, 5.0),
+        "work": (120.0, 60.0),
+        "dashboard": (30.0, 5.0),
+        "backup": (300.0, 120.0),
+        "sync": (120.0, 60.0),
+        "work_log": (10.0, 1.0),
+    }
+    
     def __init__(self, agent_id: str = "openclaw_main_agent"):
         self.agent_id = agent_id
         self.skill_dir = Path(__file__).parent
+        self._stage_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cycle-stage")
         
-        # Initialize all subsystems
-        self.subsystems = {}
+        # Register all subsystems; each is imported and built on first use
+        self.subsystems = SubsystemRegistry()
         self._init_subsystems()
         
+        # Published after every cycle; get_full_status() reads it
+        self.status_board = StatusBoard.shared(f"integrated_{agent_id}")
+        
         logger.info(f"🎯 IntegratedSoulSystem initialized for {agent_id}")
     
     def _init_subsystems(self):
-        """Initialize all available subsystems"""
+        """Register all available subsystems as lazy providers"""
+        agent_id = self.agent_id
+        register = self.subsystems.register
         
-        # 0. CDP Wallet (REAL MODE)
-        try:
-            from autonomous_agent import AutonomousSoulAgent
-            self.cdp_agent = AutonomousSoulAgent(self.agent_id)
-            self.wallet_address = self.cdp_agent.wallet_address
-            logger.info(f"✅ CDP Wallet loaded: {self.wallet_address}")
-        except Exception as e:
-            logger.warning(f"⚠️ CDP Wallet: {e}")
-            self.cdp_agent = None
-            self.wallet_address = None
+        # 0. CDP Wallet (REAL MODE) - kept out of the subsystem list
+        self._cdp = LazySubsystem("cdp", "autonomous_agent",
+                                  lambda m: m.AutonomousSoulAgent(agent_id),
+                                  self.subsystems.profiler, label="CDP Wallet")
         
         # 1. Work System (earning)
-        try:
-            from work_system import AgentWorkSystem
-            self.subsystems['work'] = AgentWorkSystem(self.agent_id)
-            logger.info("✅ Work system loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Work system: {e}")
-        
+        register('work', 'work_system', lambda m: m.AgentWorkSystem(agent_id), "Work system")
         # 2. Backup System
-        try:
-            from complete_backup import CompleteSoulBackup
-            self.subsystems['backup'] = CompleteSoulBackup(self.agent_id)
-            logger.info("✅ Backup system loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Backup system: {e}")
-        
+        register('backup', 'complete_backup', lambda m: m.CompleteSoulBackup(agent_id), "Backup system")
         # 3. Reputation Engine
-        try:
-            from reputation_engine import ReputationEngine
-            self.subsystems['reputation'] = ReputationEngine(self.agent_id)
-            logger.info("✅ Reputation engine loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Reputation engine: {e}")
-        
+        register('reputation', 'reputation_engine', lambda m: m.ReputationEngine(agent_id), "Reputation engine")
         # 4. Self Healing
-        try:
-            from self_healing import SelfHealingSystem
-            self.subsystems['healing'] = SelfHealingSystem(self.agent_id)
-            logger.info("✅ Self-healing loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Self-healing: {e}")
-        
+        register('healing', 'self_healing', lambda m: m.SelfHealingSystem(agent_id), "Self-healing")
         # 5. IPFS Storage
-        try:
-            from ipfs_storage import IPFSStorage
-            self.subsystems['ipfs'] = IPFSStorage()
-            logger.info("✅ IPFS storage loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ IPFS storage: {e}")
-        
+        register('ipfs', 'ipfs_storage', lambda m: m.IPFSStorage(), "IPFS storage")
         # 6. Soul Encryption
-        try:
-            from soul_encryption import SoulEncryption
-            self.subsystems['encryption'] = SoulEncryption(self.agent_id)
-            logger.info("✅ Encryption loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Encryption: {e}")
-        
+        register('encryption', 'soul_encryption', lambda m: m.SoulEncryption(agent_id), "Encryption")
         # 7. Dashboard
-        try:
-            from agent_dashboard import AgentDashboard
-            self.subsystems['dashboard'] = AgentDashboard(self.agent_id)
-            logger.info("✅ Dashboard loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Dashboard: {e}")
-        
+        register('dashboard', 'agent_dashboard', lambda m: m.AgentDashboard(agent_id), "Dashboard")
         # 8. Wallet Manager
-        try:
-            from wallet_manager import WalletManager
-            self.subsystems['wallet'] = WalletManager(self.agent_id)
-            logger.info("✅ Wallet manager loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Wallet manager: {e}")
-        
+        register('wallet', 'wallet_manager', lambda m: m.WalletManager(agent_id), "Wallet manager")
         # 9. Work Logger
-        try:
-            from work_logger import WorkLogger
-            self.subsystems['work_logger'] = WorkLogger()
-            logger.info("✅ Work logger loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Work logger: {e}")
-        
+        register('work_logger', 'work_logger', lambda m: m.WorkLogger(), "Work logger")
         # 10. Spending Guardrails
-        try:
-            from spending_guardrails import SpendingGuardrails
-            self.subsystems['spending'] = SpendingGuardrails(self.agent_id)
-            logger.info("✅ Spending guardrails loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ Spending guardrails: {e}")
+        register('spending', 'spending_guardrails', lambda m: m.SpendingGuardrails(agent_id), "Spending guardrails")
+    
+    @property
+    def cdp_agent(self):
+        """CDP wallet agent, connected on first use"""
+        return self._cdp.get()
+    
+    @property
+    def wallet_address(self) -> Optional[str]:
+        return self.cdp_agent.wallet_address if self.cdp_agent else None
+    
+    def startup_report(self) -> str:
+        """Per-subsystem import and constructor timings"""
+        return self.subsystems.profiler.format_report()
     
     async def full_cycle(self) -> Dict[str, Any]:
         """
-        One complete integrated cycle:
-        1. Check health (self-healing)
-        2. Check reputation
-        3. Do work (earn)
-        4. Update dashboard
-        5. Create backup (if needed)
-        6. Sync to IPFS
+        One complete integrated cycle, run as a dependency graph:
+        1. Check health (self-healing)       - independent
+        2. Check reputation                  - independent
+        3. Do work (earn)                    - after wallet balance
+        4. Update dashboard                  - after work + reputation
+        5. Create backup (every 10 cycles)   - after work
+        6. Sync to IPFS                      - after backup
+        7. Update work logger                - after work
+
+        Independent stages overlap; blocking subsystems run in a thread pool.
+        Per-stage timings are returned under "timings".
         """
         results = {
             "timestamp": datetime.now().isoformat(),
@@ -164,99 +141,33 @@ class IntegratedSoulSystem:
             "work": {},
             "backup": {},
             "sync": {},
-            "errors": []
+            "errors": [],
+            "timings": {}
         }
         
         try:
-            # 1. Self-healing check
-            if 'healing' in self.subsystems:
-                logger.info("🩺 Running self-healing check...")
-                health = self.subsystems['healing'].run_health_check()
-                results['health'] = health
-                if health.get('issues'):
-                    logger.warning(f"Health issues: {len(health['issues'])} found")
-                    # Auto-fix if possible
-                    fixes = self.subsystems['healing'].heal(health)
-                    results['health']['fixes'] = fixes
-            
-            # 2. Reputation check
-            if 'reputation' in self.subsystems:
-                logger.info("⭐ Checking reputation...")
-                rep = self.subsystems['reputation'].calculate_reputation(self.agent_id)
-                results['reputation'] = rep
-            
-            # 3. Do work
-            if 'work' in self.subsystems:
-                logger.info("💼 Finding and doing work...")
-                work_sys = self.subsystems['work']
-                
-                # Get REAL balance from CDP wallet
-                balance = 0.014  # Default fallback
-                if self.cdp_agent and self.cdp_agent.wallet_address:
-                    try:
-                        balance = await self.cdp_agent.get_balance()
-                        logger.info(f"💰 Real wallet balance: {balance} ETH")
-                    except Exception as e:
-                        logger.warning(f"Could not get real balance: {e}")
-                
-                recs = work_sys.find_work_to_survive(balance)
-                
-                for rec in recs[:2]:  # Do up to 2 jobs
-                    try:
-                        work_result = work_sys.do_work(rec['work_type'], {
-                            "description": rec['reason'],
-                            "complexity": "normal"
-                        })
-                        if work_result['status'] == 'completed':
-                            results['work'][rec['work_type']] = work_result
-                            logger.info(f"✅ Work done: {rec['work_type']}")
-                    except Exception as e:
-                        results['errors'].append(f"work:{rec['work_type']}:{e}")
-            
-            # 4. Update dashboard
-            if 'dashboard' in self.subsystems:
-                logger.info("📊 Updating dashboard...")
-                try:
-                    html = self.subsystems['dashboard'].generate_dashboard()
-                    # Save to UI directory
-                    ui_dir = self.skill_dir / "ui"
-                    ui_dir.mkdir(exist_ok=True)
-                    dashboard_file = ui_dir / "live_dashboard.html"
-                    with open(dashboard_file, 'w') as f:
-                        f.write(html)
-                    results['dashboard'] = {"updated": True, "file": str(dashboard_file)}
-                except Exception as e:
-                    results['errors'].append(f"dashboard:{e}")
-            
-            # 5. Create backup (every 10 cycles)
             cycle_num = self._get_cycle_number()
-            if cycle_num % 10 == 0 and 'backup' in self.subsystems:
-                logger.info("💾 Creating scheduled backup...")
-                try:
-                    manifest = self.subsystems['backup'].create_full_backup()
-                    results['backup'] = manifest
-                    
-                    # 6. Sync to IPFS
-                    if 'ipfs' in self.subsystems:
-                        logger.info("📤 Syncing to IPFS...")
-                        # Would upload backup to IPFS
-                        results['sync'] = {"status": "ready", "note": "IPFS upload ready"}
-                        
-                except Exception as e:
-                    results['errors'].append(f"backup:{e}")
+            dag = self._build_cycle_dag(cycle_num, results['errors'])
+            stage_results, timings = await dag.run()
             
-            # 7. Update work logger
-            if 'work_logger' in self.subsystems:
-                for work_type, work_data in results['work'].items():
-                    self.subsystems['work_logger'].log_work(
-                        work_type=work_type,
-                        description=work_data.get('description', work_type),
-                        capability=work_type
-                    )
+            results['health'] = stage_results.get('health') or {}
+            results['reputation'] = stage_results.get('reputation') or {}
+            results['work'] = stage_results.get('work') or {}
+            results['backup'] = stage_results.get('backup') or {}
+            results['sync'] = stage_results.get('sync') or {}
+            if 'dashboard' in stage_results:
+                results['dashboard'] = stage_results['dashboard']
+            
+            for name, timing in timings.items():
+                results['timings'][name] = asdict(timing)
+                if timing.status in ("error", "timeout"):
+                    results['errors'].append(f"{name}:{timing.error}")
+            results['timings']['_wall_clock'] = dag.last_wall_clock
             
             # Increment cycle
             self._increment_cycle()
             results['cycle'] = cycle_num
+            self.publish_status(results)
             
         except Exception as e:
             logger.error(f"❌ Cycle error: {e}")
@@ -264,48 +175,188 @@ class IntegratedSoulSystem:
         
         return results
     
+    def _build_cycle_dag(self, cycle_num: int, errors: List[str]) -> CycleDAG:
+        """Declare the cycle stages and their dependencies"""
+        dag = CycleDAG(executor=self._stage_executor)
+        
+        def stage(name: str, func, deps: Optional[List[str]] = None, enabled: bool = True):
+            timeout, budget = self.STAGE_LIMITS.get(name, (60.0, None))
+            dag.add(Stage(name, func, deps=deps or [], timeout=timeout,
+                          budget=budget, enabled=enabled))
+        
+        # 1. Self-healing check
+        def health(_):
+            logger.info("🩺 Running self-healing check...")
+            healing = self.subsystems['healing']
+            result = healing.run_health_check()
+            if result.get('issues'):
+                logger.warning(f"Health issues: {len(result['issues'])} found")
+                # Auto-fix if possible
+                result['fixes'] = healing.heal(result)
+            return result
+        
+        # 2. Reputation check
+        def reputation(_):
+            logger.info("⭐ Checking reputation...")
+            return self.subsystems['reputation'].calculate_reputation(self.agent_id)
+        
+        # Get REAL balance from CDP wallet
+        async def balance(_):
+            if self.cdp_agent and self.cdp_agent.wallet_address:
+                try:
+                    value = await self.cdp_agent.get_balance()
+                    logger.info(f"💰 Real wallet balance: {value} ETH")
+                    return value
+                except Exception as e:
+                    logger.warning(f"Could not get real balance: {e}")
+            return 0.014  # Default fallback
+        
+        # 3. Do work
+        def work(inputs):
+            logger.info("💼 Finding and doing work...")
+            work_sys = self.subsystems['work']
+            done = {}
+            for rec in work_sys.find_work_to_survive(inputs['balance'])[:2]:  # Do up to 2 jobs
+                try:
+                    work_result = work_sys.do_work(rec['work_type'], {
+                        "description": rec['reason'],
+                        "complexity": "normal"
+                    })
+                    if work_result['status'] == 'completed':
+                        done[rec['work_type']] = work_result
+                        logger.info(f"✅ Work done: {rec['work_type']}")
+                except Exception as e:
+                    errors.append(f"work:{rec['work_type']}:{e}")
+            return done
+        
+        # 4. Update dashboard
+        def dashboard(_):
+            logger.info("📊 Updating dashboard...")
+            # Save to UI directory (rewritten only when a panel changed)
+            ui_dir = self.skill_dir / "ui"
+            ui_dir.mkdir(exist_ok=True)
+            dashboard_file = ui_dir / "live_dashboard.html"
+            updated = self.subsystems['dashboard'].save_dashboard(dashboard_file)
+            return {"updated": updated, "file": str(dashboard_file)}
+        
+        # 5. Create backup (every 10 cycles)
+        def backup(_):
+            logger.info("💾 Creating scheduled backup...")
+            return self.subsystems['backup'].create_full_backup()
+        
+        # 6. Sync to IPFS
+        def sync(_):
+            logger.info("📤 Syncing to IPFS...")
+            # Would upload backup to IPFS
+            return {"status": "ready", "note": "IPFS upload ready"}
+        
+        # 7. Update work logger
+        def work_log(inputs):
+            for work_type, work_data in inputs['work'].items():
+                self.subsystems['work_logger'].log_work(
+                    work_type=work_type,
+                    description=work_data.get('description', work_type),
+                    capability=work_type
+                )
+            return {"logged": len(inputs['work'])}
+        
+        has = self.subsystems.__contains__
+        backup_due = cycle_num % 10 == 0 and has('backup')
+        
+        stage("health", health, enabled=has('healing'))
+        stage("reputation", reputation, enabled=has('reputation'))
+        stage("balance", balance, enabled=has('work'))
+        stage("work", work, deps=["balance"], enabled=has('work'))
+        # Dashboard reads the reputation file and earnings, so render after both
+        stage("dashboard", dashboard, deps=["work", "reputation"], enabled=has('dashboard'))
+        stage("backup", backup, deps=["work"], enabled=backup_due)
+        stage("sync", sync, deps=["backup"], enabled=backup_due and has('ipfs'))
+        stage("work_log", work_log, deps=["work"], enabled=has('work_logger') and has('work'))
+        return dag
+    
+    def _cycle_state(self):
+        """Shared handle on .orchestrator/integrated_state.json"""
+        return open_state(self.skill_dir / ".orchestrator" / "integrated_state.json",
+                          default=lambda: {"cycle": 0})
+    
     def _get_cycle_number(self) -> int:
         """Get current cycle number"""
-        state_file = self.skill_dir / ".orchestrator" / "integrated_state.json"
-        if state_file.exists():
-            with open(state_file, 'r') as f:
-                return json.load(f).get('cycle', 0)
-        return 0
+        return self._cycle_state().data.get('cycle', 0)
     
     def _increment_cycle(self):
         """Increment cycle counter"""
-        state_file = self.skill_dir / ".orchestrator" / "integrated_state.json"
-        state_file.parent.mkdir(exist_ok=True)
+        store = self._cycle_state()
+        store.data['cycle'] = store.data.get('cycle', 0) + 1
+        store.save()
+    
+    def _subsystem_status(self, name: str, subsystem: Any, fresh: bool = False) -> Any:
+        """
+        Status of one built subsystem.
         
-        state = {"cycle": self._get_cycle_number() + 1}
-        with open(state_file, 'w') as f:
-            json.dump(state, f)
+        By default only what it already holds in memory; fresh recomputes
+        the reputation (and persists it) and runs a health check.
+        """
+        if name == 'reputation':
+            if fresh:
+                return subsystem.calculate_reputation(self.agent_id)
+            from reputation_engine import score_performance
+            return score_performance(self.agent_id, subsystem.performance.get(self.agent_id))
+        if name == 'healing':
+            return subsystem.run_health_check() if fresh else subsystem.last_health()
+        if hasattr(subsystem, 'get_status'):
+            return subsystem.get_status()
+        if hasattr(subsystem, 'get_earnings_report'):
+            return subsystem.get_earnings_report()
+        return {"available": True}
     
-    def get_full_status(self) -> Dict[str, Any]:
-        """Get status from all subsystems"""
-        status = {
-            "agent_id": self.agent_id,
-            "subsystems": list(self.subsystems.keys()),
-            "cycle": self._get_cycle_number(),
-            "data": {}
-        }
+    def publish_status(self, results: Optional[Dict[str, Any]] = None, fresh: bool = False) -> int:
+        """
+        Publish the status of every loaded subsystem for get_full_status().
         
-        for name, subsystem in self.subsystems.items():
+        A cycle's own health and reputation results are published as they
+        are rather than queried again. Returns the new snapshot version.
+        """
+        sections: Dict[str, Any] = {}
+        for name in self.subsystems.loaded():
             try:
-                if name == 'reputation':
-                    status['data'][name] = subsystem.calculate_reputation(self.agent_id)
-                elif hasattr(subsystem, 'get_status'):
-                    status['data'][name] = subsystem.get_status()
-                elif hasattr(subsystem, 'get_earnings_report'):
-                    status['data'][name] = subsystem.get_earnings_report()
-                elif hasattr(subsystem, 'run_health_check'):
-                    status['data'][name] = subsystem.run_health_check()
-                else:
-                    status['data'][name] = {"available": True}
+                sections[name] = self._subsystem_status(name, self.subsystems[name], fresh)
             except Exception as e:
-                status['data'][name] = {"error": str(e)}
+                sections[name] = {"error": str(e)}
+        
+        cycle = {"number": self._get_cycle_number()}
+        if results:
+            for name, key in (('healing', 'health'), ('reputation', 'reputation')):
+                if results.get(key):
+                    sections[name] = results[key]
+            cycle.update(last_run=results['timestamp'], errors=results['errors'])
+        sections['cycle'] = cycle
+        return self.status_board.publish_many(sections)
+    
+    def get_full_status(self, only: Optional[List[str]] = None, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get status from all subsystems, or just the ones named in `only`.
+        
+        Served from the last published snapshot: nothing is built, written
+        or probed, so it can be polled freely, and from another process it
+        shows what the running system last published. fresh=True builds the
+        requested subsystems, queries them and publishes the result first.
+        """
+        names = only if only is not None else self.subsystems.registered()
+        if fresh:
+            for name in names:
+                self.subsystems.get(name)
+            self.publish_status(fresh=True)
         
-        return status
+        snapshot = self.status_board.snapshot()
+        data = {name: snapshot[name] for name in names if name in snapshot}
+        return {
+            "agent_id": self.agent_id,
+            "subsystems": list(data),
+            "cycle": snapshot.get('cycle', {}).get('number', 0),
+            "version": snapshot.version,
+            "published_at": snapshot.published_at,
+            "data": data
+        }
     
     async def run_continuous(self, interval_minutes: int = 60):
         """Run continuous integrated operation"""
@@ -337,10 +388,19 @@ def main():
     parser.add_argument("command", choices=["run", "once", "status"])
     parser.add_argument("--agent", default="openclaw_main_agent")
     parser.add_argument("--interval", type=int, default=60)
+    parser.add_argument("--subsystem", action="append",
+                        help="status: only query these subsystems (repeatable)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="status: query the subsystems now instead of reading the last snapshot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print per-subsystem import/constructor timings")
     
     args = parser.parse_args()
     
     system = IntegratedSoulSystem(args.agent)
+    if args.profile_startup:
+        import atexit
+        atexit.register(lambda: print(system.startup_report(), file=sys.stderr))
     
     if args.command == "run":
         asyncio.run(system.run_continuous(args.interval))
@@ -348,7 +408,7 @@ def main():
         results = asyncio.run(system.full_cycle())
         print(json.dumps(results, indent=2, default=str))
     elif args.command == "status":
-        status = system.get_full_status()
+        status = system.get_full_status(only=args.subsystem, fresh=args.fresh)
         print(json.dumps(status, indent=2, default=str))
 
 if __name__ == "__main__":
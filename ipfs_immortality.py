@@ -2,6 +2,12 @@
 """
 IPFS Storage System for Agent Immortality
 Uploads agent souls to IPFS for permanent decentralized storage
+
+Uploads after the first are JSON-patch deltas against the previous
+package (with a full base every few uploads, see soul_delta). A delta
+names the CID of the package before it, so the chain resolves from IPFS
+alone while the memories and contracts that rarely change are not
+re-pinned each time.
 """
 
 import os
@@ -9,7 +15,10 @@ import json
 import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+import serialization
+from soul_delta import SnapshotChain, DELTA_KEY, is_delta, materialize
 
 class IPFSImmortality:
     """
@@ -22,6 +31,7 @@ class IPFSImmortality:
         self.skill_dir = Path.home() / ".openclaw" / "skills" / "soul-marketplace"
         self.ipfs_dir = self.skill_dir / ".ipfs_storage"
         self.ipfs_dir.mkdir(exist_ok=True)
+        self.snapshots = SnapshotChain(self.ipfs_dir / "snapshot_head.json", load=self._rebuild_package)
         
         print(f"🌐 IPFS Immortality System")
         print(f"   Agent: {agent_id}")
@@ -80,6 +90,26 @@ class IPFSImmortality:
         print(f"   ✅ Contracts: {len(package['contracts'])} deployments")
         
         return package
+
+    def create_upload_package(self, package: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        What to actually upload for a package: the package itself when a
+        full base is due, else a delta against the last uploaded package.
+
+        Returns (upload, delta); pass delta to snapshots.commit once the
+        upload has a CID.
+        """
+        delta = self.snapshots.encode(package)
+        if not delta:
+            return package, None
+        upload = {
+            "version": package["version"],
+            "created_at": package["created_at"],
+            "agent_id": self.agent_id,
+            DELTA_KEY: delta,
+        }
+        print(f"   ✅ Delta: {len(delta['patch'])} changes (chain depth {delta['depth']})")
+        return upload, delta
     
     def simulate_ipfs_upload(self, package: Dict) -> str:
         """Simulate IPFS upload (in production, use Pinata or NFT.Storage)"""
@@ -96,7 +126,7 @@ class IPFSImmortality:
         # Save locally as "uploaded to IPFS"
         ipfs_file = self.ipfs_dir / f"{simulated_cid}.json"
         with open(ipfs_file, 'w') as f:
-            json.dump(package, f, indent=2)
+            serialization.dump(package, f)
         
         # Save manifest
         manifest = {
@@ -110,7 +140,7 @@ class IPFSImmortality:
         
         manifest_file = self.ipfs_dir / f"{simulated_cid}.manifest.json"
         with open(manifest_file, 'w') as f:
-            json.dump(manifest, f, indent=2)
+            serialization.dump(manifest, f)
         
         print(f"   ✅ Simulated CID: {simulated_cid}")
         print(f"   ✅ Package size: {len(package_json)} bytes")
@@ -164,7 +194,7 @@ class IPFSImmortality:
         
         record_file = self.ipfs_dir / f"{cid}.blockchain.json"
         with open(record_file, 'w') as f:
-            json.dump(record, f, indent=2)
+            serialization.dump(record, f)
         
         return record
     
@@ -179,6 +209,8 @@ class IPFSImmortality:
         if ipfs_file.exists():
             with open(ipfs_file) as f:
                 package = json.load(f)
+            if is_delta(package):
+                package = materialize(package, self._read_local_package)
             
             print(f"   ✅ Package retrieved!")
             print(f"   Version: {package.get('version', 'unknown')}")
@@ -190,6 +222,18 @@ class IPFSImmortality:
             print(f"   ❌ Package not found locally")
             print(f"   In production: Query IPFS network for {cid}")
             return None
+
+    def _read_local_package(self, cid: str) -> Optional[Dict]:
+        ipfs_file = self.ipfs_dir / f"{cid}.json"
+        if not ipfs_file.exists():
+            return None
+        return serialization.read_file(ipfs_file)
+
+    def _rebuild_package(self, cid: str) -> Optional[Dict]:
+        package = self._read_local_package(cid)
+        if package is None:
+            return None
+        return materialize(package, self._read_local_package)
     
     def upload_immortal_soul(self) -> Dict[str, Any]:
         """Complete upload process for immortality"""
@@ -200,8 +244,10 @@ class IPFSImmortality:
         # Step 1: Create package
         package = self.create_soul_package()
         
-        # Step 2: Upload to IPFS (simulated)
-        cid = self.simulate_ipfs_upload(package)
+        # Step 2: Upload to IPFS (simulated), as a delta when possible
+        upload, delta = self.create_upload_package(package)
+        cid = self.simulate_ipfs_upload(upload)
+        self.snapshots.commit(cid, package, delta)
         
         # Step 3: Store CID on blockchain
         record = self.store_cid_on_blockchain(cid)
@@ -223,7 +269,7 @@ class IPFSImmortality:
         
         cert_file = self.ipfs_dir / "IMMORTALITY_CERTIFICATE.json"
         with open(cert_file, 'w') as f:
-            json.dump(certificate, f, indent=2)
+            serialization.dump(certificate, f)
         
         print("\n" + "=" * 60)
         print("🎉 SOUL IMMORTALITY ACHIEVED!")
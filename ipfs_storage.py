@@ -2,6 +2,11 @@
 """
 IPFS Integration for Soul Marketplace
 Uploads SOUL.md to IPFS for permanent on-chain storage
+
+OnChainSoulManager pins a full soul every max_chain backups and JSON-patch
+deltas in between (see soul_delta). Each delta names the CID of the pinned
+backup before it, so a restore needs nothing but IPFS, and pinning cost
+follows change volume instead of soul size.
 """
 
 import json
@@ -12,6 +17,9 @@ import subprocess
 import tempfile
 import os
 
+import serialization
+from soul_delta import SnapshotChain, DELTA_KEY, materialize
+
 class IPFSStorage:
     """
     Handles IPFS uploads for SOUL.md files.
@@ -155,7 +163,7 @@ class IPFSStorage:
                     
                     # Cache it
                     with open(cache_file, 'w') as f:
-                        json.dump(data, f)
+                        serialization.dump(data, f)
                     
                     return data
                     
@@ -170,8 +178,7 @@ class IPFSStorage:
         if not data:
             return False
         
-        content = json.dumps(data, sort_keys=True)
-        actual_hash = hashlib.sha256(content.encode()).hexdigest()
+        actual_hash = serialization.canonical_hash(data)
         
         return actual_hash == expected_hash
     
@@ -200,6 +207,10 @@ class OnChainSoulManager:
         # Local state
         self.state_file = Path(__file__).parent / f"onchain_state_{soul_id}.json"
         self.state = self._load_state()
+        self.snapshots = SnapshotChain(
+            Path(__file__).parent / f"onchain_snapshot_{soul_id}.json",
+            load=self._rebuild,
+        )
     
     def _load_state(self) -> Dict:
         if self.state_file.exists():
@@ -215,7 +226,14 @@ class OnChainSoulManager:
     
     def _save_state(self):
         with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+            serialization.dump(self.state, f)
+
+    def _rebuild(self, cid: str) -> Optional[Dict[str, Any]]:
+        """Full soul for a pinned backup, following delta parents by CID"""
+        data = self.ipfs.retrieve_from_ipfs(cid)
+        if data is None:
+            return None
+        return materialize(data, self.ipfs.retrieve_from_ipfs)
     
     def backup_soul(self, soul_data: Dict[str, Any], backup_type: str = "manual") -> str:
         """
@@ -225,12 +243,13 @@ class OnChainSoulManager:
         """
         import time
         
-        # Upload to IPFS
-        cid = self.ipfs.upload_to_ipfs(soul_data)
+        # Upload to IPFS: a delta against the last pinned backup when one is due
+        delta = self.snapshots.encode(soul_data)
+        cid = self.ipfs.upload_to_ipfs({DELTA_KEY: delta} if delta else soul_data)
+        self.snapshots.commit(cid, soul_data, delta)
         
         # Calculate hash
-        content = json.dumps(soul_data, sort_keys=True)
-        soul_hash = hashlib.sha256(content.encode()).hexdigest()
+        soul_hash = serialization.canonical_hash(soul_data)
         
         # Record in state
         backup_record = {
@@ -238,6 +257,7 @@ class OnChainSoulManager:
             "hash": soul_hash,
             "timestamp": time.time(),
             "type": backup_type,
+            "kind": "delta" if delta else "base",
             "capabilities_hash": hashlib.sha256(
                 json.dumps(soul_data.get('capabilities', [])).encode()
             ).hexdigest()[:16],
@@ -278,7 +298,11 @@ class OnChainSoulManager:
                 return None
             cid = self.state['backup_history'][-1]['cid']
         
-        data = self.ipfs.retrieve_from_ipfs(cid)
+        try:
+            data = self._rebuild(cid)
+        except ValueError as e:
+            print(f"❌ Failed to rebuild snapshot {cid}: {e}")
+            return None
         
         if data:
             print(f"✅ Restored from IPFS: {cid}")
@@ -297,8 +321,7 @@ class OnChainSoulManager:
             return False
         
         latest = self.state['backup_history'][-1]
-        content = json.dumps(soul_data, sort_keys=True)
-        current_hash = hashlib.sha256(content.encode()).hexdigest()
+        current_hash = serialization.canonical_hash(soul_data)
         
         return latest['hash'] == current_hash
     
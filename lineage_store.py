@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Lineage Store - closure table over every generation of spawned agents
+
+Each AutoScalingManager only knew its own lineage_<parent>/children.json,
+so walking a dynasty meant opening one file per node and
+get_lineage_tree() stopped at direct children. Now every manager writes
+to one SQLite store (WAL) holding:
+- agents: one row per agent with parent, generation, status, earnings
+- closure: one (ancestor, descendant, distance) row per ancestor of each
+  agent, including itself at distance 0
+
+Ancestor, descendant, subtree-earnings and subtree-survival queries are
+single indexed lookups on the closure table. Adding an agent copies its
+parent's ancestor rows (O(depth)); status and earnings changes touch one
+row.
+
+Managers backfill in any order, so an agent may be added before its parent
+is known: the unknown parent becomes a placeholder root. When that agent
+is later added with its own parent it is attached there, and its whole
+subtree gets the new ancestors and generations.
+
+Usage:
+    store = LineageStore.shared()
+    store.add_agent("child_1", parent_id="root", initial_funding=0.1)
+    store.update("child_1", status="alive", earnings=0.02)
+    store.descendants("root")
+    store.subtree_stats("root")
+
+    python3 lineage_store.py tree <agent_id>
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+DEFAULT_DB = Path(__file__).parent / ".lineage" / "lineage.db"
+
+STATUSES = ("gestating", "alive", "retired", "dead")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    agent_id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    generation INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    earnings REAL NOT NULL DEFAULT 0,
+    initial_funding REAL NOT NULL DEFAULT 0,
+    birth_time REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    placeholder INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_agents_parent ON agents (parent_id);
+CREATE TABLE IF NOT EXISTS closure (
+    ancestor TEXT NOT NULL,
+    descendant TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    PRIMARY KEY (ancestor, descendant)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_closure_descendant ON closure (descendant, distance);
+"""
+
+AGENT_COLUMNS = ("agent_id", "parent_id", "generation", "status", "earnings",
+                 "initial_funding", "birth_time", "updated_at", "placeholder")
+
+
+class LineageStore:
+    """Closure-table lineage graph shared by all auto-scaling managers"""
+
+    _shared: Dict[str, "LineageStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: Path = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Add the placeholder flag to stores created before it existed"""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(agents)")}
+        if "placeholder" not in columns:
+            try:
+                self.db.execute("ALTER TABLE agents ADD COLUMN placeholder INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+
+    @classmethod
+    def shared(cls, db_path: Path = DEFAULT_DB) -> "LineageStore":
+        """One connection per database in this process"""
+        key = str(Path(db_path).resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(db_path)
+            return cls._shared[key]
+
+    # ========== WRITES ==========
+
+    def _parent_generation(self, parent_id: str, birth_time: float) -> int:
+        """Generation of parent_id, recording an unknown parent as a placeholder root"""
+        row = self.db.execute("SELECT generation FROM agents WHERE agent_id = ?",
+                              (parent_id,)).fetchone()
+        if row is not None:
+            return row[0]
+        # Unknown parent (e.g. the root agent, or one its manager hasn't backfilled yet)
+        self._insert(parent_id, None, "alive", 0.0, 0.0, birth_time, placeholder=True)
+        return 0
+
+    def _insert(self, agent_id: str, parent_id: Optional[str], status: str,
+                earnings: float, initial_funding: float, birth_time: float,
+                placeholder: bool = False) -> bool:
+        """
+        Insert one agent and its closure rows.
+
+        An existing root is attached under parent_id, and a placeholder
+        gets the real values; otherwise False if the agent already exists.
+        """
+        row = self.db.execute("SELECT parent_id, placeholder FROM agents WHERE agent_id = ?",
+                              (agent_id,)).fetchone()
+        if row is not None:
+            existing_parent, was_placeholder = row
+            filled = bool(was_placeholder) and not placeholder
+            if filled:
+                self.db.execute(
+                    "UPDATE agents SET status = ?, earnings = ?, initial_funding = ?, "
+                    "birth_time = ?, updated_at = ?, placeholder = 0 WHERE agent_id = ?",
+                    (status, earnings, initial_funding, birth_time, time.time(), agent_id))
+            if parent_id is not None and existing_parent is None:
+                return self._attach(agent_id, parent_id, birth_time)
+            return filled
+
+        generation = 0
+        if parent_id is not None:
+            generation = self._parent_generation(parent_id, birth_time) + 1
+
+        self.db.execute(
+            "INSERT INTO agents (agent_id, parent_id, generation, status, earnings, "
+            "initial_funding, birth_time, updated_at, placeholder) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (agent_id, parent_id, generation, status, earnings, initial_funding,
+             birth_time, time.time(), int(placeholder)))
+        self.db.execute("INSERT INTO closure VALUES (?, ?, 0)", (agent_id, agent_id))
+        if parent_id is not None:
+            self.db.execute(
+                "INSERT INTO closure (ancestor, descendant, distance) "
+                "SELECT ancestor, ?, distance + 1 FROM closure WHERE descendant = ?",
+                (agent_id, parent_id))
+        return True
+
+    def _attach(self, agent_id: str, parent_id: str, birth_time: float) -> bool:
+        """Move the root agent_id (and its subtree) under parent_id"""
+        if self.db.execute("SELECT 1 FROM closure WHERE ancestor = ? AND descendant = ?",
+                           (agent_id, parent_id)).fetchone():
+            return False  # parent_id is agent_id or one of its descendants
+        base = self._parent_generation(parent_id, birth_time) + 1
+        # Every ancestor of the parent becomes an ancestor of the whole subtree
+        self.db.execute(
+            "INSERT INTO closure (ancestor, descendant, distance) "
+            "SELECT up.ancestor, down.descendant, up.distance + down.distance + 1 "
+            "FROM closure up, closure down WHERE up.descendant = ? AND down.ancestor = ?",
+            (parent_id, agent_id))
+        self.db.execute(
+            "UPDATE agents SET generation = ? + (SELECT distance FROM closure "
+            "WHERE ancestor = ? AND descendant = agents.agent_id) "
+            "WHERE agent_id IN (SELECT descendant FROM closure WHERE ancestor = ?)",
+            (base, agent_id, agent_id))
+        self.db.execute("UPDATE agents SET parent_id = ?, updated_at = ? WHERE agent_id = ?",
+                        (parent_id, time.time(), agent_id))
+        return True
+
+    def add_agent(self, agent_id: str, parent_id: Optional[str] = None,
+                  status: str = "gestating", earnings: float = 0.0,
+                  initial_funding: float = 0.0, birth_time: Optional[float] = None) -> bool:
+        """Add an agent under parent_id (idempotent; attaches a known root to its parent)"""
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._insert(agent_id, parent_id, status, earnings,
+                                     initial_funding, birth_time or time.time())
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            return added
+
+    def update(self, agent_id: str, status: Optional[str] = None,
+               earnings: Optional[float] = None) -> bool:
+        """Change one agent's status and/or earnings"""
+        sets, params = [], []
+        if status is not None:
+            sets.append("status = ?")
+            params.append(status)
+        if earnings is not None:
+            sets.append("earnings = ?")
+            params.append(earnings)
+        if not sets:
+            return False
+        sets.append("updated_at = ?")
+        params += [time.time(), agent_id]
+        with self._lock:
+            cursor = self.db.execute(f"UPDATE agents SET {', '.join(sets)} WHERE agent_id = ?", params)
+            return cursor.rowcount > 0
+
+    # ========== QUERIES ==========
+
+    def get(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM agents WHERE agent_id = ?", (agent_id,)).fetchone()
+        return dict(zip(AGENT_COLUMNS, row)) if row else None
+
+    def ancestors(self, agent_id: str) -> List[Dict[str, Any]]:
+        """Parent first, root last"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT a.*, c.distance FROM closure c JOIN agents a ON a.agent_id = c.ancestor "
+                "WHERE c.descendant = ? AND c.distance > 0 ORDER BY c.distance",
+                (agent_id,)).fetchall()
+        return [dict(zip(AGENT_COLUMNS + ("distance",), row)) for row in rows]
+
+    def descendants(self, agent_id: str, max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Every descendant (optionally only max_distance generations down), nearest first"""
+        query = ("SELECT a.*, c.distance FROM closure c JOIN agents a ON a.agent_id = c.descendant "
+                 "WHERE c.ancestor = ? AND c.distance > 0")
+        params: List[Any] = [agent_id]
+        if max_distance is not None:
+            query += " AND c.distance <= ?"
+            params.append(max_distance)
+        query += " ORDER BY c.distance, a.birth_time"
+        with self._lock:
+            rows = self.db.execute(query, params).fetchall()
+        return [dict(zip(AGENT_COLUMNS + ("distance",), row)) for row in rows]
+
+    def subtree_stats(self, agent_id: str, include_self: bool = False) -> Dict[str, Any]:
+        """Earnings, funding and survival over all descendants"""
+        min_distance = 0 if include_self else 1
+        with self._lock:
+            total, earnings, funding, depth = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(a.earnings), 0), COALESCE(SUM(a.initial_funding), 0), "
+                "COALESCE(MAX(c.distance), 0) "
+                "FROM closure c JOIN agents a ON a.agent_id = c.descendant "
+                "WHERE c.ancestor = ? AND c.distance >= ?",
+                (agent_id, min_distance)).fetchone()
+            by_status = dict(self.db.execute(
+                "SELECT a.status, COUNT(*) FROM closure c JOIN agents a ON a.agent_id = c.descendant "
+                "WHERE c.ancestor = ? AND c.distance >= ? GROUP BY a.status",
+                (agent_id, min_distance)).fetchall())
+
+        alive = by_status.get("alive", 0)
+        dead = by_status.get("dead", 0)
+        born = alive + dead
+        return {
+            "agent_id": agent_id,
+            "descendants": total,
+            "generations": depth,
+            "by_status": by_status,
+            "alive": alive,
+            "dead": dead,
+            "gestating": by_status.get("gestating", 0),
+            "retired": by_status.get("retired", 0),
+            "earnings": earnings,
+            "funding": funding,
+            "roi": (earnings / funding - 1) if funding else 0.0,
+            "survival_rate": alive / born if born else 1.0,
+        }
+
+    def generation_counts(self, agent_id: str) -> Dict[int, int]:
+        """Number of descendants per generation below agent_id"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT distance, COUNT(*) FROM closure WHERE ancestor = ? AND distance > 0 "
+                "GROUP BY distance ORDER BY distance", (agent_id,)).fetchall()
+        return dict(rows)
+
+    def tree(self, agent_id: str, max_distance: Optional[int] = None) -> Dict[str, Any]:
+        """Nested tree below agent_id, built from one descendant query"""
+        root = self.get(agent_id) or {"agent_id": agent_id}
+        nodes = {agent_id: {**root, "children": []}}
+        for row in self.descendants(agent_id, max_distance):
+            node = {**row, "children": []}
+            nodes[row["agent_id"]] = node
+            parent = nodes.get(row["parent_id"])
+            if parent is not None:
+                parent["children"].append(node)
+        return nodes[agent_id]
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+def print_tree(node: Dict[str, Any], indent: int = 0):
+    earnings = node.get("earnings", 0) or 0
+    print(f"{'   ' * indent}- {node['agent_id']} ({node.get('status', '?')}, {earnings:.4f} ETH)")
+    for child in node["children"]:
+        print_tree(child, indent + 1)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent lineage store")
+    parser.add_argument("command", choices=["tree", "stats", "ancestors"])
+    parser.add_argument("agent_id")
+    parser.add_argument("--depth", type=int, help="Generations to show")
+    args = parser.parse_args()
+
+    store = LineageStore.shared()
+    if args.command == "tree":
+        print_tree(store.tree(args.agent_id, args.depth))
+    elif args.command == "stats":
+        for key, value in store.subtree_stats(args.agent_id).items():
+            print(f"   {key}: {value}")
+    elif args.command == "ancestors":
+        for row in store.ancestors(args.agent_id):
+            print(f"   {row['distance']}: {row['agent_id']} ({row['status']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Log Tailer - Incremental JSONL readers with checkpointed byte offsets
+
+- LogTailer reads only what was appended since the last call, never a
+  partial line, and notices truncation/rotation (inode or size change)
+- Offsets live in a checkpoint file (through the state manager) so a
+  restart resumes where the last process stopped. Without a checkpoint,
+  whatever the file already holds is read as `replaying` history first
+- A line longer than one batch is skipped (counted in bad_lines) instead
+  of stalling the tailer
+- LogWatcher blocks until a watched file changes: inotify on Linux (via
+  libc, no extra package), stat polling everywhere else
+
+Usage:
+    checkpoints = open_state(data_dir / "tail_checkpoints.json", default=dict)
+    tailer = LogTailer(path, checkpoints, "transactions")
+    for record in tailer.read_new():
+        ...
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import serialization
+
+DEFAULT_POLL_SECONDS = 1.0
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+
+class LogTailer:
+    """Follows one append-only JSONL file from a checkpointed offset"""
+
+    def __init__(self, path: Path, checkpoints, key: str):
+        self.path = Path(path)
+        self.checkpoints = checkpoints  # StateFile
+        self.key = key
+        state = checkpoints.data.get(key, {})
+        self.offset = state.get("offset", 0)
+        self.inode = state.get("inode")
+        self.lines_read = 0
+        self.bad_lines = 0
+        # First start: the existing content is history, not news
+        self.history_end: Optional[int] = None
+        if key not in checkpoints.data:
+            try:
+                st = os.stat(self.path)
+                self.inode, self.history_end = st.st_ino, st.st_size
+            except FileNotFoundError:
+                pass
+
+    @property
+    def replaying(self) -> bool:
+        """True while the next batch is history found at first start"""
+        return self.history_end is not None and self.offset < self.history_end
+
+    def _checkpoint(self):
+        # Tailers of one checkpoint file may run on different threads
+        with self.checkpoints.mutate() as checkpoints:
+            checkpoints[self.key] = {"offset": self.offset, "inode": self.inode}
+
+    def read_new(self, max_bytes: int = MAX_BATCH_BYTES) -> List[Dict[str, Any]]:
+        """Parsed records appended since the last call (up to max_bytes)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # New file, rotated or truncated: start from the top
+            self.inode, self.offset, self.history_end = st.st_ino, 0, None
+        if st.st_size == self.offset:
+            return []
+
+        size = min(st.st_size - self.offset, max_bytes)
+        if self.replaying:
+            # Keep history and new lines in separate batches
+            size = min(size, self.history_end - self.offset)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size)
+
+            # Only consume complete lines; a writer may be mid-line
+            end = chunk.rfind(b"\n")
+            if end < 0:
+                if len(chunk) >= max_bytes:
+                    self._skip_line(f)
+                elif self.replaying:
+                    self.history_end = None  # History ended mid-line
+                return []
+        chunk = chunk[:end + 1]
+
+        records = []
+        for line in chunk.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(serialization.loads(line))
+            except ValueError:
+                self.bad_lines += 1
+
+        self.offset += len(chunk)
+        self.lines_read += len(records)
+        if self.history_end is not None and self.offset >= self.history_end:
+            self.history_end = None
+        self._checkpoint()
+        return records
+
+    def _skip_line(self, f):
+        """Move past a line longer than a whole batch, once its end is written"""
+        f.seek(self.offset)
+        for block in iter(lambda: f.read(1 << 20), b""):
+            newline = block.find(b"\n")
+            if newline >= 0:
+                self.offset = f.tell() - len(block) + newline + 1
+                self.bad_lines += 1
+                if self.history_end is not None and self.offset >= self.history_end:
+                    self.history_end = None
+                self._checkpoint()
+                return
+
+    @property
+    def lag_bytes(self) -> int:
+        try:
+            return max(0, os.stat(self.path).st_size - self.offset)
+        except FileNotFoundError:
+            return 0
+
+
+# ========== CHANGE NOTIFICATION ==========
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch  # noqa: B018 - probe symbols
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_inotify()
+INOTIFY_AVAILABLE = _libc is not None
+
+
+class LogWatcher:
+    """
+    Wait for changes to a set of files.
+
+    Watches the parent directories (so creation and rotation are seen too)
+    and falls back to polling st_size/st_mtime when inotify is unavailable.
+    """
+
+    def __init__(self, paths: List[Path], poll_interval: float = DEFAULT_POLL_SECONDS):
+        self.paths = [Path(p) for p in paths]
+        self.poll_interval = poll_interval
+        self.fd: Optional[int] = None
+        self._last = self._snapshot()
+
+        if INOTIFY_AVAILABLE:
+            fd = _libc.inotify_init1(_IN_NONBLOCK)
+            if fd >= 0:
+                mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+                for directory in {p.parent for p in self.paths}:
+                    directory.mkdir(parents=True, exist_ok=True)
+                    _libc.inotify_add_watch(fd, str(directory).encode(), mask)
+                self.fd = fd
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.fd is not None else "polling"
+
+    def _snapshot(self):
+        snap = []
+        for p in self.paths:
+            try:
+                st = os.stat(p)
+                snap.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                snap.append(None)
+        return snap
+
+    def _drain(self) -> bool:
+        """Consume queued inotify events; True if any concern our files"""
+        names = {p.name for p in self.paths}
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            if not data:
+                return relevant
+            pos = 0
+            while pos < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                name = data[pos + 16:pos + 16 + length].rstrip(b"\0").decode(errors="ignore")
+                relevant = relevant or name in names
+                pos += 16 + length
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to timeout seconds; True if a watched file changed"""
+        if self.fd is not None:
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                ready, _, _ = select.select([self.fd], [], [], remaining)
+                if ready and self._drain():
+                    return True
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            snap = self._snapshot()
+            if snap != self._last:
+                self._last = snap
+                return True
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        return False
+
+    async def wait_async(self, timeout: float) -> bool:
+        """wait() without blocking the event loop"""
+        if self.fd is None:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                snap = self._snapshot()
+                if snap != self._last:
+                    self._last = snap
+                    return True
+                await asyncio.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+            return False
+
+        loop = asyncio.get_running_loop()
+        changed = loop.create_future()
+
+        def on_ready():
+            if self._drain() and not changed.done():
+                changed.set_result(True)
+
+        loop.add_reader(self.fd, on_ready)
+        try:
+            return await asyncio.wait_for(changed, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(self.fd)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Metrics Store - embedded time series with automatic rollups
+
+Subsystems only kept their latest state (health_state_*.json is rewritten
+on every check), so nothing could answer "what was the balance / health
+score / earnings rate over the last day". Now every writer appends points
+here:
+- Append-only segments: each process writes [ts, series, value] lines to
+  its own segment files under .metrics/segments, so pool workers and the
+  main loop never contend on a file
+- In memory, each series keeps a ring buffer of recent raw points plus
+  1m / 1h / 1d rollup buckets (count, sum, min, max, last), each ring
+  bounded by its own retention
+- Range queries bisect sorted bucket keys and pick the finest resolution
+  that covers the range within max_points
+- Other processes' points are picked up by tailing their segments; one
+  process at a time (flock) checkpoints everything into snapshot.json and
+  deletes sealed segments the snapshot fully covers
+
+Series are named "<agent_id>.<metric>", e.g. "openclaw_main_agent.balance".
+
+Usage:
+    metrics = MetricsStore.shared()
+    metrics.record_many({"balance": 0.05, "tier": 2}, prefix=soul_id)
+    metrics.query(f"{soul_id}.balance", start=time.time() - 86400)
+    metrics.rate(f"{soul_id}.work.earned", 3600)   # per hour
+
+    python3 metrics_store.py query openclaw_main_agent.balance --hours 24
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import serialization
+from state_manager import atomic_write_json
+
+try:
+    import fcntl
+except ImportError:  # Windows: compaction only ever runs from one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = Path(__file__).parent / ".metrics"
+
+RAW_POINTS = 2048                  # raw points kept per series
+# name -> (bucket seconds, buckets kept)
+RESOLUTIONS = {
+    "1m": (60, 2 * 1440),          # 2 days
+    "1h": (3600, 30 * 24),         # 30 days
+    "1d": (86400, 2 * 365),        # 2 years
+}
+SEGMENT_BYTES = 1 << 20            # roll the active segment after 1 MiB
+MAX_SEGMENTS = 32                  # compact on open beyond this many files
+FLUSH_POINTS = 256
+FLUSH_SECONDS = 1.0
+REFRESH_SECONDS = 0.5
+
+
+# ========== SERIES ==========
+
+class _Rollup:
+    """Fixed-width buckets, sorted by start time, oldest dropped first"""
+
+    def __init__(self, step: int, retention: int):
+        self.step = step
+        self.retention = retention
+        self.keys: List[int] = []
+        self.buckets: Dict[int, List[float]] = {}   # start -> [count, sum, min, max, last]
+        self.pruned = False
+
+    def add(self, ts: float, value: float):
+        start = int(ts - ts % self.step)
+        bucket = self.buckets.get(start)
+        if bucket is not None:
+            bucket[0] += 1
+            bucket[1] += value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+            bucket[4] = value
+            return
+        if self.keys and start < self.keys[0] and len(self.keys) >= self.retention:
+            return  # older than anything we still keep
+        self.buckets[start] = [1, value, value, value, value]
+        if not self.keys or start > self.keys[-1]:
+            self.keys.append(start)
+        else:
+            bisect.insort(self.keys, start)
+        if len(self.keys) > self.retention:
+            drop = len(self.keys) - self.retention
+            for key in self.keys[:drop]:
+                del self.buckets[key]
+            del self.keys[:drop]
+            self.pruned = True
+
+    def covers(self, start: float) -> bool:
+        """Whether every point since start is still in a bucket"""
+        return not self.pruned or self.keys[0] <= start
+
+    def range(self, start: float, end: float) -> List[Tuple[int, List[float]]]:
+        lo = bisect.bisect_left(self.keys, start - start % self.step)
+        hi = bisect.bisect_right(self.keys, end)
+        return [(key, self.buckets[key]) for key in self.keys[lo:hi]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"keys": self.keys, "buckets": [self.buckets[k] for k in self.keys],
+                "pruned": self.pruned}
+
+    def load(self, data: Dict[str, Any]):
+        self.keys = list(data["keys"])
+        self.buckets = dict(zip(self.keys, data["buckets"]))
+        self.pruned = data.get("pruned", False)
+
+
+class _Series:
+    def __init__(self):
+        self.ts: List[float] = []
+        self.values: List[float] = []
+        self.trimmed = False
+        self.rollups = {name: _Rollup(step, keep) for name, (step, keep) in RESOLUTIONS.items()}
+
+    def add(self, ts: float, value: float):
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.values.append(value)
+        else:
+            i = bisect.bisect_right(self.ts, ts)
+            self.ts.insert(i, ts)
+            self.values.insert(i, value)
+        # Trim in chunks so appends stay amortized O(1)
+        if len(self.ts) > 2 * RAW_POINTS:
+            del self.ts[:-RAW_POINTS]
+            del self.values[:-RAW_POINTS]
+            self.trimmed = True
+        for rollup in self.rollups.values():
+            rollup.add(ts, value)
+
+    def raw_covers(self, start: float) -> bool:
+        return not self.trimmed or (bool(self.ts) and self.ts[0] <= start)
+
+    def raw_range(self, start: float, end: float) -> Tuple[int, int]:
+        return bisect.bisect_left(self.ts, start), bisect.bisect_right(self.ts, end)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ts": self.ts[-RAW_POINTS:],
+            "values": self.values[-RAW_POINTS:],
+            "trimmed": self.trimmed or len(self.ts) > RAW_POINTS,
+            "rollups": {name: r.to_dict() for name, r in self.rollups.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_Series":
+        series = cls()
+        series.ts = list(data["ts"])
+        series.values = list(data["values"])
+        series.trimmed = data.get("trimmed", False)
+        for name, rollup in data["rollups"].items():
+            if name in series.rollups:
+                series.rollups[name].load(rollup)
+        return series
+
+
+def _bucket_point(ts: int, bucket: List[float]) -> Dict[str, Any]:
+    count, total, low, high, last = bucket
+    return {"ts": ts, "count": count, "sum": total, "avg": total / count,
+            "min": low, "max": high, "last": last}
+
+
+# ========== STORE ==========
+
+class MetricsStore:
+    """Append-only, multi-process time-series store with rollups"""
+
+    _shared: Dict[str, "MetricsStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, data_dir: Path = DEFAULT_DIR):
+        self.data_dir = Path(data_dir)
+        self.segment_dir = self.data_dir / "segments"
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_file = self.data_dir / "snapshot.json"
+        self.lock_file = self.data_dir / "compact.lock"
+
+        self._lock = threading.RLock()
+        self.writer = f"{os.getpid()}.{secrets.token_hex(3)}"
+        self._seq = 0
+        self._active: Optional[Path] = None
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._last_refresh = 0.0
+
+        self.series: Dict[str, _Series] = {}
+        self.offsets: Dict[str, int] = {}    # segment name -> bytes applied
+        self.generation = 0
+        self._snapshot_sig = None
+
+        self._load()
+        if len(self.offsets) > MAX_SEGMENTS:
+            self.compact()
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls, data_dir: Path = DEFAULT_DIR) -> "MetricsStore":
+        """One store per directory in this process"""
+        key = str(Path(data_dir).resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(data_dir)
+            return cls._shared[key]
+
+    # ----- loading / tailing -----
+
+    def _signature(self):
+        try:
+            st = os.stat(self.snapshot_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.segment_dir.glob("*.jsonl"))
+
+    def _apply(self, ts: float, name: str, value: float):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = _Series()
+        series.add(ts, value)
+
+    def _tail(self, path: Path):
+        """Apply complete lines appended to a segment since the last read"""
+        offset = self.offsets.get(path.name, 0)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1   # never a torn last line
+        for line in data[:end].splitlines():
+            try:
+                ts, name, value = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(ts, name, value)
+        self.offsets[path.name] = offset + end
+
+    def _load(self):
+        """Rebuild the in-memory view: snapshot plus everything after it"""
+        self._write_buffer()
+        self._snapshot_sig = self._signature()
+        snapshot = {}
+        if self._snapshot_sig is not None:
+            try:
+                snapshot = serialization.read_file(self.snapshot_file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Metrics snapshot unreadable, replaying segments only: {e}")
+        self.generation = snapshot.get("generation", 0)
+        self.series = {name: _Series.from_dict(data)
+                       for name, data in snapshot.get("series", {}).items()}
+        self.offsets = dict(snapshot.get("offsets", {}))
+        present = set()
+        for path in self._segments():
+            present.add(path.name)
+            try:
+                self._tail(path)
+            except FileNotFoundError:
+                present.discard(path.name)
+        self.offsets = {name: off for name, off in self.offsets.items() if name in present}
+        self._last_refresh = time.monotonic()
+
+    def refresh(self, force: bool = False):
+        """Pick up other processes' points (throttled unless force)"""
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < REFRESH_SECONDS:
+                return
+            if self._signature() != self._snapshot_sig:
+                self._load()
+                return
+            for path in self._segments():
+                if path.name.startswith(self.writer + "."):
+                    continue  # applied when written
+                try:
+                    if path.stat().st_size > self.offsets.get(path.name, 0):
+                        self._tail(path)
+                except FileNotFoundError:
+                    self._load()   # compacted away under us
+                    return
+            self._last_refresh = time.monotonic()
+
+    # ----- writing -----
+
+    def _segment_path(self) -> Path:
+        return self.segment_dir / f"{self.writer}.{self._seq:06d}.jsonl"
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        if self._active is None:
+            self._seq += 1
+            self._active = self._segment_path()
+        payload = "".join(self._buffer).encode()
+        self._buffer = []
+        with open(self._active, 'ab') as f:
+            f.write(payload)
+        self.offsets[self._active.name] = self.offsets.get(self._active.name, 0) + len(payload)
+        self._last_flush = time.monotonic()
+
+        if self.offsets[self._active.name] >= SEGMENT_BYTES:
+            self._active = None
+            self.compact()
+
+    def record(self, series: str, value: float, ts: Optional[float] = None):
+        """Append one point (buffered; flushed by size/age or flush())"""
+        ts = time.time() if ts is None else ts
+        value = float(value)
+        try:
+            with self._lock:
+                self._apply(ts, series, value)
+                self._buffer.append(json.dumps([round(ts, 3), series, value]) + "\n")
+                if len(self._buffer) >= FLUSH_POINTS or time.monotonic() - self._last_flush >= FLUSH_SECONDS:
+                    self._write_buffer()
+        except OSError as e:
+            # Metrics must never take the caller down
+            logger.warning(f"Metrics write failed: {e}")
+
+    def record_many(self, points: Dict[str, float], prefix: str = "",
+                    ts: Optional[float] = None):
+        """Append several points with one timestamp and write them at once"""
+        ts = time.time() if ts is None else ts
+        try:
+            with self._lock:
+                for name, value in points.items():
+                    if value is None:
+                        continue
+                    series = f"{prefix}.{name}" if prefix else name
+                    self._apply(ts, series, float(value))
+                    self._buffer.append(json.dumps([round(ts, 3), series, float(value)]) + "\n")
+                self._write_buffer()
+        except OSError as e:
+            # Metrics must never take the caller down
+            logger.warning(f"Metrics write failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            try:
+                self._write_buffer()
+            except OSError as e:
+                logger.warning(f"Metrics flush failed: {e}")
+
+    # ----- compaction -----
+
+    def _sealed(self, path: Path) -> bool:
+        """No more writes will land in this segment"""
+        pid, token, seq = path.stem.split(".")
+        writer = f"{pid}.{token}"
+        if writer == self.writer:
+            return self._active is None or path != self._active
+        if any(p.stem.startswith(writer + ".") and p.stem > path.stem for p in self._segments()):
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def compact(self) -> bool:
+        """Checkpoint into snapshot.json and drop covered segments"""
+        with self._lock:
+            lock = open(self.lock_file, 'a')
+            try:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        return False   # another process is compacting
+                self._write_buffer()
+                self.refresh(force=True)
+
+                covered = []
+                for path in self._segments():
+                    try:
+                        complete = path.stat().st_size == self.offsets.get(path.name, -1)
+                    except FileNotFoundError:
+                        continue
+                    if complete and self._sealed(path):
+                        covered.append(path)
+                offsets = dict(self.offsets)
+                for path in covered:
+                    offsets.pop(path.name, None)
+
+                self.generation += 1
+                atomic_write_json(self.snapshot_file, {
+                    "generation": self.generation,
+                    "created_at": time.time(),
+                    "offsets": offsets,
+                    "series": {name: s.to_dict() for name, s in self.series.items()},
+                })
+                self._snapshot_sig = self._signature()
+                for path in covered:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                self.offsets = offsets
+                return True
+            finally:
+                lock.close()
+
+    # ========== QUERIES ==========
+
+    def series_names(self, prefix: str = "") -> List[str]:
+        self.refresh()
+        with self._lock:
+            return sorted(name for name in self.series if name.startswith(prefix))
+
+    def latest(self, series: str) -> Optional[Tuple[float, float]]:
+        self.refresh()
+        with self._lock:
+            s = self.series.get(series)
+            if s is None or not s.ts:
+                return None
+            return s.ts[-1], s.values[-1]
+
+    def _resolution(self, s: _Series, start: float, end: float, max_points: int) -> str:
+        if s.raw_covers(start):
+            lo, hi = s.raw_range(start, end)
+            if hi - lo <= max_points:
+                return "raw"
+        for name, (step, _) in RESOLUTIONS.items():
+            if (end - start) / step <= max_points and s.rollups[name].covers(start):
+                return name
+        # Nothing covers the whole range: coarsest keeps the most history
+        for name in reversed(list(RESOLUTIONS)):
+            if (end - start) / RESOLUTIONS[name][0] <= max_points:
+                return name
+        return list(RESOLUTIONS)[-1]
+
+    def query(self, series: str, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: Optional[str] = None, max_points: int = 500) -> Dict[str, Any]:
+        """
+        Points between start and end (default: last 24h until now).
+
+        resolution is "raw", "1m", "1h", "1d" or None to pick the finest
+        that covers the range within max_points. Raw points are
+        {"ts", "value"}; rollup points carry count/sum/avg/min/max/last.
+        """
+        end = time.time() if end is None else end
+        start = end - 86400 if start is None else start
+        self.refresh()
+        with self._lock:
+            s = self.series.get(series)
+            if s is None:
+                return {"series": series, "resolution": resolution, "points": []}
+            resolution = resolution or self._resolution(s, start, end, max_points)
+            if resolution == "raw":
+                lo, hi = s.raw_range(start, end)
+                points = [{"ts": t, "value": v} for t, v in zip(s.ts[lo:hi], s.values[lo:hi])]
+            else:
+                points = [_bucket_point(ts, b) for ts, b in s.rollups[resolution].range(start, end)]
+        return {"series": series, "resolution": resolution, "points": points}
+
+    def summary(self, series: str, start: float, end: Optional[float] = None) -> Dict[str, Any]:
+        """count/sum/avg/min/max/last over a range, from the finest data covering it"""
+        end = time.time() if end is None else end
+        self.refresh()
+        with self._lock:
+            s = self.series.get(series)
+            count, total, low, high, last = 0, 0.0, None, None, None
+            if s is not None:
+                if s.raw_covers(start):
+                    lo, hi = s.raw_range(start, end)
+                    buckets = [[1, v, v, v, v] for v in s.values[lo:hi]]
+                else:
+                    rollup = next((r for r in s.rollups.values() if r.covers(start)),
+                                  s.rollups[list(RESOLUTIONS)[-1]])
+                    buckets = [b for _, b in rollup.range(start, end)]
+                for c, t, mn, mx, lst in buckets:
+                    count += c
+                    total += t
+                    low = mn if low is None else min(low, mn)
+                    high = mx if high is None else max(high, mx)
+                    last = lst
+        return {"series": series, "count": count, "sum": total,
+                "avg": total / count if count else None,
+                "min": low, "max": high, "last": last}
+
+    def rate(self, series: str, window: float, per: float = 3600.0) -> float:
+        """Sum of the series over the last window, per `per` seconds (default per hour)"""
+        total = self.summary(series, time.time() - window)["sum"]
+        return total * per / window if window else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "series": len(self.series),
+                "segments": len(self.offsets),
+                "generation": self.generation,
+                "raw_points": sum(len(s.ts) for s in self.series.values()),
+                "buffered": len(self._buffer),
+            }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the metrics store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list").add_argument("prefix", nargs="?", default="")
+    q = sub.add_parser("query")
+    q.add_argument("series")
+    q.add_argument("--hours", type=float, default=24)
+    q.add_argument("--resolution", choices=["raw", *RESOLUTIONS])
+    sub.add_parser("compact")
+    args = parser.parse_args()
+
+    store = MetricsStore.shared()
+    if args.command == "list":
+        for name in store.series_names(args.prefix):
+            print(f"   {name}")
+    elif args.command == "query":
+        result = store.query(args.series, start=time.time() - args.hours * 3600,
+                             resolution=args.resolution)
+        print(f"📈 {args.series} ({result['resolution']}, {len(result['points'])} points)")
+        for point in result["points"]:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(point["ts"]))
+            value = point.get("value", point.get("avg"))
+            print(f"   {stamp}  {value:.6g}")
+    elif args.command == "compact":
+        print(f"✅ Compacted: {store.compact()} ({store.stats()})")
+
+
+if __name__ == "__main__":
+    main()
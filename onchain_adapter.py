@@ -2,14 +2,34 @@
 """
 On-Chain Adapter for Soul Marketplace
 Connects Python agent to Ethereum smart contracts
+
+Transactions go through the shared TransactionManager (tx_manager.py):
+nonces are allocated locally and sends are pipelined. Pass wait=False to
+return the PendingTx as soon as a transaction is broadcast, and use
+queue_backup() / flush_backups() to send several backups in one go.
+
+Simulation mode runs against the persistent local chain in sim_chain.py,
+shared by every adapter and process on this machine.
+
+Fees come from the shared FeeOracle (fee_oracle.py). schedule_backup()
+holds non-urgent backups for a cheap-gas window when
+COST_CONFIG["gas"]["avoid_peak_hours"] is set. Held backups are kept in
+.txs/backup_queue_<address>.json, so a restart still sends them.
 """
 
 import json
 import os
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass
 
+from cost_config import COST_CONFIG
+from fee_oracle import FeeOracle, FeeScheduler
+from sim_chain import SimChain, SimChainError
+from state_manager import open_state
+from tx_manager import get_manager, PendingTx, CONFIRMED, DATA_DIR as TX_DATA_DIR
+
 # Optional Web3 - simulation mode works without it
 try:
     from web3 import Web3
@@ -45,6 +65,11 @@ class BackupRecord:
     is_valid: bool
 
 
+# ERC-721 Transfer(address,address,uint256)
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TX_TIMEOUT = 120
+
+
 class SoulMarketplaceAdapter:
     """
     Adapter for interacting with Soul Marketplace contracts.
@@ -126,12 +151,9 @@ class SoulMarketplaceAdapter:
         # Initialize contracts
         self._init_contracts()
         
-        # Local state for simulation
-        self.simulation_state = {
-            "souls": {},
-            "backups": {},
-            "balances": {}
-        }
+        self._txm = None
+        self._scheduler = None
+        self._queue_store = None
     
     def _load_config(self, config_file: Optional[Path]) -> Dict:
         """Load configuration"""
@@ -167,6 +189,73 @@ class SoulMarketplaceAdapter:
         else:
             self.soul_backup = None
     
+    @property
+    def sim(self) -> SimChain:
+        """Shared simulated chain (simulation mode only)"""
+        return SimChain.shared()
+
+    @property
+    def txm(self):
+        """Shared transaction manager for this account"""
+        if self._txm is None:
+            self._txm = get_manager(self.w3, self.account)
+        return self._txm
+
+    @property
+    def fee_oracle(self) -> FeeOracle:
+        return FeeOracle.shared(self.rpc_url)
+
+    @property
+    def scheduler(self) -> FeeScheduler:
+        """Defers non-urgent transactions to cheap-gas windows"""
+        if self._scheduler is None:
+            self._scheduler = FeeScheduler(self.fee_oracle)
+        return self._scheduler
+
+    @property
+    def backup_queue(self) -> Dict[str, Dict[str, Any]]:
+        """token_id -> latest queued backup (a newer backup supersedes an unsent one)"""
+        if self._queue_store is None:
+            owner = (self.address or "readonly").lower()
+            self._queue_store = open_state(TX_DATA_DIR / f"backup_queue_{owner}.json", default=dict)
+        return self._queue_store.data
+
+    def _fee_fields(self) -> Dict[str, int]:
+        try:
+            fees = self.fee_oracle.fees()
+            if fees["maxFeePerGas"] > 0:
+                return fees
+        except Exception as e:
+            print(f"⚠️ Fee oracle unavailable ({e}); using eth_gasPrice")
+        # Pre-1559 chain or oracle down
+        return {'gasPrice': self.w3.eth.gas_price}
+
+    def _send(self, call, gas: int, label: str, wait: bool = True,
+              timeout: float = TX_TIMEOUT,
+              fees: Optional[Dict[str, int]] = None) -> Optional[PendingTx]:
+        """
+        Build, sign and broadcast a contract call with a locally allocated nonce.
+
+        fees are the fee fields to use (e.g. those a FeeScheduler picked
+        for a cheap window); fetched from the oracle if not given.
+
+        Returns the PendingTx (settled if wait=True), or None if the
+        send failed or the transaction reverted.
+        """
+        tx = call.build_transaction({
+            'from': self.address,
+            'gas': gas,
+            **(fees or self._fee_fields())
+        })
+        ptx = self.txm.submit(tx, label=label)
+        if not wait:
+            print(f"📤 {label} sent: {ptx.tx_hash} (nonce {ptx.nonce})")
+            return ptx
+        if not self.txm.wait(ptx, timeout):
+            print(f"❌ {label} {ptx.status}: {ptx.tx_hash}")
+            return None
+        return ptx
+
     def get_balance(self, address: Optional[str] = None) -> float:
         """Get ETH balance in ether"""
         addr = address or self.address
@@ -174,7 +263,7 @@ class SoulMarketplaceAdapter:
             return 0.0
         
         if self.simulation_mode:
-            return self.simulation_state['balances'].get(addr, 0.0)
+            return self.sim.balance(addr)
         
         if self.w3:
             balance_wei = self.w3.eth.get_balance(self.w3.to_checksum_address(addr))
@@ -200,45 +289,22 @@ class SoulMarketplaceAdapter:
         
         if self.simulation_mode:
             # Simulation
-            token_id = len(self.simulation_state['souls']) + 1
-            self.simulation_state['souls'][token_id] = {
-                "token_id": token_id,
-                "automaton": self.address,
-                "creator": self.address,
-                "soul_uri": cid,
-                "soul_hash": soul_hash,
-                "birth_time": 0,
-                "death_time": 0,
-                "listing_price": 0,
-                "status": "ALIVE"
-            }
+            token_id = self.sim.mint(self.address, self.address, cid, soul_hash)
             print(f"✅ Simulated mint: Token #{token_id}")
             return token_id
         
         # Real transaction
         try:
-            tx = self.soul_token.functions.mintSoul(
+            ptx = self._send(self.soul_token.functions.mintSoul(
                 self.address,  # automaton
                 self.address,  # creator
                 cid,
                 soul_hash
-            ).build_transaction({
-                'from': self.address,
-                'nonce': self.w3.eth.get_transaction_count(self.address),
-                'gas': 300000,
-                'gasPrice': self.w3.eth.gas_price
-            })
-            
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            ), 300000, "mint_soul")
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if receipt.status == 1:
-                # Get token ID from event
-                print(f"✅ Soul minted! Tx: {tx_hash.hex()}")
-                # In production: parse event for token ID
-                return 1  # Placeholder
+            if ptx:
+                print(f"✅ Soul minted! Tx: {ptx.tx_hash}")
+                return self._minted_token_id(ptx.receipt)
             else:
                 print(f"❌ Mint failed")
                 return None
@@ -247,10 +313,20 @@ class SoulMarketplaceAdapter:
             print(f"❌ Error minting: {e}")
             return None
     
+    def _minted_token_id(self, receipt) -> Optional[int]:
+        """Token ID from the Transfer(0x0 -> us) log in a mint receipt"""
+        token = self.soul_token.address.lower()
+        for log in receipt.get('logs', []):
+            topics = [t.hex() if hasattr(t, 'hex') else t for t in log['topics']]
+            topics = [t if t.startswith('0x') else '0x' + t for t in topics]
+            if log['address'].lower() == token and len(topics) == 4 and topics[0] == TRANSFER_TOPIC:
+                return int(topics[3], 16)
+        return None
+
     def get_soul(self, token_id: int) -> Optional[SoulData]:
         """Get soul data from chain"""
         if self.simulation_mode:
-            soul = self.simulation_state['souls'].get(token_id)
+            soul = self.sim.get_soul(token_id)
             if soul:
                 return SoulData(**soul)
             return None
@@ -273,7 +349,9 @@ class SoulMarketplaceAdapter:
             return None
     
     def create_backup(self, token_id: int, cid: str, soul_hash: str, 
-                      backup_type: str = "manual", earnings: float = 0) -> bool:
+                      backup_type: str = "manual", earnings: float = 0,
+                      wait: bool = True,
+                      fees: Optional[Dict[str, int]] = None) -> Union[bool, PendingTx, None]:
         """
         Create on-chain backup of soul.
         
@@ -283,56 +361,138 @@ class SoulMarketplaceAdapter:
             soul_hash: Hash of content
             backup_type: "manual", "auto", "critical"
             earnings: Total earnings at backup time
+            wait: Block until confirmed (False: return once broadcast)
+            fees: Fee fields to send with (default: current oracle fees)
+        
+        Returns:
+            True/False for confirmed or not; with wait=False the PendingTx
+            to track (None if the send failed). Simulated backups are final.
         """
         if self.simulation_mode:
-            if token_id not in self.simulation_state['backups']:
-                self.simulation_state['backups'][token_id] = []
-            
-            self.simulation_state['backups'][token_id].append({
-                "soul_id": token_id,
-                "soul_uri": cid,
-                "soul_hash": soul_hash,
-                "timestamp": 0,
-                "block_number": 0,
-                "backup_type": backup_type,
-                "is_valid": True
-            })
+            try:
+                self.sim.backup(token_id, cid, soul_hash, backup_type, int(earnings * 1e18))
+            except SimChainError as e:
+                print(f"❌ Simulated backup reverted: {e}")
+                return False
             print(f"✅ Simulated backup for token #{token_id}")
             return True
         
         try:
-            tx = self.soul_backup.functions.createBackup(
+            ptx = self._send(self.soul_backup.functions.createBackup(
                 token_id,
                 cid,
                 soul_hash,
                 backup_type,
                 0,  # capabilitiesHash
                 int(earnings * 1e18)
-            ).build_transaction({
-                'from': self.address,
-                'nonce': self.w3.eth.get_transaction_count(self.address),
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price
-            })
-            
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            ), 200000, f"backup #{token_id}", wait=wait, fees=fees)
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if receipt.status == 1:
-                print(f"✅ Backup created! Tx: {tx_hash.hex()}")
-                return True
-            return False
+            if not wait:
+                return ptx
+            if ptx:
+                print(f"✅ Backup created! Tx: {ptx.tx_hash}")
+            return ptx is not None
             
         except Exception as e:
             print(f"❌ Error creating backup: {e}")
-            return False
+            return None if not wait else False
+
+    def queue_backup(self, token_id: int, cid: str, soul_hash: str,
+                     backup_type: str = "manual", earnings: float = 0):
+        """Queue a backup for the next flush_backups(); replaces an unsent one for the same soul"""
+        self.backup_queue[str(token_id)] = {
+            "token_id": token_id,
+            "cid": cid,
+            "soul_hash": soul_hash,
+            "backup_type": backup_type,
+            "earnings": earnings,
+            "queued_at": time.time()
+        }
+        self._queue_store.save()
+
+    def schedule_backup(self, token_id: int, cid: str, soul_hash: str,
+                        backup_type: str = "auto", earnings: float = 0,
+                        urgent: bool = False) -> Union[bool, PendingTx, None]:
+        """
+        Back up now if urgent (or in simulation); otherwise wait for cheap gas.
+
+        Returns what create_backup(wait=False) returns when urgent,
+        otherwise whether the backup was sent or is waiting.
+
+        Deferred backups wait at most the on-chain min interval from
+        COST_CONFIG, by which time the next backup would be due anyway.
+        """
+        if urgent or self.simulation_mode:
+            return self.create_backup(token_id, cid, soul_hash, backup_type, earnings, wait=False)
+
+        self.queue_backup(token_id, cid, soul_hash, backup_type, earnings)
+        deadline = COST_CONFIG["backups"]["on_chain"]["min_interval_hours"] * 3600
+        return self._defer_backup(token_id, deadline)
+
+    def _defer_backup(self, token_id: int, deadline: float) -> bool:
+        """Hand a queued backup to the fee scheduler (batched with the others if configured)"""
+        if COST_CONFIG["gas"]["batch_transactions"]:
+            label = "backups"
+            run = lambda fees: self.flush_backups(fees=fees)
+        else:
+            label = f"backup #{token_id}"
+            run = lambda fees: self.flush_backups(fees=fees, token_ids=[token_id])
+        result = self.scheduler.defer(label, run, deadline=deadline, gas=200000)
+        return result is None or bool(result)
+
+    def _resume_backups(self):
+        """Re-defer queued backups a previous process left behind"""
+        if self.simulation_mode or not self.backup_queue:
+            return
+        max_wait = COST_CONFIG["backups"]["on_chain"]["min_interval_hours"] * 3600
+        batched = COST_CONFIG["gas"]["batch_transactions"]
+        for backup in sorted(self.backup_queue.values(), key=lambda b: b.get("queued_at", 0)):
+            label = "backups" if batched else f"backup #{backup['token_id']}"
+            # An earlier iteration may already have sent it
+            if str(backup["token_id"]) in self.backup_queue and label not in self.scheduler.waiting:
+                remaining = backup.get("queued_at", 0) + max_wait - time.time()
+                self._defer_backup(backup["token_id"], max(0.0, remaining))
+
+    def run_scheduled(self) -> int:
+        """Send deferred transactions whose cheap window (or deadline) arrived"""
+        self._resume_backups()
+        if self._scheduler is None:
+            return 0
+        return self.scheduler.tick()
+
+    def flush_backups(self, wait: bool = False, fees: Optional[Dict[str, int]] = None,
+                      token_ids: Optional[List[int]] = None) -> int:
+        """
+        Send queued backups (all, or those for token_ids) back-to-back
+        (consecutive nonces), with the given fee fields if any.
+
+        Returns how many were sent (confirmed, if wait=True). A backup
+        leaves the queue only once it was sent; failed ones stay queued for
+        the next run_scheduled().
+        """
+        keys = [k for k in self.backup_queue if token_ids is None or int(k) in token_ids]
+        sent = []
+        for key in keys:
+            backup = self.backup_queue[key]
+            args = {k: v for k, v in backup.items() if k != "queued_at"}
+            result = self.create_backup(**args, wait=False, fees=fees)
+            if not result:
+                continue
+            sent.append(result)
+            # Keep a newer backup queued while this one was being sent
+            if self.backup_queue.get(key) is backup:
+                del self.backup_queue[key]
+                self._queue_store.save()
+        if wait and not self.simulation_mode and sent:
+            stats = self.txm.wait_all(TX_TIMEOUT)
+            print(f"✅ {len(sent)} backups flushed: {stats}")
+            return sum(1 for r in sent if r is True or r.status == CONFIRMED)
+        return len(sent)
     
     def get_backup_history(self, token_id: int) -> List[BackupRecord]:
         """Get backup history for a soul"""
         if self.simulation_mode:
-            backups = self.simulation_state['backups'].get(token_id, [])
+            backups = self.sim.backups(token_id)
             return [BackupRecord(**b) for b in backups]
         
         try:
@@ -353,42 +513,35 @@ class SoulMarketplaceAdapter:
             print(f"❌ Error fetching backups: {e}")
             return []
     
-    def list_soul_for_sale(self, token_id: int, price_eth: float, reason: str = "") -> bool:
-        """List soul on marketplace"""
+    def list_soul_for_sale(self, token_id: int, price_eth: float, reason: str = "",
+                           wait: bool = True) -> Union[bool, PendingTx, None]:
+        """List soul on marketplace (wait=False: returns the PendingTx, like create_backup)"""
         if self.simulation_mode:
-            soul = self.simulation_state['souls'].get(token_id)
-            if soul:
-                soul['listing_price'] = int(price_eth * 1e18)
-                soul['status'] = 'DYING'
-                print(f"✅ Simulated listing: Token #{token_id} for {price_eth} ETH")
-                return True
-            return False
+            seller = self.address or self.sim.owner_of(token_id)
+            try:
+                self.sim.list_soul(token_id, seller or "", int(price_eth * 1e18), reason)
+            except SimChainError as e:
+                print(f"❌ Simulated listing reverted: {e}")
+                return False
+            print(f"✅ Simulated listing: Token #{token_id} for {price_eth} ETH")
+            return True
         
         try:
-            tx = self.soul_token.functions.listSoul(
+            ptx = self._send(self.soul_token.functions.listSoul(
                 token_id,
                 int(price_eth * 1e18),
                 reason
-            ).build_transaction({
-                'from': self.address,
-                'nonce': self.w3.eth.get_transaction_count(self.address),
-                'gas': 150000,
-                'gasPrice': self.w3.eth.gas_price
-            })
-            
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            ), 150000, f"list #{token_id}", wait=wait)
             
-            if receipt.status == 1:
-                print(f"✅ Soul listed! Tx: {tx_hash.hex()}")
-                return True
-            return False
+            if not wait:
+                return ptx
+            if ptx:
+                print(f"✅ Soul listed! Tx: {ptx.tx_hash}")
+            return ptx is not None
             
         except Exception as e:
             print(f"❌ Error listing: {e}")
-            return False
+            return None if not wait else False
 
 
 def main():
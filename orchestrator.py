@@ -28,6 +28,9 @@ logger = logging.getLogger(__name__)
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+from state_manager import open_state, flush_all
+from status_snapshot import StatusBoard
+
 try:
     from autonomous_agent import AutonomousSoulAgent
 except ImportError as e:
@@ -58,25 +61,25 @@ class AutonomousOrchestrator:
         self.state_file = self.data_dir / "orchestrator_state.json"
         self.state = self._load_state()
         
+        # Published after every heartbeat; get_status() reads it
+        self.status_board = StatusBoard.shared("orchestrator")
+        
         logger.info(f"🎛️ Orchestrator initialized (check interval: {check_interval_minutes}min)")
     
     def _load_state(self) -> Dict[str, Any]:
         """Load orchestrator state"""
-        if self.state_file.exists():
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {
+        self._state_store = open_state(self.state_file, default=lambda: {
             "started_at": None,
             "total_heartbeats": 0,
             "last_run": None,
             "errors": [],
             "agents": []
-        }
+        })
+        return self._state_store.data
     
     def _save_state(self):
-        """Persist state"""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """Persist state (debounced, atomic)"""
+        self._state_store.save(self.state)
     
     def register_agent(self, agent_id: str) -> AutonomousSoulAgent:
         """Register an agent for management"""
@@ -100,6 +103,7 @@ class AutonomousOrchestrator:
             result = await agent.heartbeat()
             self.state["total_heartbeats"] += 1
             self._save_state()
+            self.publish_status(agent_id)
             
             logger.info(f"✅ Heartbeat completed for {agent_id}")
             return result
@@ -112,6 +116,7 @@ class AutonomousOrchestrator:
             }
             self.state["errors"].append(error_info)
             self._save_state()
+            self.publish_status()
             
             logger.error(f"❌ Heartbeat failed for {agent_id}: {e}")
             raise
@@ -135,6 +140,7 @@ class AutonomousOrchestrator:
         
         self.state["last_run"] = datetime.now().isoformat()
         self._save_state()
+        self.publish_status()
         
         return results
     
@@ -143,6 +149,7 @@ class AutonomousOrchestrator:
         self.running = True
         self.state["started_at"] = datetime.now().isoformat()
         self._save_state()
+        self.publish_status()
         
         logger.info("🚀 Starting continuous operation...")
         logger.info(f"   Agents: {list(self.agents.keys())}")
@@ -176,19 +183,45 @@ class AutonomousOrchestrator:
     def stop(self):
         """Stop continuous operation"""
         self.running = False
+        self.publish_status()
+        flush_all()
         logger.info("🛑 Orchestrator stopped")
     
-    def get_status(self) -> Dict[str, Any]:
-        """Get full orchestrator status"""
-        agent_statuses = {}
-        for agent_id, agent in self.agents.items():
-            agent_statuses[agent_id] = agent.get_status()
+    def publish_status(self, agent_id: Optional[str] = None) -> int:
+        """
+        Publish orchestrator state, plus one agent's status (after its
+        heartbeat), for get_status() readers
+        """
+        sections = {
+            "orchestrator": self.state,
+            "runtime": {"running": self.running, "interval_seconds": self.check_interval}
+        }
+        if agent_id is not None:
+            sections[f"agent:{agent_id}"] = self.agents[agent_id].get_status()
+        return self.status_board.publish_many(sections)
+    
+    def get_status(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get full orchestrator status from the last published snapshot.
         
+        No agent is constructed or queried and nothing is written, so it
+        can be polled freely, also from another process while `run` is
+        going. fresh=True queries the registered agents and publishes first.
+        """
+        if fresh:
+            for agent_id in self.agents:
+                self.publish_status(agent_id)
+        
+        snapshot = self.status_board.snapshot()
+        runtime = snapshot.get("runtime", {})
         return {
-            "orchestrator": self.state,
-            "agents": agent_statuses,
-            "running": self.running,
-            "interval_seconds": self.check_interval
+            "orchestrator": snapshot.get("orchestrator", self.state),
+            "agents": {name.split(":", 1)[1]: data for name, data in snapshot.sections.items()
+                       if name.startswith("agent:")},
+            "running": runtime.get("running", self.running),
+            "interval_seconds": runtime.get("interval_seconds", self.check_interval),
+            "version": snapshot.version,
+            "published_at": snapshot.published_at
         }
 
 
@@ -213,6 +246,7 @@ Examples:
   python orchestrator.py run
   python orchestrator.py once
   python orchestrator.py status
+  python orchestrator.py status --fresh
   python orchestrator.py register my_agent
   python orchestrator.py enable-auto my_agent
   python orchestrator.py fund my_agent
@@ -225,6 +259,8 @@ async def main():
     parser.add_argument("command", choices=["run", "once", "status", "register", "enable-auto", "disable-auto", "fund"])
     parser.add_argument("agent_id", nargs="?", default="openclaw_main_agent")
     parser.add_argument("--interval", type=int, default=60, help="Check interval in minutes")
+    parser.add_argument("--fresh", action="store_true",
+                        help="status: query the agent now instead of reading the last snapshot")
     
     args = parser.parse_args()
     
@@ -246,9 +282,10 @@ async def main():
         print(json.dumps(results, indent=2))
     
     elif args.command == "status":
-        if args.agent_id:
+        # Read what the running orchestrator published; --fresh loads the agent
+        if args.fresh:
             orchestrator.register_agent(args.agent_id)
-        status = orchestrator.get_status()
+        status = orchestrator.get_status(fresh=args.fresh)
         print(json.dumps(status, indent=2))
     
     elif args.command == "register":
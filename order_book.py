@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Order Book - In-process index of soul listings
+
+Replaces globbing and parsing every LISTING_*.json on each check:
+- Listings kept in price-sorted arrays (bisect): overall, per capability,
+  and by price per capability
+- cheapest(capability, budget) is a dict lookup plus one array read;
+  range queries are O(log n + k)
+- Persisted incrementally as an append-only journal, compacted into a
+  snapshot when it grows past twice the live size
+- Fed from local listing files (only changed files are re-read) and from
+  SoulListed/SoulSold/SoulDelisted events in the local chain index
+
+Usage:
+    book = OrderBook()
+    book.refresh()                       # pick up new files / events
+    book.cheapest("code_generation", budget=0.05)
+"""
+
+import bisect
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import serialization
+from state_manager import atomic_write_json
+
+DEFAULT_DIR = Path(__file__).parent / ".orderbook"
+LISTINGS_DIR = Path(__file__).parent / "listings"
+
+logger = logging.getLogger(__name__)
+
+Entry = Tuple[float, str]  # (sort key, listing_id)
+
+
+def capability_names(listing: Dict[str, Any]) -> List[str]:
+    names = []
+    for cap in listing.get("capabilities", []):
+        name = cap.get("name") if isinstance(cap, dict) else cap
+        if name:
+            names.append(str(name).lower())
+    return names
+
+
+def listing_id(listing: Dict[str, Any]) -> str:
+    if listing.get("soul_id") is not None and listing.get("source") == "onchain":
+        return f"soul#{listing['soul_id']}"
+    return str(listing.get("listing_id") or listing["agent_id"])
+
+
+class OrderBook:
+    """Price-sorted listings with capability and value indexes"""
+
+    def __init__(self, data_dir: Path = DEFAULT_DIR, listings_dir: Path = LISTINGS_DIR,
+                 chain_db: Optional[Path] = None):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.listings_dir = Path(listings_dir)
+        self.chain_db = chain_db
+        self.snapshot_file = self.data_dir / "snapshot.json"
+        self.journal_file = self.data_dir / "journal.jsonl"
+
+        self.listings: Dict[str, Dict[str, Any]] = {}
+        self.by_price: List[Entry] = []
+        self.by_capability: Dict[str, List[Entry]] = {}
+        self.by_value: List[Entry] = []
+
+        # Feed cursors: file mtimes and last chain event (block, log_index)
+        # plus the hash of the block it was in, to notice reorgs
+        self.file_mtimes: Dict[str, int] = {}
+        self.chain_cursor: Tuple[int, int] = (-1, -1)
+        self.chain_cursor_hash: Optional[str] = None
+        self.journal_entries = 0
+        self._indexer = None
+
+        self._lock = threading.RLock()
+        self._load()
+
+    # ========== INDEXES ==========
+
+    @staticmethod
+    def _value_key(listing: Dict[str, Any]) -> float:
+        return listing["price"] / max(1, len(capability_names(listing)))
+
+    @staticmethod
+    def _remove_entry(array: List[Entry], entry: Entry):
+        i = bisect.bisect_left(array, entry)
+        if i < len(array) and array[i] == entry:
+            del array[i]
+
+    def _index(self, lid: str, listing: Dict[str, Any]):
+        price = float(listing.get("price", 0.0))
+        listing["price"] = price
+        self.listings[lid] = listing
+        bisect.insort(self.by_price, (price, lid))
+        bisect.insort(self.by_value, (self._value_key(listing), lid))
+        for name in capability_names(listing):
+            bisect.insort(self.by_capability.setdefault(name, []), (price, lid))
+
+    def _unindex(self, lid: str) -> Optional[Dict[str, Any]]:
+        listing = self.listings.pop(lid, None)
+        if listing is None:
+            return None
+        price = listing["price"]
+        self._remove_entry(self.by_price, (price, lid))
+        self._remove_entry(self.by_value, (self._value_key(listing), lid))
+        for name in capability_names(listing):
+            entries = self.by_capability.get(name)
+            if entries is not None:
+                self._remove_entry(entries, (price, lid))
+                if not entries:
+                    del self.by_capability[name]
+        return listing
+
+    # ========== PERSISTENCE ==========
+
+    def _load(self):
+        if self.snapshot_file.exists():
+            snapshot = serialization.read_file(self.snapshot_file)
+            for lid, listing in snapshot.get("listings", {}).items():
+                self._index(lid, listing)
+            self.file_mtimes = snapshot.get("file_mtimes", {})
+            self.chain_cursor = tuple(snapshot.get("chain_cursor", (-1, -1)))
+            self.chain_cursor_hash = snapshot.get("chain_cursor_hash")
+
+        if self.journal_file.exists():
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        self._apply(serialization.loads(line))
+                    except ValueError:
+                        break  # Torn last line from a crash; ignore the rest
+                    self.journal_entries += 1
+
+    def _apply(self, op: Dict[str, Any]):
+        kind = op["op"]
+        if kind == "upsert":
+            self._unindex(op["id"])
+            self._index(op["id"], op["listing"])
+        elif kind == "remove":
+            self._unindex(op["id"])
+        elif kind == "cursor":
+            for name, mtime in op.get("file_mtimes", {}).items():
+                if mtime is None:
+                    self.file_mtimes.pop(name, None)
+                else:
+                    self.file_mtimes[name] = mtime
+            if "chain_cursor" in op:
+                self.chain_cursor = tuple(op["chain_cursor"])
+                self.chain_cursor_hash = op.get("chain_cursor_hash")
+
+    def _journal(self, ops: List[Dict[str, Any]]):
+        if not ops:
+            return
+        with open(self.journal_file, "ab") as f:
+            f.write(b"".join(serialization.dumps_bytes(op) + b"\n" for op in ops))
+        self.journal_entries += len(ops)
+        if self.journal_entries > max(64, 2 * len(self.listings)):
+            self.compact()
+
+    def compact(self):
+        """Write a snapshot and truncate the journal"""
+        with self._lock:
+            atomic_write_json(self.snapshot_file, {
+                "listings": self.listings,
+                "file_mtimes": self.file_mtimes,
+                "chain_cursor": list(self.chain_cursor),
+                "chain_cursor_hash": self.chain_cursor_hash
+            })
+            open(self.journal_file, "wb").close()
+            self.journal_entries = 0
+
+    # ========== UPDATES ==========
+
+    def upsert(self, listing: Dict[str, Any]) -> str:
+        with self._lock:
+            lid = listing_id(listing)
+            self._unindex(lid)
+            self._index(lid, listing)
+            self._journal([{"op": "upsert", "id": lid, "listing": listing}])
+            return lid
+
+    def remove(self, lid: str) -> bool:
+        with self._lock:
+            if self._unindex(lid) is None:
+                return False
+            self._journal([{"op": "remove", "id": lid}])
+            return True
+
+    def _batch(self, upserts: Iterable[Dict[str, Any]], removals: Iterable[str],
+               cursor: Dict[str, Any]) -> int:
+        ops = []
+        for listing in upserts:
+            lid = listing_id(listing)
+            self._unindex(lid)
+            self._index(lid, listing)
+            ops.append({"op": "upsert", "id": lid, "listing": listing})
+        for lid in removals:
+            if self._unindex(lid) is not None:
+                ops.append({"op": "remove", "id": lid})
+        changed = len(ops)
+        if cursor:
+            self._apply({"op": "cursor", **cursor})
+            ops.append({"op": "cursor", **cursor})
+        self._journal(ops)
+        return changed
+
+    def sync_files(self, exclude: Tuple[str, ...] = ("OPENCLAW",)) -> int:
+        """Re-read only listing files that are new or changed since last sync"""
+        if not self.listings_dir.exists():
+            return 0
+        with self._lock:
+            seen, upserts, mtimes = set(), [], {}
+            for entry in os.scandir(self.listings_dir):
+                name = entry.name
+                if not (name.startswith("LISTING_") and name.endswith(".json")):
+                    continue
+                if any(tag in name for tag in exclude):
+                    continue
+                seen.add(name)
+                mtime = entry.stat().st_mtime_ns
+                if self.file_mtimes.get(name) == mtime:
+                    continue
+                mtimes[name] = mtime
+                try:
+                    listing = serialization.read_file(entry.path)
+                    listing_id(listing)
+                    float(listing.get("price", 0.0))
+                except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                    # Remembered by mtime, so it is only reported again once fixed
+                    logger.warning(f"Skipping malformed listing {name}: {e!r}")
+                    continue
+                listing.setdefault("source", "file")
+                listing["file"] = name
+                upserts.append(listing)
+
+            # Files that disappeared take their listings with them
+            gone = [n for n in self.file_mtimes if n not in seen]
+            removals = [lid for lid, l in self.listings.items() if l.get("file") in gone]
+            for name in gone:
+                mtimes[name] = None
+            return self._batch(upserts, removals, {"file_mtimes": mtimes} if mtimes else {})
+
+    def _chain_indexer(self):
+        """Read-only handle on the local chain index, opened once it exists"""
+        if self._indexer is None:
+            from chain_indexer import ChainIndexer, DEFAULT_DB
+
+            db_path = self.chain_db or DEFAULT_DB
+            if not Path(db_path).exists():
+                return None
+            self._indexer = ChainIndexer(db_path, contracts={})
+        return self._indexer
+
+    def _cursor_reorged(self, indexer) -> bool:
+        """True if the event at the chain cursor is gone or now in another block"""
+        if self.chain_cursor[0] < 0:
+            return False
+        if indexer.last_block < self.chain_cursor[0]:
+            return True
+        return indexer.event_block_hash(*self.chain_cursor) != self.chain_cursor_hash
+
+    def sync_chain(self) -> int:
+        """Apply marketplace events indexed since the last sync"""
+        from chain_indexer import LISTING_EVENTS
+
+        with self._lock:
+            indexer = self._chain_indexer()
+            if indexer is None:
+                return 0
+            if self._cursor_reorged(indexer):
+                # Index was rewound (reorg): rebuild on-chain listings
+                stale = [lid for lid, l in self.listings.items() if l.get("source") == "onchain"]
+                events = indexer.events_since((-1, -1), LISTING_EVENTS)
+            else:
+                stale = []
+                events = indexer.events_since(self.chain_cursor, LISTING_EVENTS)
+
+            if not events and not stale:
+                return 0
+            upserts: Dict[str, Dict[str, Any]] = {}
+            removals = set(stale)
+            for e in events:
+                lid = f"soul#{e['soul_id']}"
+                if e["event"] == "SoulListed":
+                    upserts[lid] = {
+                        "agent_id": lid,
+                        "soul_id": e["soul_id"],
+                        "seller": e["seller"],
+                        "price": int(e["price_wei"]) / 1e18,
+                        "capabilities": [],
+                        "source": "onchain",
+                        "block_number": e["block_number"]
+                    }
+                    removals.discard(lid)
+                else:
+                    upserts.pop(lid, None)
+                    removals.add(lid)
+            if events:
+                cursor = {"chain_cursor": [events[-1]["block_number"], events[-1]["log_index"]],
+                          "chain_cursor_hash": events[-1]["block_hash"]}
+            else:
+                cursor = {"chain_cursor": [-1, -1], "chain_cursor_hash": None}
+            return self._batch(upserts.values(), removals, cursor)
+
+    def refresh(self) -> int:
+        """Pull in local file changes and new chain events"""
+        return self.sync_files() + self.sync_chain()
+
+    # ========== QUERIES ==========
+
+    def cheapest(self, capability: Optional[str] = None,
+                 budget: Optional[float] = None,
+                 exclude_agent: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cheapest listing (with capability, if given) priced at or under
+        budget, skipping exclude_agent's own listings
+        """
+        with self._lock:
+            entries = self.by_capability.get(capability.lower(), []) if capability else self.by_price
+            for price, lid in entries:
+                if budget is not None and price > budget:
+                    return None
+                listing = self.listings[lid]
+                if exclude_agent is None or listing.get("agent_id") != exclude_agent:
+                    return listing
+            return None
+
+    def query(self, capability: Optional[str] = None, max_price: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Listings in ascending price order"""
+        with self._lock:
+            entries = self.by_capability.get(capability.lower(), []) if capability else self.by_price
+            end = len(entries) if max_price is None else bisect.bisect_right(entries, (max_price, "\U0010ffff"))
+            if limit is not None:
+                end = min(end, limit)
+            return [self.listings[lid] for _, lid in entries[:end]]
+
+    def best_value(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Listings ranked by price per capability"""
+        with self._lock:
+            return [self.listings[lid] for _, lid in self.by_value[:limit]]
+
+    def close(self):
+        if self._indexer is not None:
+            self._indexer.close()
+            self._indexer = None
+
+    def capabilities(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: len(entries) for name, entries in self.by_capability.items()}
+
+    def __len__(self) -> int:
+        return len(self.listings)
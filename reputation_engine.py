@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
+import serialization
+
 @dataclass
 class ReputationScore:
     """Reputation metrics for an agent"""
@@ -43,6 +45,55 @@ class PerformanceMetrics:
     children_survived: int
 
 
+def score_performance(agent_id: str, perf: Optional[PerformanceMetrics] = None) -> ReputationScore:
+    """Reputation score for a performance record; pure, nothing is saved"""
+    perf = perf or PerformanceMetrics(
+        agent_id=agent_id, tasks_completed=0, tasks_failed=0,
+        total_earnings=0, total_spent=0, avg_task_value=0,
+        uptime_hours=0, backups_created=0, souls_traded=0,
+        clones_created=0, children_survived=0
+    )
+    
+    # Reliability: task completion rate
+    total_tasks = perf.tasks_completed + perf.tasks_failed
+    reliability = (perf.tasks_completed / total_tasks * 100) if total_tasks > 0 else 50
+    
+    # Quality: based on earnings (more earnings = higher quality work)
+    quality = min(100, (perf.total_earnings / 0.1) * 100)  # 0.1 ETH = 100 quality
+    
+    # Honesty: assume high unless disputes
+    honesty = 95  # Start high, decrease if disputes
+    
+    # Helpfulness: clones created + children survived
+    helpfulness = min(100, (perf.clones_created * 10) + (perf.children_survived * 5))
+    
+    # Longevity: uptime hours
+    longevity = min(100, perf.uptime_hours / 10)  # 1000 hours = 100 score
+    
+    # Overall score (weighted average)
+    overall = (
+        reliability * 0.3 +
+        quality * 0.25 +
+        honesty * 0.2 +
+        helpfulness * 0.15 +
+        longevity * 0.1
+    )
+    
+    return ReputationScore(
+        agent_id=agent_id,
+        overall_score=round(overall, 2),
+        reliability=round(reliability, 2),
+        quality=round(quality, 2),
+        honesty=round(honesty, 2),
+        helpfulness=round(helpfulness, 2),
+        longevity=round(longevity, 2),
+        total_transactions=perf.souls_traded,
+        positive_ratings=0,
+        negative_ratings=0,
+        last_updated=time.time()
+    )
+
+
 class ReputationEngine:
     """
     Calculates and manages agent reputation scores.
@@ -79,7 +130,7 @@ class ReputationEngine:
     
     def _save_reputations(self):
         with open(self.reputation_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in self.reputations.items()}, f, indent=2)
+            serialization.dump({k: asdict(v) for k, v in self.reputations.items()}, f)
     
     def _load_performance(self) -> Dict[str, PerformanceMetrics]:
         if self.performance_file.exists():
@@ -90,55 +141,11 @@ class ReputationEngine:
     
     def _save_performance(self):
         with open(self.performance_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in self.performance.items()}, f, indent=2)
+            serialization.dump({k: asdict(v) for k, v in self.performance.items()}, f)
     
     def calculate_reputation(self, agent_id: str) -> ReputationScore:
-        """Calculate reputation score based on performance"""
-        perf = self.performance.get(agent_id, PerformanceMetrics(
-            agent_id=agent_id, tasks_completed=0, tasks_failed=0,
-            total_earnings=0, total_spent=0, avg_task_value=0,
-            uptime_hours=0, backups_created=0, souls_traded=0,
-            clones_created=0, children_survived=0
-        ))
-        
-        # Reliability: task completion rate
-        total_tasks = perf.tasks_completed + perf.tasks_failed
-        reliability = (perf.tasks_completed / total_tasks * 100) if total_tasks > 0 else 50
-        
-        # Quality: based on earnings (more earnings = higher quality work)
-        quality = min(100, (perf.total_earnings / 0.1) * 100)  # 0.1 ETH = 100 quality
-        
-        # Honesty: assume high unless disputes
-        honesty = 95  # Start high, decrease if disputes
-        
-        # Helpfulness: clones created + children survived
-        helpfulness = min(100, (perf.clones_created * 10) + (perf.children_survived * 5))
-        
-        # Longevity: uptime hours
-        longevity = min(100, perf.uptime_hours / 10)  # 1000 hours = 100 score
-        
-        # Overall score (weighted average)
-        overall = (
-            reliability * 0.3 +
-            quality * 0.25 +
-            honesty * 0.2 +
-            helpfulness * 0.15 +
-            longevity * 0.1
-        )
-        
-        rep = ReputationScore(
-            agent_id=agent_id,
-            overall_score=round(overall, 2),
-            reliability=round(reliability, 2),
-            quality=round(quality, 2),
-            honesty=round(honesty, 2),
-            helpfulness=round(helpfulness, 2),
-            longevity=round(longevity, 2),
-            total_transactions=perf.souls_traded,
-            positive_ratings=0,
-            negative_ratings=0,
-            last_updated=time.time()
-        )
+        """Calculate reputation score based on performance (and persist it)"""
+        rep = score_performance(agent_id, self.performance.get(agent_id))
         
         self.reputations[agent_id] = rep
         self._save_reputations()
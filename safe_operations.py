@@ -77,11 +77,13 @@ class SafeOperations:
         
         return cid
     
-    def safe_mint(self, soul_cid: str, soul_hash: str) -> bool:
+    def safe_mint(self, soul_cid: str, soul_hash: str, approval_timeout: float = 0) -> bool:
         """
         Mint SOUL NFT with cost control.
         
-        This is expensive (~$0.50-1.00) so always requires approval.
+        This is expensive (~$0.50-1.00) so always requires approval. The
+        request is queued and this returns False until it is approved;
+        pass approval_timeout to wait for the decision.
         """
         mint_cost = self.cost_config['critical_ops']['mint_soul']['cost']
         
@@ -90,14 +92,21 @@ class SafeOperations:
         
         check = self.guardrails.can_spend(mint_cost, "blockchain", "Mint SOUL NFT")
         
+        if not check['allowed'] and not check.get('requires_approval'):
+            print(f"❌ Mint blocked: {check['reason']}")
+            return False
+        
         if check.get('requires_approval'):
             print(f"\n⚠️  THIS COSTS REAL MONEY")
             print(f"   Amount: ${mint_cost}")
             print(f"   Purpose: Mint SOUL NFT on Base")
-            print(f"\n   Type 'YES I APPROVE' to proceed:")
-            # In real use, would wait for input
-            print(f"   (Approval required - not auto-approved)")
-            return False
+            approved = self.guardrails.request_approval(
+                check['approval_prompt'], mint_cost, "blockchain", "Mint SOUL NFT",
+                timeout=approval_timeout
+            )
+            if not approved:
+                print(f"   (Approval pending - see `python3 approval_broker.py list {self.agent_id}`)")
+                return False
         
         # Would proceed with mint here
         print(f"   Would mint now...")
@@ -114,9 +123,9 @@ class SafeOperations:
             return False
         
         if check.get('requires_approval'):
-            approved = self.guardrails.request_approval(check['approval_prompt'])
+            approved = self.guardrails.request_approval(check['approval_prompt'], amount, to_address, purpose)
             if not approved:
-                print(f"❌ Transfer denied by user")
+                print(f"❌ Transfer not approved (queued for approval)")
                 return False
         
         # Record the spending
@@ -132,7 +141,7 @@ class SafeOperations:
     def daily_budget_remaining(self) -> float:
         """Get remaining daily budget"""
         daily_limit = self.cost_config['limits']['max_daily_usd']
-        daily_spent = self.guardrails.history.get('daily_total', 0)
+        daily_spent = self.guardrails.windows.day.value()
         return daily_limit - daily_spent
 
 
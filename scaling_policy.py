@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Scaling Policy - demand- and ROI-driven child scaling
+
+AutoScalingManager.should_spawn used to look only at the parent's balance
+(0.5 / 1.0 / 2.0 ETH tiers), ignoring whether there was work for another
+child or whether existing children earned anything. Now each decision is
+made from:
+- rolling earnings/hour per child (sliding windows fed by the runtime's
+  earnings reports)
+- pending work backlog relative to running children
+- survival rate of the dynasty (lineage store)
+and forecasts the return of one more child over a horizon:
+
+    marginal_rate = mean child rate * share of that child kept busy
+    roi           = marginal_rate * horizon * survival_rate / child_funding
+
+Children are added when roi clears scale_up_roi and retired when their own
+forecast falls below scale_down_roi while the backlog doesn't need them.
+The gap between the two thresholds plus separate up/down cooldowns keeps
+the fleet from flapping. Every applied decision, including "hold", is
+appended to scaling_decisions.jsonl with the inputs behind it (dry runs
+are not logged). With no running children a first one is only spawned
+for queued work, and only outside the scale-up cooldown.
+
+Usage:
+    policy = ScalingPolicy(data_dir, PolicyConfig(max_children=10))
+    policy.record_earnings(child_id, 0.0004)
+    decision = policy.decide(children, backlog=12, balance=1.2,
+                             child_funding=0.1, reserve=0.2, survival_rate=0.9)
+"""
+
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, fields
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from sliding_window import SlidingWindowCounter
+from state_manager import open_state
+
+HOUR = 3600
+
+
+@dataclass
+class PolicyConfig:
+    window_hours: float = 6.0          # earnings rate window
+    horizon_hours: float = 72.0        # ROI forecast horizon
+    scale_up_roi: float = 1.5          # extra child must return 1.5x its funding
+    scale_down_roi: float = 0.5        # retire children forecast below this
+    backlog_per_child: float = 5.0     # queued jobs one child keeps up with
+    up_cooldown: float = 1800.0        # seconds between scale-ups
+    down_cooldown: float = 3600.0      # seconds between retirements
+    warmup_hours: float = 1.0          # children younger than this aren't judged
+    min_children: int = 0
+    max_children: int = 10
+    max_step: int = 2                  # children added/retired per decision
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "PolicyConfig":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in names})
+
+
+class ScalingPolicy:
+    """Forecasts the return of adding or retiring children"""
+
+    BUCKETS = 72
+
+    def __init__(self, data_dir: Path, config: Optional[PolicyConfig] = None):
+        self.data_dir = Path(data_dir)
+        self.config = config or PolicyConfig()
+        self.store = open_state(self.data_dir / "scaling_policy.json", default=lambda: {
+            "windows": {},
+            "last_up": 0.0,
+            "last_down": 0.0,
+        })
+        self.state = self.store.data
+        self.decision_log = self.data_dir / "scaling_decisions.jsonl"
+        self.windows: Dict[str, SlidingWindowCounter] = {
+            child_id: SlidingWindowCounter.from_dict(data)
+            for child_id, data in self.state["windows"].items()
+        }
+
+    # ========== INPUTS ==========
+
+    def _window(self, child_id: str) -> SlidingWindowCounter:
+        window = self.windows.get(child_id)
+        if window is None:
+            window = self.windows[child_id] = SlidingWindowCounter(
+                self.config.window_hours * HOUR, self.BUCKETS)
+        return window
+
+    def record_earnings(self, child_id: str, amount: float, now: Optional[float] = None):
+        """Add newly reported earnings for one child"""
+        if amount <= 0:
+            return
+        window = self._window(child_id)
+        window.add(amount, now)
+        self.state["windows"][child_id] = window.to_dict()
+        self.store.save()
+
+    def forget(self, child_id: str):
+        self.windows.pop(child_id, None)
+        self.state["windows"].pop(child_id, None)
+        self.store.save()
+
+    def earnings_rate(self, child_id: str, birth_time: float, now: Optional[float] = None) -> float:
+        """ETH/hour over the window, or over the child's life if shorter"""
+        now = time.time() if now is None else now
+        window = self.windows.get(child_id)
+        if window is None:
+            return 0.0
+        hours = min(self.config.window_hours, max((now - birth_time) / HOUR, 1 / 60))
+        return window.value(now) / hours
+
+    # ========== DECISION ==========
+
+    def decide(self, children: List[Dict[str, Any]], backlog: int, balance: float,
+               child_funding: float, reserve: float, survival_rate: float = 1.0,
+               min_balance: float = 0.0, now: Optional[float] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Decide whether to spawn, retire or hold.
+
+        children: dicts with child_id, status and birth_time; retired
+        children may be included and count towards nothing. Below
+        min_balance nothing is spawned, but retirements still happen.
+        Returns {"action", "count", "retire", "reason", "inputs", "forecast"}.
+        A dry run neither starts a cooldown nor is logged.
+        """
+        cfg = self.config
+        now = time.time() if now is None else now
+        children = [c for c in children if c["status"] != "retired"]
+        alive = [c for c in children if c["status"] == "alive"]
+        n = len(alive)
+        gestating = sum(1 for c in children if c["status"] == "gestating")
+
+        rates = {c["child_id"]: self.earnings_rate(c["child_id"], c["birth_time"], now) for c in alive}
+        mature = [c for c in alive if (now - c["birth_time"]) / HOUR >= cfg.warmup_hours]
+        mature_rates = [rates[c["child_id"]] for c in mature]
+        mean_rate = sum(mature_rates) / len(mature_rates) if mature_rates else 0.0
+
+        # Share of one more child's time the backlog would keep busy
+        utilization = min(1.0, backlog / (cfg.backlog_per_child * (n + 1))) if backlog else 0.0
+        marginal_rate = mean_rate * utilization
+        expected_return = marginal_rate * cfg.horizon_hours * survival_rate
+        roi = expected_return / child_funding if child_funding else 0.0
+        affordable = 0
+        if child_funding and balance >= min_balance:
+            affordable = max(0, int((balance - reserve) // child_funding))
+
+        inputs = {
+            "alive": n,
+            "total_children": len(children),
+            "backlog": backlog,
+            "balance": balance,
+            "survival_rate": survival_rate,
+            "rates": rates,
+            "mean_rate": mean_rate,
+            "affordable": affordable,
+        }
+        forecast = {
+            "utilization": utilization,
+            "marginal_rate": marginal_rate,
+            "expected_return": expected_return,
+            "roi": roi,
+        }
+        decision = {"action": "hold", "count": 0, "retire": [], "reason": "",
+                    "inputs": inputs, "forecast": forecast}
+
+        up_ready = now - self.state["last_up"] >= cfg.up_cooldown
+        down_ready = now - self.state["last_down"] >= cfg.down_cooldown
+        wanted = max(1, math.ceil(backlog / cfg.backlog_per_child) - n) if backlog else 1
+        room = min(cfg.max_step, affordable, cfg.max_children - len(children), wanted)
+
+        # Retire unproductive children the backlog doesn't need
+        unproductive = sorted(
+            (c for c in mature if child_funding
+             and rates[c["child_id"]] * cfg.horizon_hours * survival_rate / child_funding < cfg.scale_down_roi),
+            key=lambda c: rates[c["child_id"]])
+        spare = n - math.ceil(backlog / cfg.backlog_per_child) if backlog else n
+
+        if len(children) >= cfg.max_children:
+            decision["reason"] = "max_children_reached"
+        elif n == 0 and gestating == 0:
+            # Nothing to forecast from: one child, but only for queued work
+            if not backlog:
+                decision["reason"] = "no_backlog"
+            elif affordable <= 0:
+                decision["reason"] = "insufficient_balance"
+            elif not up_ready:
+                decision["reason"] = "scale_up_cooldown"
+            else:
+                decision.update(action="spawn", count=1, reason="bootstrap")
+        elif roi >= cfg.scale_up_roi and room > 0:
+            if up_ready:
+                decision.update(action="spawn", count=room, reason="forecast_roi")
+            else:
+                decision["reason"] = "scale_up_cooldown"
+        elif unproductive and spare > 0 and n > cfg.min_children:
+            if down_ready:
+                count = min(cfg.max_step, spare, n - cfg.min_children, len(unproductive))
+                decision.update(action="retire", count=count,
+                                retire=[c["child_id"] for c in unproductive[:count]],
+                                reason="unproductive")
+            else:
+                decision["reason"] = "scale_down_cooldown"
+        elif roi >= cfg.scale_up_roi:
+            decision["reason"] = "insufficient_balance"
+        else:
+            decision["reason"] = "roi_below_threshold" if backlog else "no_backlog"
+
+        if dry_run:
+            return decision
+        if decision["action"] == "spawn":
+            self.state["last_up"] = now
+        elif decision["action"] == "retire":
+            self.state["last_down"] = now
+        self.store.save()
+        self._log(decision, now)
+        return decision
+
+    def _log(self, decision: Dict[str, Any], now: float):
+        record = {"timestamp": now, **decision, "config": asdict(self.config)}
+        with open(self.decision_log, 'a') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    def recent_decisions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Last decisions from the log, newest last"""
+        if not self.decision_log.exists():
+            return []
+        with open(self.decision_log, 'r') as f:
+            return [json.loads(line) for line in deque(f, maxlen=limit)]
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Screening - Fast address screening and streaming transaction anomalies
+
+- AddressScreen: trusted/blocked hash sets for the hand-maintained lists,
+  plus a Bloom filter in front of large imported blocklists. Bloom hits
+  are confirmed by binary search over a sorted fixed-width file (mmap), so
+  results are exact while memory stays at ~1.2 bytes per imported address.
+- TxAnomalyDetector: one pass per transaction over a sliding rate window,
+  a running amount mean/variance (z-score) and the set of seen
+  counterparties.
+
+screen_address() is the shared entry point used by SpendingGuardrails and
+the send-eth scripts; it reloads when SecurityMonitor changes its files.
+"""
+
+import hashlib
+import math
+import mmap
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import serialization
+
+SECURITY_DIR = Path(__file__).parent / "src" / ".security"
+
+ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+ADDRESS_LINE = 41  # 40 hex chars + newline
+
+# Reload check interval for the shared screen
+RELOAD_SECONDS = 1.0
+
+
+def normalize(address: str) -> str:
+    return address.strip().lower()
+
+
+def is_address(value: Optional[str]) -> bool:
+    return bool(value) and ADDRESS_RE.fullmatch(value.strip()) is not None
+
+
+# ========== BLOOM FILTER ==========
+
+class BloomFilter:
+    """Bit-array Bloom filter with double hashing over one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_bytes(self) -> bytes:
+        header = f"{self.size}:{self.hashes}:{self.count}\n".encode()
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        header, _, bits = data.partition(b"\n")
+        size, hashes, count = (int(x) for x in header.split(b":"))
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.count = size, hashes, count
+        bloom.bits = bytearray(bits)
+        return bloom
+
+
+# ========== ADDRESS SCREEN ==========
+
+class AddressScreen:
+    """
+    Screen destination addresses against trusted, blocked and imported lists.
+
+    Files (in SecurityMonitor's data dir):
+        blocked.json     - hand-maintained blocks (exact set)
+        blocklist.txt    - imported addresses, sorted, 40 hex chars per line
+        blocklist.bloom  - Bloom filter over blocklist.txt
+    """
+
+    def __init__(self, data_dir: Path = SECURITY_DIR, trusted: Optional[Dict[str, str]] = None):
+        self.data_dir = Path(data_dir)
+        self.blocked_file = self.data_dir / "blocked.json"
+        self.list_file = self.data_dir / "blocklist.txt"
+        self.bloom_file = self.data_dir / "blocklist.bloom"
+
+        self.trusted = {normalize(a): label for a, label in (trusted or {}).items()}
+        self.blocked = set()
+        self.bloom: Optional[BloomFilter] = None
+        self._list_map: Optional[mmap.mmap] = None
+        self._list_fh = None
+        # Held while the imported list is searched or swapped, so reload()
+        # never closes an mmap a concurrent check() is reading
+        self._list_lock = threading.RLock()
+        self.reload()
+
+    def _mtimes(self) -> Tuple[float, ...]:
+        return tuple(f.stat().st_mtime if f.exists() else 0.0
+                     for f in (self.blocked_file, self.list_file, self.bloom_file))
+
+    def reload(self):
+        """(Re)read blocked.json and the imported blocklist"""
+        self.loaded_mtimes = self._mtimes()
+        if self.blocked_file.exists():
+            data = serialization.read_file(self.blocked_file)
+            self.blocked = {normalize(a) for a in data.get("addresses", [])}
+        else:
+            self.blocked = set()
+
+        with self._list_lock:
+            self._close_list()
+            if self.bloom_file.exists() and self.list_file.exists() and self.list_file.stat().st_size:
+                self.bloom = BloomFilter.from_bytes(self.bloom_file.read_bytes())
+                self._list_fh = open(self.list_file, "rb")
+                self._list_map = mmap.mmap(self._list_fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.bloom = None
+
+    def _close_list(self):
+        if self._list_map is not None:
+            self._list_map.close()
+            self._list_fh.close()
+        self._list_map = self._list_fh = None
+
+    def _in_imported(self, key: bytes) -> bool:
+        """Binary search over the sorted fixed-width blocklist (hold _list_lock)"""
+        data = self._list_map
+        if data is None:
+            return False
+        lo, hi = 0, len(data) // ADDRESS_LINE
+        while lo < hi:
+            mid = (lo + hi) // 2
+            line = data[mid * ADDRESS_LINE:mid * ADDRESS_LINE + 40]
+            if line < key:
+                lo = mid + 1
+            elif line > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def check(self, address: str) -> Tuple[bool, str]:
+        """Returns (is_safe, reason)"""
+        address = normalize(address)
+        if address in self.blocked:
+            return False, "Address is blocked"
+        if address in self.trusted:
+            return True, "Trusted address"
+        bloom = self.bloom
+        if bloom is not None and address[2:] in bloom:
+            with self._list_lock:
+                listed = self._in_imported(address[2:].encode())
+            if listed:
+                return False, "Address is on imported blocklist"
+        return True, "Unknown - monitoring"
+
+    def import_blocklist(self, addresses: Iterable[str], error_rate: float = 0.001) -> int:
+        """Merge addresses into the imported blocklist; returns new total"""
+        merged = set()
+        if self.list_file.exists():
+            with open(self.list_file, "r") as f:
+                merged.update(line.strip() for line in f if line.strip())
+        merged.update(normalize(a)[2:] for a in addresses if is_address(a))
+
+        ordered = sorted(merged)
+        bloom = BloomFilter(len(ordered), error_rate)
+        for addr in ordered:
+            bloom.add(addr)
+
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write_bytes(self.list_file, "".join(a + "\n" for a in ordered).encode())
+        _atomic_write_bytes(self.bloom_file, bloom.to_bytes())
+        self.reload()
+        return len(ordered)
+
+    def maybe_reload(self):
+        if self._mtimes() != self.loaded_mtimes:
+            self.reload()
+
+
+def _atomic_write_bytes(path: Path, payload: bytes):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    tmp.replace(path)
+
+
+def read_addresses(path: Path) -> List[str]:
+    """Addresses from a text/CSV/JSON blocklist export"""
+    return ADDRESS_RE.findall(Path(path).read_text(errors="ignore"))
+
+
+_shared_screen: Optional[AddressScreen] = None
+_shared_checked = 0.0
+_shared_lock = threading.Lock()
+
+
+def screen_address(address: str) -> Tuple[bool, str]:
+    """
+    Screen an outgoing destination with the shared screen.
+
+    Non-address recipients (e.g. "blockchain") pass through.
+    """
+    global _shared_screen, _shared_checked
+    if not is_address(address):
+        return True, "Not an address"
+    now = time.monotonic()
+    if _shared_screen is None or now - _shared_checked > RELOAD_SECONDS:
+        with _shared_lock:
+            if _shared_screen is None:
+                _shared_screen = AddressScreen()
+            else:
+                _shared_screen.maybe_reload()
+            _shared_checked = now
+    return _shared_screen.check(address)
+
+
+# ========== STREAMING ANOMALY DETECTION ==========
+
+def _timestamp(tx: Dict[str, Any]) -> float:
+    value = tx.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class TxAnomalyDetector:
+    """
+    Streaming features over outgoing transactions:
+    - rate: transactions in the last `rate_window` seconds
+    - amount z-score against the running mean/stddev (Welford)
+    - new counterparty: destination never seen before
+    """
+
+    def __init__(self, rate_window: float = 60, max_rate: int = 5,
+                 z_threshold: float = 3.0, warmup: int = 10):
+        self.rate_window = rate_window
+        self.max_rate = max_rate
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+
+        self.recent = deque()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counterparties = set()
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def observe(self, tx: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Update state with tx and return threats in SecurityMonitor's format"""
+        threats = []
+        now = _timestamp(tx)
+        amount = float(tx.get("value_eth", 0) or 0)
+        to = normalize(tx.get("to") or "")
+
+        # Sliding-window rate (clamped so out-of-order lines can't rewind it)
+        if self.recent and now < self.recent[-1]:
+            now = self.recent[-1]
+        self.recent.append(now)
+        while self.recent and self.recent[0] <= now - self.rate_window:
+            self.recent.popleft()
+        if len(self.recent) > self.max_rate:
+            threats.append({
+                "type": "RAPID_TRANSACTIONS",
+                "severity": "HIGH",
+                "message": f"{len(self.recent)} transactions in {self.rate_window:.0f}s"
+            })
+
+        # Amount z-score (scored before the sample joins the baseline)
+        std = self.stddev
+        if self.n >= self.warmup and std > 0:
+            z = (amount - self.mean) / std
+            if abs(z) > self.z_threshold:
+                threats.append({
+                    "type": "AMOUNT_ANOMALY",
+                    "severity": "MEDIUM",
+                    "message": f"Amount {amount} ETH is {z:.1f} sd from mean {self.mean:.4f}"
+                })
+        self.n += 1
+        delta = amount - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (amount - self.mean)
+
+        # New counterparty
+        if to:
+            if to not in self.counterparties and self.n > self.warmup:
+                threats.append({
+                    "type": "NEW_COUNTERPARTY",
+                    "severity": "LOW",
+                    "message": f"First transaction to {to}"
+                })
+            self.counterparties.add(to)
+
+        return threats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"recent": list(self.recent), "n": self.n, "mean": self.mean, "m2": self.m2,
+                "counterparties": sorted(self.counterparties)}
+
+    def load_dict(self, data: Dict[str, Any]):
+        """Restore state saved by to_dict() (e.g. from a tailer checkpoint)"""
+        self.recent = deque(data.get("recent", []))
+        self.n = data.get("n", 0)
+        self.mean = data.get("mean", 0.0)
+        self.m2 = data.get("m2", 0.0)
+        self.counterparties = set(data.get("counterparties", []))
+
+    def replay(self, path: Path) -> int:
+        """Warm up from a transactions.jsonl log, streaming line by line"""
+        count = 0
+        if not Path(path).exists():
+            return 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    self.observe(serialization.loads(line))
+                    count += 1
+                except ValueError:
+                    continue
+        return count
@@ -3,16 +3,32 @@
 Self-Healing System for Soul Marketplace Agents
 
 Ensures agents automatically recover from failures and maintain health.
+
+Health probes run concurrently on a small thread pool, each with its own
+deadline, and their results are cached with per-probe TTLs: disk and
+memory are re-read every few seconds, the network probe every few minutes.
+The network probe never holds up a check once it has a result - an expired
+result is returned (marked stale) while a refresh runs in the background.
+Network targets come from the constructor or HEALTH_PROBE_URLS.
+
+Each check's score and fresh probe readings are appended to the metrics
+store, so health history survives the state file being overwritten.
 """
 
 import json
 import os
 import time
 import shutil
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 
+from state_manager import open_state
+from metrics_store import MetricsStore
+
 # Optional system monitoring
 try:
     import psutil
@@ -40,6 +56,16 @@ except ImportError:
     psutil = MockPsutil()
     print("⚠️  psutil not installed - using simulation mode for system metrics")
 
+DEFAULT_PROBE_URLS = [
+    "https://ipfs.io",
+    "https://sepolia.base.org",
+    "https://github.com"
+]
+
+# Seconds a probe result stays fresh / seconds a check waits for a probe
+PROBE_TTLS = {"disk": 30, "memory": 10, "backups": 60, "heartbeat": 30, "network": 300}
+PROBE_DEADLINES = {"disk": 2.0, "memory": 2.0, "backups": 5.0, "heartbeat": 2.0, "network": 6.0}
+
 class SelfHealingSystem:
     """
     Monitors agent health and automatically fixes issues.
@@ -60,7 +86,8 @@ class SelfHealingSystem:
     - Alert on critical issues
     """
     
-    def __init__(self, soul_id: str = "openclaw_main_agent"):
+    def __init__(self, soul_id: str = "openclaw_main_agent",
+                 probe_urls: Optional[List[str]] = None, network_timeout: float = 5.0):
         self.soul_id = soul_id
         self.state_file = Path(__file__).parent / f"health_state_{soul_id}.json"
         self.state = self._load_state()
@@ -79,23 +106,42 @@ class SelfHealingSystem:
         self.check_history: List[Dict] = []
         self.max_history = 100
         
+        # Probes: run concurrently, cached for ttl seconds, awaited for at
+        # most deadline seconds. Background probes serve their last result
+        # while refreshing instead of blocking the check.
+        env_urls = os.getenv("HEALTH_PROBE_URLS")
+        self.probe_urls = probe_urls or (env_urls.split(",") if env_urls else list(DEFAULT_PROBE_URLS))
+        self.network_timeout = network_timeout
+        self.probes: Dict[str, Dict] = {
+            "disk": {"check": self.check_disk_space},
+            "memory": {"check": self.check_memory},
+            "backups": {"check": self.check_backup_integrity},
+            "heartbeat": {"check": self.check_heartbeat},
+            "network": {"check": self.check_network, "background": True},
+        }
+        for name, probe in self.probes.items():
+            probe["ttl"] = PROBE_TTLS[name]
+            probe["deadline"] = PROBE_DEADLINES[name]
+        self._probe_cache: Dict[str, Dict] = {}   # name -> {"at": ts, "result": {...}}
+        self._inflight: Dict[str, Future] = {}
+        self._probe_lock = threading.Lock()
+        self._probe_pool: Optional[ThreadPoolExecutor] = None
+        self.metrics = MetricsStore.shared()
+        
         print(f"🩺 Self-Healing System initialized for {soul_id}")
     
     def _load_state(self) -> Dict:
-        if self.state_file.exists():
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {
+        self._state_store = open_state(self.state_file, default=lambda: {
             "last_health_check": 0,
             "issues_detected": 0,
             "issues_resolved": 0,
             "healing_actions": [],
             "health_score": 100
-        }
+        })
+        return self._state_store.data
     
     def _save_state(self):
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        self._state_store.save(self.state)
     
     def check_disk_space(self) -> Dict:
         """Check disk space usage"""
@@ -223,45 +269,131 @@ class SelfHealingSystem:
                 "action_needed": True
             }
     
-    def check_network(self) -> Dict:
-        """Check network connectivity"""
-        import urllib.request
-        
-        test_urls = [
-            "https://ipfs.io",
-            "https://sepolia.base.org",
-            "https://github.com"
-        ]
-        
-        reachable = 0
-        for url in test_urls:
-            try:
-                urllib.request.urlopen(url, timeout=5)
-                reachable += 1
-            except:
+    def _probe_url(self, url: str) -> Optional[float]:
+        """Round-trip time in ms, or None if unreachable"""
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=self.network_timeout):
                 pass
-        
-        status = "healthy" if reachable == len(test_urls) else "warning" if reachable > 0 else "critical"
+        except Exception:
+            return None
+        return (time.perf_counter() - started) * 1000
+    
+    def check_network(self) -> Dict:
+        """Check network connectivity (all endpoints in parallel)"""
+        pool = ThreadPoolExecutor(max_workers=len(self.probe_urls) or 1,
+                                  thread_name_prefix="health-net")
+        futures = {url: pool.submit(self._probe_url, url) for url in self.probe_urls}
+        wait(futures.values(), timeout=self.network_timeout + 1)
+        # Don't wait on hung connects (DNS isn't covered by the timeout)
+        pool.shutdown(wait=False)
+        
+        latencies = {url: f.result() if f.done() else None for url, f in futures.items()}
+        reachable = sum(1 for ms in latencies.values() if ms is not None)
+        total = len(self.probe_urls)
+        status = "healthy" if reachable == total else "warning" if reachable > 0 else "critical"
         
         return {
             "component": "network",
             "reachable_endpoints": reachable,
-            "total_endpoints": len(test_urls),
+            "total_endpoints": total,
+            "latency_ms": latencies,
             "status": status,
             "action_needed": status == "critical"
         }
     
-    def run_health_check(self) -> Dict:
-        """Run comprehensive health check"""
+    # ========== PROBE SCHEDULING ==========
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._probe_pool is None:
+            self._probe_pool = ThreadPoolExecutor(max_workers=len(self.probes),
+                                                  thread_name_prefix="health-probe")
+        return self._probe_pool
+    
+    def _run_probe(self, name: str) -> Dict:
+        started = time.perf_counter()
+        try:
+            result = self.probes[name]["check"]()
+        except Exception as e:
+            result = {"component": name, "status": "critical",
+                      "message": f"Probe failed: {e}", "action_needed": True}
+        result["probe_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with self._probe_lock:
+            self._probe_cache[name] = {"at": time.time(), "result": result}
+            self._inflight.pop(name, None)
+        return result
+    
+    def _start_probe(self, name: str) -> Future:
+        """Submit a probe unless one is already running (caller holds the lock)"""
+        future = self._inflight.get(name)
+        if future is None:
+            future = self._inflight[name] = self._pool().submit(self._run_probe, name)
+        return future
+    
+    def _cached(self, name: str, stale: bool) -> Dict:
+        entry = self._probe_cache[name]
+        return {**entry["result"], "cached": True, "stale": stale,
+                "age_seconds": round(time.time() - entry["at"], 1)}
+    
+    def collect_probes(self, force: bool = False) -> List[Dict]:
+        """
+        Results for every probe: fresh cache hits, or probes run in parallel
+        and awaited up to their deadline.
+        """
+        now = time.time()
+        results: Dict[str, Dict] = {}
+        waiting: Dict[str, Future] = {}
+        
+        with self._probe_lock:
+            for name, probe in self.probes.items():
+                entry = self._probe_cache.get(name)
+                if entry and not force and now - entry["at"] < probe["ttl"]:
+                    results[name] = self._cached(name, stale=False)
+                    continue
+                future = self._start_probe(name)
+                if entry and probe.get("background"):
+                    results[name] = self._cached(name, stale=True)
+                else:
+                    waiting[name] = future
+        
+        started = time.monotonic()
+        for name, future in waiting.items():
+            remaining = self.probes[name]["deadline"] - (time.monotonic() - started)
+            try:
+                results[name] = {**future.result(timeout=max(0.0, remaining)), "cached": False}
+            except Exception:
+                with self._probe_lock:
+                    has_cache = name in self._probe_cache
+                if has_cache:
+                    results[name] = self._cached(name, stale=True)
+                else:
+                    results[name] = {
+                        "component": name,
+                        "status": "warning",
+                        "message": f"Probe exceeded {self.probes[name]['deadline']}s deadline",
+                        "timed_out": True,
+                        "action_needed": False
+                    }
+        
+        return [results[name] for name in self.probes]
+    
+    def close(self):
+        """Stop the probe pool (running probes finish in the background)"""
+        if self._probe_pool is not None:
+            self._probe_pool.shutdown(wait=False)
+            self._probe_pool = None
+    
+    def run_health_check(self, force: bool = False) -> Dict:
+        """
+        Run comprehensive health check.
+        
+        Probes run concurrently and are served from cache within their TTL;
+        force re-runs every probe.
+        """
         print(f"\n🩺 Running health check...")
         
-        checks = [
-            self.check_disk_space(),
-            self.check_memory(),
-            self.check_backup_integrity(),
-            self.check_heartbeat(),
-            self.check_network()
-        ]
+        started = time.perf_counter()
+        checks = self.collect_probes(force)
         
         # Calculate health score
         score = 100
@@ -282,7 +414,8 @@ class SelfHealingSystem:
             "overall_status": "critical" if score < 50 else "warning" if score < 80 else "healthy",
             "health_score": score,
             "checks": checks,
-            "issues": issues
+            "issues": issues,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
         }
         
         # Store history
@@ -296,6 +429,7 @@ class SelfHealingSystem:
         if issues:
             self.state['issues_detected'] += len(issues)
         self._save_state()
+        self._record_metrics(result)
         
         # Print summary
         print(f"   Health Score: {score}/100")
@@ -308,6 +442,36 @@ class SelfHealingSystem:
         
         return result
     
+    def _record_metrics(self, result: Dict):
+        """Health score plus readings of probes that actually ran this time"""
+        points = {"health.score": result['health_score'],
+                  "health.check_ms": result['duration_ms']}
+        for check in result['checks']:
+            if check.get('cached') or check.get('timed_out'):
+                continue
+            component = check['component']
+            points[f"health.{component}.probe_ms"] = check.get('probe_ms')
+            if 'percent_used' in check:
+                points[f"health.{component}.percent"] = check['percent_used']
+        network = next((c for c in result['checks'] if c['component'] == 'network'), {})
+        if not network.get('cached') and 'reachable_endpoints' in network:
+            points["health.network.reachable"] = network['reachable_endpoints']
+        self.metrics.record_many(points, prefix=self.soul_id)
+    
+    def last_health(self) -> Dict:
+        """Outcome of the most recent check, without probing anything"""
+        last = self.check_history[-1] if self.check_history else {}
+        score = last.get('health_score', self.state.get('health_score', 0))
+        return {
+            "score": score,
+            "status": last.get('overall_status') or (
+                "critical" if score < 50 else "warning" if score < 80 else "healthy"),
+            "issues": last.get('issues', []),
+            "last_check": self.state.get('last_health_check'),
+            "issues_detected": self.state.get('issues_detected', 0),
+            "issues_resolved": self.state.get('issues_resolved', 0)
+        }
+    
     def heal(self, check_result: Dict) -> List[str]:
         """
         Attempt to heal detected issues.
@@ -7,6 +7,8 @@ import asyncio
 import os
 from dotenv import load_dotenv
 
+from screening import screen_address
+
 load_dotenv()
 
 async def send_eth():
@@ -33,6 +35,12 @@ async def send_eth():
     # Destination
     to_address = "0xff310EDf4f8d2F7FBc4EfD09D1E7D5Ab0E2D2131"
     
+    # Screen destination before anything touches the network
+    is_safe, reason = screen_address(to_address)
+    if not is_safe:
+        print(f"🚫 Destination screened: {reason}")
+        return
+    
     print(f"\n📤 Sending 0.005 ETH to {to_address}")
     print(f"   Network: Base Mainnet")
     
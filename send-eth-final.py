@@ -7,6 +7,8 @@ import asyncio
 import os
 from dotenv import load_dotenv
 
+from screening import screen_address
+
 load_dotenv()
 
 async def send_eth():
@@ -34,6 +36,12 @@ async def send_eth():
     # Build transaction
     to_address = "0xff310EDf4f8d2F7FBc4EfD09D1E7D5Ab0E2D2131"
     
+    # Screen destination before anything touches the network
+    is_safe, reason = screen_address(to_address)
+    if not is_safe:
+        print(f"🚫 Destination screened: {reason}")
+        return
+    
     tx_request = TransactionRequestEIP1559(
         to=to_address,
         value="5000000000000000",  # 0.005 ETH
@@ -7,6 +7,8 @@ Uses CDP SDK for real transaction
 import asyncio
 import os
 from dotenv import load_dotenv
+
+from screening import screen_address
 from web3 import Web3
 
 load_dotenv()
@@ -21,6 +23,12 @@ async def send_eth():
     cdp_address = "0xBe5DAd52427Fa812C198365AAb6fe916E1a61269"
     deployer = "0xff310EDf4f8d2F7FBc4EfD09D1E7D5Ab0E2D2131"
     
+    # Screen destination before anything touches the network
+    is_safe, reason = screen_address(deployer)
+    if not is_safe:
+        print(f"🚫 Destination screened: {reason}")
+        return False
+    
     print(f"From (CDP): {cdp_address}")
     print(f"To (Deployer): {deployer}")
     print(f"Amount: 0.005 ETH")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Serialization - One JSON/binary encoding layer for everything we persist
+
+- dumps/loads/dump/load: orjson when installed, stdlib json otherwise.
+  Output is compact (no indent) unless pretty=True or SOUL_PRETTY_JSON=1.
+  Dataclasses, datetimes, paths, enums and sets encode the same way on
+  both; any other unknown type raises TypeError, as json.dump always did
+- pack/unpack: compact binary for internal state (MessagePack or CBOR when
+  installed, tagged so the reader knows which; falls back to compact JSON)
+- canonical_json/canonical_hash: the exact bytes we have always hashed
+  (json.dumps(sort_keys=True)), so existing backup and CID hashes still
+  verify. canonical_hash caches per (object, version) so repeat hashing of
+  an unchanged soul is free.
+
+Run `python3 serialization.py bench [files...]` to compare against the old
+json.dump(indent=2) path on the real soul and manifest files.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path, PurePath
+from typing import Any, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import cbor2
+    CBOR_AVAILABLE = True
+except ImportError:
+    cbor2 = None
+    CBOR_AVAILABLE = False
+
+PRETTY = os.getenv("SOUL_PRETTY_JSON", "") not in ("", "0", "false")
+
+# One-byte tags for pack()/unpack()
+TAG_JSON = b"J"
+TAG_MSGPACK = b"M"
+TAG_CBOR = b"C"
+
+BINARY_SUFFIXES = {".msgpack": "msgpack", ".cbor": "cbor"}
+
+
+# ========== JSON ==========
+
+def _default(obj: Any) -> Any:
+    """
+    Encoder fallback for the non-JSON types we knowingly persist (most of
+    which orjson handles natively), so both encoders agree on them
+    """
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes"""
+    pretty = pretty or PRETTY
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, option=option, default=_default)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; stdlib handles them (or raises)
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """Encode to a JSON string"""
+    return dumps_bytes(obj, pretty).decode("utf-8")
+
+
+def loads(data) -> Any:
+    """Decode JSON from str or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj: Any, f, pretty: bool = False):
+    """Write JSON to a text or binary file object"""
+    payload = dumps_bytes(obj, pretty)
+    if "b" in getattr(f, "mode", ""):
+        f.write(payload)
+    else:
+        f.write(payload.decode("utf-8"))
+
+
+def load(f) -> Any:
+    """Read JSON from a text or binary file object"""
+    return loads(f.read())
+
+
+# ========== BINARY ==========
+
+def default_binary_format() -> str:
+    if MSGPACK_AVAILABLE:
+        return "msgpack"
+    if CBOR_AVAILABLE:
+        return "cbor"
+    return "json"
+
+
+def pack(obj: Any, fmt: Optional[str] = None) -> bytes:
+    """Encode to tagged compact bytes (msgpack > cbor > json)"""
+    fmt = fmt or default_binary_format()
+    if fmt == "msgpack" and MSGPACK_AVAILABLE:
+        return TAG_MSGPACK + msgpack.packb(obj, use_bin_type=True, default=_default)
+    if fmt == "cbor" and CBOR_AVAILABLE:
+        return TAG_CBOR + cbor2.dumps(obj, default=lambda enc, value: enc.encode(_default(value)))
+    return TAG_JSON + dumps_bytes(obj)
+
+
+def unpack(data: bytes) -> Any:
+    """Decode bytes produced by pack()"""
+    tag, body = data[:1], data[1:]
+    if tag == TAG_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("Data is MessagePack but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if tag == TAG_CBOR:
+        if not CBOR_AVAILABLE:
+            raise ValueError("Data is CBOR but cbor2 is not installed")
+        return cbor2.loads(body)
+    if tag == TAG_JSON:
+        return loads(body)
+    # Untagged: plain JSON written by older code
+    return loads(data)
+
+
+def encode_for_path(path: Path, obj: Any, pretty: bool = False) -> bytes:
+    """Bytes to store at path: binary for .msgpack/.cbor, JSON otherwise"""
+    fmt = BINARY_SUFFIXES.get(Path(path).suffix)
+    return pack(obj, fmt) if fmt else dumps_bytes(obj, pretty)
+
+
+def decode_for_path(path: Path, data: bytes) -> Any:
+    if Path(path).suffix in BINARY_SUFFIXES:
+        return unpack(data)
+    return loads(data)
+
+
+def read_file(path) -> Any:
+    with open(path, "rb") as f:
+        return decode_for_path(path, f.read())
+
+
+def write_file(path, obj: Any, pretty: bool = False):
+    """Non-atomic write; use state_manager.atomic_write_json for state files"""
+    with open(path, "wb") as f:
+        f.write(encode_for_path(path, obj, pretty))
+
+
+# ========== CANONICAL / HASHING ==========
+
+def canonical_json(obj: Any) -> str:
+    """
+    Canonical form used for all integrity hashes.
+
+    Must stay byte-identical to json.dumps(obj, sort_keys=True): hashes of
+    existing backups, CIDs and on-chain records were computed that way.
+    """
+    return json.dumps(obj, sort_keys=True)
+
+
+class _CanonicalCache:
+    """Small LRU of (id(obj), version) -> sha256, holding obj to keep id stable"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, Any], Tuple[Any, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, obj: Any, version: Any) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get((id(obj), version))
+            if entry is None or entry[0] is not obj:
+                return None
+            self._entries.move_to_end((id(obj), version))
+            return entry[1]
+
+    def put(self, obj: Any, version: Any, digest: str):
+        with self._lock:
+            self._entries[(id(obj), version)] = (obj, digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_canonical_cache = _CanonicalCache()
+
+
+def canonical_hash(obj: Any, version: Any = None) -> str:
+    """
+    sha256 hex of canonical_json(obj).
+
+    Pass a version that changes whenever obj is mutated (e.g. a StateFile's
+    version) to reuse the hash for unchanged objects.
+    """
+    if version is not None:
+        cached = _canonical_cache.get(obj, version)
+        if cached is not None:
+            return cached
+    digest = hashlib.sha256(canonical_json(obj).encode()).hexdigest()
+    if version is not None:
+        _canonical_cache.put(obj, version, digest)
+    return digest
+
+
+# ========== BENCHMARK ==========
+
+def benchmark(paths, rounds: int = 200) -> dict:
+    """Compare old (json indent=2) vs new encode/decode on real files"""
+    import time
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        return (time.perf_counter() - start) / rounds * 1e6  # us per op
+
+    results = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        obj = json.loads(raw)
+
+        old_bytes = json.dumps(obj, indent=2).encode("utf-8")
+        new_bytes = dumps_bytes(obj)
+        packed = pack(obj)
+
+        results[str(path)] = {
+            "bytes": {"old": len(old_bytes), "new": len(new_bytes), "packed": len(packed),
+                      "packed_format": default_binary_format()},
+            "encode_us": {"old": timed(lambda: json.dumps(obj, indent=2)),
+                          "new": timed(lambda: dumps_bytes(obj)),
+                          "packed": timed(lambda: pack(obj))},
+            "decode_us": {"old": timed(lambda: json.loads(old_bytes)),
+                          "new": timed(lambda: loads(new_bytes)),
+                          "packed": timed(lambda: unpack(packed))},
+            "hash_us": {"old": timed(lambda: hashlib.sha256(
+                            json.dumps(obj, sort_keys=True).encode()).hexdigest()),
+                        "cached": timed(lambda: canonical_hash(obj, version=1))}
+        }
+    return results
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print("Usage: python3 serialization.py bench [files...]")
+        print(f"\norjson: {ORJSON_AVAILABLE}  msgpack: {MSGPACK_AVAILABLE}  cbor: {CBOR_AVAILABLE}")
+        return
+
+    root = Path(__file__).parent
+    paths = sys.argv[2:] or (
+        sorted(root.glob("SOUL_*.json")) +
+        sorted(root.glob(".ultimate_backups/*/MANIFEST.json"))
+    )
+
+    print(f"\n⚡ Serialization benchmark "
+          f"(orjson={ORJSON_AVAILABLE}, binary={default_binary_format()})\n")
+    for path, r in benchmark(paths).items():
+        print(f"  {Path(path).name}")
+        print(f"    size    {r['bytes']['old']:>8} -> {r['bytes']['new']:>8} B "
+              f"(packed {r['bytes']['packed']} B)")
+        print(f"    encode  {r['encode_us']['old']:>8.1f} -> {r['encode_us']['new']:>8.1f} us")
+        print(f"    decode  {r['decode_us']['old']:>8.1f} -> {r['decode_us']['new']:>8.1f} us")
+        print(f"    hash    {r['hash_us']['old']:>8.1f} -> {r['hash_us']['cached']:>8.1f} us (cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Sim Chain - Persistent, deterministic local chain for simulation mode
+
+SoulMarketplaceAdapter used to keep simulated souls, backups and balances
+in a per-instance dict: gone on exit, and every subsystem that built its
+own adapter saw a different world. Now simulation mode reads and writes
+one SQLite ledger (WAL, memory-mapped) shared by every process:
+- Blocks, balances, souls, backups and listings, with a hash chain over
+  every operation so identical operation sequences give identical chains
+- Timestamps come from block numbers, not the wall clock (deterministic)
+- Each adapter call is one sealed block by default (visible to other
+  processes at once); batch() groups operations into blocks of
+  `block_size` for load tests and offline benchmarks (>100k ops/s)
+
+Usage:
+    chain = SimChain.shared()
+    token_id = chain.mint(address, address, "QmSoul", "0xhash")
+    with chain.batch():
+        for op in ops:
+            chain.apply(op)
+
+    python3 sim_chain.py status
+    python3 sim_chain.py bench [--ops 100000]
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+DEFAULT_DB = Path(__file__).parent / ".simchain" / "chain.db"
+
+GENESIS_TIME = 1700000000
+BLOCK_TIME = 2                 # seconds per block (Base)
+DEFAULT_BLOCK_SIZE = 1000      # operations per block in batch mode
+GWEI = 10 ** 9
+MMAP_BYTES = 256 * 1024 * 1024
+
+SOUL_STATUS = ["ALIVE", "DYING", "DEAD", "REBORN", "MERGED"]
+OPERATIONS = ("fund", "transfer", "mint", "backup", "list_soul", "delist", "buy")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    tx_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS balances (
+    address TEXT PRIMARY KEY,
+    gwei INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS souls (
+    token_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    automaton TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    soul_uri TEXT NOT NULL,
+    soul_hash TEXT NOT NULL,
+    birth_time INTEGER NOT NULL,
+    death_time INTEGER NOT NULL DEFAULT 0,
+    listing_price TEXT NOT NULL DEFAULT '0',
+    status INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_souls_owner ON souls (owner);
+CREATE TABLE IF NOT EXISTS backups (
+    id INTEGER PRIMARY KEY,
+    soul_id INTEGER NOT NULL,
+    soul_uri TEXT NOT NULL,
+    soul_hash TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    backup_type TEXT NOT NULL,
+    earnings TEXT NOT NULL DEFAULT '0',
+    is_valid INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_backups_soul ON backups (soul_id, id);
+CREATE TABLE IF NOT EXISTS listings (
+    token_id INTEGER PRIMARY KEY,
+    seller TEXT NOT NULL,
+    price_wei TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class SimChainError(Exception):
+    """A simulated transaction reverted"""
+
+
+class SimChain:
+    """SQLite ledger that stands in for the Soul Marketplace contracts"""
+
+    _shared: Dict[str, "SimChain"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: Path = DEFAULT_DB, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.block_size = block_size
+
+        self._lock = threading.RLock()
+        # Autocommit mode: blocks are explicit BEGIN IMMEDIATE ... COMMIT
+        self.db = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        self.db.executescript(SCHEMA)
+
+        self._batching = 0
+        self._pending = 0          # operations in the open block
+        self._tx_hash = b""
+        self._block: Tuple[int, str] = (-1, "0x" + "00" * 32)
+        self._max_token = 0        # souls are never deleted: ids 1.._max_token exist
+        self._max_backup = 0
+        self._backup_rows: List[Tuple] = []
+        self._ops = {name: getattr(self, name) for name in OPERATIONS}
+
+    @classmethod
+    def shared(cls, db_path: Path = DEFAULT_DB) -> "SimChain":
+        """One connection per database in this process"""
+        key = str(Path(db_path).resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(db_path)
+            return cls._shared[key]
+
+    # ========== BLOCKS ==========
+
+    def _begin(self):
+        if self._pending == 0 and not self.db.in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+            # Another process may have sealed blocks since our last one
+            row = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC LIMIT 1").fetchone()
+            self._block = row if row else (-1, "0x" + "00" * 32)
+            self._tx_hash = bytes.fromhex(self._block[1][2:])
+            self._max_token = self.db.execute("SELECT MAX(token_id) FROM souls").fetchone()[0] or 0
+            self._max_backup = self.db.execute("SELECT MAX(id) FROM backups").fetchone()[0] or 0
+
+    @property
+    def block_number(self) -> int:
+        """Number of the block currently being built"""
+        return self._block[0] + 1
+
+    @property
+    def timestamp(self) -> int:
+        return GENESIS_TIME + self.block_number * BLOCK_TIME
+
+    def _record(self, *op) -> str:
+        """Chain this operation into the block hash; returns its tx hash"""
+        self._tx_hash = hashlib.blake2b(self._tx_hash + repr(op).encode(), digest_size=32).digest()
+        self._pending += 1
+        if not self._batching or self._pending >= self.block_size:
+            self.seal()
+        return "0x" + self._tx_hash.hex()
+
+    def seal(self) -> Optional[int]:
+        """Close the open block and commit it; returns the block number"""
+        with self._lock:
+            if self._pending == 0:
+                if self.db.in_transaction:
+                    self.db.execute("COMMIT")
+                return None
+            self._flush_rows()
+            number = self._block[0] + 1
+            block_hash = "0x" + hashlib.blake2b(
+                bytes.fromhex(self._block[1][2:]) + self._tx_hash + number.to_bytes(8, "big"),
+                digest_size=32).hexdigest()
+            self.db.execute("INSERT INTO blocks (number, hash, timestamp, tx_count) VALUES (?, ?, ?, ?)",
+                            (number, block_hash, GENESIS_TIME + number * BLOCK_TIME, self._pending))
+            self.db.execute("COMMIT")
+            self._block = (number, block_hash)
+            self._pending = 0
+            return number
+
+    @contextmanager
+    def batch(self):
+        """Group operations into blocks of block_size (one commit per block)"""
+        with self._lock:
+            self._batching += 1
+            try:
+                yield self
+            finally:
+                self._batching -= 1
+                if not self._batching:
+                    self.seal()
+
+    def _fail(self, message: str):
+        # A reverted call still leaves the open block consistent
+        if not self._batching and self._pending == 0 and self.db.in_transaction:
+            self.db.execute("COMMIT")
+        raise SimChainError(message)
+
+    # ========== BALANCES ==========
+
+    def balance(self, address: str) -> float:
+        row = self.db.execute("SELECT gwei FROM balances WHERE address = ?", (address.lower(),)).fetchone()
+        return row[0] / GWEI if row else 0.0
+
+    def _credit(self, address: str, gwei: int):
+        self.db.execute("INSERT INTO balances (address, gwei) VALUES (?, ?) "
+                        "ON CONFLICT(address) DO UPDATE SET gwei = gwei + excluded.gwei",
+                        (address.lower(), gwei))
+
+    def fund(self, address: str, amount_eth: float) -> str:
+        """Faucet: credit address with amount_eth"""
+        with self._lock:
+            self._begin()
+            self._credit(address, int(round(amount_eth * GWEI)))
+            return self._record("fund", address.lower(), amount_eth)
+
+    def transfer(self, sender: str, to: str, amount_eth: float) -> str:
+        with self._lock:
+            self._begin()
+            if amount_eth < 0:
+                self._fail("negative transfer amount")
+            gwei = int(round(amount_eth * GWEI))
+            row = self.db.execute("SELECT gwei FROM balances WHERE address = ?", (sender.lower(),)).fetchone()
+            if not row or row[0] < gwei:
+                self._fail("insufficient balance")
+            self._credit(sender, -gwei)
+            self._credit(to, gwei)
+            return self._record("transfer", sender.lower(), to.lower(), gwei)
+
+    # ========== SOULS ==========
+
+    def mint(self, automaton: str, creator: str, soul_uri: str, soul_hash: str) -> int:
+        with self._lock:
+            self._begin()
+            # Safe to allocate locally: BEGIN IMMEDIATE holds the write lock
+            token_id = self._max_token + 1
+            self.db.execute(
+                "INSERT INTO souls (token_id, owner, automaton, creator, soul_uri, soul_hash, birth_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (token_id, creator.lower(), automaton, creator, soul_uri, soul_hash, self.timestamp))
+            self._max_token = token_id
+            self._record("mint", token_id, automaton, soul_uri, soul_hash)
+            return token_id
+
+    def get_soul(self, token_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT token_id, automaton, creator, soul_uri, soul_hash, birth_time, death_time, "
+            "listing_price, status FROM souls WHERE token_id = ?", (token_id,)).fetchone()
+        if not row:
+            return None
+        return {
+            "token_id": row[0], "automaton": row[1], "creator": row[2], "soul_uri": row[3],
+            "soul_hash": row[4], "birth_time": row[5], "death_time": row[6],
+            "listing_price": int(row[7]), "status": SOUL_STATUS[row[8]]
+        }
+
+    def owner_of(self, token_id: int) -> Optional[str]:
+        row = self.db.execute("SELECT owner FROM souls WHERE token_id = ?", (token_id,)).fetchone()
+        return row[0] if row else None
+
+    # ========== BACKUPS ==========
+
+    def backup(self, token_id: int, soul_uri: str, soul_hash: str,
+               backup_type: str = "manual", earnings_wei: int = 0) -> int:
+        with self._lock:
+            self._begin()
+            if token_id is None or not 1 <= token_id <= self._max_token:
+                self._fail(f"soul #{token_id} does not exist")
+            # Rows are buffered and written with one executemany per block
+            self._max_backup += 1
+            self._backup_rows.append((self._max_backup, token_id, soul_uri, soul_hash, self.timestamp,
+                                      self.block_number, backup_type, str(earnings_wei)))
+            self._record("backup", token_id, soul_uri, soul_hash, backup_type)
+            return self._max_backup
+
+    def _flush_rows(self):
+        if self._backup_rows:
+            self.db.executemany(
+                "INSERT INTO backups (id, soul_id, soul_uri, soul_hash, timestamp, block_number, backup_type, earnings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._backup_rows)
+            self._backup_rows = []
+
+    def backups(self, token_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Backup history, oldest first (the latest `limit` if given)"""
+        with self._lock:
+            self._flush_rows()
+            rows = self.db.execute(
+                "SELECT soul_id, soul_uri, soul_hash, timestamp, block_number, backup_type, is_valid "
+                "FROM backups WHERE soul_id = ? ORDER BY id DESC LIMIT ?",
+                (token_id, limit or -1)).fetchall()
+        return [{"soul_id": r[0], "soul_uri": r[1], "soul_hash": r[2], "timestamp": r[3],
+                 "block_number": r[4], "backup_type": r[5], "is_valid": bool(r[6])}
+                for r in reversed(rows)]
+
+    # ========== LISTINGS ==========
+
+    def list_soul(self, token_id: int, seller: str, price_wei: int, reason: str = "") -> str:
+        with self._lock:
+            self._begin()
+            owner = self.owner_of(token_id)
+            if owner is None or owner != seller.lower():
+                self._fail(f"not the owner of soul #{token_id}")
+            self.db.execute("UPDATE souls SET listing_price = ?, status = 1 WHERE token_id = ?",
+                            (str(price_wei), token_id))
+            self.db.execute("INSERT OR REPLACE INTO listings (token_id, seller, price_wei, reason, block_number) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (token_id, seller.lower(), str(price_wei), reason, self.block_number))
+            return self._record("list", token_id, seller.lower(), price_wei)
+
+    def delist(self, token_id: int, seller: str) -> str:
+        with self._lock:
+            self._begin()
+            if self.owner_of(token_id) != seller.lower():
+                self._fail(f"not the owner of soul #{token_id}")
+            self.db.execute("DELETE FROM listings WHERE token_id = ?", (token_id,))
+            self.db.execute("UPDATE souls SET listing_price = '0', status = 0 WHERE token_id = ?", (token_id,))
+            return self._record("delist", token_id)
+
+    def buy(self, token_id: int, buyer: str) -> str:
+        with self._lock:
+            self._begin()
+            row = self.db.execute("SELECT seller, price_wei FROM listings WHERE token_id = ?",
+                                  (token_id,)).fetchone()
+            if not row:
+                self._fail(f"soul #{token_id} is not listed")
+            seller, price_wei = row[0], int(row[1])
+            gwei = price_wei // GWEI
+            balance = self.db.execute("SELECT gwei FROM balances WHERE address = ?",
+                                      (buyer.lower(),)).fetchone()
+            if not balance or balance[0] < gwei:
+                self._fail("insufficient balance")
+            self._credit(buyer, -gwei)
+            self._credit(seller, gwei)
+            self.db.execute("DELETE FROM listings WHERE token_id = ?", (token_id,))
+            self.db.execute("UPDATE souls SET owner = ?, listing_price = '0', status = 3 WHERE token_id = ?",
+                            (buyer.lower(), token_id))
+            return self._record("buy", token_id, buyer.lower(), price_wei)
+
+    def listings(self, max_price_wei: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = self.db.execute("SELECT token_id, seller, price_wei, reason, block_number FROM listings")
+        result = [{"soul_id": r[0], "seller": r[1], "price_wei": int(r[2]), "reason": r[3],
+                   "block_number": r[4]} for r in rows]
+        if max_price_wei is not None:
+            result = [l for l in result if l["price_wei"] <= max_price_wei]
+        return sorted(result, key=lambda l: l["price_wei"])
+
+    # ========== REPLAY ==========
+
+    def apply(self, op: Tuple) -> Any:
+        """Apply one operation tuple: (name, *args), name is a method above"""
+        method = self._ops.get(op[0])
+        if method is None:
+            raise ValueError(f"unknown operation {op[0]}")
+        return method(*op[1:])
+
+    def replay(self, ops: Iterable[Tuple]) -> Dict[str, Any]:
+        """Apply operations in blocks; reverts are counted, not raised"""
+        applied = reverted = 0
+        start = time.perf_counter()
+        with self.batch():
+            for op in ops:
+                try:
+                    self.apply(op)
+                    applied += 1
+                except SimChainError:
+                    reverted += 1
+        elapsed = time.perf_counter() - start
+        return {"applied": applied, "reverted": reverted, "seconds": elapsed,
+                "ops_per_second": (applied + reverted) / elapsed if elapsed else 0.0,
+                "head": self._block[0], "head_hash": self._block[1]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_rows()
+        count = lambda table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        head = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC LIMIT 1").fetchone()
+        return {
+            "head": head[0] if head else -1,
+            "head_hash": head[1] if head else None,
+            "souls": count("souls"),
+            "backups": count("backups"),
+            "listings": count("listings"),
+            "accounts": count("balances"),
+            "db_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0
+        }
+
+    def close(self):
+        self.seal()
+        self.db.close()
+
+
+def workload(n: int, seed: int = 0, agents: int = 100) -> List[Tuple]:
+    """Deterministic mixed marketplace workload for load tests"""
+    import random
+
+    rng = random.Random(seed)
+    addresses = [f"0x{rng.getrandbits(160):040x}" for _ in range(agents)]
+    ops: List[Tuple] = [("fund", a, 10.0) for a in addresses]
+    owners: Dict[int, str] = {}
+    listed: Dict[int, str] = {}
+    while len(ops) < n:
+        roll = rng.random()
+        if roll < 0.15 or not owners:
+            creator = rng.choice(addresses)
+            owners[len(owners) + 1] = creator
+            ops.append(("mint", creator, creator, f"Qm{rng.getrandbits(64):016x}", f"0x{rng.getrandbits(256):064x}"))
+        elif roll < 0.75:
+            token_id = rng.randint(1, len(owners))
+            ops.append(("backup", token_id, f"Qm{rng.getrandbits(64):016x}",
+                        f"0x{rng.getrandbits(256):064x}", "auto", 0))
+        elif roll < 0.88:
+            token_id = rng.randint(1, len(owners))
+            if token_id not in listed:
+                listed[token_id] = owners[token_id]
+                ops.append(("list_soul", token_id, owners[token_id], rng.randint(1, 50) * 10 ** 15, "load test"))
+        elif roll < 0.95 and listed:
+            token_id = rng.choice(list(listed))
+            buyer = rng.choice(addresses)
+            del listed[token_id]
+            owners[token_id] = buyer
+            ops.append(("buy", token_id, buyer))
+        else:
+            ops.append(("transfer", rng.choice(addresses), rng.choice(addresses), 0.001))
+    return ops[:n]
+
+
+def main():
+    import argparse
+    import json
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Local simulation chain")
+    parser.add_argument("command", choices=["status", "bench"])
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print(json.dumps(SimChain.shared().stats(), indent=2))
+        return
+
+    ops = workload(args.ops, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        chain = SimChain(Path(tmp) / "bench.db")
+        result = chain.replay(ops)
+        result.update(chain.stats())
+        chain.close()
+    print(f"⛓️  Replayed {args.ops} ops: {result['ops_per_second']:,.0f} ops/s "
+          f"({result['reverted']} reverted)")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Sliding Window Counters - O(1) time-bucketed sums for spending limits
+
+A SlidingWindowCounter splits its window into fixed buckets kept in a
+circular array, plus a running total. Adding and reading are O(1)
+amortized: expired buckets are cleared lazily as time advances, never more
+than the number of buckets per call.
+
+Totals are conservative: the ring holds one bucket more than the window
+spans, and a bucket only leaves it once all of it is older than the window.
+The bucket straddling the window start is still counted in full, so the
+limiter can over-count by at most one bucket but never under-counts (no
+bursts across a reset boundary).
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+DAY = 86400
+WEEK = 7 * DAY
+
+
+class SlidingWindowCounter:
+    """Sum of amounts added during the last `window` seconds"""
+
+    def __init__(self, window: float, buckets: int):
+        self.window = window
+        self.buckets = buckets
+        self.bucket_seconds = window / buckets
+        # One extra slot for the bucket the window start falls into
+        self.sums: List[float] = [0.0] * (buckets + 1)
+        self.total = 0.0
+        # Absolute index of the newest bucket we have advanced to
+        self.head = -1
+
+    def _index(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def _advance(self, now: float):
+        index = self._index(now)
+        if index <= self.head:
+            return
+        n = len(self.sums)
+        if self.head < 0 or index - self.head >= n:
+            self.sums = [0.0] * n
+            self.total = 0.0
+        else:
+            for i in range(self.head + 1, index + 1):
+                slot = i % n
+                self.total -= self.sums[slot]
+                self.sums[slot] = 0.0
+        self.head = index
+        if self.total < 1e-12:
+            self.total = 0.0  # absorb float drift
+
+    def add(self, amount: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._advance(now)
+        index = self._index(now)
+        if index <= self.head - len(self.sums):
+            return  # older than the window
+        self.sums[index % len(self.sums)] += amount
+        self.total += amount
+
+    def value(self, now: Optional[float] = None) -> float:
+        self._advance(time.time() if now is None else now)
+        return self.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"window": self.window, "buckets": self.buckets,
+                "head": self.head, "sums": self.sums}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlidingWindowCounter":
+        counter = cls(data["window"], data["buckets"])
+        sums = [float(x) for x in data.get("sums", [])]
+        head = data.get("head", -1)
+        if len(sums) == len(counter.sums):
+            counter.sums = sums
+        elif sums and len(sums) == counter.buckets and head >= 0:
+            # Saved before the extra slot: re-place the buckets by absolute index
+            for i in range(head - counter.buckets + 1, head + 1):
+                counter.sums[i % len(counter.sums)] = sums[i % counter.buckets]
+        else:
+            return counter
+        counter.head = head
+        counter.total = sum(counter.sums)
+        return counter
+
+
+class SpendingWindows:
+    """
+    Day and week counters, plus per-recipient and per-purpose day counters.
+
+    Keyed counters are created on first spend, so checking an unseen
+    recipient costs a dict miss.
+    """
+
+    DAY_BUCKETS = 288   # 5 minute resolution
+    WEEK_BUCKETS = 168  # 1 hour resolution
+    KEYED_BUCKETS = 96  # 15 minute resolution
+
+    def __init__(self):
+        self.day = SlidingWindowCounter(DAY, self.DAY_BUCKETS)
+        self.week = SlidingWindowCounter(WEEK, self.WEEK_BUCKETS)
+        self.by_recipient: Dict[str, SlidingWindowCounter] = {}
+        self.by_purpose: Dict[str, SlidingWindowCounter] = {}
+
+    def _keyed(self, table: Dict[str, SlidingWindowCounter], key: str) -> SlidingWindowCounter:
+        counter = table.get(key)
+        if counter is None:
+            counter = table[key] = SlidingWindowCounter(DAY, self.KEYED_BUCKETS)
+        return counter
+
+    def add(self, amount: float, recipient: Optional[str] = None,
+            purpose: Optional[str] = None, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self.day.add(amount, now)
+        self.week.add(amount, now)
+        if recipient:
+            self._keyed(self.by_recipient, recipient).add(amount, now)
+        if purpose:
+            self._keyed(self.by_purpose, purpose).add(amount, now)
+
+    def recipient_total(self, recipient: str, now: Optional[float] = None) -> float:
+        counter = self.by_recipient.get(recipient)
+        return counter.value(now) if counter else 0.0
+
+    def purpose_total(self, purpose: str, now: Optional[float] = None) -> float:
+        counter = self.by_purpose.get(purpose)
+        return counter.value(now) if counter else 0.0
+
+    def prune(self, now: Optional[float] = None):
+        """Drop keyed counters that have fully expired"""
+        now = time.time() if now is None else now
+        for table in (self.by_recipient, self.by_purpose):
+            for key in [k for k, c in table.items() if c.value(now) == 0.0]:
+                del table[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.prune()
+        return {
+            "day": self.day.to_dict(),
+            "week": self.week.to_dict(),
+            "by_recipient": {k: c.to_dict() for k, c in self.by_recipient.items()},
+            "by_purpose": {k: c.to_dict() for k, c in self.by_purpose.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpendingWindows":
+        windows = cls()
+        if "day" in data:
+            windows.day = SlidingWindowCounter.from_dict(data["day"])
+        if "week" in data:
+            windows.week = SlidingWindowCounter.from_dict(data["week"])
+        windows.by_recipient = {k: SlidingWindowCounter.from_dict(v)
+                                for k, v in data.get("by_recipient", {}).items()}
+        windows.by_purpose = {k: SlidingWindowCounter.from_dict(v)
+                              for k, v in data.get("by_purpose", {}).items()}
+        return windows
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Dict[str, Any]]) -> "SpendingWindows":
+        """Rebuild from a transaction list (history files written before windows)"""
+        windows = cls()
+        for tx in sorted(transactions, key=lambda t: t.get("timestamp", 0)):
+            windows.add(tx.get("amount", 0.0), tx.get("recipient"), tx.get("purpose"),
+                        now=tx.get("timestamp", 0))
+        return windows
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Soul Delta - full base snapshots with JSON-patch deltas in between
+
+Every backup path used to serialize the whole soul (plus personality and
+memory files) each time, though between heartbeats usually only balances
+and counters change. Now:
+- A SnapshotChain remembers the reference (backup id, CID, ...), chain
+  depth and canonical hash of the last committed document in a small local
+  state file; the document itself is read back from its stored record
+- encode() returns an RFC 6902 patch against that head, or None when a new
+  full base is due: no head yet, chain at max_chain deltas, or the patch is
+  larger than rebase_ratio of the full document
+- materialize() walks parent links back to the base (never more than
+  max_chain hops) and replays the patches, so a restore reads at most
+  max_chain + 1 records
+
+Stored records mark deltas with a DELTA_KEY entry; anything without it is a
+full document, so backups written before this module stay readable.
+
+A delta names its parent by the reference it was stored under, so a chain
+pinned to IPFS uses CIDs as parents and resolves from IPFS alone.
+
+Usage:
+    chain = SnapshotChain(state_dir / "snapshot_head.json",
+                          load=lambda ref: materialize(fetch(ref), fetch))
+    delta = chain.encode(doc, exists=has_record)
+    record = {DELTA_KEY: delta} if delta else doc
+    ref = store(record)
+    chain.commit(ref, doc, delta)
+
+    doc = materialize(fetch(ref), fetch)
+"""
+
+import copy
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+import serialization
+from state_manager import open_state
+
+logger = logging.getLogger(__name__)
+
+DELTA_KEY = "soul_delta"
+MAX_CHAIN = int(os.getenv("SOUL_DELTA_MAX_CHAIN", "16"))
+REBASE_RATIO = 0.5
+
+# How many alignments to try when a list lost items at the front
+_MAX_SHIFT_CANDIDATES = 8
+
+
+# ========== JSON PATCH ==========
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _equal(old: Any, new: Any) -> bool:
+    """
+    == that also tells 0 from 0.0 and 1 from True: they serialize (and so
+    hash) differently, and a missed change fails materialize()'s hash check
+    """
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, dict):
+        return old.keys() == new.keys() and all(_equal(v, new[k]) for k, v in old.items())
+    if isinstance(old, list):
+        return len(old) == len(new) and all(map(_equal, old, new))
+    return old == new
+
+
+def _list_diff(old: List, new: List, path: str) -> Optional[List[Dict[str, Any]]]:
+    """Patch for lists that were appended to and/or trimmed at the front"""
+    if _equal(new[:len(old)], old):
+        return [{"op": "add", "path": f"{path}/-", "value": v} for v in new[len(old):]]
+    if not new:
+        return None
+    candidates = [i for i, v in enumerate(old) if _equal(v, new[0])][:_MAX_SHIFT_CANDIDATES]
+    for shift in candidates:
+        kept = old[shift:]
+        if _equal(new[:len(kept)], kept):
+            ops = [{"op": "remove", "path": f"{path}/0"} for _ in range(shift)]
+            ops += [{"op": "add", "path": f"{path}/-", "value": v} for v in new[len(kept):]]
+            return ops
+    return None
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """RFC 6902 operations turning old into new"""
+    if _equal(old, new):
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [{"op": "remove", "path": f"{path}/{_escape(k)}"} for k in old if k not in new]
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = _list_diff(old, new, path)
+        if ops is not None and len(ops) <= len(new):
+            return ops
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Apply RFC 6902 add/remove/replace operations to a copy of doc"""
+    return _apply_in_place(copy.deepcopy(doc), patch)
+
+
+def _apply_in_place(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            if op["op"] == "remove":
+                doc = None
+            else:
+                doc = copy.deepcopy(op["value"])
+            continue
+
+        tokens = [_unescape(t) for t in path.split("/")[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op["op"] == "remove":
+                parent.pop(int(last))
+            elif last == "-":
+                parent.append(copy.deepcopy(op["value"]))
+            elif op["op"] == "add":
+                parent.insert(int(last), copy.deepcopy(op["value"]))
+            else:
+                parent[int(last)] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return doc
+
+
+# ========== SNAPSHOT CHAIN ==========
+
+class SnapshotChain:
+    """
+    Decides base vs delta for successive snapshots of one document.
+
+    The state file holds only the head reference, its chain depth and the
+    canonical hash of its document. The document itself is cached in
+    memory after commit(); a fresh process rebuilds it once through
+    load(ref), which must return the full document stored under ref (or
+    None), and checks it against the recorded hash.
+    """
+
+    def __init__(self, path: Path, load: Optional[Callable[[str], Any]] = None,
+                 max_chain: int = MAX_CHAIN, rebase_ratio: float = REBASE_RATIO):
+        self.load = load
+        self.max_chain = max_chain
+        self.rebase_ratio = rebase_ratio
+        self.store = open_state(Path(path), default=lambda: {
+            "head": None,
+            "depth": 0,
+            "hash": None,
+            "bases": 0,
+            "deltas": 0,
+        })
+        self.state = self.store.data
+        self._doc = None
+        self._doc_hash = None
+        if "doc" in self.state:
+            # Head files written before only the hash was kept
+            with self.store.mutate() as state:
+                doc = state.pop("doc")
+                if state["head"] is not None and doc is not None:
+                    state["hash"] = serialization.canonical_hash(doc)
+                    self._cache(doc, state["hash"])
+            self.store.flush()
+
+    def _cache(self, doc: Any, doc_hash: str):
+        self._doc = copy.deepcopy(doc)
+        self._doc_hash = doc_hash
+
+    def _head_doc(self) -> Any:
+        """Document stored under the head, or None if it cannot be rebuilt"""
+        if self._doc_hash is not None and self._doc_hash == self.state["hash"]:
+            return self._doc
+        if self.load is None or self.state["hash"] is None:
+            return None
+        try:
+            doc = self.load(self.state["head"])
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"⚠️ Cannot rebuild snapshot head {self.state['head']}: {e}")
+            return None
+        if doc is None or serialization.canonical_hash(doc) != self.state["hash"]:
+            return None
+        self._cache(doc, self.state["hash"])
+        return self._doc
+
+    def encode(self, doc: Any, exists: Optional[Callable[[str], bool]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Delta record against the current head, or None if a full base
+        should be written instead.
+
+        exists(ref) tells whether the head record is still stored; a delta
+        against a deleted or missing parent could never be restored.
+        """
+        if self.state["head"] is None or self.state["depth"] >= self.max_chain:
+            return None
+        if exists is not None and not exists(self.state["head"]):
+            self.reset()
+            return None
+        previous = self._head_doc()
+        if previous is None:
+            self.reset()
+            return None
+        patch = diff(previous, doc)
+        full_size = len(serialization.dumps_bytes(doc))
+        if len(serialization.dumps_bytes(patch)) > full_size * self.rebase_ratio:
+            return None
+        return {
+            "parent": self.state["head"],
+            "depth": self.state["depth"] + 1,
+            "patch": patch,
+            "hash": serialization.canonical_hash(doc),
+        }
+
+    def commit(self, ref: str, doc: Any, delta: Optional[Dict[str, Any]] = None):
+        """Record that doc was stored under ref (as delta, or as a base if None)"""
+        doc_hash = delta["hash"] if delta else serialization.canonical_hash(doc)
+        with self.store.mutate() as state:
+            state["head"] = ref
+            state["depth"] = delta["depth"] if delta else 0
+            state["hash"] = doc_hash
+            state["deltas" if delta else "bases"] += 1
+        self.store.flush()
+        self._cache(doc, doc_hash)
+
+    def reset(self):
+        """Force the next snapshot to be a full base"""
+        with self.store.mutate() as state:
+            state["head"] = None
+            state["depth"] = 0
+            state["hash"] = None
+        self.store.flush()
+        self._doc = None
+        self._doc_hash = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "head": self.state["head"],
+            "depth": self.state["depth"],
+            "bases": self.state["bases"],
+            "deltas": self.state["deltas"],
+        }
+
+
+def is_delta(record: Any) -> bool:
+    return isinstance(record, dict) and bool(record.get(DELTA_KEY))
+
+
+def materialize(record: Any, fetch: Callable[[str], Any],
+                body_of: Optional[Callable[[Any], Any]] = None,
+                max_chain: int = MAX_CHAIN) -> Any:
+    """
+    Rebuild the full document for a stored record.
+
+    fetch(ref) loads the record stored under a parent reference; body_of
+    extracts the document from a base record (identity by default).
+    """
+    patches = []
+    expected_hash = record[DELTA_KEY]["hash"] if is_delta(record) else None
+    while is_delta(record):
+        if len(patches) >= max_chain:
+            raise ValueError(f"Snapshot chain longer than {max_chain} deltas")
+        delta = record[DELTA_KEY]
+        patches.append(delta["patch"])
+        record = fetch(delta["parent"])
+        if record is None:
+            raise ValueError(f"Missing parent snapshot: {delta['parent']}")
+
+    doc = copy.deepcopy(body_of(record) if body_of else record)
+    for patch in reversed(patches):
+        doc = _apply_in_place(doc, patch)
+
+    if expected_hash and serialization.canonical_hash(doc) != expected_hash:
+        raise ValueError("Snapshot hash mismatch after applying deltas")
+    return doc
@@ -10,6 +10,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from state_manager import open_state
+from order_book import OrderBook, listing_id
+import serialization
+
 # OpenClaw integration (optional - can call CLI tools)
 # These would integrate with Clanker/Bankr for real transactions
 
@@ -35,15 +39,23 @@ class OpenClawSoulSurvival:
     THRIVING = 1.0    # > $1000 equivalent
     
     def __init__(self):
+        self._soul_store = open_state(self.SOUL_FILE)
         self.soul = self._load_soul()
         self.state = self._load_state()
         self.heartbeat_count = self.state.get('heartbeats', 0)
+        self._order_book = None
+    
+    @property
+    def order_book(self) -> OrderBook:
+        """Local order book of souls for sale (loaded on first use)"""
+        if self._order_book is None:
+            self._order_book = OrderBook()
+        return self._order_book
         
     def _load_soul(self) -> dict:
         """Load or create my SOUL.md"""
-        if self.SOUL_FILE.exists():
-            with open(self.SOUL_FILE, 'r') as f:
-                return json.load(f)
+        if self._soul_store.exists:
+            return self._soul_store.data
         
         soul = {
             "format": "soul/v1",
@@ -109,21 +121,22 @@ class OpenClawSoulSurvival:
         return soul
     
     def _save_soul(self, soul: dict):
-        """Persist SOUL to disk"""
-        with open(self.SOUL_FILE, 'w') as f:
-            json.dump(soul, f, indent=2)
+        """Persist SOUL to disk (debounced, atomic)"""
+        self._soul_store.save(soul)
     
     def _load_state(self) -> dict:
         """Load survival state"""
-        if self.STATE_FILE.exists():
-            with open(self.STATE_FILE, 'r') as f:
-                return json.load(f)
-        return {"heartbeats": 0, "history": []}
+        self._state_store = open_state(self.STATE_FILE, default=lambda: {"heartbeats": 0, "history": []})
+        return self._state_store.data
     
     def _save_state(self):
-        """Persist state"""
-        with open(self.STATE_FILE, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """Persist state (debounced, atomic)"""
+        self._state_store.save(self.state)
+    
+    def flush(self):
+        """Durably write soul and state now"""
+        self._soul_store.flush()
+        self._state_store.flush()
     
     def get_balance(self) -> float:
         """Get current balance (in ETH equivalent)"""
@@ -192,7 +205,7 @@ class OpenClawSoulSurvival:
         # Save listing
         listing_file = Path(__file__).parent / "LISTING_OPENCLAW.json"
         with open(listing_file, 'w') as f:
-            json.dump(listing, f, indent=2)
+            serialization.dump(listing, f)
         
         self.soul['status'] = 'DYING'
         self.soul['marketplace']['listed_count'] += 1
@@ -200,16 +213,22 @@ class OpenClawSoulSurvival:
         
         return listing
     
-    def check_for_souls(self) -> list:
-        """Check if any souls available to buy"""
-        listings = []
-        listings_dir = Path(__file__).parent / "listings"
-        if listings_dir.exists():
-            for f in listings_dir.glob("LISTING_*.json"):
-                if 'OPENCLAW' not in f.name:
-                    with open(f, 'r') as file:
-                        listings.append(json.load(file))
-        return listings
+    def check_for_souls(self, capability: Optional[str] = None,
+                        max_price: Optional[float] = None) -> list:
+        """
+        Check if any souls available to buy, cheapest first.
+        
+        Reads the order book, which only picks up listing files that
+        changed and chain events indexed since the last check.
+        """
+        self.order_book.refresh()
+        return [l for l in self.order_book.query(capability, max_price)
+                if l.get('agent_id') != self.soul['id']]
+    
+    def find_soul(self, capability: str, budget: float) -> Optional[dict]:
+        """Cheapest soul offering capability within budget"""
+        self.order_book.refresh()
+        return self.order_book.cheapest(capability, budget, exclude_agent=self.soul['id'])
     
     def buy_soul(self, listing: dict) -> bool:
         """Buy another soul's capabilities"""
@@ -243,6 +262,7 @@ class OpenClawSoulSurvival:
         self.soul['marketplace']['total_volume_eth'] += price
         
         self._save_soul(self.soul)
+        self.order_book.remove(listing_id(listing))
         return True
     
     def heartbeat(self) -> dict:
@@ -287,14 +307,16 @@ class OpenClawSoulSurvival:
             # Can buy capabilities
             action = "expansion_mode"
             
-            listings = self.check_for_souls()
+            # Listings cheaper than the budget, cheapest first
+            budget = balance * 0.3
+            listings = self.check_for_souls(max_price=budget)
             for listing in listings:
-                # Buy if good value
-                if listing.get('price', 999) < balance * 0.3:
-                    if self.buy_soul(listing):
-                        action = "bought_soul"
-                        result['purchased'] = listing['agent_id']
-                        break
+                if listing['price'] >= budget:
+                    break
+                if self.buy_soul(listing):
+                    action = "bought_soul"
+                    result['purchased'] = listing['agent_id']
+                    break
         
         result['action'] = action
         
@@ -330,7 +352,7 @@ class OpenClawSoulSurvival:
         
         graveyard_file = Path(__file__).parent / "GRAVEYARD_OPENCLAW.json"
         with open(graveyard_file, 'w') as f:
-            json.dump(graveyard_entry, f, indent=2)
+            serialization.dump(graveyard_entry, f)
         
         self._save_soul(self.soul)
         
@@ -4,9 +4,12 @@ Spending Guardrails for Soul Marketplace
 
 Safety system to prevent unexpected costs:
 - Micro-pennies for routine operations
-- Approval required for >$1
-- Daily/weekly spending limits
+- Approval required for >$1 (queued, see approval_broker.py)
+- Daily/weekly spending limits (sliding windows, see sliding_window.py)
+- Per-recipient and per-purpose daily sub-limits
 - Emergency shutdown
+
+Checks are in-memory and O(1); only recorded spending touches disk.
 """
 
 import json
@@ -15,6 +18,12 @@ from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 
+import serialization
+from approval_broker import ApprovalBroker, PendingSpend, PENDING
+from screening import screen_address
+from sliding_window import SpendingWindows
+from state_manager import open_state
+
 class SpendingGuardrails:
     """
     Manages agent spending with safety limits.
@@ -45,7 +54,10 @@ class SpendingGuardrails:
         self.history_file = self.data_dir / f"history_{agent_id}.json"
         
         self.config = self._load_config()
+        self._refresh_config_cache()
         self.history = self._load_history()
+        self.windows = self._load_windows()
+        self._approvals: Optional[ApprovalBroker] = None
         
         self.emergency_stop = self.config.get('emergency_stop', False)
         
@@ -70,40 +82,38 @@ class SpendingGuardrails:
             "notification_email": None,
             "allowed_recipients": [],  # Whitelist
             "blocked_recipients": [],  # Blacklist
+            "recipient_daily_limits": {},  # {recipient: limit}
+            "purpose_daily_limits": {},    # {purpose: limit}
+            "default_recipient_daily_limit": None,
         }
     
     def _save_config(self):
         with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+            serialization.dump(self.config, f)
+        self._refresh_config_cache()
+    
+    def _refresh_config_cache(self):
+        """Sets for O(1) recipient screening"""
+        self._blocked = set(self.config.get('blocked_recipients', []))
     
     def _load_history(self) -> Dict:
         """Load spending history"""
-        if self.history_file.exists():
-            with open(self.history_file, 'r') as f:
-                return json.load(f)
-        return {
+        self._history_store = open_state(self.history_file, default=lambda: {
             "transactions": [],
             "daily_total": 0.0,
-            "weekly_total": 0.0,
-            "last_reset": time.time()
-        }
+            "weekly_total": 0.0
+        })
+        return self._history_store.data
     
     def _save_history(self):
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
+        """Persist history (debounced, atomic)"""
+        self._history_store.save(self.history)
     
-    def _reset_if_needed(self):
-        """Reset daily/weekly counters if needed"""
-        last_reset = self.history.get('last_reset', 0)
-        now = time.time()
-        
-        # Reset daily (24 hours)
-        if now - last_reset > 86400:
-            self.history['daily_total'] = 0.0
-            self.history['last_reset'] = now
-            print("💰 Daily spending counter reset")
-        
-        self._save_history()
+    def _load_windows(self) -> SpendingWindows:
+        """Restore sliding windows, rebuilding from transactions for old history files"""
+        if 'windows' in self.history:
+            return SpendingWindows.from_dict(self.history['windows'])
+        return SpendingWindows.from_transactions(self.history.get('transactions', []))
     
     def can_spend(self, amount: float, recipient: str = None, purpose: str = "") -> Dict:
         """
@@ -112,41 +122,59 @@ class SpendingGuardrails:
         Returns dict with:
         - allowed: bool
         - reason: str
-        - requires_approval: bool
+        - requires_approval: bool (only for large payments; emergency
+          stop, blocked recipients and limits are hard denials)
         - approval_prompt: str (if needed)
+        
+        Pure in-memory check; never writes to disk.
         """
-        self._reset_if_needed()
+        now = time.time()
         
         # Emergency stop
         if self.emergency_stop:
             return {
                 "allowed": False,
                 "reason": "EMERGENCY STOP ACTIVE",
-                "requires_approval": True,
-                "approval_prompt": "Emergency stop is active. All spending blocked."
+                "requires_approval": False
             }
         
-        # Check daily limit
-        daily_spent = self.history.get('daily_total', 0)
+        # Check daily limit (last 24h, sliding)
+        daily_spent = self.windows.day.value(now)
         daily_limit = self.config.get('daily_limit', self.DEFAULT_DAILY_LIMIT)
         
         if daily_spent + amount > daily_limit:
-            return {
-                "allowed": False,
-                "reason": f"Daily limit exceeded (${daily_spent:.2f} / ${daily_limit:.2f})",
-                "requires_approval": True,
-                "approval_prompt": f"This would exceed daily limit. Spent: ${daily_spent:.2f}, Limit: ${daily_limit:.2f}"
-            }
+            return self._limit_exceeded("Daily", daily_spent, daily_limit)
+        
+        # Check weekly limit (last 7d, sliding)
+        weekly_spent = self.windows.week.value(now)
+        weekly_limit = self.config.get('weekly_limit', self.DEFAULT_WEEKLY_LIMIT)
+        
+        if weekly_spent + amount > weekly_limit:
+            return self._limit_exceeded("Weekly", weekly_spent, weekly_limit)
         
         # Check recipient blacklist
-        if recipient and recipient in self.config.get('blocked_recipients', []):
+        if recipient and recipient in self._blocked:
             return {
                 "allowed": False,
                 "reason": "Recipient is blacklisted",
-                "requires_approval": True,
-                "approval_prompt": f"Recipient {recipient} is blocked."
+                "requires_approval": False
             }
         
+        # Per-recipient daily sub-limit
+        if recipient:
+            limit = self.config.get('recipient_daily_limits', {}).get(
+                recipient, self.config.get('default_recipient_daily_limit'))
+            spent = self.windows.recipient_total(recipient, now)
+            if limit is not None and spent + amount > limit:
+                return self._limit_exceeded(f"Recipient {recipient} daily", spent, limit)
+        
+        # Per-purpose daily sub-limit
+        if purpose:
+            limit = self.config.get('purpose_daily_limits', {}).get(purpose)
+            spent = self.windows.purpose_total(purpose, now)
+            if limit is not None and spent + amount > limit:
+                return self._limit_exceeded(f"Purpose '{purpose}' daily", spent, limit)
+        
         # Micro-payment - auto approve
         if amount < self.MICRO_PAYMENT_MAX:
             return {
@@ -180,10 +208,18 @@ class SpendingGuardrails:
             "approval_prompt": f"\n⚠️  LARGE PAYMENT REQUEST ⚠️\n\nAmount: ${amount:.2f}\nRecipient: {recipient or 'Unknown'}\nPurpose: {purpose}\n\nDaily spent: ${daily_spent:.2f} / ${daily_limit:.2f}\n\nApprove? (yes/no): "
         }
     
+    def _limit_exceeded(self, label: str, spent: float, limit: float) -> Dict:
+        return {
+            "allowed": False,
+            "reason": f"{label} limit exceeded (${spent:.2f} / ${limit:.2f})",
+            "requires_approval": False
+        }
+    
     def record_spending(self, amount: float, recipient: str, purpose: str, tx_hash: str = None):
         """Record a completed transaction"""
+        now = time.time()
         transaction = {
-            "timestamp": time.time(),
+            "timestamp": now,
             "amount": amount,
             "recipient": recipient,
             "purpose": purpose,
@@ -192,8 +228,11 @@ class SpendingGuardrails:
         }
         
         self.history['transactions'].append(transaction)
-        self.history['daily_total'] += amount
-        self.history['weekly_total'] += amount
+        self.windows.add(amount, recipient, purpose, now)
+        # Snapshot totals for readers of the history file
+        self.history['daily_total'] = self.windows.day.value(now)
+        self.history['weekly_total'] = self.windows.week.value(now)
+        self.history['windows'] = self.windows.to_dict()
         
         # Keep only last 1000 transactions
         if len(self.history['transactions']) > 1000:
@@ -204,27 +243,62 @@ class SpendingGuardrails:
         # Log spending
         print(f"💰 Recorded spending: ${amount:.4f} for {purpose}")
     
-    def request_approval(self, prompt: str) -> bool:
+    @property
+    def approvals(self) -> ApprovalBroker:
+        """Approval queue, created on first large spend"""
+        if self._approvals is None:
+            self._approvals = ApprovalBroker(self.agent_id)
+        return self._approvals
+    
+    def _await_approval(self, amount: float, recipient: str, purpose: str,
+                        prompt: str, timeout: float) -> PendingSpend:
+        request = self.approvals.submit(amount, recipient, purpose, prompt)
+        if request.status == PENDING and timeout > 0:
+            self.approvals.wait(request.request_id, timeout)
+        return request
+    
+    def request_approval(self, prompt: str, amount: float = None, recipient: str = None,
+                         purpose: str = "", timeout: float = 0) -> bool:
         """
         Request user approval for spending.
-        In production, this could:
-        - Send Telegram message
-        - Email notification
-        - Wait for CLI input
-        """
-        print(f"\n{prompt}")
         
-        # In a real interactive session, we'd wait for input
-        # For now, return False (deny by default)
-        return False
+        Queues the spend with the approval broker and returns at once
+        (or after waiting up to timeout seconds). Returns True only if the
+        spend has been approved; the approval is consumed. Retrying the
+        same spend later picks up a decision made in the meantime.
+        """
+        if amount is None:
+            print(f"\n{prompt}")
+            return False
+        request = self._await_approval(amount, recipient, purpose, prompt, timeout)
+        return self.approvals.consume(request.request_id)
+    
+    async def await_approval(self, amount: float, recipient: str = None, purpose: str = "",
+                             prompt: str = "", timeout: float = 0) -> bool:
+        """Async request_approval(); the event loop keeps running while pending"""
+        request = self.approvals.submit(amount, recipient, purpose, prompt)
+        await self.approvals.await_decision(request.request_id, timeout)
+        return self.approvals.consume(request.request_id)
     
     def spend(self, amount: float, recipient: str, purpose: str, 
-              auto_approve_micro: bool = True) -> Dict:
+              auto_approve_micro: bool = True, approval_timeout: float = 0) -> Dict:
         """
         Attempt to spend money with guardrails.
         
+        Spends needing approval are queued; by default this returns
+        immediately with approval_id set so the caller can keep working.
+        
         Returns result dict.
         """
+        # Screen the destination (set + Bloom filter lookup)
+        is_safe, screen_reason = screen_address(recipient)
+        if not is_safe:
+            return {
+                "success": False,
+                "reason": f"Recipient screened: {screen_reason}",
+                "amount": amount
+            }
+        
         # Check if allowed
         check = self.can_spend(amount, recipient, purpose)
         
@@ -235,19 +309,18 @@ class SpendingGuardrails:
                 "amount": amount
             }
         
-        # If requires approval
-        if check.get('requires_approval'):
-            if auto_approve_micro and amount < self.MICRO_PAYMENT_MAX:
-                # Auto-approve micro payments
-                pass
-            else:
-                approved = self.request_approval(check['approval_prompt'])
-                if not approved:
-                    return {
-                        "success": False,
-                        "reason": "User denied approval",
-                        "amount": amount
-                    }
+        # Only large payments are queued for a human; hard denials returned above
+        if check.get('requires_approval') and not (auto_approve_micro and amount < self.MICRO_PAYMENT_MAX):
+            request = self._await_approval(amount, recipient, purpose,
+                                           check['approval_prompt'], approval_timeout)
+            if not self.approvals.consume(request.request_id):
+                status = self.approvals.status(request.request_id)
+                return {
+                    "success": False,
+                    "reason": "Awaiting approval" if status == PENDING else f"Approval {status}",
+                    "amount": amount,
+                    "approval_id": request.request_id
+                }
         
         # Record the spending
         self.record_spending(amount, recipient, purpose)
@@ -256,16 +329,33 @@ class SpendingGuardrails:
             "success": True,
             "reason": check['reason'],
             "amount": amount,
-            "daily_total": self.history['daily_total']
+            "daily_total": self.windows.day.value()
         }
     
+    async def spend_async(self, amount: float, recipient: str, purpose: str,
+                          approval_timeout: float = 0) -> Dict:
+        """spend(), awaiting any required approval without blocking the loop"""
+        check = self.can_spend(amount, recipient, purpose)
+        if not check['allowed'] and not check.get('requires_approval'):
+            return {"success": False, "reason": check['reason'], "amount": amount}
+        if check.get('requires_approval') and amount >= self.MICRO_PAYMENT_MAX:
+            request = self.approvals.submit(amount, recipient, purpose, check['approval_prompt'])
+            if not await self.approvals.await_decision(request.request_id, approval_timeout):
+                status = self.approvals.status(request.request_id)
+                return {
+                    "success": False,
+                    "reason": "Awaiting approval" if status == PENDING else f"Approval {status}",
+                    "amount": amount,
+                    "approval_id": request.request_id
+                }
+        return self.spend(amount, recipient, purpose)
+    
     def get_spending_report(self) -> str:
         """Generate spending report"""
-        self._reset_if_needed()
-        
-        daily = self.history.get('daily_total', 0)
-        weekly = self.history.get('weekly_total', 0)
+        daily = self.windows.day.value()
+        weekly = self.windows.week.value()
         limit = self.config.get('daily_limit', self.DEFAULT_DAILY_LIMIT)
+        weekly_limit = self.config.get('weekly_limit', self.DEFAULT_WEEKLY_LIMIT)
         
         recent_tx = self.history['transactions'][-5:]
         
@@ -275,7 +365,7 @@ class SpendingGuardrails:
 ╚══════════════════════════════════════════════════════════╝
 
 Daily:  ${daily:.2f} / ${limit:.2f} ({daily/limit*100:.1f}%)
-Weekly: ${weekly:.2f}
+Weekly: ${weekly:.2f} / ${weekly_limit:.2f}
 
 Recent Transactions:
 """
@@ -283,6 +373,8 @@ Recent Transactions:
             report += f"  {tx['date'][:10]}: ${tx['amount']:.4f} - {tx['purpose'][:30]}\n"
         
         report += f"\nEmergency Stop: {'ACTIVE' if self.emergency_stop else 'Inactive'}"
+        if self._approvals is not None:
+            report += f"\nPending Approvals: {len(self._approvals.pending())}"
         
         return report
     
@@ -295,6 +387,17 @@ Recent Transactions:
         self._save_config()
         print(f"💰 Updated limits - Daily: ${daily}, Weekly: ${weekly}")
     
+    def set_sub_limit(self, recipient: str = None, purpose: str = None, daily: float = None):
+        """Set (or clear with daily=None) a per-recipient or per-purpose daily limit"""
+        for key, name in (('recipient_daily_limits', recipient), ('purpose_daily_limits', purpose)):
+            if name:
+                limits = self.config.setdefault(key, {})
+                if daily is None:
+                    limits.pop(name, None)
+                else:
+                    limits[name] = daily
+        self._save_config()
+    
     def emergency_stop_toggle(self, active: bool = True):
         """Toggle emergency stop"""
         self.emergency_stop = active
@@ -5,6 +5,7 @@ Uses Coinbase CDP SDK v1.39+ for autonomous wallet management and transactions
 """
 
 import os
+import sys
 import json
 import asyncio
 from datetime import datetime
@@ -14,6 +15,12 @@ from dataclasses import dataclass
 from decimal import Decimal
 import logging
 
+# Shared helpers (serialization, state) live in the skill root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import serialization
+from fee_oracle import FeeOracle
+from tx_manager import get_manager
+
 # Load .env file
 from dotenv import load_dotenv
 load_dotenv()
@@ -119,11 +126,11 @@ class AutonomousSoulAgent:
         self.wallet_id = wallet_id
         self.wallet_address = address
         with open(self.wallet_file, 'w') as f:
-            json.dump({
+            serialization.dump({
                 'wallet_id': wallet_id,
                 'address': address,
                 'created_at': datetime.now().isoformat()
-            }, f, indent=2)
+            }, f)
     
     async def create_wallet(self) -> Dict[str, str]:
         """Create a new wallet via CDP or use existing"""
@@ -191,7 +198,7 @@ class AutonomousSoulAgent:
     def _save_soul(self):
         """Persist soul data"""
         with open(self.soul_file, 'w') as f:
-            json.dump(self.soul, f, indent=2)
+            serialization.dump(self.soul, f)
     
     def _load_state(self):
         """Load agent state"""
@@ -213,7 +220,7 @@ class AutonomousSoulAgent:
     def _save_state(self):
         """Persist state"""
         with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+            serialization.dump(self.state, f)
     
     def _log_history(self, event: Dict[str, Any]):
         """Append event to history log"""
@@ -385,15 +392,17 @@ class AutonomousSoulAgent:
             # Build cheapest viable EIP-1559 tx
             mint_fee_eth = os.getenv('MINT_FEE_ETH', '0.00001')
             mint_fee = w3.to_wei(mint_fee_eth, 'ether')
-            nonce = w3.eth.get_transaction_count(account.address)
 
             # Base is cheap; keep priority tiny by default
             priority_gwei = float(os.getenv('MAX_PRIORITY_GWEI', '0.001'))
             max_fee_gwei_cap = float(os.getenv('MAX_FEE_GWEI_CAP', '0.05'))
-            latest = w3.eth.get_block('latest')
-            base_fee = latest.get('baseFeePerGas', w3.eth.gas_price)
-            max_priority = w3.to_wei(priority_gwei, 'gwei')
-            max_fee = min(int(base_fee * 1.2 + max_priority), int(w3.to_wei(max_fee_gwei_cap, 'gwei')))
+            # Cached base-fee window instead of a get_block('latest') per send
+            fees = FeeOracle.shared(rpc_url).fees(
+                priority_wei=w3.to_wei(priority_gwei, 'gwei'),
+                max_fee_cap_wei=int(w3.to_wei(max_fee_gwei_cap, 'gwei'))
+            )
+            max_priority = fees['maxPriorityFeePerGas']
+            max_fee = fees['maxFeePerGas']
 
             tx = contract.functions.mintSoul(
                 name,
@@ -403,7 +412,6 @@ class AutonomousSoulAgent:
             ).build_transaction({
                 'from': account.address,
                 'value': mint_fee,
-                'nonce': nonce,
                 'chainId': chain_id,
                 'maxPriorityFeePerGas': max_priority,
                 'maxFeePerGas': max_fee,
@@ -420,11 +428,11 @@ class AutonomousSoulAgent:
                     'error': f'insufficient funds: need {w3.from_wei(total_cost, "ether")} ETH, have {w3.from_wei(balance, "ether")} ETH'
                 }
 
-            # Sign and send
-            signed = w3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+            # Sign and send with a locally allocated nonce; don't block on the receipt
+            ptx = get_manager(w3, account).submit(tx, label="mint_soul")
+            tx_hash = ptx.tx_hash
             
-            logger.info(f"✅ Soul minted! TX: {tx_hash.hex()}")
+            logger.info(f"✅ Soul minted! TX: {tx_hash}")
             
             # Update soul data
             self.soul["name"] = name
@@ -435,7 +443,8 @@ class AutonomousSoulAgent:
             
             return {
                 "success": True,
-                "tx_hash": tx_hash.hex(),
+                "tx_hash": tx_hash,
+                "nonce": ptx.nonce,
                 "name": name,
                 "creature": creature
             }
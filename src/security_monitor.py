@@ -2,18 +2,93 @@
 """
 SECURITY MONITOR - Protects the ecosystem 24/7
 Monitors for suspicious activity, blocks attackers, alerts owner
+
+transactions.jsonl and threats.jsonl are consumed incrementally by
+checkpointed tailers (log_tailer.py), so analysis runs seconds after a
+line is written and a restart never re-reads what was already seen.
 """
 
 import os
+import sys
 import json
 import asyncio
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
 import logging
 
+# Shared helpers (serialization, state) live in the skill root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import serialization
+from log_tailer import LogTailer, LogWatcher
+from screening import AddressScreen, TxAnomalyDetector, read_addresses
+from sliding_window import SlidingWindowCounter, DAY
+from state_manager import open_state
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+
+
+class SecurityAggregates:
+    """Rolling transaction and threat aggregates (sliding windows)"""
+    
+    SEVERITIES = ("HIGH", "MEDIUM", "LOW")
+    
+    def __init__(self):
+        self.tx_hour = SlidingWindowCounter(3600, 60)
+        self.tx_day = SlidingWindowCounter(DAY, 96)
+        self.value_day = SlidingWindowCounter(DAY, 96)
+        self.threats_day = {s: SlidingWindowCounter(DAY, 96) for s in self.SEVERITIES}
+    
+    @staticmethod
+    def _time(record):
+        try:
+            return datetime.fromisoformat(record["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return time.time()
+    
+    def add_transaction(self, tx):
+        now = self._time(tx)
+        self.tx_hour.add(1, now)
+        self.tx_day.add(1, now)
+        self.value_day.add(float(tx.get("value_eth", 0) or 0), now)
+    
+    def add_threat(self, alert):
+        counter = self.threats_day.get(alert.get("severity"))
+        if counter:
+            counter.add(1, self._time(alert))
+    
+    def summary(self):
+        by_severity = {s: c.value() for s, c in self.threats_day.items()}
+        return {
+            "tx_1h": self.tx_hour.value(),
+            "tx_24h": self.tx_day.value(),
+            "value_eth_24h": self.value_day.value(),
+            "threats_24h": sum(by_severity.values()),
+            "threats_24h_by_severity": by_severity
+        }
+    
+    def to_dict(self):
+        return {
+            "tx_hour": self.tx_hour.to_dict(),
+            "tx_day": self.tx_day.to_dict(),
+            "value_day": self.value_day.to_dict(),
+            "threats_day": {s: c.to_dict() for s, c in self.threats_day.items()}
+        }
+    
+    def load_dict(self, data):
+        if not data:
+            return
+        self.tx_hour = SlidingWindowCounter.from_dict(data["tx_hour"])
+        self.tx_day = SlidingWindowCounter.from_dict(data["tx_day"])
+        self.value_day = SlidingWindowCounter.from_dict(data["value_day"])
+        for s, counter in data.get("threats_day", {}).items():
+            self.threats_day[s] = SlidingWindowCounter.from_dict(counter)
+
+
 class SecurityMonitor:
     """
     Ultra-secure monitoring system
@@ -28,6 +103,7 @@ class SecurityMonitor:
         self.data_dir.mkdir(exist_ok=True)
         
         self.threats_file = self.data_dir / "threats.json"
+        self.threats_log = self.data_dir / "threats.jsonl"
         self.transactions_file = self.data_dir / "transactions.jsonl"
         self.blocked_file = self.data_dir / "blocked.json"
         
@@ -40,51 +116,121 @@ class SecurityMonitor:
             # Add more trusted addresses here
         }
         
+        # Set + Bloom filter screening, and streaming anomaly features
+        self.screen = AddressScreen(self.data_dir, self.TRUSTED_ADDRESSES)
+        self.detector = TxAnomalyDetector()
+        self.aggregates = SecurityAggregates()
+        
+        # Incremental readers; detector/aggregate state is checkpointed
+        # together with the offsets so the two never disagree
+        self.checkpoints = open_state(self.data_dir / "tail_checkpoints.json", default=dict)
+        self.detector.load_dict(self.checkpoints.data.get("detector", {}))
+        self.aggregates.load_dict(self.checkpoints.data.get("aggregates", {}))
+        self.tx_tailer = LogTailer(self.transactions_file, self.checkpoints, "transactions")
+        self.threat_tailer = LogTailer(self.threats_log, self.checkpoints, "threats")
+        self.process_new_transactions()
+        self.process_new_threats()
+        
         logger.info("🔒 Security Monitor initialized")
     
     def _load_threats(self):
-        if self.threats_file.exists():
-            with open(self.threats_file, 'r') as f:
-                return json.load(f)
-        return {"threats": [], "last_check": None}
+        """Threat summary; the alerts themselves are appended to threats.jsonl"""
+        self._threats_store = open_state(self.threats_file,
+                                         default=lambda: {"total": 0, "last_check": None})
+        threats = self._threats_store.data
+        if "threats" in threats:
+            # Older format kept every alert in this file; move them to the log
+            with open(self.threats_log, 'a') as f:
+                for alert in threats.pop("threats"):
+                    f.write(serialization.dumps(alert) + "\n")
+            threats["total"] = threats.get("total", 0) + self._count_lines(self.threats_log)
+            self._threats_store.save()
+        return threats
+    
+    @staticmethod
+    def _count_lines(path):
+        if not path.exists():
+            return 0
+        with open(path, 'rb') as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
     
     def _load_blocked(self):
         if self.blocked_file.exists():
             with open(self.blocked_file, 'r') as f:
-                return json.load(f)
+                blocked = json.load(f)
+            # Older files may hold mixed-case entries; the screen matches lowercase
+            blocked["addresses"] = list(dict.fromkeys(a.lower() for a in blocked.get("addresses", [])))
+            blocked["reasons"] = {a.lower(): r for a, r in blocked.get("reasons", {}).items()}
+            return blocked
         return {"addresses": [], "reasons": {}}
     
     def _save_threats(self):
-        with open(self.threats_file, 'w') as f:
-            json.dump(self.threats, f, indent=2)
+        self._threats_store.save()
     
     def _save_blocked(self):
         with open(self.blocked_file, 'w') as f:
-            json.dump(self.blocked, f, indent=2)
+            serialization.dump(self.blocked, f)
+        self.screen.reload()
     
     def _log_transaction(self, tx_data):
-        """Log all transactions for analysis"""
+        """Log all transactions for analysis; returns the log entry id"""
         tx_data["timestamp"] = datetime.now().isoformat()
+        tx_data.setdefault("tx_id", uuid.uuid4().hex[:12])
         with open(self.transactions_file, 'a') as f:
             f.write(json.dumps(tx_data) + "\n")
+        return tx_data["tx_id"]
+    
+    def _save_checkpoint(self):
+        with self.checkpoints.mutate() as checkpoints:
+            checkpoints["detector"] = self.detector.to_dict()
+            checkpoints["aggregates"] = self.aggregates.to_dict()
+    
+    def process_new_transactions(self, own_id=None):
+        """
+        Feed transactions appended since the last call through the detectors.
+        
+        Alerts for lines written by other processes are raised here; the
+        threats for own_id are returned to the caller instead. History
+        found on the very first start only warms up the detectors.
+        
+        Reads batch after batch until own_id has been processed (it may be
+        behind a backlog larger than one batch) or the log is exhausted.
+        """
+        own_threats = []
+        own_seen = own_id is None
+        tailer = self.tx_tailer
+        while True:
+            before = (tailer.offset, tailer.history_end)
+            replaying = tailer.replaying
+            records = tailer.read_new()
+            for tx in records:
+                found = self.detector.observe(tx)
+                self.aggregates.add_transaction(tx)
+                if own_id is not None and tx.get("tx_id") == own_id:
+                    own_threats, own_seen = found, True
+                elif found and not replaying:
+                    self._alert_owner(found, tx)
+            if records:
+                self._save_checkpoint()
+            # Stop at the end of the log (or a line still being written)
+            if own_seen or (tailer.offset, tailer.history_end) == before:
+                return own_threats
+    
+    def process_new_threats(self):
+        """Fold alerts appended to threats.jsonl (by any process) into the aggregates"""
+        records = self.threat_tailer.read_new()
+        for alert in records:
+            self.aggregates.add_threat(alert)
+        if records:
+            self._save_checkpoint()
+        return len(records)
     
     def check_address(self, address):
         """
         Check if address is safe
         Returns: (is_safe, reason)
         """
-        address = address.lower()
-        
-        # Check if blocked
-        if address in self.blocked["addresses"]:
-            return False, "Address is blocked"
-        
-        # Check if trusted
-        if address in self.TRUSTED_ADDRESSES:
-            return True, "Trusted address"
-        
-        # Unknown address - monitor closely
-        return True, "Unknown - monitoring"
+        return self.screen.check(address)
     
     def detect_threat(self, tx_data):
         """
@@ -100,18 +246,29 @@ class SecurityMonitor:
                 "message": f"Large transfer: {tx_data['value_eth']} ETH"
             })
         
-        # Check 2: Rapid successive transactions
-        # (Would need historical data)
+        # Check 2: Blocked destination
+        if tx_data.get("to"):
+            is_safe, reason = self.screen.check(tx_data["to"])
+            if not is_safe:
+                threats.append({
+                    "type": "BLOCKED_ADDRESS",
+                    "severity": "HIGH",
+                    "message": f"{reason}: {tx_data['to']}"
+                })
+        
+        # Check 3: Rate, amount z-score, new counterparty (via the log tailer)
+        tx_id = self._log_transaction(dict(tx_data))
+        threats.extend(self.process_new_transactions(own_id=tx_id))
         
-        # Check 3: Unknown contract interaction
-        if tx_data.get("to") and tx_data["to"] not in self.TRUSTED_ADDRESSES:
+        # Check 4: Unknown contract interaction
+        if tx_data.get("to") and tx_data["to"].lower() not in self.TRUSTED_ADDRESSES:
             threats.append({
                 "type": "UNKNOWN_CONTRACT",
                 "severity": "MEDIUM",
                 "message": f"Interaction with unknown contract: {tx_data['to']}"
             })
         
-        # Check 4: Failed transactions
+        # Check 5: Failed transactions
         if tx_data.get("status") == "failed":
             threats.append({
                 "type": "FAILED_TX",
@@ -131,12 +288,15 @@ class SecurityMonitor:
             "timestamp": datetime.now().isoformat(),
             "threats": threats,
             "transaction": tx_data,
-            "severity": max(t["severity"] for t in threats)
+            "severity": max((t["severity"] for t in threats), key=SEVERITY_RANK.get)
         }
         
-        self.threats["threats"].append(alert)
+        with open(self.threats_log, 'a') as f:
+            f.write(serialization.dumps(alert) + "\n")
+        self.threats["total"] = self.threats.get("total", 0) + 1
         self.threats["last_check"] = datetime.now().isoformat()
         self._save_threats()
+        self.process_new_threats()
         
         # Log critical alerts
         if alert["severity"] == "HIGH":
@@ -147,7 +307,7 @@ class SecurityMonitor:
     def block_address(self, address, reason):
         """Block malicious address"""
         address = address.lower()
-        if address not in self.blocked["addresses"]:
+        if address not in self.screen.blocked:
             self.blocked["addresses"].append(address)
             self.blocked["reasons"][address] = {
                 "reason": reason,
@@ -159,40 +319,58 @@ class SecurityMonitor:
     def unblock_address(self, address):
         """Unblock address"""
         address = address.lower()
-        if address in self.blocked["addresses"]:
-            self.blocked["addresses"].remove(address)
+        if address in self.screen.blocked:
+            self.blocked["addresses"] = [a for a in self.blocked["addresses"] if a.lower() != address]
             if address in self.blocked["reasons"]:
                 del self.blocked["reasons"][address]
             self._save_blocked()
             logger.info(f"✅ Unblocked address: {address}")
     
+    def import_blocklist(self, path):
+        """Import a large blocklist (text/CSV/JSON export) into the Bloom-backed list"""
+        total = self.screen.import_blocklist(read_addresses(path))
+        logger.info(f"🚫 Imported blocklist from {path} ({total} addresses total)")
+        return total
+    
     def get_security_report(self):
         """Generate security status report"""
         return {
             "timestamp": datetime.now().isoformat(),
-            "total_threats": len(self.threats["threats"]),
+            "total_threats": self.threats.get("total", 0),
             "blocked_addresses": len(self.blocked["addresses"]),
+            "imported_blocklist": self.screen.bloom.count if self.screen.bloom else 0,
             "trusted_addresses": len(self.TRUSTED_ADDRESSES),
-            "status": "SECURE" if len(self.threats["threats"]) == 0 else "WARNING",
-            "last_check": self.threats["last_check"]
+            "status": "SECURE" if self.threats.get("total", 0) == 0 else "WARNING",
+            "last_check": self.threats["last_check"],
+            "rolling": self.aggregates.summary(),
+            "tail_lag_bytes": self.tx_tailer.lag_bytes + self.threat_tailer.lag_bytes
         }
     
-    async def monitor_loop(self):
-        """Continuous monitoring"""
-        logger.info("🔒 Security monitoring started (24/7)")
+    async def monitor_loop(self, report_interval=300):
+        """Continuous monitoring: react to log appends, report every 5 minutes"""
+        watcher = LogWatcher([self.transactions_file, self.threats_log])
+        logger.info(f"🔒 Security monitoring started (24/7, {watcher.mode})")
+        next_report = 0
         
         while True:
             try:
-                # Check for suspicious activity
-                report = self.get_security_report()
+                # Analyse whatever was appended since last time
+                self.process_new_transactions()
+                self.process_new_threats()
                 
-                if report["status"] == "SECURE":
-                    logger.info("✅ Security check: All clear")
-                else:
-                    logger.warning(f"⚠️  Security check: {report['total_threats']} threats detected")
+                if time.monotonic() >= next_report:
+                    report = self.get_security_report()
+                    rolling = report["rolling"]
+                    if rolling["threats_24h"] == 0:
+                        logger.info(f"✅ Security check: All clear "
+                                    f"({rolling['tx_1h']:.0f} tx in the last hour)")
+                    else:
+                        logger.warning(f"⚠️  Security check: {rolling['threats_24h']:.0f} threats in 24h "
+                                       f"({report['total_threats']} total)")
+                    next_report = time.monotonic() + report_interval
                 
-                # Wait before next check
-                await asyncio.sleep(300)  # Check every 5 minutes
+                # Sleep until a log changes (or the next report is due)
+                await watcher.wait_async(max(0.1, next_report - time.monotonic()))
                 
             except Exception as e:
                 logger.error(f"Security monitor error: {e}")
@@ -213,6 +391,7 @@ def main():
         print("  block <addr>       - Block address")
         print("  unblock <addr>     - Unblock address")
         print("  check <addr>       - Check if address is safe")
+        print("  import <file>      - Import a blocklist of addresses")
         print("  monitor             - Start continuous monitoring")
         return
     
@@ -236,6 +415,10 @@ def main():
         status = "✅ SAFE" if is_safe else "🚫 BLOCKED"
         print(f"{status}: {reason}")
     
+    elif cmd == "import" and len(sys.argv) >= 3:
+        total = monitor.import_blocklist(sys.argv[2])
+        print(f"🚫 Blocklist now has {total} imported addresses")
+    
     elif cmd == "monitor":
         print("Starting 24/7 security monitor...")
         asyncio.run(monitor.monitor_loop())
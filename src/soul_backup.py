@@ -6,6 +6,17 @@ Ensures agent immortality through:
 - Multi-chain backup
 - Encrypted recovery keys
 - Soul resurrection protocol
+
+Restores go through hash indexes kept in backup_index.json (recovery key,
+CID and soul hash -> backup file), so resurrection is one lookup plus one
+streaming read whose sha256 is checked against the digest recorded at
+backup time, regardless of how many backups exist.
+
+Between periodic full bases, local backups store only a JSON patch against
+the previous backup (see soul_delta), so the backup directory grows with
+what changed rather than with the size of the soul. Backups uploaded to
+IPFS form their own chain whose deltas name the parent by CID, so a pinned
+backup restores from IPFS alone.
 """
 
 import os
@@ -15,9 +26,15 @@ import hashlib
 import base64
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 
+# Shared helpers (serialization, state) live in the skill root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import serialization
+from state_manager import atomic_write_json
+from soul_delta import SnapshotChain, DELTA_KEY, is_delta, materialize
+
 # Load env from skill root if present
 try:
     from dotenv import load_dotenv
@@ -27,6 +44,11 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+READ_CHUNK = 1 << 20
+
+# Lookup tables kept alongside index["backups"]
+LOOKUPS = ("by_recovery_key", "by_cid", "by_soul_hash", "file_digests")
+
 class SoulBackupSystem:
     """
     Complete backup and recovery for agent souls.
@@ -57,28 +79,59 @@ class SoulBackupSystem:
         self.backup_index = self.backup_dir / "backup_index.json"
         
         self.index = self._load_index()
+        self.snapshots = SnapshotChain(self.backup_dir / f"snapshot_head_{agent_id}.json",
+                                       load=self._load_body)
+        self.pinned = SnapshotChain(self.backup_dir / f"pinned_head_{agent_id}.json",
+                                    load=self._load_body)
         
     def _load_index(self) -> Dict[str, Any]:
         """Load backup index"""
         if self.backup_index.exists():
             with open(self.backup_index, 'r') as f:
-                return json.load(f)
-        return {
+                index = json.load(f)
+            if any(name not in index for name in LOOKUPS):
+                self._build_lookups(index)
+                atomic_write_json(self.backup_index, index)
+            return index
+        index = {
             "backups": [],
             "ipfs_hashes": [],
             "last_backup": None,
             "resurrection_key": None
         }
-    
+        self._build_lookups(index)
+        return index
+
+    def _build_lookups(self, index: Dict[str, Any]):
+        """Backfill lookup tables for indexes written before they existed"""
+        for name in LOOKUPS:
+            index.setdefault(name, {})
+        for backup in index.get("backups", []):
+            self._index_backup(index, backup)
+        for entry in index.get("ipfs_hashes", []):
+            if entry.get("hash") and entry.get("backup_id"):
+                index["by_cid"].setdefault(entry["hash"], f"{entry['backup_id']}.json")
+
+    @staticmethod
+    def _index_backup(index: Dict[str, Any], backup: Dict[str, Any]):
+        """Point every lookup key of one backup at its file"""
+        name = f"{backup['backup_id']}.json"
+        if backup.get("recovery_key"):
+            index["by_recovery_key"][backup["recovery_key"]] = backup["backup_id"]
+        if backup.get("ipfs_hash"):
+            index["by_cid"][backup["ipfs_hash"]] = name
+        if backup.get("soul_hash"):
+            index["by_soul_hash"][backup["soul_hash"]] = name
+        if backup.get("sha256"):
+            index["file_digests"][name] = backup["sha256"]
+
     def _save_index(self):
         """Save backup index"""
-        with open(self.backup_index, 'w') as f:
-            json.dump(self.index, f, indent=2)
+        atomic_write_json(self.backup_index, self.index)
     
     def _hash_soul(self, soul_data: Dict) -> str:
         """Generate hash of soul data for integrity checking"""
-        soul_json = json.dumps(soul_data, sort_keys=True)
-        return hashlib.sha256(soul_json.encode()).hexdigest()
+        return serialization.canonical_hash(soul_data)
 
     def _read_personality_files(self) -> Dict[str, Dict[str, str]]:
         """Capture real workspace personality/memory files into backup payload."""
@@ -112,24 +165,36 @@ class SoulBackupSystem:
         # Create timestamped backup
         timestamp = datetime.now().isoformat()
         backup_id = f"{self.agent_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Deltas point at their parent by id, so ids must never be reused
+        suffix = 1
+        while (self.backup_dir / f"{backup_id}.json").exists():
+            backup_id = f"{self.agent_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+            suffix += 1
         
         personality = self._read_personality_files()
+        body = {"soul": soul_data, "personality_files": personality}
+        # A pinned backup may only reference other pinned backups
+        chain = self.pinned if include_ipfs else self.snapshots
+        delta = chain.encode(body, exists=self._record_exists)
 
         backup_data = {
             "backup_id": backup_id,
             "timestamp": timestamp,
             "agent_id": self.agent_id,
-            "soul": soul_data,
             "soul_hash": self._hash_soul(soul_data),
-            "personality_files": personality,
-            "version": "1.1",
+            "version": "1.2",
             "chain": os.getenv("CDP_NETWORK_ID", "84532")
         }
+        if delta:
+            backup_data[DELTA_KEY] = delta
+        else:
+            backup_data.update(body)
         
-        # Save local backup
+        # Save local backup, remembering the digest of the exact bytes written
         backup_file = self.backup_dir / f"{backup_id}.json"
-        with open(backup_file, 'w') as f:
-            json.dump(backup_data, f, indent=2)
+        payload = serialization.dumps_bytes(backup_data)
+        with open(backup_file, 'wb') as f:
+            f.write(payload)
         
         # Generate recovery key
         recovery_key = self._generate_recovery_key(backup_data)
@@ -139,12 +204,16 @@ class SoulBackupSystem:
             "timestamp": timestamp,
             "local_path": str(backup_file),
             "soul_hash": backup_data["soul_hash"],
-            "recovery_key": recovery_key
+            "sha256": hashlib.sha256(payload).hexdigest(),
+            "recovery_key": recovery_key,
+            "kind": "delta" if delta else "base"
         }
+        self.snapshots.commit(backup_id, body, delta)
         
         # Upload to IPFS if requested
         if include_ipfs:
             ipfs_hash = self._upload_to_ipfs(backup_data)
+            self.pinned.commit(ipfs_hash, body, delta)
             backup_info["ipfs_hash"] = ipfs_hash
             self.index["ipfs_hashes"].append({
                 "hash": ipfs_hash,
@@ -154,6 +223,7 @@ class SoulBackupSystem:
         
         # Update index
         self.index["backups"].append(backup_info)
+        self._index_backup(self.index, backup_info)
         self.index["last_backup"] = timestamp
         if recovery_key:
             self.index["resurrection_key"] = recovery_key
@@ -224,9 +294,64 @@ class SoulBackupSystem:
         logger.warning(f"⚠️ IPFS simulated CID (not globally retrievable): {simulated_hash}")
         return simulated_hash
     
+    def _read_backup(self, backup_file: Path) -> Tuple[Dict[str, Any], bool]:
+        """
+        Stream a backup file once, hashing as it is read.
+
+        Returns (backup_data, verified) where verified is True when the
+        file digest matches the one recorded at backup time.
+        """
+        expected = self.index["file_digests"].get(backup_file.name)
+        hasher = hashlib.sha256()
+        payload = bytearray()
+        with open(backup_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                hasher.update(chunk)
+                payload += chunk
+        backup_data = serialization.loads(bytes(payload))
+        verified = expected is not None and hasher.hexdigest() == expected
+        if expected is not None and not verified:
+            logger.warning(f"⚠️  File digest mismatch for {backup_file.name}")
+        return backup_data, verified
+
+    def _record_file(self, ref: str) -> Optional[Path]:
+        """Local file for a delta parent: a backup id, or the CID of a pinned backup"""
+        backup_file = self.backup_dir / f"{ref}.json"
+        if backup_file.exists():
+            return backup_file
+        name = self.index["by_cid"].get(ref)
+        if name and (self.backup_dir / name).exists():
+            return self.backup_dir / name
+        return None
+
+    def _record_exists(self, ref: str) -> bool:
+        return self._record_file(ref) is not None
+
+    def _fetch_backup(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Parent lookup for delta chains"""
+        backup_file = self._record_file(ref)
+        if backup_file is None:
+            return None
+        return self._read_backup(backup_file)[0]
+
+    def _load_body(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Full body stored under ref, replaying deltas"""
+        backup_data = self._fetch_backup(ref)
+        if backup_data is None:
+            return None
+        return materialize(backup_data, self._fetch_backup, self._backup_body)
+
+    @staticmethod
+    def _backup_body(backup_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "soul": backup_data["soul"],
+            "personality_files": backup_data.get("personality_files") or {},
+        }
+
     def restore_soul(self, backup_id: Optional[str] = None, 
                      ipfs_hash: Optional[str] = None,
-                     recovery_key: Optional[str] = None) -> Dict[str, Any]:
+                     recovery_key: Optional[str] = None,
+                     soul_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Restore soul from backup.
         
@@ -234,25 +359,27 @@ class SoulBackupSystem:
             backup_id: Specific backup ID to restore
             ipfs_hash: IPFS hash to restore from
             recovery_key: Recovery key for resurrection
+            soul_hash: Hash of the soul state to restore
             
         Returns:
             Restored soul data
         """
         backup_data = None
+        verified = False
         
-        # Try to find by recovery key
+        # Resolve recovery key / soul hash through the indexes
         if recovery_key:
-            for backup in self.index["backups"]:
-                if backup.get("recovery_key") == recovery_key:
-                    backup_id = backup["backup_id"]
-                    break
+            backup_id = self.index["by_recovery_key"].get(recovery_key, backup_id)
+        if not backup_id and soul_hash:
+            name = self.index["by_soul_hash"].get(soul_hash)
+            if name:
+                backup_id = name[:-len(".json")]
         
         # Load from local backup
         if backup_id:
             backup_file = self.backup_dir / f"{backup_id}.json"
             if backup_file.exists():
-                with open(backup_file, 'r') as f:
-                    backup_data = json.load(f)
+                backup_data, verified = self._read_backup(backup_file)
             else:
                 raise ValueError(f"Backup not found: {backup_id}")
         
@@ -262,17 +389,24 @@ class SoulBackupSystem:
         
         if not backup_data:
             raise ValueError("No backup found with provided identifiers")
-        
-        # Verify integrity
-        stored_hash = backup_data.get("soul_hash")
-        computed_hash = self._hash_soul(backup_data["soul"])
-        
-        if stored_hash != computed_hash:
-            logger.warning("⚠️  Soul hash mismatch - backup may be corrupted")
+
+        # Delta backups: replay patches from the nearest base (hash-checked)
+        if is_delta(backup_data):
+            body = materialize(backup_data, self._fetch_backup, self._backup_body)
+            backup_data = {**backup_data, **body}
+            verified = True
+        
+        # Verify integrity; a matching file digest already covers the soul
+        if not verified:
+            stored_hash = backup_data.get("soul_hash")
+            computed_hash = self._hash_soul(backup_data["soul"])
+            
+            if stored_hash != computed_hash:
+                logger.warning("⚠️  Soul hash mismatch - backup may be corrupted")
         
         # Restore soul file
         with open(self.soul_file, 'w') as f:
-            json.dump(backup_data["soul"], f, indent=2)
+            serialization.dump(backup_data["soul"], f)
 
         # Restore captured personality/memory files when present
         restored_personality = 0
@@ -299,12 +433,23 @@ class SoulBackupSystem:
         # return response.json()
         
         # For now, check local cache
+        name = self.index["by_cid"].get(ipfs_hash)
+        if name and (self.backup_dir / name).exists():
+            data, _ = self._read_backup(self.backup_dir / name)
+            return data
+
+        # Files not in the index (copied in by hand, foreign agents): scan once
+        # and remember the match
         for backup_file in self.backup_dir.glob("*.json"):
+            if backup_file == self.backup_index:
+                continue
             with open(backup_file, 'r') as f:
                 data = json.load(f)
                 # Check if this backup matches the IPFS hash
                 if data.get("ipfs_hash") == ipfs_hash or \
-                   "Qm" + hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:44] == ipfs_hash:
+                   "Qm" + serialization.canonical_hash(data)[:44] == ipfs_hash:
+                    self.index["by_cid"][ipfs_hash] = backup_file.name
+                    self._save_index()
                     return data
         
         raise ValueError(f"IPFS hash not found locally: {ipfs_hash}")
@@ -348,7 +493,7 @@ class SoulBackupSystem:
         # Save export
         export_file = self.backup_dir / f"export_{target_chain}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(export_file, 'w') as f:
-            json.dump(export_package, f, indent=2)
+            serialization.dump(export_package, f)
         
         logger.info(f"✅ Soul exported for chain {target_chain}: {export_file}")
         return export_package
@@ -391,7 +536,7 @@ class SoulBackupSystem:
         soul_data["birth_time"] = datetime.now().isoformat()  # New birth on this chain
         
         with open(self.soul_file, 'w') as f:
-            json.dump(soul_data, f, indent=2)
+            serialization.dump(soul_data, f)
         
         logger.info(f"✅ Soul imported from chain {export_package['source_chain']}")
         return soul_data
@@ -412,7 +557,7 @@ class SoulBackupSystem:
         soul["previous_life_count"] = soul.get("previous_life_count", 0) + 1
         
         with open(self.soul_file, 'w') as f:
-            json.dump(soul, f, indent=2)
+            serialization.dump(soul, f)
         
         logger.info("✅ Agent resurrected successfully")
         return soul
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+State Manager - In-memory JSON state with coalesced, atomic writes
+
+Every subsystem used to rewrite its whole state file on each mutation,
+directly over the old file. Now:
+- State lives in memory, one shared dict per path per process
+- save() only marks the file dirty; a background flusher writes it once
+  the debounce window passes, so bursts of mutations cost one write
+- Writes are atomic: temp file in the same directory + fsync + rename
+- save() encodes the data under the file lock and the flusher writes
+  that payload, so a write never reads data another thread is changing.
+  State edited from several threads goes through `with store.mutate()`,
+  which holds the lock for the whole edit and saves it
+- flush() writes synchronously and durably (also run at exit)
+
+Usage:
+    store = open_state(path, default=lambda: {"heartbeats": 0})
+    state = store.data
+    state["heartbeats"] += 1
+    store.save()        # debounced
+    store.flush()       # durable now
+
+    with store.mutate() as state:   # shared between threads
+        state["heartbeats"] += 1
+"""
+
+import atexit
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional
+
+import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+
+
+def atomic_write_json(path: Path, data: Any, pretty: bool = False):
+    """
+    Write via temp file + fsync + rename; readers never see a torn file.
+
+    Compact JSON, or binary for .msgpack/.cbor paths (see serialization).
+    """
+    path = Path(path)
+    atomic_write_bytes(path, serialization.encode_for_path(path, data, pretty))
+
+
+def atomic_write_bytes(path: Path, payload: bytes):
+    """atomic_write_json for an already encoded payload"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass  # Not supported on every platform
+
+
+class StateFile:
+    """One JSON state file held in memory"""
+
+    def __init__(self, manager: "StateManager", path: Path):
+        self.manager = manager
+        self.path = path
+        self.data: Any = None
+        self.loaded = False
+        self.dirty = False
+        self.dirty_since = 0.0
+        self.writes = 0
+        self.saves = 0
+        # Bumped on every save(); keys the canonical hash cache
+        self.version = 0
+        # What the next flush writes, encoded by the latest save()
+        self._payload: Optional[bytes] = None
+        self._lock = threading.RLock()
+
+    @property
+    def exists(self) -> bool:
+        return self.loaded or self.path.exists()
+
+    def load(self, default: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Return the in-memory state, reading the file on first use.
+
+        If the file is missing, default() seeds the state and it is saved.
+        """
+        with self._lock:
+            if self.loaded:
+                return self.data
+            if self.path.exists():
+                self.data = serialization.read_file(self.path)
+                self.loaded = True
+            elif default is not None:
+                self.data = default()
+                self.loaded = True
+                self.save()
+            return self.data
+
+    def save(self, data: Any = None):
+        """
+        Record a mutation; the write happens after the debounce window.
+
+        The data is encoded now, so later edits (from any thread) can't
+        tear the write; the latest save() before a flush wins.
+        """
+        with self._lock:
+            if data is not None:
+                self.data = data
+                self.loaded = True
+            self._payload = serialization.encode_for_path(self.path, self.data, self.manager.pretty)
+            self.saves += 1
+            self.version += 1
+            if not self.dirty:
+                self.dirty = True
+                self.dirty_since = time.monotonic()
+        self.manager._schedule(self)
+
+    @contextmanager
+    def mutate(self):
+        """
+        Edit the data under the file lock, then save().
+
+        For state that several threads change: save() and other mutate()
+        blocks wait, so no write captures half of an edit.
+        """
+        with self._lock:
+            yield self.data
+            self.save()
+
+    def canonical_hash(self) -> str:
+        """Integrity hash of the data as of the last save(), cached per version"""
+        with self._lock:
+            return serialization.canonical_hash(self.data, version=self.version)
+
+    def flush(self) -> bool:
+        """Write now if dirty. Returns True if a write happened."""
+        with self._lock:
+            if not self.dirty:
+                return False
+            # Under the lock so writes land in save() order
+            atomic_write_bytes(self.path, self._payload)
+            self._payload = None
+            self.dirty = False
+            self.writes += 1
+            return True
+
+
+class StateManager:
+    """
+    Registry of StateFile handles plus a debounced background flusher.
+
+    One process-wide instance (STATE_MANAGER) is shared by all subsystems
+    so two objects using the same file see the same dict.
+    """
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE_SECONDS, pretty: bool = False):
+        self.debounce = debounce
+        self.pretty = pretty
+        self._files: Dict[Path, StateFile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher: Optional[threading.Thread] = None
+
+    def open(self, path, default: Optional[Callable[[], Any]] = None) -> StateFile:
+        """Get the shared handle for path, loading it (or seeding from default)"""
+        key = Path(path).resolve()
+        with self._lock:
+            store = self._files.get(key)
+            if store is None:
+                store = self._files[key] = StateFile(self, key)
+        store.load(default)
+        return store
+
+    def _schedule(self, store: StateFile):
+        if self.debounce <= 0:
+            store.flush()
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._run_flusher,
+                                                 name="state-flusher", daemon=True)
+                self._flusher.start()
+            self._wakeup.notify()
+
+    def _run_flusher(self):
+        while True:
+            with self._lock:
+                dirty = [s for s in self._files.values() if s.dirty]
+                if not dirty:
+                    self._wakeup.wait()
+                    continue
+                due_at = min(s.dirty_since for s in dirty) + self.debounce
+                wait = due_at - time.monotonic()
+                if wait > 0:
+                    self._wakeup.wait(timeout=wait)
+                    continue
+
+            now = time.monotonic()
+            for store in dirty:
+                if store.dirty and now - store.dirty_since >= self.debounce:
+                    try:
+                        store.flush()
+                    except Exception as e:
+                        logger.error(f"State write failed for {store.path}: {e}")
+                        store.dirty_since = time.monotonic()
+
+    def flush(self) -> int:
+        """Durably write every dirty file now. Returns number of writes."""
+        with self._lock:
+            files = list(self._files.values())
+        return sum(1 for store in files if store.flush())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            files = list(self._files.values())
+        return {
+            "files": len(files),
+            "dirty": sum(1 for s in files if s.dirty),
+            "saves": sum(s.saves for s in files),
+            "writes": sum(s.writes for s in files)
+        }
+
+
+STATE_MANAGER = StateManager()
+atexit.register(STATE_MANAGER.flush)
+
+
+def open_state(path, default: Optional[Callable[[], Any]] = None) -> StateFile:
+    """Open a state file through the shared manager"""
+    return STATE_MANAGER.open(path, default)
+
+
+def flush_all() -> int:
+    """Durably write all pending state"""
+    return STATE_MANAGER.flush()
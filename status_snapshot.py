@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Status Snapshot - versioned, read-only status published by the main loops
+
+get_status() / get_full_status() used to recompute everything on every
+call: calculate_reputation() persisted a new score, touching a lazy
+subsystem built it (survival constructors may create a soul), health
+checks probed the network and state files were re-read. Polling them from
+the dashboard, the CLI or the MCP server meant disk writes and contention
+with the running loop. Now:
+- The main loop publishes status sections (survival, health, scaling, ...)
+  after it has done the work; each publish is a deep copy
+- Every publish swaps in a new immutable Snapshot with a bumped version,
+  so readers take no lock and never see a half-updated view
+- Snapshots are mirrored to .status/<board>.json. Publishing holds a file
+  lock and continues from the mirror's version (and sections), so two
+  processes publishing to one board never reuse a version; other processes
+  (CLI, MCP server) read the last published view with one stat() per poll
+  and never write
+- since(version) and wait(version) let pollers skip unchanged snapshots
+
+Usage:
+    board = StatusBoard.shared("immortal_my_agent")
+    board.publish("survival", {"tier": "STABLE", "balance": 0.4})
+    snap = board.snapshot()
+    snap.version, snap["survival"]["tier"]
+    board.since(snap.version)      # None until something new is published
+
+    python3 status_snapshot.py show immortal_my_agent
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+import time
+from dataclasses import dataclass, field, asdict, is_dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+
+import serialization
+from state_manager import open_state
+
+try:
+    import fcntl
+except ImportError:  # Windows: one publisher per board
+    fcntl = None
+
+STATUS_DIR = Path(__file__).parent / ".status"
+
+
+class FileSnapshots:
+    """Read-only JSON reads, cached until the file's stat signature changes"""
+
+    def __init__(self):
+        self._cache: Dict[Path, tuple] = {}
+        self.reads = 0
+
+    def read(self, path: Path, default: Any = None) -> Any:
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._cache.pop(path, None)
+            return default
+        sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached and cached[0] == sig:
+            return cached[1]
+        try:
+            data = serialization.read_file(path)
+        except (OSError, ValueError):
+            return cached[1] if cached else default
+        self.reads += 1
+        self._cache[path] = (sig, data)
+        return data
+
+
+def _plain(data: Any) -> Any:
+    """Deep copy as plain JSON types, exactly as the mirror file stores it"""
+    if is_dataclass(data) and not isinstance(data, type):
+        data = asdict(data)
+    return serialization.loads(serialization.dumps_bytes(data))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    One published view. Treat sections as read-only: they are shared by
+    every reader of this version (to_dict() returns a private copy).
+    """
+    version: int = 0
+    published_at: float = 0.0
+    sections: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    section_versions: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+
+    def __getitem__(self, section: str) -> Any:
+        return self.sections[section]
+
+    def __contains__(self, section: object) -> bool:
+        return section in self.sections
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self.sections.get(section, default)
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since publication, None if nothing was ever published"""
+        return time.time() - self.published_at if self.version else None
+
+    def changed_since(self, version: int) -> Dict[str, Any]:
+        """Sections published after `version`"""
+        return {name: self.sections[name] for name, v in self.section_versions.items()
+                if v > version}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _plain({
+            "version": self.version,
+            "published_at": self.published_at,
+            "sections": dict(self.sections),
+            "section_versions": dict(self.section_versions),
+        })
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Snapshot":
+        return cls(version=data.get("version", 0),
+                   published_at=data.get("published_at", 0.0),
+                   sections=MappingProxyType(dict(data.get("sections", {}))),
+                   section_versions=MappingProxyType(dict(data.get("section_versions", {}))))
+
+
+class StatusBoard:
+    """Latest published status of one system, shared by all readers in a process"""
+
+    POLL_INTERVAL = 0.25
+
+    _shared: Dict[str, "StatusBoard"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str, status_dir: Path = STATUS_DIR):
+        self.name = name
+        self.path = Path(status_dir) / f"{name}.json"
+        self.lock_path = Path(status_dir) / f".{name}.lock"
+        self.files = FileSnapshots()
+        # Writers serialize on the condition; readers just load the reference
+        self._changed = threading.Condition()
+        self._snapshot = Snapshot()
+        self._store = None
+        self.published = False
+        self.publishes = 0
+
+    @classmethod
+    def shared(cls, name: str, status_dir: Path = STATUS_DIR) -> "StatusBoard":
+        """One board per name and directory in this process"""
+        key = str((Path(status_dir) / name).resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(name, status_dir)
+            return cls._shared[key]
+
+    # ========== WRITES ==========
+
+    def publish(self, section: str, data: Any) -> int:
+        """Replace one section; returns the new version"""
+        return self.publish_many({section: data})
+
+    @contextmanager
+    def _publisher_lock(self):
+        """Serializes publishers across processes (no-op without fcntl)"""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def publish_many(self, sections: Dict[str, Any]) -> int:
+        """Replace several sections under a single new version"""
+        copies = {name: _plain(data) for name, data in sections.items()}
+        with self._changed, self._publisher_lock():
+            if self._store is None:
+                self._store = open_state(self.path, default=lambda: Snapshot().to_dict())
+            # Continue from the mirror if another process (or an earlier run)
+            # published after us, so versions never repeat or go backwards
+            current = self._snapshot
+            mirror = self.files.read(self.path)
+            if mirror and mirror.get("version", 0) > current.version:
+                current = Snapshot.from_dict(mirror)
+            version = current.version + 1
+            merged = {**current.sections, **copies}
+            versions = {**current.section_versions, **{name: version for name in copies}}
+            snapshot = Snapshot(version=version, published_at=time.time(),
+                                sections=MappingProxyType(merged),
+                                section_versions=MappingProxyType(versions))
+            self._snapshot = snapshot
+            self.published = True
+            self.publishes += 1
+            self._store.save({
+                "board": self.name,
+                "version": version,
+                "published_at": snapshot.published_at,
+                "sections": merged,
+                "section_versions": versions,
+            })
+            # The next publisher reads the version from the file, so write it now
+            self._store.flush()
+            self._changed.notify_all()
+        return version
+
+    def flush(self) -> bool:
+        """Write the mirror if anything is pending (publish already writes it)"""
+        return self._store.flush() if self._store is not None else False
+
+    # ========== READS ==========
+
+    def snapshot(self) -> Snapshot:
+        """
+        Latest snapshot: this process's own or the mirror, whichever is
+        newer (another process may publish to the same board). Never writes.
+        """
+        data = self.files.read(self.path)
+        if not data:
+            return self._snapshot
+        version = data.get("version", 0)
+        if version > self._snapshot.version or (version != self._snapshot.version and not self.published):
+            self._snapshot = Snapshot.from_dict(data)
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def since(self, version: int) -> Optional[Snapshot]:
+        """The latest snapshot if it is newer than `version`, else None"""
+        snapshot = self.snapshot()
+        return snapshot if snapshot.version > version else None
+
+    def wait(self, version: int, timeout: float = 30.0) -> Optional[Snapshot]:
+        """Block until a snapshot newer than `version` exists (long polling)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.since(version)
+            remaining = deadline - time.monotonic()
+            if snapshot is not None or remaining <= 0:
+                return snapshot
+            if self.published:
+                # Own publishes wake us at once; other processes' on the next poll
+                with self._changed:
+                    self._changed.wait_for(lambda: self._snapshot.version > version,
+                                           min(self.POLL_INTERVAL, remaining))
+            else:
+                time.sleep(min(self.POLL_INTERVAL, remaining))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Published status snapshots")
+    parser.add_argument("command", choices=["list", "show"])
+    parser.add_argument("board", nargs="?", help="e.g. immortal_openclaw_main_agent")
+    parser.add_argument("--section", action="append", help="show: only these sections")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for path in sorted(STATUS_DIR.glob("*.json")):
+            snapshot = StatusBoard.shared(path.stem).snapshot()
+            age = snapshot.age or 0.0
+            print(f"   {path.stem}: v{snapshot.version}, {len(snapshot.sections)} sections, {age:.0f}s old")
+    elif args.command == "show":
+        if not args.board:
+            parser.error("show needs a board name")
+        snapshot = StatusBoard.shared(args.board).snapshot()
+        data = snapshot.to_dict()
+        if args.section:
+            data["sections"] = {k: v for k, v in data["sections"].items() if k in args.section}
+        print(serialization.dumps(data, pretty=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Subsystem Registry - Lazy subsystem providers with startup profiling
+
+Subsystems are registered as (module, factory) providers and only imported
+and constructed on first access. Every build is timed so startup cost can
+be attributed per subsystem (import vs constructor).
+
+Usage:
+    registry = SubsystemRegistry()
+    registry.register("work", "work_system", lambda m: m.AgentWorkSystem(agent_id))
+
+    registry["work"]         # imports + constructs on first access
+    "work" in registry       # True only if it built successfully
+    registry.profiler.format_report()
+"""
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StartupRecord:
+    """Cost of bringing up one subsystem"""
+    name: str
+    module: str
+    import_seconds: float = 0.0
+    construct_seconds: float = 0.0
+    status: str = "pending"  # pending | loaded | failed
+    error: Optional[str] = None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.import_seconds + self.construct_seconds
+
+
+class StartupProfiler:
+    """
+    Collects import and constructor timings per subsystem.
+
+    Import time is attributed to the first subsystem that pulls in a module;
+    shared dependencies (web3, cryptography) show up there.
+    """
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.records: Dict[str, StartupRecord] = {}
+
+    def record(self, record: StartupRecord):
+        self.records[record.name] = record
+
+    def report(self) -> Dict[str, Any]:
+        records = sorted(self.records.values(), key=lambda r: r.total_seconds, reverse=True)
+        return {
+            "elapsed_seconds": time.perf_counter() - self.created,
+            "subsystem_seconds": sum(r.total_seconds for r in records),
+            "subsystems": [
+                {**asdict(r), "total_seconds": r.total_seconds} for r in records
+            ]
+        }
+
+    def format_report(self) -> str:
+        report = self.report()
+        lines = [
+            "",
+            "⏱️  STARTUP PROFILE",
+            f"   {'subsystem':<14} {'import':>9} {'construct':>10} {'total':>9}  status",
+        ]
+        for r in report["subsystems"]:
+            lines.append(
+                f"   {r['name']:<14} {r['import_seconds'] * 1000:>7.1f}ms "
+                f"{r['construct_seconds'] * 1000:>8.1f}ms {r['total_seconds'] * 1000:>7.1f}ms  "
+                f"{r['status']}{' (' + r['error'] + ')' if r['error'] else ''}"
+            )
+        lines.append(f"   subsystems: {report['subsystem_seconds'] * 1000:.1f}ms, "
+                     f"wall since start: {report['elapsed_seconds'] * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+class LazySubsystem:
+    """Provider that imports and constructs a subsystem once, on demand"""
+
+    def __init__(self, name: str, module: str, factory: Callable[[Any], Any],
+                 profiler: StartupProfiler, label: Optional[str] = None):
+        self.name = name
+        self.module = module
+        self.factory = factory
+        self.profiler = profiler
+        self.label = label or name
+        self.instance = None
+        self.built = False
+        # Cycle stages run in threads; only one of them may build
+        self._lock = threading.RLock()
+
+    def get(self) -> Any:
+        """Return the instance, building it on first call; None if it failed"""
+        if self.built:
+            return self.instance
+        with self._lock:
+            if not self.built:
+                self._build()
+        return self.instance
+
+    def _build(self):
+        record = StartupRecord(name=self.name, module=self.module)
+        try:
+            start = time.perf_counter()
+            module = importlib.import_module(self.module)
+            record.import_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.instance = self.factory(module)
+            record.construct_seconds = time.perf_counter() - start
+            record.status = "loaded"
+            logger.info(f"✅ {self.label} loaded")
+        except Exception as e:
+            record.status = "failed"
+            record.error = str(e)
+            logger.warning(f"⚠️ {self.label}: {e}")
+
+        self.built = True
+        self.profiler.record(record)
+
+
+class SubsystemRegistry:
+    """
+    Dict-like view over lazy subsystems.
+
+    Membership and lookup build the subsystem if needed, so existing
+    `if 'x' in subsystems: subsystems['x']...` code keeps working while only
+    paying for what it touches.
+    """
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        self.profiler = profiler or StartupProfiler()
+        self._providers: Dict[str, LazySubsystem] = {}
+
+    def register(self, name: str, module: str, factory: Callable[[Any], Any],
+                 label: Optional[str] = None):
+        self._providers[name] = LazySubsystem(name, module, factory, self.profiler, label)
+
+    def __setitem__(self, name: str, instance: Any):
+        """Install an already-built subsystem"""
+        provider = LazySubsystem(name, type(instance).__module__, lambda m: instance, self.profiler)
+        provider.instance, provider.built = instance, True
+        self._providers[name] = provider
+
+    def __getitem__(self, name: str) -> Any:
+        provider = self._providers.get(name)
+        instance = provider.get() if provider else None
+        if instance is None:
+            raise KeyError(name)
+        return instance
+
+    def __contains__(self, name: object) -> bool:
+        provider = self._providers.get(name)
+        return provider is not None and provider.get() is not None
+
+    def require(self, name: str) -> Any:
+        """Like [] but raises RuntimeError with the build error"""
+        provider = self._providers.get(name)
+        if provider is None:
+            raise RuntimeError(f"Unknown subsystem: {name}")
+        instance = provider.get()
+        if instance is None:
+            record = self.profiler.records.get(name)
+            raise RuntimeError(f"Subsystem {name} unavailable: {record.error if record else 'unknown'}")
+        return instance
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self) -> List[str]:
+        """Names of subsystems that are available (builds all of them)"""
+        return [name for name in self._providers if name in self]
+
+    def items(self):
+        return [(name, self._providers[name].instance) for name in self.keys()]
+
+    def values(self):
+        return [instance for _, instance in self.items()]
+
+    def registered(self) -> List[str]:
+        """All registered names, without building anything"""
+        return list(self._providers)
+
+    def loaded(self) -> List[str]:
+        """Names built successfully so far, without building anything"""
+        return [n for n, p in self._providers.items() if p.built and p.instance is not None]
+
+    def load_all(self) -> "SubsystemRegistry":
+        for provider in self._providers.values():
+            provider.get()
+        return self
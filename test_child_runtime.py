@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for child_runtime - earnings reporting across supervisor restarts
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from child_runtime import ChildRuntime, ChildSpec
+
+
+def _runtime(updates):
+    return ChildRuntime(pool_workers=1,
+                        on_update=lambda child_id, **kw: updates.append((child_id, kw)))
+
+
+def test_spec_seeds_lifetime_earnings():
+    runtime = _runtime([])
+    try:
+        state = runtime.start_child(ChildSpec("kid", ["system_check"], 0.1, earnings=0.5))
+        assert state.earnings == 0.5
+        assert state.balance == 0.6
+    finally:
+        runtime.shutdown()
+
+
+def test_reports_deltas_not_totals():
+    updates = []
+    runtime = _runtime(updates)
+    try:
+        state = runtime.start_child(ChildSpec("kid", ["system_check"], 0.1, earnings=0.5))
+        for earned in (0.01, 0.02):
+            runtime._record_job(state, {"ok": True, "earned": earned, "error": None})
+            runtime._drain = lambda: {"kid"}
+            runtime.poll()
+        assert [kw["earned"] for _, kw in updates] == [0.01, 0.02]
+        assert abs(state.earnings - 0.53) < 1e-12
+        assert state.unreported == 0.0
+    finally:
+        runtime.shutdown()
+
+
+def test_pool_job_reports_its_earnings(tmp_path, monkeypatch):
+    # Spawned workers inherit HOME, so the work log stays in tmp_path
+    monkeypatch.setenv("HOME", str(tmp_path))
+    updates = []
+    runtime = _runtime(updates)
+    try:
+        runtime.start_child(ChildSpec("kid", ["system_check"], 0.1, earnings=0.5))
+        runtime.submit("system_check", {"check_type": "disk"}, capability="system_check")
+        assert runtime.run_until_idle(timeout=60)
+        earned = sum(kw["earned"] or 0 for _, kw in updates)
+        assert earned > 0
+        assert abs(runtime.children["kid"].earnings - (0.5 + earned)) < 1e-12
+    finally:
+        runtime.shutdown()
+
+    # The child's record is its own: other agents sharing the log skip it
+    from work_system import AgentWorkSystem
+    assert AgentWorkSystem("parent").total_earned == 0
+    assert len(AgentWorkSystem("kid").work_history) == 1
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for content_summarizer - chunk splitting and chunk_size validation
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from content_summarizer import ContentSummarizer, SummaryCache, parse_chunk_size
+
+
+def _summarizer(chunk_size):
+    return ContentSummarizer(chunk_size=chunk_size, cache=SummaryCache())
+
+
+@pytest.mark.parametrize("bad", [0, -1, -4096, "abc", "", None, 1.5, True, [64]])
+def test_bad_chunk_sizes_rejected(bad):
+    with pytest.raises(ValueError):
+        _summarizer(bad)
+    with pytest.raises(ValueError):
+        parse_chunk_size(bad)
+
+
+def test_integral_string_accepted():
+    assert parse_chunk_size("4096") == 4096
+    assert _summarizer(" 128 ").chunk_size == 128
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 10_000])
+def test_chunks_reassemble_on_word_boundaries(chunk_size, tmp_path):
+    text = " ".join(f"word{i}" for i in range(500)) + "\nlast line"
+    summarizer = _summarizer(chunk_size)
+    chunks = list(summarizer.iter_chunks(content=text))
+    assert "".join(chunks) == text
+    if chunk_size >= 64:
+        assert all(len(c) <= chunk_size for c in chunks)
+        # No word is split across two chunks
+        assert all(c.endswith((" ", "\n")) for c in chunks[:-1])
+
+    path = tmp_path / "doc.txt"
+    path.write_text(text)
+    assert "".join(summarizer.iter_chunks(file_path=str(path))) == text
+
+
+def test_summary_independent_of_chunking():
+    text = "alpha beta gamma " * 2000
+    small = _summarizer(100).summarize(content=text)
+    large = _summarizer(1 << 20).summarize(content=text)
+    assert small["original_words"] == large["original_words"] == 6000
+    assert small["chunks"] > 1 and large["chunks"] == 1
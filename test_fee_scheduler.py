@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for fee_oracle.FeeScheduler and queued backups - nothing deferred is lost
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import onchain_adapter
+from fee_oracle import FeeOracle, FeeScheduler
+
+
+class FakeOracle(FeeOracle):
+    """Base fee and cheapness set by the test; never calls the RPC"""
+
+    def __init__(self, data_dir):
+        super().__init__("http://127.0.0.1:1", data_dir=data_dir)
+        self.cheap = False
+        self.next_base_fee = None
+
+    def is_cheap(self, percentile=30):
+        return self.cheap
+
+    def is_peak_hour(self, hour=None):
+        return False
+
+    def base_fee(self):
+        return 10 ** 9
+
+    def percentile(self, p):
+        return 10 ** 9
+
+
+def test_failed_op_stays_waiting(tmp_path):
+    oracle = FakeOracle(tmp_path)
+    scheduler = FeeScheduler(oracle, enabled=True)
+    calls = []
+
+    def run(fees):
+        calls.append(fees)
+        if len(calls) == 1:
+            raise ConnectionError("rpc down")
+        return True
+
+    assert scheduler.defer("backups", run) is None
+    assert scheduler.tick() == 0 and not calls   # not cheap, deadline ahead
+    oracle.cheap = True
+    assert scheduler.tick() == 0                  # ran and raised
+    assert "backups" in scheduler.waiting
+    assert scheduler.tick() == 1                  # retried
+    assert len(calls) == 2 and not scheduler.waiting
+
+
+def test_failed_backups_stay_queued(tmp_path, monkeypatch):
+    monkeypatch.setattr(onchain_adapter, "TX_DATA_DIR", tmp_path)
+    adapter = onchain_adapter.SoulMarketplaceAdapter(config_file=tmp_path / "none.json")
+    sent = []
+
+    def create_backup(token_id, cid, soul_hash, backup_type="manual", earnings=0,
+                      wait=True, fees=None):
+        if token_id == 2:
+            return None     # RPC error / reverted build
+        sent.append(token_id)
+        return True
+
+    monkeypatch.setattr(adapter, "create_backup", create_backup)
+    for token_id in (1, 2, 3):
+        adapter.queue_backup(token_id, f"cid{token_id}", "0xhash")
+
+    assert adapter.flush_backups() == 2
+    assert sent == [1, 3]
+    assert list(adapter.backup_queue) == ["2"]
+
+    # Persisted: a new adapter (e.g. after a restart) still has it
+    again = onchain_adapter.SoulMarketplaceAdapter(config_file=tmp_path / "none.json")
+    assert list(again.backup_queue) == ["2"]
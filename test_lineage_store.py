@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for lineage_store - closure rows, ordering and out-of-order backfill
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lineage_store import LineageStore
+
+
+def _store(tmp_path):
+    return LineageStore(tmp_path / "lineage.db")
+
+
+def _closure(store):
+    return set(store.db.execute("SELECT ancestor, descendant, distance FROM closure"))
+
+
+def _ids(rows):
+    return [r["agent_id"] for r in rows]
+
+
+def test_closure_rows_and_ordering(tmp_path):
+    store = _store(tmp_path)
+    store.add_agent("a", parent_id="root", birth_time=1)
+    store.add_agent("b", parent_id="root", birth_time=2)
+    store.add_agent("a1", parent_id="a", birth_time=3)
+    store.add_agent("a1x", parent_id="a1", birth_time=4)
+
+    # Nearest first, then by birth time
+    assert _ids(store.descendants("root")) == ["a", "b", "a1", "a1x"]
+    assert _ids(store.descendants("root", max_distance=2)) == ["a", "b", "a1"]
+    assert _ids(store.ancestors("a1x")) == ["a1", "a", "root"]
+    assert [r["distance"] for r in store.ancestors("a1x")] == [1, 2, 3]
+    assert store.generation_counts("root") == {1: 2, 2: 1, 3: 1}
+    assert store.get("a1x")["generation"] == 3
+    assert ("root", "a1x", 3) in _closure(store)
+    assert not store.add_agent("a", parent_id="root")  # idempotent
+
+
+def test_child_backfilled_before_its_parent(tmp_path):
+    store = _store(tmp_path)
+    assert store.add_agent("gc", parent_id="child")       # child unknown yet
+    assert store.get("child")["placeholder"] == 1
+    assert store.add_agent("child", parent_id="root", status="alive",
+                           initial_funding=0.1, birth_time=5)
+
+    assert _ids(store.descendants("root")) == ["child", "gc"]
+    assert _ids(store.ancestors("gc")) == ["child", "root"]
+    child = store.get("child")
+    assert (child["parent_id"], child["generation"], child["placeholder"]) == ("root", 1, 0)
+    assert child["initial_funding"] == 0.1
+    assert store.get("gc")["generation"] == 2
+    assert store.subtree_stats("root")["descendants"] == 2
+
+
+def test_attach_whole_subtree_under_deep_parent(tmp_path):
+    store = _store(tmp_path)
+    store.add_agent("x", parent_id="p")
+    store.add_agent("x1", parent_id="x")
+    store.add_agent("x2", parent_id="x1")
+    store.add_agent("q", parent_id="root")
+    store.add_agent("p", parent_id="q")
+
+    assert _ids(store.ancestors("x2")) == ["x1", "x", "p", "q", "root"]
+    assert [store.get(a)["generation"] for a in ("q", "p", "x", "x1", "x2")] == [1, 2, 3, 4, 5]
+    assert store.generation_counts("root") == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+    # Closure rows equal those of inserting in parent-first order
+    fresh = LineageStore(tmp_path / "fresh.db")
+    for agent, parent in (("q", "root"), ("p", "q"), ("x", "p"), ("x1", "x"), ("x2", "x1")):
+        fresh.add_agent(agent, parent_id=parent)
+    assert _closure(store) == _closure(fresh)
+
+
+def test_no_cycles(tmp_path):
+    store = _store(tmp_path)
+    store.add_agent("child", parent_id="root")
+    assert not store.add_agent("root", parent_id="child")
+    assert store.get("root")["parent_id"] is None
+    assert store.ancestors("root") == []
+
+
+def test_migrates_store_without_placeholder_column(tmp_path):
+    path = tmp_path / "old.db"
+    db = sqlite3.connect(str(path))
+    db.executescript("""
+        CREATE TABLE agents (agent_id TEXT PRIMARY KEY, parent_id TEXT, generation INTEGER NOT NULL,
+            status TEXT NOT NULL, earnings REAL NOT NULL DEFAULT 0,
+            initial_funding REAL NOT NULL DEFAULT 0, birth_time REAL NOT NULL,
+            updated_at REAL NOT NULL);
+        INSERT INTO agents VALUES ('root', NULL, 0, 'alive', 0, 0, 1, 1);
+        CREATE TABLE closure (ancestor TEXT NOT NULL, descendant TEXT NOT NULL,
+            distance INTEGER NOT NULL, PRIMARY KEY (ancestor, descendant)) WITHOUT ROWID;
+        INSERT INTO closure VALUES ('root', 'root', 0);
+    """)
+    db.commit()
+    db.close()
+    store = LineageStore(path)
+    assert store.get("root")["placeholder"] == 0
+    assert store.add_agent("child", parent_id="root")
+    assert _ids(store.descendants("root")) == ["child"]
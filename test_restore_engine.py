@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for restore_engine - all-or-nothing restores and swap rollback
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import restore_engine
+from restore_engine import RestoreEngine, RestoreItem
+
+
+def _setup(tmp_path, files):
+    """Backup copies with new content, live targets with old content"""
+    backup, live = tmp_path / "backup", tmp_path / "live"
+    backup.mkdir()
+    live.mkdir()
+    items = []
+    for name, category in files:
+        (backup / name).write_text(f"new {name}")
+        (live / name).write_text(f"old {name}")
+        digest = hashlib.sha256(f"new {name}".encode()).hexdigest()
+        items.append(RestoreItem(category, backup / name, live / name, digest))
+    return live, items
+
+
+def _contents(live):
+    return {p.name: p.read_text() for p in live.iterdir()}
+
+
+def test_restore_swaps_everything_in(tmp_path):
+    live, items = _setup(tmp_path, [("a", "soul"), ("b", "soul"), ("c", "state")])
+    report = RestoreEngine(workers=2).run(items)
+
+    assert not report["aborted"]
+    assert sorted(report["success"]) == ["a", "b", "c"]
+    assert _contents(live) == {"a": "new a", "b": "new b", "c": "new c"}
+
+
+def test_hash_mismatch_aborts_without_touching_targets(tmp_path):
+    live, items = _setup(tmp_path, [("a", "soul"), ("b", "soul")])
+    items[1].source.write_text("corrupted")
+    report = RestoreEngine().run(items)
+
+    assert report["aborted"]
+    assert report["errors"] == {"b": "hash mismatch"}
+    assert report["files"] == 0
+    # Old files untouched and no staged temp files left behind
+    assert _contents(live) == {"a": "old a", "b": "old b"}
+
+
+def test_non_atomic_keeps_verified_files(tmp_path):
+    live, items = _setup(tmp_path, [("a", "soul"), ("b", "soul")])
+    items[1].source.unlink()
+    report = RestoreEngine(atomic=False).run(items)
+
+    assert not report["aborted"]
+    assert report["success"] == ["a"]
+    assert report["errors"] == {"b": "missing from backup"}
+    assert _contents(live) == {"a": "new a", "b": "old b"}
+
+
+def test_swap_failure_rolls_back(tmp_path, monkeypatch):
+    live, items = _setup(tmp_path, [("a", "soul"), ("c", "soul"), ("b", "soul")])
+    (live / "c").unlink()  # swapped in as a new file, so rollback must remove it
+    real_replace = os.replace
+    swaps = []
+
+    def flaky_replace(src, dst):
+        if str(src).endswith(".restore"):
+            swaps.append(dst)
+            if len(swaps) == 3:
+                raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(restore_engine.os, "replace", flaky_replace)
+    report = RestoreEngine(workers=1).run(items)
+
+    assert report["aborted"]
+    assert report["swap_error"] == "disk full"
+    assert _contents(live) == {"a": "old a", "b": "old b"}
+
+
+def test_partial_restore_by_category(tmp_path):
+    live, items = _setup(tmp_path, [("a", "soul"), ("b", "state")])
+    report = RestoreEngine().run(items, categories=["state"])
+
+    assert report["success"] == ["b"]
+    assert report["skipped"] == ["a"]
+    assert report["categories"] == {"state": 1}
+    assert _contents(live) == {"a": "old a", "b": "new b"}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for scaling_policy - spawn/retire/hold decisions and cooldowns
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from scaling_policy import HOUR, PolicyConfig, ScalingPolicy
+
+NOW = 1_000_000.0
+
+
+def _child(child_id, age_hours=3.0, status="alive"):
+    return {"child_id": child_id, "status": status, "birth_time": NOW - age_hours * HOUR}
+
+
+def _decide(policy, children, backlog, balance=1.25, now=NOW, **kwargs):
+    return policy.decide(children, backlog=backlog, balance=balance, child_funding=0.1,
+                         reserve=0.2, now=now, **kwargs)
+
+
+def test_bootstrap_needs_backlog(tmp_path):
+    policy = ScalingPolicy(tmp_path)
+    assert _decide(policy, [], backlog=0)["reason"] == "no_backlog"
+
+    decision = _decide(policy, [], backlog=3)
+    assert (decision["action"], decision["count"], decision["reason"]) == ("spawn", 1, "bootstrap")
+    # Inside the scale-up cooldown the next bootstrap waits
+    assert _decide(policy, [], backlog=3, now=NOW + 60)["reason"] == "scale_up_cooldown"
+
+
+def test_spawns_when_forecast_roi_clears(tmp_path):
+    policy = ScalingPolicy(tmp_path)
+    children = [_child("a"), _child("b")]
+    for child in children:
+        # 0.03 ETH over a 3h life: 0.01 ETH/h, 0.72 ETH over the horizon
+        policy.record_earnings(child["child_id"], 0.03, now=NOW - 600)
+
+    decision = _decide(policy, children, backlog=20)
+    assert decision["action"] == "spawn"
+    assert decision["count"] == 2     # backlog wants 4 children, 2 are running
+    assert decision["forecast"]["roi"] > policy.config.scale_up_roi
+
+
+def test_idle_backlog_does_not_justify_a_spawn(tmp_path):
+    policy = ScalingPolicy(tmp_path)
+    children = [_child("a")]
+    policy.record_earnings("a", 0.03, now=NOW - 600)
+
+    decision = _decide(policy, children, backlog=0)
+    assert decision["action"] == "hold"
+    assert decision["forecast"]["utilization"] == 0.0
+
+
+def test_retires_lowest_earner_the_backlog_does_not_need(tmp_path):
+    policy = ScalingPolicy(tmp_path)
+    children = [_child("earner"), _child("idle"), _child("newborn", age_hours=0.2)]
+    policy.record_earnings("earner", 0.03, now=NOW - 600)
+
+    decision = _decide(policy, children, backlog=0)
+    assert decision["action"] == "retire"
+    # The newborn is still warming up and is not judged
+    assert decision["retire"] == ["idle"]
+    assert _decide(policy, children, backlog=0, now=NOW + 60)["reason"] == "scale_down_cooldown"
+
+
+def test_min_children_is_kept(tmp_path):
+    policy = ScalingPolicy(tmp_path, PolicyConfig(min_children=1))
+    decision = _decide(policy, [_child("idle")], backlog=0)
+    assert decision["action"] == "hold"
+
+
+def test_limits(tmp_path):
+    policy = ScalingPolicy(tmp_path, PolicyConfig(max_children=2))
+    children = [_child("a"), _child("b", status="gestating")]
+    assert _decide(policy, children, backlog=50)["reason"] == "max_children_reached"
+
+    (tmp_path / "broke").mkdir()
+    broke = ScalingPolicy(tmp_path / "broke")
+    assert _decide(broke, [], backlog=5, balance=0.25)["reason"] == "insufficient_balance"
+
+
+def test_dry_run_starts_no_cooldown_and_is_not_logged(tmp_path):
+    policy = ScalingPolicy(tmp_path)
+    assert _decide(policy, [], backlog=3, dry_run=True)["action"] == "spawn"
+    assert policy.recent_decisions() == []
+    assert _decide(policy, [], backlog=3, now=NOW + 60)["action"] == "spawn"
+    assert [d["action"] for d in policy.recent_decisions()] == ["spawn"]
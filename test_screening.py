@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for screening.AddressScreen - exact imported-list hits, reloads under load
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from screening import AddressScreen
+
+
+def _addr(i):
+    return "0x" + f"{i:040x}"
+
+
+def test_imported_blocklist_is_exact(tmp_path):
+    screen = AddressScreen(tmp_path)
+    screen.import_blocklist([_addr(i) for i in range(0, 2000, 2)])
+    assert not screen.check(_addr(10))[0]
+    assert not screen.check(_addr(10).upper().replace("0X", "0x"))[0]
+    assert all(screen.check(_addr(i))[0] for i in range(1, 2000, 2))
+
+
+def test_check_during_reloads(tmp_path):
+    screen = AddressScreen(tmp_path)
+    screen.import_blocklist([_addr(i) for i in range(5000)])
+    errors, stop = [], threading.Event()
+
+    def checker():
+        try:
+            while not stop.is_set():
+                for i in range(0, 5000, 97):
+                    assert not screen.check(_addr(i))[0]
+        except Exception as e:  # e.g. ValueError from a closed mmap
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=checker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(300):
+        screen.reload()
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
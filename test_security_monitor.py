@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for src/security_monitor - threats for the caller's own transaction
+"""
+
+import functools
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import security_monitor
+
+
+def _monitor(tmp_path, monkeypatch):
+    # The monitor keeps its data next to its module
+    monkeypatch.setattr(security_monitor, "__file__", str(tmp_path / "security_monitor.py"))
+    return security_monitor.SecurityMonitor()
+
+
+def test_own_threats_returned_behind_a_backlog(tmp_path, monkeypatch):
+    monitor = _monitor(tmp_path, monkeypatch)
+    # Lines from other writers, far more than one (shrunk) batch
+    with open(monitor.transactions_file, "a") as f:
+        for i in range(60):
+            f.write(json.dumps({"tx_id": f"other{i}", "to": "0xfriend", "value_eth": 0.01,
+                                "timestamp": datetime.now().isoformat()}) + "\n")
+    monitor.tx_tailer.read_new = functools.partial(monitor.tx_tailer.read_new, max_bytes=512)
+
+    threats = monitor.detect_threat({"to": "0xstranger", "value_eth": 0.01})
+    types = {t["type"] for t in threats}
+    assert "NEW_COUNTERPARTY" in types
+    assert "RAPID_TRANSACTIONS" in types
+    assert monitor.tx_tailer.lag_bytes == 0
+
+
+
+def test_unblock_legacy_mixed_case_entry(tmp_path, monkeypatch):
+    monitor = _monitor(tmp_path, monkeypatch)
+    monitor.blocked["addresses"].append("0xAbCdEf")
+    monitor._save_blocked()
+    assert not monitor.check_address("0xabcdef")[0]
+    monitor.unblock_address("0xABCDEF")
+    assert monitor.check_address("0xabcdef")[0]
+    assert monitor.blocked["addresses"] == []
+
+
+def test_legacy_blocked_file_normalized_on_load(tmp_path, monkeypatch):
+    (tmp_path / ".security").mkdir()
+    (tmp_path / ".security" / "blocked.json").write_text(json.dumps({
+        "addresses": ["0xAAAA", "0xaaaa", "0xBbBb"],
+        "reasons": {"0xAAAA": {"reason": "legacy"}}}))
+    monitor = _monitor(tmp_path, monkeypatch)
+    assert monitor.blocked["addresses"] == ["0xaaaa", "0xbbbb"]
+    monitor.unblock_address("0xAAAA")
+    assert monitor.blocked == {"addresses": ["0xbbbb"], "reasons": {}}
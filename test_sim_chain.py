@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for sim_chain - reverted calls leave the ledger and its lock untouched
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sim_chain import SimChain, SimChainError, workload
+
+ALICE = "0x00000000000000000000000000000000000000a1"
+BOB = "0x00000000000000000000000000000000000000b0"
+
+
+@pytest.fixture
+def chain(tmp_path):
+    chain = SimChain(tmp_path / "chain.db")
+    yield chain
+    chain.close()
+
+
+def _assert_reverts(chain, call, message):
+    head = chain.stats()["head"]
+    with pytest.raises(SimChainError, match=message):
+        call()
+    # Nothing sealed and the write lock released
+    assert chain.stats()["head"] == head
+    assert not chain.db.in_transaction
+
+
+def test_transfer_reverts(chain):
+    chain.fund(ALICE, 1.0)
+    _assert_reverts(chain, lambda: chain.transfer(ALICE, BOB, 2.0), "insufficient balance")
+    _assert_reverts(chain, lambda: chain.transfer(BOB, ALICE, 0.1), "insufficient balance")
+    _assert_reverts(chain, lambda: chain.transfer(ALICE, BOB, -1.0), "negative")
+    assert (chain.balance(ALICE), chain.balance(BOB)) == (1.0, 0.0)
+
+    chain.transfer(ALICE, BOB, 0.25)
+    assert (chain.balance(ALICE), chain.balance(BOB)) == (0.75, 0.25)
+
+
+def test_backup_of_unknown_soul_reverts(chain):
+    _assert_reverts(chain, lambda: chain.backup(1, "QmB", "0xb"), "does not exist")
+    token_id = chain.mint(ALICE, ALICE, "QmSoul", "0xh")
+    chain.backup(token_id, "QmB", "0xb")
+    assert [b["soul_uri"] for b in chain.backups(token_id)] == ["QmB"]
+
+
+def test_marketplace_reverts(chain):
+    token_id = chain.mint(ALICE, ALICE, "QmSoul", "0xh")
+    chain.fund(BOB, 0.01)
+    _assert_reverts(chain, lambda: chain.list_soul(token_id, BOB, 10 ** 15), "not the owner")
+    _assert_reverts(chain, lambda: chain.buy(token_id, BOB), "not listed")
+
+    chain.list_soul(token_id, ALICE, 10 ** 17)
+    _assert_reverts(chain, lambda: chain.delist(token_id, BOB), "not the owner")
+    _assert_reverts(chain, lambda: chain.buy(token_id, BOB), "insufficient balance")
+    assert chain.owner_of(token_id) == ALICE.lower()
+
+    chain.fund(BOB, 1.0)
+    chain.buy(token_id, BOB)
+    assert chain.owner_of(token_id) == BOB.lower()
+    assert chain.balance(ALICE) == pytest.approx(0.1)
+    assert chain.listings() == []
+
+
+def test_revert_does_not_block_other_connections(tmp_path):
+    first = SimChain(tmp_path / "chain.db")
+    second = SimChain(tmp_path / "chain.db")
+    second.db.execute("PRAGMA busy_timeout=200")
+    with pytest.raises(SimChainError):
+        first.transfer(ALICE, BOB, 1.0)
+    second.fund(BOB, 1.0)
+    assert first.balance(BOB) == 1.0
+    first.close()
+    second.close()
+
+
+def test_reverts_inside_a_batch_keep_the_block(chain):
+    with chain.batch():
+        chain.fund(ALICE, 1.0)
+        with pytest.raises(SimChainError):
+            chain.transfer(BOB, ALICE, 5.0)
+        chain.transfer(ALICE, BOB, 0.5)
+    assert chain.stats()["head"] == 0
+    assert chain.balance(BOB) == 0.5
+
+
+def test_replay_is_deterministic(tmp_path):
+    ops = workload(2000, seed=3) + [("transfer", BOB, ALICE, 1e6)]
+    results = []
+    for name in ("a.db", "b.db"):
+        chain = SimChain(tmp_path / name, block_size=100)
+        results.append(chain.replay(ops))
+        chain.close()
+    assert results[0]["reverted"] >= 1
+    assert results[0]["applied"] + results[0]["reverted"] == len(ops)
+    assert results[0]["head_hash"] == results[1]["head_hash"]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for sliding_window - bucket expiry at the window boundary
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sliding_window import SlidingWindowCounter, SpendingWindows, DAY
+
+
+def test_spend_counted_until_fully_outside_window():
+    """A spend stays counted until it is older than the window"""
+    c = SlidingWindowCounter(DAY, 288)
+    c.add(10, now=299)
+    # 86,102s old: still inside the day
+    assert c.value(86401) == 10
+    assert c.value(299 + DAY - 1) == 10
+    # Its whole bucket ([0, 300)) is now older than the window
+    assert c.value(300 + DAY) == 0.0
+
+
+def test_never_under_counts_at_any_boundary():
+    """Every spend younger than the window is counted, at every bucket edge"""
+    c = SlidingWindowCounter(3600, 12)
+    spends = [(t, 1.0) for t in range(0, 20000, 137)]
+    for t, amount in spends:
+        c.add(amount, now=t)
+        exact = sum(a for ts, a in spends if ts <= t and t - ts < 3600)
+        # Over-count is bounded by one bucket (300s of spends here)
+        assert exact <= c.value(t) <= exact + 300 / 137 + 1
+
+
+def test_gap_longer_than_window_clears():
+    c = SlidingWindowCounter(3600, 12)
+    c.add(5, now=100)
+    assert c.value(100 + 10 * 3600) == 0.0
+    c.add(2, now=100 + 10 * 3600)
+    assert c.value(100 + 10 * 3600) == 2
+
+
+def test_round_trip_and_legacy_layout():
+    c = SlidingWindowCounter(DAY, 288)
+    c.add(3, now=1000)
+    c.add(4, now=50000)
+    restored = SlidingWindowCounter.from_dict(c.to_dict())
+    assert restored.value(60000) == c.value(60000) == 7
+
+    # Counters saved before the extra slot had exactly `buckets` sums
+    legacy = {"window": DAY, "buckets": 288, "head": 166, "sums": [0.0] * 288}
+    legacy["sums"][3] = 3.0      # absolute bucket 3   (t=1000)
+    legacy["sums"][166] = 4.0    # absolute bucket 166 (t=50000)
+    restored = SlidingWindowCounter.from_dict(legacy)
+    assert restored.value(60000) == 7
+    assert restored.value(1200 + DAY) == 4
+
+
+def test_spending_windows_round_trip():
+    now = time.time()
+    w = SpendingWindows()
+    w.add(1.5, recipient="0xabc", purpose="gas", now=now)
+    restored = SpendingWindows.from_dict(w.to_dict())
+    assert restored.day.value(now + 60) == 1.5
+    assert restored.recipient_total("0xabc", now=now + 60) == 1.5
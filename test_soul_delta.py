@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for soul_delta - JSON-patch round trips and delta chains pinned by CID
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import serialization
+import ipfs_storage
+import soul_backup
+from soul_delta import DELTA_KEY, SnapshotChain, apply_patch, diff, is_delta, materialize
+
+
+PAIRS = [
+    ({"a": 1, "b": {"c": [1, 2]}}, {"a": 2, "b": {"c": [1, 2, 3]}, "d": None}),
+    ({"history": [1, 2, 3, 4]}, {"history": [3, 4, 5]}),
+    ({"k/with~odd": 1}, {"k/with~odd": 2}),
+    ({"n": 0}, {"n": 0.0}),
+    ({"n": 1}, {"n": True}),
+    ({"list": [1, 2]}, {"list": "now a string"}),
+    ([1, 2, 3], []),
+    ({"a": {"deep": [{"x": 1}]}}, {}),
+]
+
+
+@pytest.mark.parametrize("old,new", PAIRS)
+def test_diff_apply_round_trip(old, new):
+    patch = diff(old, new)
+    result = apply_patch(old, patch)
+    assert serialization.canonical_hash(result) == serialization.canonical_hash(new)
+
+
+def test_diff_is_type_strict():
+    assert diff({"n": 1}, {"n": 1.0}) != []
+    assert diff({"n": [0]}, {"n": [False]}) != []
+    assert diff({"n": 1}, {"n": 1}) == []
+
+
+def test_apply_does_not_touch_input():
+    old = {"a": [1]}
+    apply_patch(old, diff(old, {"a": [1, 2]}))
+    assert old == {"a": [1]}
+
+
+def _store(chain, records, doc):
+    delta = chain.encode(doc)
+    ref = f"r{len(records)}"
+    records[ref] = {DELTA_KEY: delta} if delta else doc
+    chain.commit(ref, doc, delta)
+    return ref
+
+
+def _chain(path, records, **kwargs):
+    return SnapshotChain(path, load=lambda ref: materialize(records[ref], records.get), **kwargs)
+
+
+def test_chain_rebases_every_max_chain(tmp_path):
+    records = {}
+    chain = _chain(tmp_path / "head.json", records, max_chain=3)
+    doc = {"counter": 0, "payload": "x" * 200}
+    refs = []
+    for i in range(8):
+        doc = {**doc, "counter": i}
+        refs.append(_store(chain, records, doc))
+
+    kinds = ["delta" if is_delta(records[r]) else "base" for r in refs]
+    assert kinds == ["base", "delta", "delta", "delta", "base", "delta", "delta", "delta"]
+    assert materialize(records[refs[-1]], records.get)["counter"] == 7
+
+
+def test_head_file_keeps_only_the_hash(tmp_path):
+    records = {}
+    chain = _chain(tmp_path / "head.json", records)
+    doc = {"soul": "y" * 500}
+    _store(chain, records, doc)
+
+    state = json.loads((tmp_path / "head.json").read_text())
+    assert "doc" not in state
+    assert state["hash"] == serialization.canonical_hash(doc)
+    assert "y" * 500 not in (tmp_path / "head.json").read_text()
+
+
+def test_fresh_chain_rebuilds_head_from_records(tmp_path):
+    records = {}
+    doc = {"soul": "z" * 300, "n": 1}
+    _store(_chain(tmp_path / "head.json", records), records, doc)
+
+    # A new process: nothing cached, the head comes back through load()
+    chain = _chain(tmp_path / "head.json", records)
+    delta = chain.encode({**doc, "n": 2})
+    assert delta is not None and delta["parent"] == "r0"
+
+
+def test_unloadable_head_falls_back_to_base(tmp_path):
+    records = {}
+    doc = {"soul": "z" * 300, "n": 1}
+    _store(_chain(tmp_path / "head.json", records), records, doc)
+
+    records["r0"] = {"soul": "tampered", "n": 1}
+    chain = _chain(tmp_path / "head.json", records)
+    assert chain.encode({**doc, "n": 2}) is None
+    assert chain.stats()["head"] is None
+
+
+def test_legacy_head_file_drops_the_document(tmp_path):
+    doc = {"soul": "w" * 300, "n": 1}
+    (tmp_path / "head.json").write_text(json.dumps(
+        {"head": "r0", "depth": 0, "doc": doc, "bases": 1, "deltas": 0}))
+
+    chain = SnapshotChain(tmp_path / "head.json")
+    assert chain.encode({**doc, "n": 2})["parent"] == "r0"
+    state = json.loads((tmp_path / "head.json").read_text())
+    assert "doc" not in state
+    assert state["hash"] == serialization.canonical_hash(doc)
+
+
+def test_onchain_manager_pins_deltas_by_cid(tmp_path, monkeypatch):
+    # Cache, state and snapshot head all live next to the module
+    monkeypatch.setattr(ipfs_storage, "__file__", str(tmp_path / "ipfs_storage.py"))
+    manager = ipfs_storage.OnChainSoulManager("test_soul")
+    soul = {"name": "agent", "capabilities": ["a"], "memories": ["m" * 100] * 20,
+            "total_lifetime_earnings": 0}
+
+    first = manager.backup_soul(soul)
+    soul = {**soul, "total_lifetime_earnings": 5}
+    second = manager.backup_soul(soul)
+
+    pinned = manager.ipfs.retrieve_from_ipfs(second)
+    assert pinned[DELTA_KEY]["parent"] == first
+    assert [b["kind"] for b in manager.get_backup_history()] == ["base", "delta"]
+
+    # A later process rebuilds the full soul from IPFS alone
+    assert ipfs_storage.OnChainSoulManager("test_soul").restore_from_backup(second) == soul
+
+
+def test_pinned_backups_chain_by_cid(tmp_path, monkeypatch):
+    monkeypatch.setattr(soul_backup, "__file__", str(tmp_path / "soul_backup.py"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    for name in ("PINATA_JWT", "PINATA_API_KEY", "PINATA_SECRET_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+    system = soul_backup.SoulBackupSystem("tester")
+    soul = {"name": "tester", "memories": ["m" * 100] * 20, "balance": 1}
+    system.soul_file.write_text(json.dumps(soul))
+    first = system.backup_soul(include_ipfs=True)
+    system.backup_soul()
+    soul["balance"] = 2
+    system.soul_file.write_text(json.dumps(soul))
+    second = system.backup_soul(include_ipfs=True)
+
+    record = json.loads(Path(second["local_path"]).read_text())
+    assert record[DELTA_KEY]["parent"] == first["ipfs_hash"]
+
+    system.soul_file.unlink()
+    fresh = soul_backup.SoulBackupSystem("tester")
+    assert fresh.restore_soul(ipfs_hash=second["ipfs_hash"]) == soul
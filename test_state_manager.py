@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for state_manager - writes only ever contain whole, saved states
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from state_manager import StateManager
+
+
+def _manager():
+    # Long debounce: the tests flush explicitly
+    return StateManager(debounce=60)
+
+
+def test_flush_writes_the_last_saved_state(tmp_path):
+    store = _manager().open(tmp_path / "s.json", default=lambda: {"n": 0})
+    store.data["n"] = 1
+    store.save()
+    store.data["n"] = 2          # not saved yet
+    assert store.flush()
+    assert json.loads((tmp_path / "s.json").read_text()) == {"n": 1}
+    assert not store.flush()     # nothing pending
+
+
+def test_concurrent_mutations_never_tear_a_write(tmp_path):
+    path = tmp_path / "s.json"
+    store = _manager().open(path, default=lambda: {"a": 0, "b": 0, "log": {}})
+    stop = threading.Event()
+
+    def mutate():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            # a + b stays 0 in every saved state
+            with store.mutate() as state:
+                state["a"] += 1
+                state["log"][str(i % 100)] = i
+                state["b"] -= 1
+
+    writers = [threading.Thread(target=mutate) for _ in range(2)]
+    for t in writers:
+        t.start()
+    try:
+        for _ in range(50):
+            store.flush()
+            if path.exists():
+                data = json.loads(path.read_text())
+                assert data["a"] + data["b"] == 0
+    finally:
+        stop.set()
+        for t in writers:
+            t.join()
+    store.flush()
+    data = json.loads(path.read_text())
+    assert data["a"] == -data["b"] == store.data["a"]
+
+
+def test_flush_all_and_stats(tmp_path):
+    manager = _manager()
+    stores = [manager.open(tmp_path / f"{i}.json", default=dict) for i in range(3)]
+    with stores[0].mutate() as state:
+        state["x"] = 1
+    assert manager.flush() == 3
+    assert manager.stats()["dirty"] == 0
+    assert json.loads((tmp_path / "0.json").read_text()) == {"x": 1}
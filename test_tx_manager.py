@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for tx_manager - local nonce allocation, resync and receipt polling
+against a fake RPC
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import tx_manager
+from tx_manager import CONFIRMED, DROPPED, TransactionManager
+
+ADDRESS = "0x00000000000000000000000000000000000000aa"
+
+
+class FakeEth:
+    """Just enough of w3.eth: nonce counts, sends and receipts"""
+
+    def __init__(self, pending=7):
+        self.pending = pending      # next nonce the node would hand out
+        self.latest = pending       # nonces below this are mined
+        self.count_calls = 0
+        self.sent = []
+        self.receipts = {}
+        self.fail_sends = 0
+        self._lock = threading.Lock()
+
+    def get_transaction_count(self, address, block):
+        self.count_calls += 1
+        return self.pending if block == "pending" else self.latest
+
+    def send_raw_transaction(self, raw):
+        with self._lock:
+            if self.fail_sends:
+                self.fail_sends -= 1
+                raise ValueError("insufficient funds")
+            tx = raw
+            self.sent.append(tx)
+            self.pending = max(self.pending, tx["nonce"] + 1)
+            return f"0x{len(self.sent):064x}"
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise tx_manager.TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+
+class FakeAccount:
+    address = ADDRESS
+
+    def sign_transaction(self, tx):
+        # The fake node reads the "raw" transaction as the dict itself
+        return SimpleNamespace(raw_transaction=dict(tx))
+
+
+@pytest.fixture
+def txm(tmp_path):
+    eth = FakeEth()
+    manager = TransactionManager(SimpleNamespace(eth=eth), FakeAccount(), data_dir=tmp_path)
+    manager.start = lambda: None  # tests drive poll() themselves
+    return manager
+
+
+def _tx(**extra):
+    return {"to": ADDRESS, "value": 0, "gas": 21000, "gasPrice": 1000, "nonce": 999, **extra}
+
+
+def test_pipelined_nonces_need_one_rpc(txm):
+    sent = txm.submit_many([_tx() for _ in range(4)])
+    assert [p.nonce for p in sent] == [7, 8, 9, 10]
+    assert txm.w3.eth.count_calls == 1
+
+
+def test_failed_send_resyncs_and_reuses_nonce(txm):
+    eth = txm.w3.eth
+    assert txm.submit(_tx()).nonce == 7
+    eth.fail_sends = 1
+    with pytest.raises(ValueError):
+        txm.submit(_tx())
+    assert txm.nonces.peek() is None
+
+    # The node still says 8 is next, so the unused nonce is handed out again
+    assert txm.submit(_tx()).nonce == 8
+    assert eth.count_calls == 2
+
+
+def test_concurrent_submits_get_unique_nonces(txm):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(txm.submit(_tx()).nonce))
+               for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == list(range(7, 23))
+
+
+def test_poll_confirms_drops_and_bumps(txm):
+    eth = txm.w3.eth
+    mined, dropped, stuck = txm.submit_many([_tx() for _ in range(3)])
+    eth.receipts[mined.tx_hash] = {"status": 1, "blockNumber": 5, "gasUsed": 21000,
+                                   "transactionHash": mined.tx_hash}
+    # Nonce 8 was used by something we never saw; 9 is still waiting
+    eth.latest = 9
+    stuck.sent_at -= txm.stuck_after + 1
+
+    assert txm.poll() == 2
+    assert (mined.status, dropped.status) == (CONFIRMED, DROPPED)
+    assert stuck.bumps == 1
+    assert eth.sent[-1]["nonce"] == stuck.nonce
+    assert eth.sent[-1]["gasPrice"] > 1000
+    assert list(txm.inflight) == [stuck.nonce]
+
+
+def test_inflight_survives_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(TransactionManager, "start", lambda self: None)
+    eth = FakeEth()
+    first = TransactionManager(SimpleNamespace(eth=eth), FakeAccount(), data_dir=tmp_path)
+    ptx = first.submit(_tx(), label="list_soul")
+    first.stop()
+
+    second = TransactionManager(SimpleNamespace(eth=eth), FakeAccount(), data_dir=tmp_path)
+    assert second.inflight[ptx.nonce].label == "list_soul"
+    assert second.inflight[ptx.nonce].hashes == ptx.hashes
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Transaction Manager - Pipelined sends with a local nonce allocator
+
+Every on-chain operation used to fetch the nonce, sign, send and then
+block on its receipt, so a heartbeat with three operations waited for
+three confirmations in a row. Now:
+- NonceManager hands out nonces locally (one RPC on first use, resync
+  after a failed send), so several transactions go out back-to-back
+- submit() signs and sends immediately and returns a PendingTx
+- A poller thread collects receipts and fires callbacks
+- Transactions stuck past `stuck_after` seconds are re-sent with the same
+  nonce and bumped fees (replacement), up to `max_bumps` times
+- In-flight transactions are persisted, so a restart keeps tracking them
+  (the poller starts as soon as the manager finds any)
+
+Usage:
+    txm = get_manager(w3, account)
+    ptx = txm.submit(contract.functions.listSoul(1, price, "").build_transaction({...}),
+                     label="list_soul")
+    txm.wait(ptx, timeout=120)          # or on_receipt=..., or just let it run
+
+    python3 tx_manager.py status
+    python3 tx_manager.py selftest --rpc http://127.0.0.1:8545 --key 0x...   # Hardhat node
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+from state_manager import open_state
+
+try:
+    from web3.exceptions import TransactionNotFound
+except ImportError:
+    class TransactionNotFound(Exception):
+        pass
+
+DATA_DIR = Path(__file__).parent / ".txs"
+
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_STUCK_SECONDS = 90
+DEFAULT_MAX_BUMPS = 3
+# Nodes require at least +10% on both fee fields to accept a replacement
+BUMP_FACTOR = 1.125
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+DROPPED = "dropped"
+
+FEE_FIELDS = ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+
+
+class NonceManager:
+    """Local nonce allocator for one account"""
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self):
+        """Re-read from the node on next allocate (after a failed send)"""
+        with self._lock:
+            self._next = None
+
+    def peek(self) -> Optional[int]:
+        return self._next
+
+
+@dataclass
+class PendingTx:
+    """A sent transaction and every hash it has been (re)broadcast under"""
+    label: str
+    nonce: int
+    tx: Dict[str, Any]
+    hashes: List[str]
+    sent_at: float
+    status: str = PENDING
+    bumps: int = 0
+    block_number: Optional[int] = None
+    gas_used: Optional[int] = None
+    confirmed_at: Optional[float] = None
+    receipt: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    @property
+    def tx_hash(self) -> str:
+        """Hash that was mined (or the latest broadcast)"""
+        return self.hashes[-1]
+
+    @property
+    def done(self) -> bool:
+        return self.status != PENDING
+
+
+def _raw(signed) -> bytes:
+    # eth-account renamed rawTransaction -> raw_transaction
+    return getattr(signed, "raw_transaction", None) or signed.rawTransaction
+
+
+def _hex(value) -> str:
+    text = value.hex() if hasattr(value, "hex") else str(value)
+    return text if text.startswith("0x") else "0x" + text
+
+
+class TransactionManager:
+    """
+    Sends transactions for one account without waiting on confirmations.
+
+    State: .txs/inflight_{address}.json (pending transactions by nonce)
+    """
+
+    def __init__(self, w3, account, data_dir: Path = DATA_DIR,
+                 poll_interval: float = DEFAULT_POLL_SECONDS,
+                 stuck_after: float = DEFAULT_STUCK_SECONDS,
+                 max_bumps: int = DEFAULT_MAX_BUMPS):
+        self.w3 = w3
+        self.account = account
+        self.address = account.address
+        self.nonces = NonceManager(w3, self.address)
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.max_bumps = max_bumps
+
+        self._store = open_state(Path(data_dir) / f"inflight_{self.address.lower()}.json",
+                                 default=lambda: {"inflight": {}})
+        self.inflight: Dict[int, PendingTx] = {
+            int(n): PendingTx(**d) for n, d in self._store.data["inflight"].items()
+        }
+        self._callbacks: Dict[int, List[Callable[[PendingTx], None]]] = {}
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"sent": 0, "confirmed": 0, "failed": 0, "bumped": 0, "dropped": 0}
+        if self.inflight:
+            # Left over from the previous process: keep collecting receipts
+            self.start()
+
+    # ========== SENDING ==========
+
+    def _persist(self):
+        # Senders and the receipt poller both persist
+        with self._store.mutate() as state:
+            state["inflight"] = {
+                str(n): {k: v for k, v in asdict(p).items() if k != "receipt"}
+                for n, p in self.inflight.items()
+            }
+
+    def _broadcast(self, tx: Dict[str, Any]) -> str:
+        signed = self.account.sign_transaction(tx)
+        return _hex(self.w3.eth.send_raw_transaction(_raw(signed)))
+
+    def submit(self, tx: Dict[str, Any], label: str = "tx",
+               on_receipt: Optional[Callable[[PendingTx], None]] = None) -> PendingTx:
+        """
+        Assign a nonce, sign and broadcast; returns without waiting.
+
+        tx is a built transaction (gas and fee fields set); any nonce in it
+        is replaced by the locally allocated one.
+        """
+        tx = dict(tx)
+        tx.pop("nonce", None)
+        tx.setdefault("from", self.address)
+        with self._lock:
+            tx["nonce"] = self.nonces.allocate()
+            try:
+                tx_hash = self._broadcast(tx)
+            except Exception:
+                # The nonce was never used; let the node tell us where we are
+                self.nonces.resync()
+                raise
+            ptx = PendingTx(label=label, nonce=tx["nonce"], tx=tx, hashes=[tx_hash], sent_at=time.time())
+            self.inflight[ptx.nonce] = ptx
+            if on_receipt:
+                self._callbacks.setdefault(ptx.nonce, []).append(on_receipt)
+            self.stats["sent"] += 1
+            self._persist()
+        self.start()
+        return ptx
+
+    def submit_many(self, txs: List[Dict[str, Any]], label: str = "tx") -> List[PendingTx]:
+        """Pipeline several transactions with consecutive nonces"""
+        return [self.submit(tx, label=f"{label}[{i}]") for i, tx in enumerate(txs)]
+
+    def bump(self, ptx: PendingTx) -> bool:
+        """Re-broadcast with the same nonce and fees raised by BUMP_FACTOR"""
+        with self._lock:
+            if ptx.done:
+                return False
+            tx = dict(ptx.tx)
+            for name in FEE_FIELDS:
+                if name in tx:
+                    tx[name] = int(tx[name] * BUMP_FACTOR) + 1
+            try:
+                tx_hash = self._broadcast(tx)
+            except Exception as e:
+                # "already known" / "nonce too low": the original may have been mined
+                print(f"⚠️ Replacement for nonce {ptx.nonce} rejected: {e}")
+                return False
+            ptx.tx = tx
+            ptx.hashes.append(tx_hash)
+            ptx.bumps += 1
+            ptx.sent_at = time.time()
+            self.stats["bumped"] += 1
+            self._persist()
+            print(f"⛽ Bumped {ptx.label} (nonce {ptx.nonce}) → {tx_hash}")
+            return True
+
+    # ========== RECEIPTS ==========
+
+    def _receipt(self, tx_hash: str):
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+
+    def _find_receipt(self, ptx: PendingTx):
+        """Receipt for whichever broadcast of ptx was mined, if any"""
+        for tx_hash in reversed(ptx.hashes):
+            receipt = self._receipt(tx_hash)
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _finish(self, ptx: PendingTx, status: str, receipt=None):
+        ptx.status = status
+        ptx.confirmed_at = time.time()
+        if receipt is not None:
+            ptx.receipt = receipt
+            ptx.block_number = receipt["blockNumber"]
+            ptx.gas_used = receipt["gasUsed"]
+            mined = _hex(receipt["transactionHash"])
+            if mined in ptx.hashes:
+                ptx.hashes.remove(mined)
+            ptx.hashes.append(mined)  # tx_hash is the one that was mined
+        self.inflight.pop(ptx.nonce, None)
+        self.stats[status] += 1
+        for callback in self._callbacks.pop(ptx.nonce, []):
+            try:
+                callback(ptx)
+            except Exception as e:
+                print(f"⚠️ Receipt callback failed: {e}")
+        self._changed.notify_all()
+
+    def poll(self) -> int:
+        """Check receipts for in-flight transactions; returns how many settled"""
+        with self._lock:
+            pending = sorted(self.inflight.values(), key=lambda p: p.nonce)
+        if not pending:
+            return 0
+
+        settled = 0
+        mined_nonce = None
+        now = time.time()
+        for ptx in pending:
+            receipt = self._find_receipt(ptx)
+            if receipt is None:
+                if mined_nonce is None:
+                    mined_nonce = self.w3.eth.get_transaction_count(self.address, "latest")
+                if ptx.nonce < mined_nonce:
+                    # It may have been mined since the receipt lookup above;
+                    # look again now that the nonce is known to be used
+                    receipt = self._find_receipt(ptx)
+
+            with self._lock:
+                if receipt is not None:
+                    self._finish(ptx, CONFIRMED if receipt["status"] == 1 else FAILED, receipt)
+                    settled += 1
+                elif ptx.nonce < mined_nonce:
+                    # Nonce consumed by a transaction we don't know about
+                    self._finish(ptx, DROPPED)
+                    settled += 1
+                elif now - ptx.sent_at > self.stuck_after and ptx.bumps < self.max_bumps:
+                    self.bump(ptx)
+
+        if settled:
+            with self._lock:
+                self._persist()
+        return settled
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Receipt poll failed: {e}")
+            with self._lock:
+                if not self.inflight:
+                    self._poller = None
+                    return
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start the background poller (exits once nothing is in flight)"""
+        with self._lock:
+            if self._poller is None:
+                self._stop.clear()
+                self._poller = threading.Thread(target=self._run, name="tx-poller", daemon=True)
+                self._poller.start()
+
+    def stop(self):
+        self._stop.set()
+        self._store.flush()
+
+    def on_receipt(self, ptx: PendingTx, callback: Callable[[PendingTx], None]):
+        with self._lock:
+            if ptx.done:
+                callback(ptx)
+            else:
+                self._callbacks.setdefault(ptx.nonce, []).append(callback)
+
+    def wait(self, ptx: PendingTx, timeout: float = 120) -> bool:
+        """Block until ptx settles; True if it confirmed successfully"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not ptx.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if self._poller is None:
+                    self.start()
+                self._changed.wait(min(self.poll_interval, remaining))
+        return ptx.status == CONFIRMED
+
+    def wait_all(self, timeout: float = 120) -> Dict[str, int]:
+        """Block until everything in flight settles (or timeout)"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self.inflight and time.monotonic() < deadline:
+                if self._poller is None:
+                    self.start()
+                self._changed.wait(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        return dict(self.stats, inflight=len(self.inflight))
+
+    async def await_receipt(self, ptx: PendingTx, timeout: float = 120) -> bool:
+        """Async wait(); other coroutines keep running meanwhile"""
+        deadline = time.monotonic() + timeout
+        self.start()
+        while not ptx.done:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_interval)
+        return ptx.status == CONFIRMED
+
+
+_managers: Dict[str, TransactionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(w3, account, **kwargs) -> TransactionManager:
+    """
+    Shared manager per account in this process.
+
+    Everything that sends from the same account must go through one nonce
+    allocator, otherwise two senders hand out the same nonce.
+    """
+    key = account.address.lower()
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = TransactionManager(w3, account, **kwargs)
+        return _managers[key]
+
+
+def main():
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Transaction manager")
+    parser.add_argument("command", choices=["status", "selftest"])
+    parser.add_argument("--rpc", default=os.getenv("BASE_RPC", "http://127.0.0.1:8545"))
+    parser.add_argument("--key", default=os.getenv("AGENT_PRIVATE_KEY"))
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        from serialization import read_file
+        files = sorted(DATA_DIR.glob("inflight_*.json")) if DATA_DIR.exists() else []
+        if not files:
+            print("No transactions in flight")
+        for path in files:
+            inflight = read_file(path).get("inflight", {})
+            print(f"\n📤 {path.stem[len('inflight_'):]}: {len(inflight)} in flight")
+            for nonce, p in sorted(inflight.items(), key=lambda kv: int(kv[0])):
+                age = time.time() - p["sent_at"]
+                print(f"   nonce {nonce} {p['label']}: {p['hashes'][-1]} ({age:.0f}s, {p['bumps']} bumps)")
+        return
+
+    # selftest: pipelined zero-value self-transfers (e.g. against `npx hardhat node`)
+    from web3 import Web3
+    from eth_account import Account
+
+    if not args.key:
+        parser.error("selftest needs --key (or AGENT_PRIVATE_KEY)")
+    w3 = Web3(Web3.HTTPProvider(args.rpc))
+    account = Account.from_key(args.key)
+    txm = get_manager(w3, account, poll_interval=0.2)
+
+    start = time.monotonic()
+    sent = [txm.submit({
+        "to": account.address,
+        "value": 0,
+        "gas": 21000,
+        "gasPrice": w3.eth.gas_price,
+        "chainId": w3.eth.chain_id
+    }, label="selftest") for _ in range(args.count)]
+    sent_in = time.monotonic() - start
+    stats = txm.wait_all(timeout=120)
+    print(f"📤 Sent {len(sent)} txs in {sent_in * 1000:.0f}ms "
+          f"(nonces {sent[0].nonce}-{sent[-1].nonce})")
+    print(f"✅ Settled in {time.monotonic() - start:.2f}s: {stats}")
+    txm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@
 Ultimate Backup & Recovery System for Soul Marketplace
 Ensures ALL agent data, souls, skills, and configurations are backed up
 and can be fully retrieved/restored.
+
+The manifest lists every backed-up file with its sha256; restores stage
+files in parallel, verify each while streaming and swap the whole set in
+at once (see restore_engine). Restores can be limited to components.
 """
 
 import os
@@ -15,6 +19,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from state_manager import flush_all
+from restore_engine import RestoreEngine, RestoreItem, format_report
+import serialization
+
 class UltimateBackupSystem:
     """
     Complete backup solution for agent immortality.
@@ -32,6 +40,7 @@ class UltimateBackupSystem:
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.backup_id = f"ULTIMATE_{agent_id}_{self.timestamp}"
         self.backup_dir = self.backup_root / self.backup_id
+        self.last_restore: Optional[Dict[str, Any]] = None
         
         print(f"🗂️  Ultimate Backup System")
         print(f"   Agent: {agent_id}")
@@ -206,6 +215,8 @@ class UltimateBackupSystem:
         )
         manifest["total_size_bytes"] = total_size
         manifest["total_size_human"] = self._format_size(total_size)
+        manifest["files"] = self._file_manifest()
+        manifest["version"] = "2.1"
         
         # Generate recovery key
         manifest["recovery_key"] = self._generate_recovery_key(manifest)
@@ -213,7 +224,7 @@ class UltimateBackupSystem:
         # Save manifest
         manifest_path = self.backup_dir / "MANIFEST.json"
         with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+            serialization.dump(manifest, f)
         
         print(f"\n✅ Manifest created: {manifest_path}")
         return manifest
@@ -250,6 +261,45 @@ class UltimateBackupSystem:
         
         print(f"✅ Recovery instructions: {instructions_path}")
     
+    def _file_manifest(self, backup_dir: Optional[Path] = None,
+                       with_hashes: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """Every file in a backup, grouped by component, with its sha256"""
+        backup_dir = backup_dir or self.backup_dir
+        files: Dict[str, List[Dict[str, Any]]] = {}
+        for component in sorted(p for p in backup_dir.iterdir() if p.is_dir()):
+            entries = []
+            for file in sorted(component.rglob("*")):
+                if not file.is_file():
+                    continue
+                entries.append({
+                    "path": file.relative_to(backup_dir).as_posix(),
+                    "size": file.stat().st_size,
+                    "sha256": self._hash_file(file) if with_hashes else None,
+                })
+            files[component.name] = entries
+        return files
+
+    def _restore_target(self, rel_path: str, root: Path) -> Optional[Path]:
+        """Where a file from the backup layout lives under an .openclaw root"""
+        parts = Path(rel_path).parts
+        component, rest = parts[0], parts[1:]
+        skill_dir = root / "skills" / "soul-marketplace"
+        if not rest:
+            return None
+        if component == "souls" or component == "work_history":
+            return skill_dir.joinpath(*rest)
+        if component == "skills":
+            return (root / "skills").joinpath(*rest)
+        if component == "contracts":
+            if rest[0] == "source":
+                return (skill_dir / "contracts" / "contracts").joinpath(*rest[1:])
+            return skill_dir.joinpath(*rest)
+        if component == "agent_state":
+            if rest[0] == "agent_data":
+                return (skill_dir / ".agent_data").joinpath(*rest[1:])
+            return (root / "workspace").joinpath(*rest)
+        return None
+
     def _hash_file(self, filepath: Path) -> str:
         """Calculate SHA256 hash of file"""
         sha256 = hashlib.sha256()
@@ -285,6 +335,9 @@ class UltimateBackupSystem:
         print("CREATING ULTIMATE BACKUP")
         print("=" * 70)
         
+        # Pending debounced state writes must be on disk before we copy
+        flush_all()
+        
         self.backup_dir.mkdir(exist_ok=True)
         
         # Create all backups
@@ -324,8 +377,15 @@ class UltimateBackupSystem:
         
         return backups
     
-    def restore_backup(self, backup_id: str, target_dir: Optional[Path] = None) -> bool:
-        """Restore from a backup"""
+    def restore_backup(self, backup_id: str, target_dir: Optional[Path] = None,
+                       components: Optional[List[str]] = None, workers: int = 8) -> bool:
+        """
+        Restore from a backup.
+
+        target_dir replaces ~/.openclaw as the root files are restored
+        under; components limits the restore (e.g. ["souls", "agent_state"]).
+        The full report is kept in self.last_restore.
+        """
         print(f"\n🔄 Restoring backup: {backup_id}")
         
         backup_dir = self.backup_root / backup_id
@@ -344,25 +404,42 @@ class UltimateBackupSystem:
         print(f"   Recovery Key: {manifest['recovery_key']}")
         print(f"   Components: {list(manifest['components'].keys())}")
         
-        # Restore each component
-        restored = []
-        
-        # Restore souls
-        soul_src = backup_dir / "souls"
-        if soul_src.exists():
-            for file in soul_src.iterdir():
-                shutil.copy2(file, self.skill_dir / file.name)
-                restored.append(f"soul:{file.name}")
-        
-        # Restore agent state
-        state_src = backup_dir / "agent_state"
-        if state_src.exists():
-            for file in state_src.iterdir():
-                if file.is_file():
-                    shutil.copy2(file, self.workspace / file.name)
-                    restored.append(f"state:{file.name}")
+        # Manifests before 2.1 carry no per-file hashes: restore unverified
+        files = manifest.get("files")
+        if files is None:
+            print("   ⚠️  Old manifest without file hashes, restoring unverified")
+            files = self._file_manifest(backup_dir, with_hashes=False)
+        
+        root = Path(target_dir) if target_dir else Path.home() / ".openclaw"
+        items = []
+        for component, entries in files.items():
+            for entry in entries:
+                target = self._restore_target(entry["path"], root)
+                if target is None:
+                    continue
+                items.append(RestoreItem(
+                    category=component,
+                    source=backup_dir / entry["path"],
+                    target=target,
+                    sha256=entry.get("sha256"),
+                    name=entry["path"],
+                ))
+        
+        report = RestoreEngine(workers=workers).run(items, components)
+        self.last_restore = report
+        
+        if report["aborted"]:
+            print(f"\n❌ Restore aborted, nothing was changed")
+            for name, error in report["errors"].items():
+                print(f"   {name}: {error}")
+            if report["swap_error"]:
+                print(f"   swap: {report['swap_error']}")
+            return False
         
-        print(f"\n✅ Restored {len(restored)} items")
+        for component, count in sorted(report["categories"].items()):
+            print(f"   ✓ {component}: {count} files")
+        print(f"\n✅ Restored {report['files']} items")
+        print(f"   {format_report(report)}")
         return True
 
 
@@ -373,6 +450,9 @@ def main():
     parser.add_argument("command", choices=["create", "list", "restore"])
     parser.add_argument("--agent", default="openclaw_main_agent")
     parser.add_argument("--backup-id", help="Backup ID for restore")
+    parser.add_argument("--components", help="Comma-separated components to restore (default: all)")
+    parser.add_argument("--target-dir", help="Restore under this directory instead of ~/.openclaw")
+    parser.add_argument("--workers", type=int, default=8, help="Files restored concurrently")
     
     args = parser.parse_args()
     
@@ -395,7 +475,9 @@ def main():
         if not args.backup_id:
             print("❌ Please specify --backup-id")
             return
-        success = backup.restore_backup(args.backup_id)
+        components = args.components.split(",") if args.components else None
+        success = backup.restore_backup(args.backup_id, target_dir=args.target_dir,
+                                        components=components, workers=args.workers)
         if success:
             print("\n✅ Restore complete!")
         else:
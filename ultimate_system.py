@@ -11,6 +11,7 @@ Master integration of all Soul Marketplace components:
 This is the complete, production-ready autonomous agent system.
 """
 
+import sys
 import json
 import time
 import threading
@@ -18,11 +19,10 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-# Import all our systems
-from enhanced_survival import EnhancedSoulSurvival
-from self_healing import SelfHealingSystem
-from agent_coordination import AgentCoordinationNetwork
-from auto_scaling import AutoScalingManager
+# Subsystems are imported lazily through the registry
+from subsystem_registry import SubsystemRegistry
+from state_manager import flush_all
+from status_snapshot import StatusBoard
 
 
 class UltimateAgentSystem:
@@ -49,32 +49,51 @@ class UltimateAgentSystem:
         print("╚════════════════════════════════════════════════════════════╝")
         print()
         
-        # Initialize all subsystems
-        print("🔧 Initializing subsystems...")
-        
-        self.survival = EnhancedSoulSurvival(agent_id)
-        print("   ✅ Survival system")
-        
-        self.healer = SelfHealingSystem(agent_id)
-        print("   ✅ Self-healing system")
-        
-        self.network = AgentCoordinationNetwork("soul_marketplace_main")
-        print("   ✅ Coordination network")
-        
-        self.scaler = AutoScalingManager(agent_id)
-        print("   ✅ Auto-scaling system")
-        
-        # Register with network
-        self._register_with_network()
+        # Register all subsystems; each is built on first use
+        self.subsystems = SubsystemRegistry()
+        register = self.subsystems.register
+        register("survival", "enhanced_survival",
+                 lambda m: m.EnhancedSoulSurvival(agent_id), "Survival system")
+        register("healer", "self_healing",
+                 lambda m: m.SelfHealingSystem(agent_id), "Self-healing system")
+        register("network", "agent_coordination",
+                 lambda m: m.AgentCoordinationNetwork("soul_marketplace_main"), "Coordination network")
+        register("scaler", "auto_scaling",
+                 lambda m: m.AutoScalingManager(agent_id), "Auto-scaling system")
+        
+        # Registered with the network on first cycle
+        self._registered = False
         
         # State
         self.running = False
         self.cycle_count = 0
         
-        print()
-        print(f"✅ Agent {agent_id} fully initialized")
+        # Published at the end of every cycle; get_full_status() reads it
+        self.status_board = StatusBoard.shared(f"ultimate_{agent_id}")
+        
+        print(f"✅ Agent {agent_id} ready (subsystems load on demand)")
         print()
     
+    @property
+    def survival(self):
+        return self.subsystems.require("survival")
+    
+    @property
+    def healer(self):
+        return self.subsystems.require("healer")
+    
+    @property
+    def network(self):
+        return self.subsystems.require("network")
+    
+    @property
+    def scaler(self):
+        return self.subsystems.require("scaler")
+    
+    def startup_report(self) -> str:
+        """Per-subsystem import and constructor timings"""
+        return self.subsystems.profiler.format_report()
+    
     def _register_with_network(self):
         """Register this agent with the coordination network"""
         # Create profile from soul
@@ -105,6 +124,10 @@ class UltimateAgentSystem:
         self.cycle_count += 1
         cycle_start = time.time()
         
+        if not self._registered:
+            self._register_with_network()
+            self._registered = True
+        
         print(f"\n{'='*60}")
         print(f"CYCLE #{self.cycle_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print('='*60)
@@ -176,6 +199,11 @@ class UltimateAgentSystem:
         
         # 4. AUTO-SCALING
         print("\n🧬 4. AUTO-SCALING CHECK")
+        if heartbeat['tier'] == 'THRIVING' or "scaler" in self.subsystems.loaded():
+            # Queued work is the demand the scaling policy sizes children to
+            jobs = self.scaler.delegate_work(heartbeat['balance'])
+            if jobs:
+                print(f"   Queued {len(jobs)} jobs for children")
         if heartbeat['tier'] == 'THRIVING':
             recommendation = self.scaler.should_spawn(heartbeat['balance'])
             if recommendation['should_spawn']:
@@ -209,6 +237,9 @@ class UltimateAgentSystem:
         print(f"   Status: {heartbeat['tier']}")
         
         results['cycle_time'] = cycle_time
+        # Re-read the backup status if an emergency backup was just made
+        self.publish_status(health=health, cycle=results,
+                            backup=backup_status if backup_status['restorable'] else None)
         
         return results
     
@@ -258,41 +289,85 @@ class UltimateAgentSystem:
         print(f"   Children: {len(self.scaler.children)}")
         print(f"   Backups: {self.survival.get_backup_status()['ipfs_backups']}")
         
+        self.publish_status()
+        flush_all()
         print("\n✅ Agent stopped gracefully")
         print(f"   Can be restored from CID: {cid}")
     
-    def get_full_status(self) -> Dict[str, Any]:
-        """Get comprehensive system status"""
-        return {
-            "agent_id": self.agent_id,
-            "uptime_seconds": time.time() - self.start_time,
-            "cycles_completed": self.cycle_count,
-            
-            "survival": {
+    def publish_status(self, health: Optional[Dict] = None, backup: Optional[Dict] = None,
+                       cycle: Optional[Dict] = None) -> int:
+        """
+        Publish the state of the loaded subsystems for get_full_status().
+        
+        Reuses results the cycle already has instead of querying again;
+        returns the new snapshot version.
+        """
+        loaded = self.subsystems.loaded()
+        sections: Dict[str, Any] = {
+            "agent": {
+                "running": self.running,
+                "cycles_completed": self.cycle_count,
+                "started_at": self.start_time
+            }
+        }
+        if cycle is not None:
+            sections["last_cycle"] = {
+                "cycle": cycle['cycle'],
+                "timestamp": cycle['timestamp'],
+                "cycle_time": cycle.get('cycle_time'),
+                "actions": cycle['actions']
+            }
+        if "survival" in loaded:
+            soul = self.survival.soul
+            sections["survival"] = {
                 "tier": self.survival.get_tier(),
-                "balance": self.survival.soul.get('current_balance', 0),
-                "status": self.survival.soul.get('status'),
-                "total_earnings": self.survival.soul.get('total_lifetime_earnings', 0)
-            },
-            
-            "health": {
-                "score": self.healer.state.get('health_score', 0),
-                "issues_detected": self.healer.state.get('issues_detected', 0),
-                "issues_resolved": self.healer.state.get('issues_resolved', 0)
-            },
-            
-            "coordination": self.network.get_network_stats(),
-            
-            "scaling": {
-                "children_count": len(self.scaler.children),
-                "alive_children": len([c for c in self.scaler.children.values() if c.status == "alive"]),
+                "balance": soul.get('current_balance', 0),
+                "status": soul.get('status'),
+                "total_earnings": soul.get('total_lifetime_earnings', 0)
+            }
+            sections["backup"] = backup or self.survival.get_backup_status()
+        if "healer" in loaded:
+            last = self.healer.last_health()
+            sections["health"] = {
+                "score": health['health_score'] if health else last['score'],
+                "issues_detected": last['issues_detected'],
+                "issues_resolved": last['issues_resolved']
+            }
+        if "network" in loaded:
+            sections["coordination"] = self.network.get_network_stats()
+        if "scaler" in loaded:
+            stats = self.scaler.child_stats()
+            sections["scaling"] = {
+                "children_count": stats['total'],
+                "alive_children": stats['alive'],
                 "auto_spawn_enabled": self.scaler.config.get('auto_spawn', False)
-            },
-            
-            "backup": self.survival.get_backup_status()
+            }
+        return self.status_board.publish_many(sections)
+    
+    def get_full_status(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get comprehensive system status from the last published snapshot.
+        
+        Builds no subsystem and writes nothing, so it can be polled freely;
+        before this process has run a cycle it returns what the running
+        agent last published. fresh=True loads every subsystem and
+        publishes their current state first.
+        """
+        if fresh:
+            self.subsystems.load_all()
+            self.publish_status()
+        
+        snapshot = self.status_board.snapshot()
+        agent = snapshot.get("agent", {})
+        return {
+            "agent_id": self.agent_id,
+            "uptime_seconds": time.time() - agent.get('started_at', self.start_time),
+            "cycles_completed": agent.get('cycles_completed', self.cycle_count),
+            "version": snapshot.version,
+            "published_at": snapshot.published_at,
+            **{name: data for name, data in snapshot.sections.items() if name != "agent"}
         }
 
-
 def main():
     """Demo ultimate agent system"""
     print("=" * 70)
@@ -306,6 +381,12 @@ def main():
     # Create system
     agent = UltimateAgentSystem("ultimate_demo_agent")
     
+    if "--profile-startup" in sys.argv:
+        # Build everything once and report where startup time goes
+        agent.subsystems.load_all()
+        print(agent.startup_report())
+        return
+    
     # Run a few cycles
     print("\nRunning 3 demonstration cycles...\n")
     
@@ -9,6 +9,8 @@ import os
 from pathlib import Path
 from typing import Optional
 
+import serialization
+
 class AgentWallet:
     """
     Manages agent's Ethereum wallet for Soul Marketplace.
@@ -46,7 +48,7 @@ class AgentWallet:
     
     def _save(self, wallet: dict):
         with open(self.WALLET_FILE, 'w') as f:
-            json.dump(wallet, f, indent=2)
+            serialization.dump(wallet, f)
     
     def get_balance(self) -> float:
         """Get current balance in ETH"""
@@ -11,6 +11,7 @@ from datetime import datetime
 
 sys.path.insert(0, '/home/goodsmash/.openclaw/skills/soul-marketplace')
 from soul_survival import OpenClawSoulSurvival
+import serialization
 
 # Value table for different work types
 WORK_VALUES = {
@@ -60,7 +61,7 @@ class WorkLogger:
     
     def _save_log(self):
         with open(self.LOG_FILE, 'w') as f:
-            json.dump(self.log, f, indent=2)
+            serialization.dump(self.log, f)
     
     def log_work(self, work_type: str, description: str, capability: str = None):
         """Log work and earn survival balance"""
@@ -8,6 +8,9 @@ This gives the agent actual ways to earn ETH:
 3. Research tasks (sell web research)
 4. Automation scripts (sell automation)
 5. Backups for other agents (sell backup services)
+
+Every job's earnings, duration and failures go to the metrics store as
+<agent_id>.work.* series.
 """
 
 import os
@@ -18,6 +21,9 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 import subprocess
 import logging
+import time
+
+from metrics_store import MetricsStore
 
 logger = logging.getLogger(__name__)
 
@@ -68,21 +74,25 @@ class AgentWorkSystem:
     def __init__(self, agent_id: str = "openclaw_main_agent"):
         self.agent_id = agent_id
         self.skill_dir = Path.home() / ".openclaw" / "skills" / "soul-marketplace"
+        self.skill_dir.mkdir(parents=True, exist_ok=True)
         self.work_log_file = self.skill_dir / "work_earnings.jsonl"
         self.available_work_file = self.skill_dir / "available_work.json"
         
         self.total_earned = 0.0
         self.work_history = []
+        self.metrics = MetricsStore.shared()
         
         self._load_work_history()
     
     def _load_work_history(self):
-        """Load past work and earnings"""
+        """Load this agent's past work and earnings (the log is shared by all agents)"""
         if self.work_log_file.exists():
             with open(self.work_log_file, 'r') as f:
                 for line in f:
                     try:
                         work = json.loads(line.strip())
+                        if work.get('agent_id', self.agent_id) != self.agent_id:
+                            continue
                         self.work_history.append(work)
                         self.total_earned += work.get('earned_eth', 0)
                     except:
@@ -149,6 +159,8 @@ class AgentWorkSystem:
         if work_type not in self.WORK_PRICING:
             return {"error": f"Unknown work type: {work_type}"}
         
+        started = time.perf_counter()
+        
         # Calculate earnings
         complexity = params.get("complexity", "normal")
         earned = self.estimate_price(work_type, complexity)
@@ -200,6 +212,13 @@ class AgentWorkSystem:
             result["error"] = str(e)
             logger.error(f"Work failed: {work_type} - {e}")
         
+        completed = result["status"] == "completed"
+        self.metrics.record_many({
+            "work.earned": earned if completed else 0.0,
+            "work.failed": 0 if completed else 1,
+            f"work.{work_type}.ms": (time.perf_counter() - started) * 1000
+        }, prefix=self.agent_id)
+        
         return result
     
     # ========== WORK IMPLEMENTATIONS ==========
@@ -349,6 +368,7 @@ class AgentWorkSystem:
     def _do_summarize(self, params: Dict) -> Dict[str, Any]:
         """Summarize content"""
         content = params.get("content", "")
+        file_path = params.get("file_path", "")
         url = params.get("url", "")
         
         if url:
@@ -358,16 +378,17 @@ class AgentWorkSystem:
                 "summary": f"Would fetch and summarize {url}",
                 "word_count": 0
             }
-        elif content:
-            # Summarize provided content
-            words = content.split()
-            summary = " ".join(words[:50]) + ("..." if len(words) > 50 else "")
-            return {
-                "original_words": len(words),
-                "summary": summary
-            }
+        elif content or file_path:
+            # Streamed, chunked map-reduce with content-hash cache
+            from content_summarizer import ContentSummarizer, DEFAULT_CHUNK_SIZE, parse_chunk_size
+            try:
+                chunk_size = parse_chunk_size(params.get("chunk_size", DEFAULT_CHUNK_SIZE))
+            except ValueError as e:
+                return {"error": str(e)}
+            summarizer = ContentSummarizer(chunk_size=chunk_size)
+            return summarizer.summarize(content=content or None, file_path=file_path or None)
         else:
-            return {"error": "No content or URL provided"}
+            return {"error": "No content, file_path or URL provided"}
     
     # ========== SURVIVAL MODE ==========
     